@@ -126,7 +126,9 @@ def create_client_from_env(username=None,
                 settings.get('api_key'),
             )
 
-    return BaseClient(auth=auth, transport=transport)
+    return BaseClient(auth=auth, transport=transport,
+                      location_cache=(settings.get('location_cache') or
+                                      consts.LOCATION_CACHE))
 
 
 def Client(**kwargs):
@@ -145,13 +147,16 @@ class BaseClient(object):
     :param auth: auth driver that looks like SoftLayer.auth.AuthenticationBase
     :param transport: An object that's callable with this signature:
                       transport(SoftLayer.transports.Request)
+    :param location_cache: file the datacenters used by the managers are
+                           cached in (optional)
     """
 
     _prefix = "SoftLayer_"
 
-    def __init__(self, auth=None, transport=None):
+    def __init__(self, auth=None, transport=None, location_cache=None):
         self.auth = auth
         self.transport = transport
+        self.location_cache = location_cache
 
     def authenticate_with_password(self, username, password,
                                    security_question_id=None,
@@ -0,0 +1,98 @@
+"""Sync the DNS records of many servers."""
+# :license: MIT, see LICENSE for more details.
+
+import click
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.managers import dns
+
+
+@click.command(epilog="""Without --a-record, --aaaa-record or --ptr, the A and
+PTR records are synced, like `slcli vs dns-sync` does.""")
+@click.option('--tag', '-t', multiple=True,
+              help="Only sync servers with this tag. Can be given more than once")
+@click.option('--datacenter', '-d', help="Only sync servers in this datacenter")
+@click.option('--all', 'all_servers', is_flag=True,
+              help="Sync every server of the account")
+@click.option('--vs/--no-vs', default=True, show_default=True,
+              help="Include virtual servers")
+@click.option('--hardware/--no-hardware', default=True, show_default=True,
+              help="Include hardware servers")
+@click.option('--a-record', '-a', is_flag=True, help="Sync A records")
+@click.option('--aaaa-record', is_flag=True, help="Sync AAAA records")
+@click.option('--ptr', is_flag=True, help="Sync PTR records")
+@click.option('--ttl', default=7200, show_default=True, type=click.INT,
+              help="Sets the TTL of the records")
+@click.option('--dry-run', is_flag=True,
+              help="Only show the changes, don't make them")
+@click.option('--workers', default=8, show_default=True,
+              type=click.IntRange(min=1),
+              help="Number of API calls to run at the same time")
+@environment.pass_env
+def cli(env, tag, datacenter, all_servers, vs, hardware, a_record, aaaa_record,
+        ptr, ttl, dry_run, workers):
+    """Sync the A, AAAA and PTR records of many servers.
+
+    Each forward and reverse zone is fetched once and the changes are made
+    with a few batched calls.
+    """
+
+    if not (tag or datacenter or all_servers):
+        raise exceptions.ArgumentError(
+            "Choose servers with --tag or --datacenter, or use --all")
+
+    record_types = [record_type for record_type, wanted
+                    in (('A', a_record), ('AAAA', aaaa_record), ('PTR', ptr))
+                    if wanted] or ['A', 'PTR']
+    filters = {'tags': list(tag) or None, 'datacenter': datacenter,
+               'mask': dns.HOST_SYNC_MASK}
+    guests = SoftLayer.VSManager(env.client).list_instances(**filters) if vs else []
+    servers = (SoftLayer.HardwareManager(env.client).list_hardware(**filters)
+               if hardware else [])
+
+    manager = SoftLayer.DNSManager(env.client)
+    plans, errors = manager.plan_host_sync(guests, servers,
+                                           record_types=record_types,
+                                           ttl=ttl, workers=workers)
+
+    for fqdn in sorted(errors):
+        env.err("Skipping %s: %s" % (fqdn, errors[fqdn]))
+
+    table = formatting.Table(['zone', 'action', 'host', 'type', 'data', 'ttl'])
+    for plan in plans:
+        for record in plan.create:
+            table.add_row([plan.name, 'create', record['record'],
+                           record['type'], record['data'], record['ttl']])
+        for record in plan.update:
+            table.add_row([plan.name, 'update', record['host'],
+                           record['type'].upper(), record['data'],
+                           record['ttl']])
+
+    if not plans:
+        env.fout("%d servers are in sync" % (len(guests) + len(servers)))
+        return
+    env.fout(table)
+
+    if dry_run:
+        return
+
+    changes = sum(len(plan) for plan in plans)
+    if not (env.skip_confirmations or formatting.confirm(
+            "This will change %d DNS records. Continue?" % changes)):
+        raise exceptions.CLIAbort("Aborting DNS sync")
+
+    failed = 0
+    for plan in plans:
+        report = manager.apply_zone_sync(plan, workers=workers)
+        for (action, index), error in report.failed.items():
+            record = getattr(plan, action)[index]
+            env.err("Failed to %s %s record %s in %s: %s"
+                    % (action, record['type'].upper(),
+                       record.get('record') or record['host'], plan.name, error))
+        failed += len(report.failed)
+
+    if failed:
+        raise exceptions.CLIAbort("%d of %d changes failed" % (failed, changes))
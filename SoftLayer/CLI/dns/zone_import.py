@@ -1,6 +1,8 @@
 """Import zone based off a BIND zone file."""
 # :license: MIT, see LICENSE for more details.
+import os
 import re
+import sys
 
 import click
 
@@ -9,11 +11,16 @@ from SoftLayer.CLI import environment
 from SoftLayer.CLI import exceptions
 from SoftLayer.CLI import helpers
 
-RECORD_REGEX = re.compile(r"""^((?P<domain>(([\w-]+|\*)(\.)?)*|\@)?\s+
-                               (?P<ttl>\d+)?\s+
-                               (?P<class>\w+)?)?\s+
-                               (?P<type>\w+)\s+
-                               (?P<data>.*)""", re.X)
+# A token is a quoted string, a parenthesis, a comment or a run of anything
+# else which isn't whitespace
+TOKEN_REGEX = re.compile(r'"(?:[^"\\]|\\.)*"?|[()]|;.*|[^\s"();]+')
+# Each repetition ends in a unit, so a failed match can't backtrack over
+# every way of splitting a run of digits
+TTL_REGEX = re.compile(r'^(?:\d+[smhdw])*\d+[smhdw]?$', re.I)
+TTL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+CLASSES = ('IN', 'CH', 'HS', 'CS')
+# How deep $INCLUDE files may include other files
+MAX_INCLUDE_DEPTH = 8
 RECORD_FMT = "type={type}, record={record}, data={data}, ttl={ttl}"
 
 
@@ -26,20 +33,26 @@ def cli(env, zonefile, dry_run):
     """Import zone based off a BIND zone file."""
 
     manager = SoftLayer.DNSManager(env.client)
-    with open(zonefile) as zone_f:
-        zone_contents = zone_f.read()
-
-    zone, records, bad_lines = parse_zone_details(zone_contents)
-
-    env.out("Parsed: zone=%s" % zone)
-    for record in records:
-        env.out("Parsed: %s" % RECORD_FMT.format(**record))
+    parser = ZoneParser()
+    records = []
+    try:
+        with open(zonefile) as zone_f:
+            for record in parser.records(zone_f, path=zonefile):
+                env.out("Parsed: %s" % RECORD_FMT.format(**record))
+                if not dry_run:
+                    records.append(record)
+    except IOError as ex:
+        raise exceptions.CLIAbort("Can't read %s: %s" % (ex.filename, ex.strerror))
 
-    for line in bad_lines:
+    env.out("Parsed: zone=%s" % parser.zone)
+    for line in parser.bad_lines:
         env.out("Unparsed: %s" % line)
 
+    if parser.zone is None:
+        raise exceptions.CLIAbort("%s has no $ORIGIN" % zonefile)
     if dry_run:
         return
+    zone = parser.zone
 
     # Find zone id or create the zone if it doesn't exist
     try:
@@ -49,69 +62,225 @@ def cli(env, zonefile, dry_run):
         zone_id = manager.create_zone(zone)['id']
         env.out(click.style("Created: %s" % zone, fg='green'))
 
-    # Attempt to create each record
-    for record in records:
-        try:
-            manager.create_record(zone_id,
-                                  record['record'],
-                                  record['type'],
-                                  record['data'],
-                                  record['ttl'])
+    # Create the records in concurrent batches
+    errors = {}
+    with click.progressbar(length=len(records), label='Creating records',
+                           file=sys.stderr) as progress:
+        for index, _, error in manager.create_records(zone_id, records):
+            progress.update(1)
+            if error is not None:
+                if not isinstance(error, SoftLayer.SoftLayerAPIError):
+                    raise error
+                errors[index] = error
 
-            env.out(click.style("Created: %s" % RECORD_FMT.format(**record),
-                                fg='green'))
-        except SoftLayer.SoftLayerAPIError as ex:
+    for index, record in enumerate(records):
+        if index in errors:
             env.out(click.style("Failed: %s" % RECORD_FMT.format(**record),
                                 fg='red'))
-            env.out(click.style(str(ex), fg='red'))
+            env.out(click.style(str(errors[index]), fg='red'))
+        else:
+            env.out(click.style("Created: %s" % RECORD_FMT.format(**record),
+                                fg='green'))
 
     env.out(click.style("Finished", fg='green'))
 
 
 def parse_zone_details(zone_contents):
-    """Parses a zone file into python data-structures."""
-    records = []
-    bad_lines = []
-    zone_lines = [line.strip() for line in zone_contents.split('\n')]
+    """Parses a zone file into python data-structures.
 
-    zone_search = re.search(r'^\$ORIGIN (?P<zone>.*)\.', zone_lines[0])
-    zone = zone_search.group('zone')
+    :returns: tuple of (zone, records, bad_lines)
+    """
+    parser = ZoneParser()
+    records = list(parser.records(zone_contents.splitlines()))
+    return parser.zone, records, parser.bad_lines
 
-    for line in zone_lines[1:]:
-        record_search = re.search(RECORD_REGEX, line)
-        if record_search is None:
-            bad_lines.append(line)
-            continue
 
-        name = record_search.group('domain')
-        # The API requires we send a host, although bind allows a blank
-        # entry. @ is the same thing as blank
-        if name is None:
-            name = "@"
-
-        ttl = record_search.group('ttl')
-        # we don't do anything with the class
-        # domain_class = domainSearch.group('class')
-        record_type = record_search.group('type').upper()
-        data = record_search.group('data')
-
-        # the dns class doesn't support weighted MX records yet, so we chomp
-        # that part out.
-        if record_type == "MX":
-            record_search = re.search(r'(?P<weight>\d+)\s+(?P<data>.*)', data)
-            data = record_search.group('data')
-
-        # This will skip the SOA record bit. And any domain that gets
-        # parsed oddly.
-        if record_type == 'IN':
-            bad_lines.append(line)
-            continue
+class ZoneParser(object):
+    """Parses BIND zone files a line at a time.
+
+    Handles the $ORIGIN, $TTL and $INCLUDE directives, comments, quoted
+    strings and records spanning lines in parentheses. Records are yielded as
+    they are parsed, so memory use doesn't grow with the size of the file.
+    Hosts are made relative to the zone, which is the first $ORIGIN.
+
+    SOA records, which the API manages itself, and lines which can't be
+    parsed end up in bad_lines. An $INCLUDE'd file which can't be read
+    raises IOError rather than silently dropping its records.
+
+    ::
+
+        parser = ZoneParser()
+        with open('example.com.zone') as zone_f:
+            for record in parser.records(zone_f, path='example.com.zone'):
+                print(record['record'], record['type'], record['data'])
+
+    :param string origin: the zone, if the file doesn't start with $ORIGIN
+    :param string ttl: the default TTL, if the file doesn't set $TTL
+    """
+
+    def __init__(self, origin=None, ttl=None):
+        self.zone = origin.rstrip('.') if origin else None
+        self.origin = _absolute(origin, None) if origin else None
+        self.ttl = ttl
+        self.bad_lines = []
+        self._owner = None
+
+    def records(self, lines, path=None, _depth=0):
+        """Yields the records of a zone file.
+
+        :param lines: iterable of the lines of the file, like a file object
+        :param string path: the file's path, which $INCLUDE paths are relative
+                            to
+        :returns: generator of dicts with the 'record', 'type', 'data' and
+                  'ttl' of each record
+        """
+        for line, tokens, has_owner in _entries(lines):
+            if tokens[0].startswith('$'):
+                directive = tokens[0].upper()
+                if directive == '$ORIGIN' and len(tokens) == 2:
+                    self.origin = _absolute(tokens[1], self.origin)
+                    if self.zone is None:
+                        self.zone = self.origin.rstrip('.')
+                elif directive == '$TTL' and len(tokens) == 2 \
+                        and TTL_REGEX.match(tokens[1]):
+                    self.ttl = _ttl_seconds(tokens[1])
+                elif directive == '$INCLUDE' and len(tokens) in (2, 3) \
+                        and _depth < MAX_INCLUDE_DEPTH:
+                    for record in self._include(tokens[1:], path, _depth):
+                        yield record
+                else:
+                    self.bad_lines.append(line)
+                continue
+
+            record = self._record(tokens, has_owner)
+            if record is None:
+                self.bad_lines.append(line)
+            else:
+                yield record
 
-        records.append({
-            'record': name,
+    def _include(self, args, path, depth):
+        """Yields the records of an $INCLUDE'd file.
+
+        The origin and owner are restored when the included file ends.
+        """
+        filename = os.path.join(os.path.dirname(path or ''),
+                                os.path.expanduser(args[0]))
+        origin, owner = self.origin, self._owner
+        if len(args) == 2:
+            self.origin = _absolute(args[1], origin)
+        try:
+            with open(filename) as include_f:
+                for record in self.records(include_f, filename, depth + 1):
+                    yield record
+        finally:
+            self.origin, self._owner = origin, owner
+
+    def _record(self, tokens, has_owner):
+        """Turns the tokens of an entry into a record dict, or None."""
+        if has_owner:
+            self._owner = tokens.pop(0)
+        ttl = None
+        while tokens and (TTL_REGEX.match(tokens[0]) or
+                          tokens[0].upper() in CLASSES):
+            token = tokens.pop(0)
+            if token.upper() not in CLASSES:
+                ttl = _ttl_seconds(token)
+
+        if len(tokens) < 2 or tokens[0].upper() == 'SOA':
+            return None
+
+        record_type = tokens[0].upper()
+        data = tokens[1:]
+        # The API doesn't support weighted MX records yet, so we chomp that
+        # part out.
+        if record_type == 'MX':
+            if len(data) != 2:
+                return None
+            data = data[1:]
+
+        return {
+            'record': self._host(self._owner),
             'type': record_type,
-            'data': data,
-            'ttl': ttl,
-        })
+            'data': ' '.join(data),
+            'ttl': ttl or self.ttl,
+        }
+
+    def _host(self, name):
+        """Returns the host of a record relative to the zone.
+
+        The API requires we send a host, although bind allows a blank entry.
+        @ is the same thing as blank.
+        """
+        if name is None or name == '@':
+            name = self.origin
+        elif not name.endswith('.'):
+            # Relative names of the zone itself are kept as they are written
+            if self.origin is None or self.origin.rstrip('.') == self.zone:
+                return name
+            name = _absolute(name, self.origin)
+
+        if name is None or name.rstrip('.') == self.zone:
+            return '@'
+        suffix = '.%s.' % self.zone
+        if self.zone and name.endswith(suffix):
+            return name[:-len(suffix)]
+        return name
+
+
+def _entries(lines):
+    """Yields (text, tokens, has_owner) for every entry of a zone file.
+
+    An entry is a line, or several lines when parentheses are open. Comments
+    and parentheses are dropped from the tokens. has_owner is False for
+    entries starting with whitespace, which belong to the previous owner.
+    """
+    text, tokens, depth, has_owner = [], [], 0, False
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not depth:
+            has_owner = bool(line) and not line[0].isspace()
+
+        # Most lines have no quotes or parentheses and are just split
+        if '"' not in line and '(' not in line and ')' not in line:
+            line_tokens = line.split(';', 1)[0].split()
+        else:
+            line_tokens = []
+            for token in TOKEN_REGEX.findall(line):
+                if token == '(':
+                    depth += 1
+                elif token == ')':
+                    depth = max(depth - 1, 0)
+                elif token[0] != ';':
+                    line_tokens.append(token)
+
+        if not line_tokens and not depth and not tokens:
+            continue
+        text.append(line.strip())
+        tokens.extend(line_tokens)
+        if depth:
+            continue
+        if tokens:
+            yield ' '.join(text), tokens, has_owner
+        text, tokens = [], []
+
+    if tokens:
+        yield ' '.join(text), tokens, has_owner
+
+
+def _absolute(name, origin):
+    """Returns a domain name with a trailing dot."""
+    if name == '@':
+        return origin
+    if name.endswith('.'):
+        return name
+    if origin is None:
+        return name + '.'
+    return '%s.%s' % (name, origin)
+
 
-    return zone, records, bad_lines
+def _ttl_seconds(ttl):
+    """Converts a TTL like '86400' or '1h30m' to a string of seconds."""
+    if ttl.isdigit():
+        return ttl
+    return str(sum(int(number) * TTL_UNITS[unit.lower() or 's']
+                   for number, unit in re.findall(r'(\d+)([smhdw]?)', ttl, re.I)))
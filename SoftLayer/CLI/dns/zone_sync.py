@@ -0,0 +1,89 @@
+"""Make a zone match a BIND zone file."""
+# :license: MIT, see LICENSE for more details.
+
+import click
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
+from SoftLayer.CLI.dns import zone_import
+
+
+@click.command()
+@click.argument('zonefile',
+                type=click.Path(exists=True, readable=True, resolve_path=True))
+@click.option('--dry-run', is_flag=True,
+              help="Only show the changes, don't make them")
+@click.option('--workers', default=8, show_default=True,
+              type=click.IntRange(min=1),
+              help="Number of API calls to run at the same time")
+@environment.pass_env
+def cli(env, zonefile, dry_run, workers):
+    """Make a zone match a BIND zone file.
+
+    Records which are in the zone but not in ZONEFILE are deleted, records
+    which are only in ZONEFILE are created and records whose TTL or data
+    changed are updated in place. SOA records are left alone.
+    """
+
+    manager = SoftLayer.DNSManager(env.client)
+    parser = zone_import.ZoneParser()
+    try:
+        with open(zonefile) as zone_f:
+            records = list(parser.records(zone_f, path=zonefile))
+    except IOError as ex:
+        raise exceptions.CLIAbort("Can't read %s: %s" % (ex.filename, ex.strerror))
+    zone = parser.zone
+    if zone is None:
+        raise exceptions.CLIAbort("%s has no $ORIGIN" % zonefile)
+
+    zone_id = helpers.resolve_id(manager.resolve_ids, zone, name='zone')
+    plan = manager.plan_zone_sync(zone_id, records)
+
+    table = formatting.Table(['action', 'id', 'host', 'type', 'data', 'ttl'])
+    table.align['data'] = 'l'
+    for record in plan.create:
+        table.add_row(['create', formatting.blank(), record['record'],
+                       record['type'], record['data'],
+                       record.get('ttl') or formatting.blank()])
+    for change in plan.update:
+        table.add_row(['update', change['id'], formatting.blank(),
+                       formatting.blank(), change.get('data', formatting.blank()),
+                       change.get('ttl', formatting.blank())])
+    for record in plan.delete:
+        table.add_row(['delete', record['id'], record['host'],
+                       record['type'].upper(), record['data'], record['ttl']])
+
+    if not len(plan):
+        env.fout("%s is in sync" % zone)
+        return
+    env.fout(table)
+
+    if dry_run:
+        return
+
+    if plan.delete and not (env.skip_confirmations or formatting.confirm(
+            "This will delete %d records from %s. Continue?"
+            % (len(plan.delete), zone))):
+        raise exceptions.CLIAbort("Aborted.")
+
+    report = manager.apply_zone_sync(plan, workers=workers)
+    for (action, index), error in report.failed.items():
+        env.err("Failed to %s %s: %s"
+                % (action, _describe(plan, action, index), error))
+
+    if not report.ok:
+        raise exceptions.CLIAbort("%d of %d changes failed"
+                                  % (len(report.failed), len(plan)))
+    env.err("Synced %s: %d created, %d updated, %d deleted"
+            % (zone, len(plan.create), len(plan.update), len(plan.delete)))
+
+
+def _describe(plan, action, index):
+    """Names a record of the plan in error messages."""
+    if action == 'create':
+        record = plan.create[index]
+        return "%s %s %s" % (record['record'], record['type'], record['data'])
+    return "record %s" % getattr(plan, action)[index]['id']
@@ -2,6 +2,7 @@
 # :license: MIT, see LICENSE for more details.
 
 from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
 
 
 def parse_id(input_id):
@@ -16,3 +17,27 @@ def parse_id(input_id):
         raise exceptions.CLIAbort(
             'Invalid ID %s: ID should be of the form xxx:yyy' % input_id)
     return key_value[0], int(key_value[1])
+
+
+def left_out_table(plan):
+    """Lists the rules a FirewallRulePlan left out of the update request.
+
+    :param SoftLayer.managers.firewall.FirewallRulePlan plan: the plan
+    :returns: a Table with the 1-based number of each rule left out
+    """
+    table = formatting.Table(['rule', 'left out'])
+    left_out = ([(index, 'duplicate of rule %d' % (first + 1))
+                 for index, first in plan.duplicates] +
+                [(index, 'shadowed by rule %d' % (covering + 1))
+                 for index, covering in plan.shadowed])
+    for index, reason in sorted(left_out):
+        table.add_row([index + 1, reason])
+    return table
+
+
+def plan_summary(plan):
+    """Describes a FirewallRulePlan in one line."""
+    return ("%d rules: %d added, %d removed, %d duplicate and %d shadowed "
+            "rules left out" % (len(plan.rules), len(plan.added),
+                                len(plan.removed), len(plan.duplicates),
+                                len(plan.shadowed)))
@@ -35,7 +35,8 @@ def parse_rules(content=None):
         for line in lines:
             if line.strip() == '':
                 continue
-            key_value = line.strip().split(':')
+            # Only split once, IPv6 addresses contain colons
+            key_value = line.strip().split(':', 1)
             key = key_value[0].strip()
             value = key_value[1].strip()
             if key == 'action':
@@ -56,6 +57,8 @@ def parse_rules(content=None):
                 parsed_rule['destinationPortRangeEnd'] = int(value)
             elif key == 'version':
                 parsed_rule['version'] = int(value)
+            elif key == 'notes':
+                parsed_rule['notes'] = value
         parsed_rules.append(parsed_rule)
     return parsed_rules
 
@@ -153,12 +156,8 @@ def cli(env, identifier):
         while True:
             try:
                 rules = parse_rules(edited_rules)
-                if firewall_type == 'vlan':
-                    rules = mgr.edit_dedicated_fwl_rules(firewall_id,
-                                                         rules)
-                else:
-                    rules = mgr.edit_standard_fwl_rules(firewall_id,
-                                                        rules)
+                plan, request = mgr.update_fwl_rules(
+                    firewall_id, rules, dedicated=firewall_type == 'vlan')
                 break
             except (SoftLayer.SoftLayerError, ValueError) as error:
                 env.out("Unexpected error({%s})" % (error))
@@ -173,6 +172,13 @@ def cli(env, identifier):
                         raise exceptions.CLIAbort('Aborted.')
                 else:
                     raise exceptions.CLIAbort('Aborted.')
-                env.fout('Firewall updated!')
     else:
         raise exceptions.CLIAbort('Aborted.')
+
+    if plan.duplicates or plan.shadowed:
+        env.fout(firewall.left_out_table(plan))
+    env.fout(firewall.plan_summary(plan))
+    if request is None:
+        env.fout('The firewall already has these rules, nothing was sent.')
+    else:
+        env.fout('Firewall updated!')
@@ -0,0 +1,57 @@
+"""Replace the rules of a firewall with the rules of a file."""
+# :license: MIT, see LICENSE for more details.
+
+import click
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import firewall
+from SoftLayer.CLI.firewall import edit
+from SoftLayer.CLI import formatting
+
+
+@click.command()
+@click.argument('identifier')
+@click.argument('rules_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True,
+              help="Only show the changes, don't make them")
+@environment.pass_env
+def cli(env, identifier, rules_file, dry_run):
+    """Replace the rules of a firewall with the rules of a file.
+
+    RULES_FILE has the format `slcli firewall edit` opens in the editor.
+    Addresses may be given in CIDR notation, e.g. 10.0.0.0/24. Repeated
+    rules and rules which an earlier rule fully covers are left out, and
+    nothing is sent when the firewall already has the rules.
+    """
+
+    mgr = SoftLayer.FirewallManager(env.client)
+    firewall_type, firewall_id = firewall.parse_id(identifier)
+    dedicated = firewall_type == 'vlan'
+
+    with open(rules_file) as rules_fp:
+        content = rules_fp.read()
+    try:
+        plan = mgr.plan_fwl_rules(firewall_id, edit.parse_rules(content),
+                                  dedicated=dedicated)
+    except (IndexError, ValueError) as ex:
+        raise exceptions.CLIAbort("Invalid rules in %s: %s" % (rules_file, ex))
+
+    if plan.duplicates or plan.shadowed:
+        env.fout(firewall.left_out_table(plan))
+    env.fout(firewall.plan_summary(plan))
+
+    if not plan.changed:
+        env.fout('The firewall already has these rules, nothing was sent.')
+        return
+    if dry_run:
+        return
+
+    if not (env.skip_confirmations or formatting.confirm(
+            "This will replace the rules of firewall %s. Continue?"
+            % identifier)):
+        raise exceptions.CLIAbort('Aborted.')
+
+    mgr.edit_fwl_rules(firewall_id, plan.rules, dedicated=dedicated)
+    env.fout('Firewall updated!')
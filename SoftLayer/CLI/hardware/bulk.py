@@ -0,0 +1,161 @@
+"""Act on many hardware servers at once."""
+# :license: MIT, see LICENSE for more details.
+
+import click
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
+
+
+def _resolve(env, identifiers, id_file, action):
+    """Resolves all identifiers and confirms the action."""
+    mgr = SoftLayer.HardwareManager(env.client)
+    identifiers = helpers.read_identifiers(identifiers, id_file)
+    hw_ids = helpers.resolve_many_ids(mgr.resolve_many, identifiers,
+                                      'hardware')
+    if not (env.skip_confirmations or
+            formatting.confirm('This will %s %d servers. Continue?'
+                               % (action, len(hw_ids)))):
+        raise exceptions.CLIAbort('Aborted.')
+    return mgr, hw_ids
+
+
+def _report(env, report, ids):
+    """Prints the outcome for each server."""
+    env.fout(helpers.bulk_report_table(report, ids))
+    helpers.check_bulk_report(report, 'servers')
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@click.option('--immediate',
+              is_flag=True,
+              default=False,
+              help="""Cancels the servers immediately (instead of on the billing
+ anniversary)""")
+@click.option('--comment',
+              help="An optional comment to add to the cancellation ticket")
+@click.option('--reason',
+              help="""An optional cancellation reason. See cancel-reasons for
+ a list of available options""")
+@helpers.bulk_options
+@environment.pass_env
+def cancel(env, identifiers, immediate, comment, reason, id_file, workers,
+           rate):
+    """Cancel many dedicated servers."""
+
+    mgr, hw_ids = _resolve(env, identifiers, id_file, 'cancel')
+    report = mgr.cancel_servers(hw_ids,
+                                reason=reason or 'unneeded',
+                                comment=comment or '',
+                                immediate=immediate,
+                                workers=workers,
+                                rate=rate)
+    _report(env, report, hw_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@click.option('--postinstall', '-i', help="Post-install script to download")
+@helpers.multi_option('--key', '-k',
+                      help="SSH keys to add to the root user")
+@helpers.bulk_options
+@environment.pass_env
+def reload(env, identifiers, postinstall, key, id_file, workers, rate):
+    """Reload operating system on many servers."""
+
+    keys = []
+    for single_key in key:
+        resolver = SoftLayer.SshKeyManager(env.client).resolve_ids
+        keys.append(helpers.resolve_id(resolver, single_key, 'SshKey'))
+
+    mgr, hw_ids = _resolve(env, identifiers, id_file, 'reload')
+    report = mgr.reload_servers(hw_ids,
+                                post_uri=postinstall,
+                                ssh_keys=keys,
+                                workers=workers,
+                                rate=rate)
+    _report(env, report, hw_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@click.option('--domain', '-D', help="Domain portion of the FQDN")
+@click.option('--notes', help="Notes to set on the servers")
+@click.option('--tag', '-g', multiple=True,
+              help="Tags to set or empty string to remove all")
+@click.option('--userdata', '-u', help="User defined metadata string")
+@helpers.bulk_options
+@environment.pass_env
+def edit(env, identifiers, domain, notes, tag, userdata, id_file, workers,
+         rate):
+    """Edit the details of many servers."""
+
+    tags = ','.join(tag) if tag else None
+    mgr, hw_ids = _resolve(env, identifiers, id_file, 'edit')
+    report = mgr.edit_servers(hw_ids,
+                              userdata=userdata,
+                              domain=domain,
+                              notes=notes,
+                              tags=tags,
+                              workers=workers,
+                              rate=rate)
+    _report(env, report, hw_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@click.option('--hard/--soft',
+              default=None,
+              help="Perform a hard or soft reboot")
+@helpers.bulk_options
+@environment.pass_env
+def reboot(env, identifiers, hard, id_file, workers, rate):
+    """Reboot many servers."""
+
+    mgr, hw_ids = _resolve(env, identifiers, id_file, 'reboot')
+    report = mgr.reboot_servers(hw_ids, hard=hard, workers=workers,
+                                rate=rate)
+    _report(env, report, hw_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@helpers.bulk_options
+@environment.pass_env
+def power_cycle(env, identifiers, id_file, workers, rate):
+    """Power cycle many servers."""
+
+    mgr, hw_ids = _resolve(env, identifiers, id_file, 'power cycle')
+    report = mgr.power_cycle_servers(hw_ids, workers=workers, rate=rate)
+    _report(env, report, hw_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@helpers.bulk_options
+@environment.pass_env
+def power_off(env, identifiers, id_file, workers, rate):
+    """Power off many servers."""
+
+    mgr, hw_ids = _resolve(env, identifiers, id_file, 'power off')
+    report = mgr.power_off_servers(hw_ids, workers=workers, rate=rate)
+    _report(env, report, hw_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@helpers.bulk_options
+@environment.pass_env
+def power_on(env, identifiers, id_file, workers, rate):
+    """Power on many servers."""
+
+    mgr = SoftLayer.HardwareManager(env.client)
+    identifiers = helpers.read_identifiers(identifiers, id_file)
+    hw_ids = helpers.resolve_many_ids(mgr.resolve_many, identifiers,
+                                      'hardware')
+    report = mgr.power_on_servers(hw_ids, workers=workers, rate=rate)
+    _report(env, report, hw_ids)
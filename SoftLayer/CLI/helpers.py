@@ -6,9 +6,17 @@
     :license: MIT, see LICENSE for more details.
 """
 
+import json
+
 import click
 
 from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
 
 
 def multi_option(*param_decls, **attrs):
@@ -48,3 +56,152 @@ def resolve_id(resolver, identifier, name='object'):
             (name, identifier, ', '.join([str(_id) for _id in ids])))
 
     return ids[0]
+
+
+def bulk_options(func):
+    """Adds the options shared by commands which act on many objects.
+
+    Adds a --file option to read identifiers from (one per line) along with
+    --workers and --rate to control concurrency.
+    """
+    options = [
+        click.option('--file', '-f', 'id_file',
+                     type=click.Path(exists=True, readable=True,
+                                     resolve_path=True),
+                     help="File with one identifier per line"),
+        click.option('--workers', default=8, show_default=True,
+                     type=click.IntRange(min=1),
+                     help="Number of API calls to run at the same time"),
+        click.option('--rate', type=click.FLOAT,
+                     help="Maximum number of API calls to start per second"),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def read_identifiers(identifiers, id_file=None):
+    """Combines identifiers given as arguments with those from a file.
+
+    Blank lines and lines starting with # in the file are ignored.
+
+    :param list identifiers: identifiers given on the command line
+    :param string id_file: optional path to a file of identifiers
+    """
+    result = list(identifiers)
+    if id_file:
+        with open(id_file) as id_fp:
+            for line in id_fp:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    result.append(line)
+
+    if not result:
+        raise exceptions.ArgumentError(
+            'At least one identifier or --file is required.')
+    return result
+
+
+def read_data_file(path, json_lines=False):
+    """Reads the data in a JSON file, or a YAML one with a .yaml/.yml name.
+
+    Reading YAML needs PyYAML. Files which can't be parsed abort the command.
+
+    :param string path: the file to read
+    :param bool json_lines: read a JSON file as one value per line, skipping
+                            blank lines and lines starting with #. The values
+                            are returned as a list.
+    """
+    with open(path) as data_fp:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise exceptions.CLIAbort(
+                    "Reading YAML needs PyYAML. Install it or use JSON.")
+            try:
+                return yaml.safe_load(data_fp)
+            except yaml.YAMLError as ex:
+                raise exceptions.CLIAbort("Can't parse %s: %s" % (path, ex))
+
+        if not json_lines:
+            try:
+                return json.load(data_fp)
+            except ValueError as ex:
+                raise exceptions.CLIAbort("Can't parse %s: %s" % (path, ex))
+
+        values = []
+        for number, line in enumerate(data_fp, 1):
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            try:
+                values.append(json.loads(line))
+            except ValueError as ex:
+                raise exceptions.CLIAbort("Can't parse %s: line %d: %s"
+                                          % (path, number, ex))
+        return values
+
+
+def resolve_many_ids(resolver, identifiers, name='object'):
+    """Resolves many identifiers using a batch resolver function.
+
+    Aborts when any identifier is missing or ambiguous, listing all of them.
+
+    :param resolver: function that resolves a list of identifiers, returning
+                     a dict of identifier => list of ids.
+    :param list identifiers: string identifiers used to resolve ids
+    :param string name: the object type, to be used in error messages
+    :returns: list of ids, in the same order as identifiers
+    """
+    resolved = resolver(identifiers)
+
+    errors = []
+    for identifier in identifiers:
+        ids = resolved.get(identifier, [])
+        if len(ids) == 0:
+            errors.append("Unable to find %s '%s'" % (name, identifier))
+        elif len(ids) > 1:
+            errors.append("Multiple %s found for '%s': %s" % (
+                name, identifier, ', '.join([str(_id) for _id in ids])))
+
+    if errors:
+        raise exceptions.CLIAbort("Error: " + "\nError: ".join(errors))
+
+    ids = []
+    seen = set()
+    for identifier in identifiers:
+        _id = resolved[identifier][0]
+        if _id not in seen:
+            seen.add(_id)
+            ids.append(_id)
+    return ids
+
+
+def bulk_report_table(report, ids):
+    """Formats a SoftLayer.bulk.BulkReport as a table of per-id outcomes.
+
+    :param report: a SoftLayer.bulk.BulkReport
+    :param list ids: the ids the operation was run on. Rows are in this order
+                     rather than the order the calls finished in.
+    """
+    table = formatting.Table(['id', 'status', 'error'])
+    table.align['error'] = 'l'
+    for _id in ids:
+        if _id in report.succeeded:
+            table.add_row([_id, 'OK', formatting.blank()])
+        elif _id in report.failed:
+            table.add_row([_id, 'FAILED', str(report.failed[_id])])
+    return table
+
+
+def check_bulk_report(report, name='object'):
+    """Aborts with a summary of failed ids when a bulk operation failed.
+
+    :param report: a SoftLayer.bulk.BulkReport
+    :param string name: the object type, to be used in error messages
+    """
+    if report.ok:
+        return
+
+    raise exceptions.CLIAbort(
+        "%d of %d %s failed. Retry with: %s" % (
+            len(report.failed), len(report), name,
+            ' '.join([str(_id) for _id in report.failed])))
@@ -0,0 +1,121 @@
+"""Verify and place many orders from a file."""
+# :license: MIT, see LICENSE for more details.
+
+import click
+
+from SoftLayer import bulk
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
+from SoftLayer.managers import ordering
+
+ORDER_KEYS = ['package_keyname', 'location', 'item_keynames', 'complex_type',
+              'hourly', 'preset_keyname', 'extras', 'quantity']
+
+
+def _read_orders(path):
+    """Reads orders from a YAML list or a file of JSON lines."""
+    orders = helpers.read_data_file(path, json_lines=True) or []
+    if not isinstance(orders, list):
+        raise exceptions.CLIAbort("%s should contain a list of orders" % path)
+    for number, order in enumerate(orders, 1):
+        if not isinstance(order, dict):
+            raise exceptions.CLIAbort("Order %d is not a mapping" % number)
+        unknown = sorted(set(order) - set(ORDER_KEYS))
+        if unknown:
+            raise exceptions.CLIAbort("Order %d has unknown keys: %s"
+                                      % (number, ', '.join(unknown)))
+        missing = [key for key in ['package_keyname', 'location',
+                                   'item_keynames', 'complex_type']
+                   if key not in order]
+        if missing:
+            raise exceptions.CLIAbort("Order %d is missing: %s"
+                                      % (number, ', '.join(missing)))
+    return orders
+
+
+def _run(env, phase, results, orders, report):
+    """Records and streams (to stderr) the outcome of each order."""
+    for index, result, error in results:
+        order = orders[index]
+        if error is None:
+            report.add_success(index, result)
+            status = 'OK'
+        else:
+            report.add_failure(index, error)
+            status = 'FAILED: %s' % error
+        env.err("%s %d (%s %s): %s" % (phase, index + 1, order['package_keyname'],
+                                       order['location'], status))
+
+
+@click.command()
+@click.argument('order_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--verify', is_flag=True,
+              help="Only verify the orders, do not place them")
+@click.option('--no-validate', is_flag=True,
+              help="Send every order to verifyOrder, even those failing the "
+                   "local checks against the package catalog")
+@click.option('--workers', default=8, show_default=True,
+              type=click.IntRange(min=1),
+              help="Number of API calls to run at the same time")
+@click.option('--rate', type=click.FLOAT,
+              help="Maximum number of API calls to start per second")
+@environment.pass_env
+def cli(env, order_file, verify, no_validate, workers, rate):
+    """Verify, then place, many orders.
+
+    ORDER_FILE has one order per line as JSON or, with a .yaml/.yml name, a
+    YAML list of orders. Each order has the arguments of
+    SoftLayer.OrderingManager.place_order(): package_keyname, location,
+    item_keynames, complex_type and optionally hourly, preset_keyname,
+    extras and quantity.
+
+    All orders are verified first. Only if every order verifies are they
+    placed, after confirmation.
+
+    \b
+    Example:
+        {"package_keyname": "CLOUD_SERVER", "location": "DALLAS13", "item_keynames": [...],
+         "complex_type": "SoftLayer_Container_Product_Order_Virtual_Guest",
+         "extras": {"virtualGuests": [{"hostname": "web1", "domain": "example.com"}]}}
+    """
+    manager = ordering.OrderingManager(env.client)
+    orders = _read_orders(order_file)
+
+    verified = bulk.BulkReport()
+    _run(env, 'verify', manager.verify_orders(orders, workers=workers, rate=rate,
+                                              validate=not no_validate),
+         orders, verified)
+
+    placed = bulk.BulkReport()
+    if not verify and verified.ok and orders:
+        if not (env.skip_confirmations or formatting.confirm(
+                "This will place %d orders and incur charges on your account. "
+                "Continue?" % len(orders))):
+            raise exceptions.CLIAbort("Aborting order.")
+        _run(env, 'place', manager.place_orders(orders, workers=workers, rate=rate,
+                                                validate=False),
+             orders, placed)
+
+    table = formatting.Table(['#', 'package', 'location', 'verified', 'placed', 'order id', 'error'])
+    table.align['error'] = 'l'
+    for index, order in enumerate(orders):
+        error = placed.failed.get(index) or verified.failed.get(index)
+        table.add_row([
+            index + 1,
+            order['package_keyname'],
+            order['location'],
+            'yes' if index in verified.succeeded else 'no',
+            'yes' if index in placed.succeeded else 'no',
+            (placed.succeeded.get(index) or {}).get('orderId') or formatting.blank(),
+            str(error) if error else formatting.blank(),
+        ])
+    env.fout(table)
+
+    if not verified.ok:
+        raise exceptions.CLIAbort("%d of %d orders failed to verify; none were placed"
+                                  % (len(verified.failed), len(orders)))
+    if not placed.ok:
+        raise exceptions.CLIAbort("%d of %d orders failed to place"
+                                  % (len(placed.failed), len(orders)))
@@ -1,15 +1,35 @@
 """Metric Utilities"""
 from __future__ import print_function
+import array
 import datetime
+import functools
 import itertools
+import json
+import os
 import sys
 
 import click
 
+from SoftLayer import bulk
 from SoftLayer.CLI import environment
 from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
 from SoftLayer import utils
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# The metric types summed into the public_in, public_out, private_in and
+# private_out columns
+_METRICS = [
+    'publicIn_net_octet',
+    'publicOut_net_octet',
+    'privateIn_net_octet',
+    'privateOut_net_octet',
+]
+
 
 # pylint: disable=unused-argument
 def _validate_datetime(ctx, param, value):
@@ -25,7 +45,7 @@ def _validate_datetime(ctx, param, value):
             "not in the format 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'")
 
 
-def _get_pooled_bandwidth(env, start, end):
+def _get_pooled_bandwidth(env):
     call = env.client.call('Account', 'getVirtualDedicatedRacks',
                            iter=True,
                            mask='id,name,metricTrackingObjectId')
@@ -44,34 +64,25 @@ def _get_pooled_bandwidth(env, start, end):
          'summaryType': 'sum'},
     ]
 
-    with click.progressbar(list(call),
-                           label='Calculating for bandwidth pools',
-                           file=sys.stderr) as pools:
-        for pool in pools:
-            if not pool.get('metricTrackingObjectId'):
-                continue
+    for pool in call:
+        if not pool.get('metricTrackingObjectId'):
+            continue
 
-            yield {
-                'id': pool['id'],
-                'type': 'pool',
-                'name': pool['name'],
-                'data': env.client.call(
-                    'Metric_Tracking_Object',
-                    'getSummaryData',
-                    start.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                    end.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                    types,
-                    300,
-                    id=pool['metricTrackingObjectId'],
-                ),
-            }
-
-
-def _get_hardware_bandwidth(env, start, end):
+        yield {
+            'id': pool['id'],
+            'type': 'pool',
+            'name': pool['name'],
+            'metric_tracking_id': pool['metricTrackingObjectId'],
+            'types': types,
+            'rollup': 300,
+        }
+
+
+def _get_hardware_bandwidth(env):
     hw_call = env.client.call(
         'Account', 'getHardware',
         iter=True,
-        mask='id,hostname,metricTrackingObject.id,'
+        mask='id,hostname,metricTrackingObject.id,datacenter.name,'
              'virtualRack[id,bandwidthAllotmentTypeId]')
     types = [
         {'keyName': 'PUBLICIN',
@@ -88,41 +99,33 @@ def _get_hardware_bandwidth(env, start, end):
          'summaryType': 'counter'},
     ]
 
-    with click.progressbar(list(hw_call),
-                           label='Calculating for hardware',
-                           file=sys.stderr) as hws:
-        for instance in hws:
-            if not utils.lookup(instance, 'metricTrackingObject', 'id'):
-                continue
+    for instance in hw_call:
+        if not utils.lookup(instance, 'metricTrackingObject', 'id'):
+            continue
 
-            pool_name = None
-            if utils.lookup(instance,
-                            'virtualRack',
-                            'bandwidthAllotmentTypeId') == 2:
-                pool_name = utils.lookup(instance, 'virtualRack', 'name')
-
-            yield {
-                'id': instance['id'],
-                'type': 'hardware',
-                'name': instance['hostname'],
-                'pool': pool_name,
-                'data': env.client.call(
-                    'Metric_Tracking_Object',
-                    'getSummaryData',
-                    start.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                    end.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                    types,
-                    3600,
-                    id=instance['metricTrackingObject']['id'],
-                ),
-            }
-
-
-def _get_virtual_bandwidth(env, start, end):
+        pool_name = None
+        if utils.lookup(instance,
+                        'virtualRack',
+                        'bandwidthAllotmentTypeId') == 2:
+            pool_name = utils.lookup(instance, 'virtualRack', 'name')
+
+        yield {
+            'id': instance['id'],
+            'type': 'hardware',
+            'name': instance['hostname'],
+            'pool': pool_name,
+            'datacenter': utils.lookup(instance, 'datacenter', 'name'),
+            'metric_tracking_id': instance['metricTrackingObject']['id'],
+            'types': types,
+            'rollup': 3600,
+        }
+
+
+def _get_virtual_bandwidth(env):
     call = env.client.call(
         'Account', 'getVirtualGuests',
         iter=True,
-        mask='id,hostname,metricTrackingObjectId,'
+        mask='id,hostname,metricTrackingObjectId,datacenter.name,'
              'virtualRack[id,bandwidthAllotmentTypeId]')
     types = [
         {'keyName': 'PUBLICIN_NET_OCTET',
@@ -139,37 +142,156 @@ def _get_virtual_bandwidth(env, start, end):
          'summaryType': 'sum'},
     ]
 
-    with click.progressbar(list(call),
-                           label='Calculating for virtual',
-                           file=sys.stderr) as vms:
-        for instance in vms:
-            metric_tracking_id = utils.lookup(instance,
-                                              'metricTrackingObjectId')
+    for instance in call:
+        metric_tracking_id = utils.lookup(instance,
+                                          'metricTrackingObjectId')
+
+        if metric_tracking_id is None:
+            continue
+
+        pool_name = None
+        if utils.lookup(instance,
+                        'virtualRack',
+                        'bandwidthAllotmentTypeId') == 2:
+            pool_name = utils.lookup(instance, 'virtualRack', 'id')
 
-            if metric_tracking_id is None:
+        yield {
+            'id': instance['id'],
+            'type': 'virtual',
+            'name': instance['hostname'],
+            'pool': pool_name,
+            'datacenter': utils.lookup(instance, 'datacenter', 'name'),
+            'metric_tracking_id': metric_tracking_id,
+            'types': types,
+            'rollup': 3600,
+        }
+
+
+def _get_summary_data(env, start, end, item):
+    """Fetches the metric summary data of a single pool or server."""
+    return env.client.call(
+        'Metric_Tracking_Object',
+        'getSummaryData',
+        start.strftime('%Y-%m-%d %H:%M:%S %Z'),
+        end.strftime('%Y-%m-%d %H:%M:%S %Z'),
+        item['types'],
+        item['rollup'],
+        id=item['metric_tracking_id'],
+    )
+
+
+def _checkpoint_key(start, end):
+    return '%s/%s' % (start.isoformat(), end.isoformat())
+
+
+def _read_checkpoint(path, start, end):
+    """Reads the summary data fetched by an earlier run of the same report.
+
+    :returns: dict of (type, id) => summary data
+    """
+    fetched = {}
+    if not path or not os.path.exists(path):
+        return fetched
+
+    key = _checkpoint_key(start, end)
+    with open(path) as checkpoint:
+        for line in checkpoint:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A partial line is left behind when a run is killed while
+                # writing to the file.
                 continue
+            if entry.get('range') == key:
+                fetched[(entry['type'], entry['id'])] = entry['data']
+    return fetched
 
-            pool_name = None
-            if utils.lookup(instance,
-                            'virtualRack',
-                            'bandwidthAllotmentTypeId') == 2:
-                pool_name = utils.lookup(instance, 'virtualRack', 'id')
-
-            yield {
-                'id': instance['id'],
-                'type': 'virtual',
-                'name': instance['hostname'],
-                'pool': pool_name,
-                'data': env.client.call(
-                    'Metric_Tracking_Object',
-                    'getSummaryData',
-                    start.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                    end.strftime('%Y-%m-%d %H:%M:%S %Z'),
-                    types,
-                    3600,
-                    id=metric_tracking_id,
-                ),
-            }
+
+def _group_sum(groups, values, size):
+    """Sums values into size buckets, using groups as the bucket of each value.
+
+    Uses numpy.bincount when NumPy is installed.
+
+    :param array groups: bucket index of each value
+    :param array values: the values to sum
+    :param int size: the number of buckets
+    :returns: array of sums, one per bucket
+    """
+    if numpy is not None:
+        return array.array('d', numpy.bincount(
+            numpy.asarray(groups, dtype=numpy.intp),
+            weights=numpy.asarray(values, dtype=numpy.float64),
+            minlength=size))
+
+    totals = array.array('d', [0.0]) * size
+    for group, value in zip(groups, values):
+        totals[group] += value
+    return totals
+
+
+def _sum_metrics(rows):
+    """Sums the metric data of every row by metric type in one pass.
+
+    :param list rows: the getSummaryData result of each row
+    :returns: array of len(rows) * len(_METRICS) sums, row by row
+    """
+    columns = dict((metric, index) for index, metric in enumerate(_METRICS))
+    width = len(_METRICS)
+    groups = array.array('l')
+    values = array.array('d')
+    for row, data in enumerate(rows):
+        for result in data:
+            column = columns.get(result['type'])
+            if column is not None:
+                groups.append(row * width + column)
+                values.append(result['counter'])
+    return _group_sum(groups, values, len(rows) * width)
+
+
+def _rollup(keys, totals):
+    """Sums per-row metric totals by key.
+
+    :param list keys: the key (pool, datacenter, ...) of each row. Rows with
+                      no key are left out.
+    :param array totals: per-row totals from _sum_metrics
+    :returns: list of (key, row count, [sum per metric]), in key order
+    """
+    width = len(_METRICS)
+    index = {}
+    counts = []
+    groups = array.array('l')
+    values = array.array('d')
+    for row, key in enumerate(keys):
+        if key is None:
+            continue
+        if key not in index:
+            index[key] = len(index)
+            counts.append(0)
+        counts[index[key]] += 1
+        for column in range(width):
+            groups.append(index[key] * width + column)
+        values.extend(totals[row * width:(row + 1) * width])
+
+    sums = _group_sum(groups, values, len(index) * width)
+    return [(key, counts[i], list(sums[i * width:(i + 1) * width]))
+            for key, i in sorted(index.items(), key=lambda pair: str(pair[0]))]
+
+
+def _top(totals, count):
+    """Returns the indexes of the count rows with the most traffic."""
+    width = len(_METRICS)
+    row_totals = _group_sum(
+        array.array('l', (index // width for index in range(len(totals)))),
+        totals, len(totals) // width)
+    if numpy is not None:
+        order = numpy.argsort(-numpy.asarray(row_totals), kind='stable')
+        return sorted(int(row) for row in order[:count])
+    order = sorted(range(len(row_totals)), key=lambda row: -row_totals[row])
+    return sorted(order[:count])
+
+
+def _metric_columns(sums):
+    return [formatting.b_to_gb(int(value)) for value in sums]
 
 
 @click.command(short_help="Bandwidth report for every pool/server")
@@ -188,8 +310,18 @@ def _get_virtual_bandwidth(env, start, end):
 @click.option('--sortby', help='Column to sort by',
               default='hostname',
               show_default=True)
+@click.option('--workers', default=8, show_default=True,
+              type=click.IntRange(min=1),
+              help="Number of metric queries to run at the same time")
+@click.option('--checkpoint', type=click.Path(dir_okay=False),
+              help="File to record fetched results in. Running the same "
+                   "report again with this file only fetches what is missing")
+@click.option('--top', type=click.IntRange(min=1),
+              help="Only list the pools/servers with the most traffic")
+@helpers.multi_option('--rollup', type=click.Choice(['pool', 'datacenter']),
+                      help="Also print totals per pool or datacenter")
 @environment.pass_env
-def cli(env, start, end, sortby):
+def cli(env, start, end, sortby, workers, checkpoint, top, rollup):
     """Bandwidth report for every pool/server.
 
     This reports on the total data transfered for each virtual sever, hardware
@@ -209,29 +341,70 @@ def cli(env, start, end, sortby):
     ])
     table.sortby = sortby
 
-    def f_type(key, results):
-        "Filter metric data by type"
-        return (result['counter'] for result in results
-                if result['type'] == key)
-
+    items = []
+    fetched = _read_checkpoint(checkpoint, start, end)
+    checkpoint_fp = None
     try:
-        for item in itertools.chain(_get_pooled_bandwidth(env, start, end),
-                                    _get_virtual_bandwidth(env, start, end),
-                                    _get_hardware_bandwidth(env, start, end)):
-            pub_in = int(sum(f_type('publicIn_net_octet', item['data'])))
-            pub_out = int(sum(f_type('publicOut_net_octet', item['data'])))
-            pri_in = int(sum(f_type('privateIn_net_octet', item['data'])))
-            pri_out = int(sum(f_type('privateOut_net_octet', item['data'])))
-            table.add_row([
-                item['type'],
-                item['name'],
-                formatting.b_to_gb(pub_in),
-                formatting.b_to_gb(pub_out),
-                formatting.b_to_gb(pri_in),
-                formatting.b_to_gb(pri_out),
-                item.get('pool') or formatting.blank(),
-            ])
+        # Listing every pool and server is paginated and slow on big
+        # accounts, so it is interruptible as well.
+        items.extend(itertools.chain(_get_pooled_bandwidth(env),
+                                     _get_virtual_bandwidth(env),
+                                     _get_hardware_bandwidth(env)))
+        pending = [item for item in items
+                   if (item['type'], item['id']) not in fetched]
+        if len(pending) < len(items):
+            env.err('Resuming from %s, %d of %d already fetched'
+                    % (checkpoint, len(items) - len(pending), len(items)))
+
+        if checkpoint:
+            checkpoint_fp = open(checkpoint, 'a')
+        with click.progressbar(length=len(pending),
+                               label='Calculating bandwidth',
+                               file=sys.stderr) as progress:
+            for item, data, error in bulk.iter_concurrent(
+                    functools.partial(_get_summary_data, env, start, end),
+                    pending, workers=workers):
+                progress.update(1)
+                if error is not None:
+                    raise error
+                fetched[(item['type'], item['id'])] = data
+                if checkpoint_fp:
+                    checkpoint_fp.write(json.dumps({
+                        'range': _checkpoint_key(start, end),
+                        'type': item['type'],
+                        'id': item['id'],
+                        'data': data,
+                    }) + '\n')
+                    checkpoint_fp.flush()
     except KeyboardInterrupt:
         env.err("Printing collected results and then aborting.")
+    finally:
+        if checkpoint_fp:
+            checkpoint_fp.close()
+
+    # Rows are added in the order items were listed, not in the order the
+    # concurrent queries finished in, so the output is stable.
+    items = [item for item in items if (item['type'], item['id']) in fetched]
+    totals = _sum_metrics([fetched[(item['type'], item['id'])]
+                           for item in items])
+    width = len(_METRICS)
+
+    rows = range(len(items)) if top is None else _top(totals, top)
+    for row in rows:
+        item = items[row]
+        table.add_row([item['type'], item['name']] +
+                      _metric_columns(totals[row * width:(row + 1) * width]) +
+                      [item.get('pool') or formatting.blank()])
 
     env.out(env.fmt(table))
+
+    for key in rollup:
+        rollup_table = formatting.Table([key, 'count', 'public_in',
+                                         'public_out', 'private_in',
+                                         'private_out'])
+        # Pools are totalled as pools already, so only servers are rolled up
+        keys = [item.get(key) if item['type'] != 'pool' else None
+                for item in items]
+        for name, count, sums in _rollup(keys, totals):
+            rollup_table.add_row([name, count] + _metric_columns(sums))
+        env.out(env.fmt(rollup_table))
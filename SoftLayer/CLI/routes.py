@@ -12,6 +12,12 @@ ALL_ROUTES = [
     ('call-api', 'SoftLayer.CLI.call_api:cli'),
 
     ('virtual', 'SoftLayer.CLI.virt'),
+    ('virtual:bulk-cancel', 'SoftLayer.CLI.virt.bulk:cancel'),
+    ('virtual:bulk-edit', 'SoftLayer.CLI.virt.bulk:edit'),
+    ('virtual:bulk-power-off', 'SoftLayer.CLI.virt.bulk:power_off'),
+    ('virtual:bulk-power-on', 'SoftLayer.CLI.virt.bulk:power_on'),
+    ('virtual:bulk-reboot', 'SoftLayer.CLI.virt.bulk:reboot'),
+    ('virtual:bulk-reload', 'SoftLayer.CLI.virt.bulk:reload'),
     ('virtual:cancel', 'SoftLayer.CLI.virt.cancel:cli'),
     ('virtual:capture', 'SoftLayer.CLI.virt.capture:cli'),
     ('virtual:create', 'SoftLayer.CLI.virt.create:cli'),
@@ -52,6 +58,7 @@ ALL_ROUTES = [
     ('setup', 'SoftLayer.CLI.config.setup:cli'),
 
     ('dns', 'SoftLayer.CLI.dns'),
+    ('dns:host-sync', 'SoftLayer.CLI.dns.host_sync:cli'),
     ('dns:import', 'SoftLayer.CLI.dns.zone_import:cli'),
     ('dns:record-add', 'SoftLayer.CLI.dns.record_add:cli'),
     ('dns:record-edit', 'SoftLayer.CLI.dns.record_edit:cli'),
@@ -61,6 +68,7 @@ ALL_ROUTES = [
     ('dns:zone-delete', 'SoftLayer.CLI.dns.zone_delete:cli'),
     ('dns:zone-list', 'SoftLayer.CLI.dns.zone_list:cli'),
     ('dns:zone-print', 'SoftLayer.CLI.dns.zone_print:cli'),
+    ('dns:zone-sync', 'SoftLayer.CLI.dns.zone_sync:cli'),
 
     ('block', 'SoftLayer.CLI.block'),
     ('block:access-authorize', 'SoftLayer.CLI.block.access.authorize:cli'),
@@ -125,6 +133,7 @@ ALL_ROUTES = [
     ('firewall:detail', 'SoftLayer.CLI.firewall.detail:cli'),
     ('firewall:edit', 'SoftLayer.CLI.firewall.edit:cli'),
     ('firewall:list', 'SoftLayer.CLI.firewall.list:cli'),
+    ('firewall:sync', 'SoftLayer.CLI.firewall.sync:cli'),
 
     ('globalip', 'SoftLayer.CLI.globalip'),
     ('globalip:assign', 'SoftLayer.CLI.globalip.assign:cli'),
@@ -208,6 +217,7 @@ ALL_ROUTES = [
     ('order:item-list', 'SoftLayer.CLI.order.item_list:cli'),
     ('order:package-list', 'SoftLayer.CLI.order.package_list:cli'),
     ('order:place', 'SoftLayer.CLI.order.place:cli'),
+    ('order:place-batch', 'SoftLayer.CLI.order.place_batch:cli'),
     ('order:preset-list', 'SoftLayer.CLI.order.preset_list:cli'),
     ('order:package-locations', 'SoftLayer.CLI.order.package_locations:cli'),
 
@@ -216,6 +226,13 @@ ALL_ROUTES = [
     ('rwhois:show', 'SoftLayer.CLI.rwhois.show:cli'),
 
     ('hardware', 'SoftLayer.CLI.hardware'),
+    ('hardware:bulk-cancel', 'SoftLayer.CLI.hardware.bulk:cancel'),
+    ('hardware:bulk-edit', 'SoftLayer.CLI.hardware.bulk:edit'),
+    ('hardware:bulk-power-cycle', 'SoftLayer.CLI.hardware.bulk:power_cycle'),
+    ('hardware:bulk-power-off', 'SoftLayer.CLI.hardware.bulk:power_off'),
+    ('hardware:bulk-power-on', 'SoftLayer.CLI.hardware.bulk:power_on'),
+    ('hardware:bulk-reboot', 'SoftLayer.CLI.hardware.bulk:reboot'),
+    ('hardware:bulk-reload', 'SoftLayer.CLI.hardware.bulk:reload'),
     ('hardware:cancel', 'SoftLayer.CLI.hardware.cancel:cli'),
     ('hardware:cancel-reasons', 'SoftLayer.CLI.hardware.cancel_reasons:cli'),
     ('hardware:create', 'SoftLayer.CLI.hardware.create:cli'),
@@ -243,6 +260,7 @@ ALL_ROUTES = [
     ('securitygroup:rule-add', 'SoftLayer.CLI.securitygroup.rule:add'),
     ('securitygroup:rule-edit', 'SoftLayer.CLI.securitygroup.rule:edit'),
     ('securitygroup:rule-remove', 'SoftLayer.CLI.securitygroup.rule:remove'),
+    ('securitygroup:rule-sync', 'SoftLayer.CLI.securitygroup.rule:sync'),
     ('securitygroup:interface-list',
      'SoftLayer.CLI.securitygroup.interface:interface_list'),
     ('securitygroup:interface-add',
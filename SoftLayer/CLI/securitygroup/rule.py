@@ -7,6 +7,7 @@ import SoftLayer
 from SoftLayer.CLI import environment
 from SoftLayer.CLI import exceptions
 from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
 
 COLUMNS = ['id',
            'remoteIp',
@@ -158,3 +159,74 @@ def remove(env, securitygroup_id, rule_id):
     mgr = SoftLayer.NetworkManager(env.client)
     if not mgr.remove_securitygroup_rule(securitygroup_id, rule_id):
         raise exceptions.CLIAbort("Failed to remove security group rule")
+
+
+def _read_rules(path):
+    """Reads a JSON list of rules, or a YAML one from a .yaml/.yml file."""
+    rules = helpers.read_data_file(path)
+    if not isinstance(rules, list) or not all(isinstance(rule, dict)
+                                              for rule in rules):
+        raise exceptions.CLIAbort("%s should contain a list of rules" % path)
+    return rules
+
+
+@click.command()
+@click.argument('securitygroup_id')
+@click.argument('rules_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True,
+              help="Only show the changes, don't make them")
+@click.option('--wait/--no-wait', default=True, show_default=True,
+              help="Wait for the firewall updates to complete")
+@click.option('--timeout', default=600, show_default=True, type=click.INT,
+              help="Seconds to wait for the firewall updates")
+@environment.pass_env
+def sync(env, securitygroup_id, rules_file, dry_run, wait, timeout):
+    """Make the rules of a security group match a file.
+
+    RULES_FILE holds a JSON list (or, with a .yaml/.yml name, a YAML list)
+    of rules with the fields of `slcli sg rule-list`: direction, ethertype,
+    protocol, portRangeMin, portRangeMax, remoteIp and remoteGroupId.
+    Rules which are in the security group but not in RULES_FILE are
+    removed.
+
+    \b
+    Example:
+        [{"direction": "ingress", "protocol": "tcp",
+          "portRangeMin": 22, "portRangeMax": 22},
+         {"direction": "egress"}]
+    """
+    mgr = SoftLayer.NetworkManager(env.client)
+    rules = _read_rules(rules_file)
+    try:
+        plan = mgr.plan_securitygroup_sync(securitygroup_id, rules)
+    except ValueError as ex:
+        raise exceptions.CLIAbort("Invalid rules in %s: %s" % (rules_file, ex))
+
+    if not len(plan):
+        env.fout("Security group %s is in sync" % securitygroup_id)
+        return
+
+    table = formatting.Table(['action'] + COLUMNS)
+    for action, changes in [('add', plan.add), ('edit', plan.edit),
+                            ('remove', plan.remove)]:
+        for rule in changes:
+            table.add_row([action] + [
+                formatting.blank() if rule.get(column) in (None, -1)
+                else rule[column] for column in COLUMNS])
+    env.fout(table)
+
+    if dry_run:
+        return
+
+    if plan.remove and not (env.skip_confirmations or formatting.confirm(
+            "This will remove %d rules from security group %s. Continue?"
+            % (len(plan.remove), securitygroup_id))):
+        raise exceptions.CLIAbort('Aborted.')
+
+    request_ids = mgr.apply_securitygroup_sync(plan, wait=wait, limit=timeout)
+    env.fout("Synced security group %s: %d added, %d edited, %d removed"
+             % (securitygroup_id, len(plan.add), len(plan.edit),
+                len(plan.remove)))
+    if request_ids and not wait:
+        env.fout("Firewall updates pending for requests %s"
+                 % ', '.join(str(request_id) for request_id in request_ids))
@@ -21,24 +21,26 @@ COLUMNS = ['datacenter',
               help='Column to sort by',
               default='datacenter',
               type=click.Choice(COLUMNS))
+@click.option('--datacenter', '-d',
+              help='Only summarize this datacenter')
 @environment.pass_env
-def cli(env, sortby):
+def cli(env, sortby, datacenter):
     """Account summary."""
 
     mgr = SoftLayer.NetworkManager(env.client)
-    datacenters = mgr.summary_by_datacenter()
+    datacenters = mgr.summary_by_datacenter(datacenter=datacenter)
 
     table = formatting.Table(COLUMNS)
     table.sortby = sortby
 
-    for name, datacenter in datacenters.items():
+    for name, counts in datacenters.items():
         table.add_row([
             name,
-            datacenter['hardware_count'],
-            datacenter['virtual_guest_count'],
-            datacenter['vlan_count'],
-            datacenter['subnet_count'],
-            datacenter['public_ip_count'],
+            counts['hardware_count'],
+            counts['virtual_guest_count'],
+            counts['vlan_count'],
+            counts['subnet_count'],
+            counts['public_ip_count'],
         ])
 
     env.fout(table)
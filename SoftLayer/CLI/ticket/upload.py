@@ -2,6 +2,7 @@
 # :license: MIT, see LICENSE for more details.
 
 import os
+import sys
 
 import click
 
@@ -15,8 +16,11 @@ from SoftLayer.CLI import helpers
 @click.argument('identifier')
 @click.option('--path', help="The path of the attachment to be uploaded")
 @click.option('--name', help="The name of the attachment shown in the ticket")
+@click.option('--split-size', type=click.IntRange(min=1),
+              help="Split files larger than this many MB into several "
+                   "attachments, named NAME.001, NAME.002, ...")
 @environment.pass_env
-def cli(env, identifier, path, name):
+def cli(env, identifier, path, name, split_size):
     """Adds an attachment to an existing ticket."""
     mgr = SoftLayer.TicketManager(env.client)
 
@@ -31,7 +35,21 @@ def cli(env, identifier, path, name):
     if name is None:
         name = os.path.basename(path)
 
-    attached_file = mgr.upload_attachment(ticket_id=ticket_id,
-                                          file_path=path,
-                                          file_name=name)
-    env.fout("File attached: \n%s" % attached_file)
+    with click.progressbar(length=os.path.getsize(path), label='Uploading',
+                           file=sys.stderr) as progress:
+        def update(sent, _):
+            """Moves the progress bar to the number of bytes sent."""
+            progress.update(sent - progress.pos)
+
+        if split_size:
+            attached_files = mgr.upload_attachment_parts(
+                ticket_id=ticket_id, file_path=path, file_name=name,
+                part_size=split_size * 1024 * 1024, progress=update)
+        else:
+            attached_files = [mgr.upload_attachment(ticket_id=ticket_id,
+                                                    file_path=path,
+                                                    file_name=name,
+                                                    progress=update)]
+
+    for attached_file in attached_files:
+        env.fout("File attached: \n%s" % attached_file)
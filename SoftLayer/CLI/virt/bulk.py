@@ -0,0 +1,138 @@
+"""Act on many virtual servers at once."""
+# :license: MIT, see LICENSE for more details.
+
+import click
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
+
+
+def _resolve(env, identifiers, id_file, action):
+    """Resolves all identifiers and confirms the action."""
+    vsi = SoftLayer.VSManager(env.client)
+    identifiers = helpers.read_identifiers(identifiers, id_file)
+    vs_ids = helpers.resolve_many_ids(vsi.resolve_many, identifiers, 'VS')
+    if not (env.skip_confirmations or
+            formatting.confirm('This will %s %d virtual servers. Continue?'
+                               % (action, len(vs_ids)))):
+        raise exceptions.CLIAbort('Aborted.')
+    return vsi, vs_ids
+
+
+def _report(env, report, ids):
+    """Prints the outcome for each virtual server."""
+    env.fout(helpers.bulk_report_table(report, ids))
+    helpers.check_bulk_report(report, 'virtual servers')
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@helpers.bulk_options
+@environment.pass_env
+def cancel(env, identifiers, id_file, workers, rate):
+    """Cancel many virtual servers."""
+
+    vsi, vs_ids = _resolve(env, identifiers, id_file, 'cancel')
+    report = vsi.cancel_instances(vs_ids, workers=workers, rate=rate)
+    _report(env, report, vs_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@click.option('--postinstall', '-i', help="Post-install script to download")
+@click.option(
+    '--image',
+    help="""Image ID. The default is to use the current operating system.
+See: 'slcli image list' for reference""")
+@helpers.multi_option('--key', '-k',
+                      help="SSH keys to add to the root user")
+@helpers.bulk_options
+@environment.pass_env
+def reload(env, identifiers, postinstall, image, key, id_file, workers, rate):
+    """Reload operating system on many virtual servers."""
+
+    keys = []
+    for single_key in key:
+        resolver = SoftLayer.SshKeyManager(env.client).resolve_ids
+        keys.append(helpers.resolve_id(resolver, single_key, 'SshKey'))
+
+    vsi, vs_ids = _resolve(env, identifiers, id_file, 'reload')
+    report = vsi.reload_instances(vs_ids,
+                                  post_uri=postinstall,
+                                  ssh_keys=keys,
+                                  image_id=image,
+                                  workers=workers,
+                                  rate=rate)
+    _report(env, report, vs_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@click.option('--domain', '-D', help="Domain portion of the FQDN")
+@click.option('--notes', help="Notes to set on the virtual servers")
+@click.option('--tag', '-g', multiple=True,
+              help="Tags to set or empty string to remove all")
+@click.option('--userdata', '-u', help="User defined metadata string")
+@helpers.bulk_options
+@environment.pass_env
+def edit(env, identifiers, domain, notes, tag, userdata, id_file, workers,
+         rate):
+    """Edit the details of many virtual servers."""
+
+    tags = ','.join(tag) if tag else None
+    vsi, vs_ids = _resolve(env, identifiers, id_file, 'edit')
+    report = vsi.edit_instances(vs_ids,
+                                userdata=userdata,
+                                domain=domain,
+                                notes=notes,
+                                tags=tags,
+                                workers=workers,
+                                rate=rate)
+    _report(env, report, vs_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@click.option('--hard/--soft',
+              default=None,
+              help="Perform a hard or soft reboot")
+@helpers.bulk_options
+@environment.pass_env
+def reboot(env, identifiers, hard, id_file, workers, rate):
+    """Reboot many virtual servers."""
+
+    vsi, vs_ids = _resolve(env, identifiers, id_file, 'reboot')
+    report = vsi.reboot_instances(vs_ids, hard=hard, workers=workers,
+                                  rate=rate)
+    _report(env, report, vs_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@click.option('--hard/--soft', help="Perform a hard shutdown")
+@helpers.bulk_options
+@environment.pass_env
+def power_off(env, identifiers, hard, id_file, workers, rate):
+    """Power off many virtual servers."""
+
+    vsi, vs_ids = _resolve(env, identifiers, id_file, 'power off')
+    report = vsi.power_off_instances(vs_ids, hard=hard, workers=workers,
+                                     rate=rate)
+    _report(env, report, vs_ids)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@helpers.bulk_options
+@environment.pass_env
+def power_on(env, identifiers, id_file, workers, rate):
+    """Power on many virtual servers."""
+
+    vsi = SoftLayer.VSManager(env.client)
+    identifiers = helpers.read_identifiers(identifiers, id_file)
+    vs_ids = helpers.resolve_many_ids(vsi.resolve_many, identifiers, 'VS')
+    report = vsi.power_on_instances(vs_ids, workers=workers, rate=rate)
+    _report(env, report, vs_ids)
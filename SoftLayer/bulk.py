@@ -0,0 +1,300 @@
+"""
+    SoftLayer.bulk
+    ~~~~~~~~~~~~~~
+    Helpers to run many API calls with a bounded pool of worker threads.
+
+    :license: MIT, see LICENSE for more details.
+"""
+import collections
+import logging
+import threading
+import time
+
+import six
+
+LOGGER = logging.getLogger(__name__)
+
+#: Default number of worker threads used for bulk operations
+DEFAULT_WORKERS = 8
+
+# How long the consuming thread blocks at a time. Waiting with a timeout keeps
+# the wait interruptible with Ctrl-C on python 2.
+_POLL_INTERVAL = 0.5
+
+# Tells a worker thread to exit
+_STOP = object()
+
+
+class RateLimiter(object):
+    """Limits how often calls are started, across all worker threads.
+
+    :param float rate: maximum number of calls started per second. None or 0
+                       disables rate limiting.
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next_call = 0
+
+    def wait(self):
+        """Blocks until the next call is allowed to start."""
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.time()
+            delay = self._next_call - now
+            self._next_call = max(now, self._next_call) + self.interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+class BulkReport(object):
+    """Per-item outcome of a bulk operation.
+
+    A report can be handed back to the bulk operation that produced it to
+    retry only the items which did not succeed.
+    """
+
+    def __init__(self):
+        #: item => result of the call, in completion order
+        self.succeeded = collections.OrderedDict()
+        #: item => exception raised by the call, in completion order
+        self.failed = collections.OrderedDict()
+
+    @property
+    def ok(self):
+        """True when no item failed."""
+        return not self.failed
+
+    def add_success(self, item, result):
+        """Records a successful call."""
+        self.failed.pop(item, None)
+        self.succeeded[item] = result
+
+    def add_failure(self, item, error):
+        """Records a failed call."""
+        self.failed[item] = error
+
+    def pending(self, items):
+        """Returns the items which have not succeeded yet."""
+        return [item for item in items if item not in self.succeeded]
+
+    def __len__(self):
+        return len(self.succeeded) + len(self.failed)
+
+    def __repr__(self):
+        return "<BulkReport: %d succeeded, %d failed>" % (len(self.succeeded),
+                                                          len(self.failed))
+
+
+class ProvisionReport(object):
+    """Outcome of provisioning a batch of instances.
+
+    Tracks which instances were created, which were tagged and which became
+    ready, along with the errors of every stage.
+    """
+
+    def __init__(self):
+        #: created instances, in the order of the configs they came from
+        self.created = []
+        #: chunk index => (list of configs, exception) for failed chunks
+        self.create_errors = collections.OrderedDict()
+        #: instance id => tags which were set
+        self.tagged = collections.OrderedDict()
+        #: instance id => exception raised while setting tags
+        self.tag_errors = collections.OrderedDict()
+        #: instance id => True if ready, False if the wait expired
+        self.ready = collections.OrderedDict()
+
+    @property
+    def ok(self):
+        """True when every instance was created, tagged and (if waited on)
+        became ready."""
+        return (not self.create_errors and not self.tag_errors and
+                all(self.ready.values()))
+
+    @property
+    def errors(self):
+        """Returns every error, in the order create, tag."""
+        return ([error for _, error in self.create_errors.values()] +
+                list(self.tag_errors.values()))
+
+    def __repr__(self):
+        return ("<ProvisionReport: %d created, %d tagged, %d ready, "
+                "%d errors>" % (len(self.created), len(self.tagged),
+                                len([r for r in self.ready.values() if r]),
+                                len(self.errors)))
+
+
+class WorkerPool(object):
+    """A bounded pool of threads calling func for items submitted over time.
+
+    Unlike iter_concurrent(), items can be submitted while results are being
+    consumed, so one pool can serve several stages of a pipeline without
+    going over its number of workers.
+
+    :param func: function to call with each item
+    :param int workers: maximum number of concurrent calls
+    :param rate: maximum number of calls started per second, or a RateLimiter
+                 shared with other bulk operations
+    """
+
+    def __init__(self, func, workers=DEFAULT_WORKERS, rate=None):
+        self.func = func
+        self.workers = max(1, workers)
+        self.limiter = rate if isinstance(rate, RateLimiter) else RateLimiter(
+            rate)
+        self._tasks = six.moves.queue.Queue()
+        self._results = six.moves.queue.Queue()
+        self._threads = []
+        self._pending = 0
+
+    def submit(self, item):
+        """Queues func(item) to be called by the next free worker."""
+        self._pending += 1
+        self._tasks.put(item)
+        if len(self._threads) < min(self.workers, self._pending):
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def __len__(self):
+        """Number of submitted items whose result was not consumed yet."""
+        return self._pending
+
+    def as_completed(self):
+        """Yields (item, result, exception) tuples as calls finish.
+
+        This runs until the result of every submitted item was yielded,
+        including items submitted while iterating.
+        """
+        while self._pending:
+            try:
+                outcome = self._results.get(timeout=_POLL_INTERVAL)
+            except six.moves.queue.Empty:
+                continue
+            self._pending -= 1
+            yield outcome
+
+    def close(self):
+        """Stops the workers once their current call has finished.
+
+        Items which were not started yet are dropped.
+        """
+        while True:
+            try:
+                self._tasks.get_nowait()
+            except six.moves.queue.Empty:
+                break
+        for _ in self._threads:
+            self._tasks.put(_STOP)
+
+    def _work(self):
+        """Works through the task queue until the pool is closed."""
+        while True:
+            item = self._tasks.get()
+            if item is _STOP:
+                return
+            self.limiter.wait()
+            self._results.put(_call(self.func, item))
+
+
+def iter_concurrent(func, items, workers=DEFAULT_WORKERS, rate=None):
+    """Calls func(item) for every item using a bounded pool of threads.
+
+    Results are yielded as soon as they are available, so the order is not
+    the order of items. Exceptions raised by func are yielded, not raised.
+
+    :param func: function to call with each item
+    :param items: iterable of items
+    :param int workers: maximum number of concurrent calls
+    :param rate: maximum number of calls started per second, or a RateLimiter
+                 shared with other bulk operations
+    :returns: generator of (item, result, exception) tuples
+    """
+    items = list(items)
+    limiter = rate if isinstance(rate, RateLimiter) else RateLimiter(rate)
+
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            limiter.wait()
+            yield _call(func, item)
+        return
+
+    pool = WorkerPool(func, workers=workers, rate=limiter)
+    for item in items:
+        pool.submit(item)
+
+    try:
+        for item, result, error in pool.as_completed():
+            yield item, result, error
+    finally:
+        # Let running calls finish but don't start new ones when the consumer
+        # goes away (for example on KeyboardInterrupt).
+        pool.close()
+
+
+def map_concurrent(func, items, workers=DEFAULT_WORKERS, rate=None):
+    """Like map(), but calls func concurrently.
+
+    Results are returned in the same order as items. The first exception
+    raised by func is re-raised once all calls have finished.
+
+    :param func: function to call with each item
+    :param items: iterable of items
+    :param int workers: maximum number of concurrent calls
+    :param float rate: maximum number of calls started per second
+    """
+    items = list(items)
+    indexed = list(enumerate(items))
+    results = [None] * len(items)
+    error = None
+
+    for (index, _), result, ex in iter_concurrent(
+            lambda pair: func(pair[1]), indexed, workers=workers, rate=rate):
+        if ex is not None:
+            error = error or ex
+        results[index] = result
+
+    if error is not None:
+        raise error
+    return results
+
+
+def run_bulk(func, items, workers=DEFAULT_WORKERS, rate=None, report=None):
+    """Calls func(item) for every item and records the outcome of each call.
+
+    Failures don't stop the other calls. Pass the report of a previous run to
+    only retry the items that did not succeed.
+
+    :param func: function to call with each item
+    :param list items: items (usually ids) to call func with
+    :param int workers: maximum number of concurrent calls
+    :param float rate: maximum number of calls started per second
+    :param BulkReport report: report of a previous run to resume
+    :returns: a BulkReport
+    """
+    if report is None:
+        report = BulkReport()
+
+    for item, result, error in iter_concurrent(func, report.pending(items),
+                                               workers=workers, rate=rate):
+        if error is None:
+            report.add_success(item, result)
+        else:
+            LOGGER.warning("Bulk operation failed for %s: %s", item, error)
+            report.add_failure(item, error)
+
+    return report
+
+
+def _call(func, item):
+    """Calls func(item), capturing any exception raised."""
+    try:
+        return item, func(item), None
+    except Exception as ex:  # pylint: disable=broad-except
+        return item, None, ex
@@ -39,6 +39,7 @@ def get_client_settings_env(**_):
         'proxy': os.environ.get('https_proxy'),
         'username': os.environ.get('SL_USERNAME'),
         'api_key': os.environ.get('SL_API_KEY'),
+        'location_cache': os.environ.get('SL_LOCATION_CACHE'),
     }
 
 
@@ -57,6 +58,7 @@ def get_client_settings_config_file(**kwargs):  # pylint: disable=inconsistent-r
         'endpoint_url': '',
         'timeout': '0',
         'proxy': '',
+        'location_cache': '',
     })
     config.read(config_files)
 
@@ -67,6 +69,7 @@ def get_client_settings_config_file(**kwargs):  # pylint: disable=inconsistent-r
             'proxy': config.get('softlayer', 'proxy'),
             'username': config.get('softlayer', 'username'),
             'api_key': config.get('softlayer', 'api_key'),
+            'location_cache': config.get('softlayer', 'location_cache'),
         }
 
 
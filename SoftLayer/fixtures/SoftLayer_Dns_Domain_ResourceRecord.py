@@ -1,3 +1,6 @@
 createObject = {'name': 'example.com'}
+createObjects = [{'id': 1}]
 deleteObject = True
 editObject = True
+editObjects = True
+deleteObjects = True
@@ -1,4 +1,10 @@
 getDatacenters = [{
     'id': 0,
     'name': 'dal05'
+}, {
+    'id': 168642,
+    'longName': 'San Jose 1',
+    'name': 'sjc01',
+    'regions': [{'keyname': 'SANJOSE01', 'description': 'SJC01 - San Jose'}],
+    'priceGroups': [{'id': 503, 'name': 'Location Group 1'}]
 }]
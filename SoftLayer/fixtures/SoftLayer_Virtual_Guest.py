@@ -425,6 +425,12 @@ reloadOperatingSystem = 'OK'
 setTags = True
 createArchiveTransaction = {}
 executeRescueLayer = True
+powerOff = True
+powerOffSoft = True
+powerOn = True
+rebootDefault = True
+rebootHard = True
+rebootSoft = True
 
 getUpgradeItemPrices = [
     {
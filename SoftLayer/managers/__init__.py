@@ -19,6 +19,7 @@ from SoftLayer.managers.ipsec import IPSECManager
 from SoftLayer.managers.load_balancer import LoadBalancerManager
 from SoftLayer.managers.messaging import MessagingManager
 from SoftLayer.managers.metadata import MetadataManager
+from SoftLayer.managers.metrics import MetricsManager
 from SoftLayer.managers.network import NetworkManager
 from SoftLayer.managers.object_storage import ObjectStorageManager
 from SoftLayer.managers.ordering import OrderingManager
@@ -40,6 +41,7 @@ __all__ = [
     'LoadBalancerManager',
     'MessagingManager',
     'MetadataManager',
+    'MetricsManager',
     'NetworkManager',
     'ObjectStorageManager',
     'OrderingManager',
@@ -0,0 +1,178 @@
+"""
+    SoftLayer.managers.datacenters
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Datacenter lookups shared by the managers
+
+    :license: MIT, see LICENSE for more details.
+"""
+import json
+import os
+import threading
+import time
+import weakref
+
+from SoftLayer import utils
+
+#: Seconds the registry reuses the datacenters it fetched for
+LOCATION_TTL = 24 * 60 * 60
+
+DATACENTER_MASK = ('id,name,longName,regions[keyname,description],'
+                   'priceGroups[id,name]')
+
+# client => LocationRegistry
+_REGISTRIES = weakref.WeakKeyDictionary()
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_registry(client):
+    """Returns the LocationRegistry shared by everything using a client.
+
+    The datacenters are persisted to the client's location_cache file, which
+    create_client_from_env() sets from the config (~/.softlayer-locations by
+    default).
+
+    :param SoftLayer.API.BaseClient client: the client instance
+    """
+    with _REGISTRIES_LOCK:
+        registry = _REGISTRIES.get(client)
+        if registry is None:
+            registry = _REGISTRIES[client] = LocationRegistry(
+                client, path=getattr(client, 'location_cache', None))
+        return registry
+
+
+def _normalize(key):
+    return str(key).strip().lower()
+
+
+class LocationRegistry(object):
+    """Datacenters, their regions and price groups, fetched once.
+
+    The datacenters are fetched on first use and kept for ttl seconds. With a
+    path they are also written to a JSON file, so later processes reuse them
+    until they expire. Every datacenter can be looked up by its name, long
+    name, id or the keyname of one of its regions.
+
+    ::
+
+        registry = get_registry(client)
+        registry.get_id('dal09')
+        registry.get_datacenter('Dallas 9')
+
+    :param SoftLayer.API.BaseClient client: the client instance
+    :param string path: file to persist the datacenters to (optional)
+    :param int ttl: seconds to keep the datacenters for
+    """
+
+    def __init__(self, client, path=None, ttl=LOCATION_TTL):
+        self.client = client
+        self.path = os.path.expanduser(path) if path else None
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._expires = 0
+        self._datacenters = []
+        self._index = {}
+
+    def _load(self):
+        """Returns (expiry time, datacenters), from the file or the API."""
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path) as cache_fp:
+                    cached = json.load(cache_fp)
+                if cached['expires'] > time.time():
+                    return cached['expires'], cached['datacenters']
+            except (ValueError, KeyError, TypeError):
+                pass
+
+        datacenters = self.client['Location_Datacenter'].getDatacenters(
+            mask=DATACENTER_MASK) or []
+        expires = time.time() + self.ttl
+        if self.path:
+            with open(self.path + '.tmp', 'w') as cache_fp:
+                json.dump({'expires': expires, 'datacenters': datacenters},
+                          cache_fp)
+            os.rename(self.path + '.tmp', self.path)
+        return expires, datacenters
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._expires > time.time():
+                return
+
+            self._expires, self._datacenters = self._load()
+            self._index = {}
+            for datacenter in self._datacenters:
+                keys = [datacenter.get('id'), datacenter.get('name'),
+                        datacenter.get('longName')]
+                keys.extend(region.get('keyname')
+                            for region in datacenter.get('regions') or [])
+                for key in keys:
+                    if key is not None:
+                        self._index.setdefault(_normalize(key), datacenter)
+
+    def clear(self):
+        """Forgets the datacenters, so the next lookup fetches them again."""
+        with self._lock:
+            self._expires = 0
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def get_datacenters(self):
+        """Returns every datacenter."""
+        self._ensure_loaded()
+        return list(self._datacenters)
+
+    def get_datacenter(self, identifier):
+        """Returns a datacenter, or None if there is no such datacenter.
+
+        :param identifier: the name ('dal09'), long name ('Dallas 9'), id or
+                           region keyname ('DALLAS09') of the datacenter
+        """
+        self._ensure_loaded()
+        return self._index.get(_normalize(identifier))
+
+    def get_id(self, identifier):
+        """Returns the id of a datacenter, or None if it doesn't exist.
+
+        :param identifier: the name, long name, id or region keyname
+        """
+        return utils.lookup(self.get_datacenter(identifier) or {}, 'id')
+
+    def get_region_keyname(self, identifier):
+        """Returns the keyname of the region of a datacenter, or None.
+
+        :param identifier: the name, long name, id or region keyname
+        """
+        regions = utils.lookup(self.get_datacenter(identifier) or {},
+                               'regions') or []
+        return regions[0].get('keyname') if regions else None
+
+    def get_price_group_ids(self, identifier):
+        """Returns the ids of the price groups a datacenter belongs to.
+
+        :param identifier: the name, long name, id or region keyname
+        """
+        groups = utils.lookup(self.get_datacenter(identifier) or {},
+                              'priceGroups') or []
+        return [group['id'] for group in groups]
+
+
+def find_region(regions, datacenter):
+    """Finds the package region of a datacenter.
+
+    Package regions carry the keyname and price groups an order in that
+    package needs, so they are looked up in the package itself.
+
+    :param list regions: the regions of a product package
+    :param string datacenter: the name, long name or id of the datacenter,
+                              or the region keyname
+    :returns: the region, or None if the package isn't sold there
+    """
+    key = _normalize(datacenter)
+    for region in regions:
+        location = utils.lookup(region, 'location', 'location') or {}
+        keys = (location.get('name'), location.get('longName'),
+                location.get('id'), region.get('keyname'))
+        if key in [_normalize(value) for value in keys if value is not None]:
+            return region
+    return None
@@ -9,6 +9,7 @@
 import logging
 import SoftLayer
 
+from SoftLayer.managers import datacenters
 from SoftLayer.managers import ordering
 from SoftLayer import utils
 
@@ -255,10 +256,9 @@ class DedicatedHostManager(utils.IdentifierMixin, object):
 
     def _get_location(self, regions, datacenter):
         """Get the longer key with a short location(datacenter) name."""
-        for region in regions:
-            # list of locations
-            if region['location']['location']['name'] == datacenter:
-                return region
+        region = datacenters.find_region(regions, datacenter)
+        if region is not None:
+            return region
 
         raise SoftLayer.SoftLayerError("Could not find valid location for: '%s'" % datacenter)
 
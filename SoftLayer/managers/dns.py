@@ -5,10 +5,70 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import logging
 import time
 
+from SoftLayer import bulk
 from SoftLayer import utils
 
+LOGGER = logging.getLogger(__name__)
+
+#: Default number of records created per createObjects call
+RECORD_CHUNK_SIZE = 100
+
+# Just what sync_zone() needs to compare records
+SYNC_RECORD_MASK = 'id,host,type,data,ttl'
+
+#: What plan_host_sync() needs of each virtual server or hardware server
+HOST_SYNC_MASK = ('id,hostname,domain,fullyQualifiedDomainName,'
+                  'primaryIpAddress,'
+                  'primaryNetworkComponent[primaryVersion6IpAddressRecord[ipAddress]]')
+REVERSE_ZONE_MASK = 'id,name'
+
+
+#: Record types whose data is a host name
+HOSTNAME_TYPES = ('CNAME', 'MX', 'NS', 'PTR')
+
+
+def _record_data(record_type, data):
+    """Returns record data the way syncs compare it.
+
+    Host names are case insensitive and may or may not end with a dot.
+    """
+    if record_type.upper() in HOSTNAME_TYPES:
+        return data.rstrip('.').lower()
+    return data
+
+
+def _record_key(host, record_type, data):
+    """Returns the key records are matched by when syncing a zone."""
+    return (host.lower(), record_type.upper(), _record_data(record_type, data))
+
+
+class ZoneSyncPlan(object):
+    """The changes which make the records of a zone match a desired list.
+
+    :param integer zone_id: the zone's ID
+    :param string name: the zone's name
+    """
+
+    def __init__(self, zone_id, name=None):
+        self.zone_id = zone_id
+        self.name = name
+        #: desired records (as passed to create_records()) to create
+        self.create = []
+        #: current records with the changed fields applied, to edit
+        self.update = []
+        #: current records to delete
+        self.delete = []
+
+    def __len__(self):
+        return len(self.create) + len(self.update) + len(self.delete)
+
+    def __repr__(self):
+        return "<ZoneSyncPlan: %d create, %d update, %d delete>" % (
+            len(self.create), len(self.update), len(self.delete))
+
 
 class DNSManager(utils.IdentifierMixin, object):
     """Manage SoftLayer DNS.
@@ -24,6 +84,7 @@ class DNSManager(utils.IdentifierMixin, object):
         self.service = self.client['Dns_Domain']
         self.record = self.client['Dns_Domain_ResourceRecord']
         self.resolvers = [self._get_zone_id_from_name]
+        self.batch_resolvers = [self._get_zone_ids_from_names]
 
     def _get_zone_id_from_name(self, name):
         """Return zone ID based on a zone."""
@@ -31,6 +92,14 @@ class DNSManager(utils.IdentifierMixin, object):
             filter={"domains": {"name": utils.query_filter(name)}})
         return [x['id'] for x in results]
 
+    def _get_zone_ids_from_names(self, names):
+        """Return zone IDs for many zone names with one API call."""
+        results = self.client['Account'].getDomains(
+            mask='id,name',
+            filter={"domains": {"name": utils.query_filter_in(names)}})
+        return utils.group_ids_by(results, 'name', names,
+                                  normalize=lambda name: name.lower())
+
     def list_zones(self, **kwargs):
         """Retrieve a list of all DNS zones.
 
@@ -101,6 +170,354 @@ class DNSManager(utils.IdentifierMixin, object):
             'type': record_type,
             'data': data})
 
+    def create_records(self, zone_id, records, chunk_size=RECORD_CHUNK_SIZE,
+                       workers=bulk.DEFAULT_WORKERS, rate=None):
+        """Creates many resource records on a domain.
+
+        The records are split into chunks which are created concurrently with
+        one createObjects call each. When a chunk fails, its records are
+        created one by one to find out which of them the API rejects, so one
+        bad record doesn't fail the rest of its chunk.
+
+        :param integer zone_id: the zone's ID
+        :param list records: dicts with the 'record', 'type', 'data' and
+                             optionally 'ttl' (default: 60) of each record,
+                             as returned by the zone file parser
+        :param int chunk_size: maximum number of records per createObjects call
+        :param int workers: maximum number of concurrent API calls
+        :param rate: maximum number of API calls started per second
+        :returns: generator of (index, created record, exception) tuples, one
+                  per record, in completion order. index is the position of
+                  the record in records.
+
+        Example::
+
+            report = SoftLayer.bulk.BulkReport()
+            for index, created, error in mgr.create_records(zone_id, records):
+                if error is None:
+                    report.add_success(index, created)
+                else:
+                    report.add_failure(index, error)
+        """
+        templates = [{
+            'domainId': zone_id,
+            'ttl': record.get('ttl', 60),
+            'host': record['record'],
+            'type': record['type'],
+            'data': record['data'],
+        } for record in records]
+        size = chunk_size or len(templates) or 1
+
+        def run(task):
+            """Creates a chunk of records, or a single one."""
+            if task[0] == 'chunk':
+                return self.record.createObjects(
+                    templates[task[1]:task[1] + size])
+            return self.record.createObject(templates[task[1]])
+
+        pool = bulk.WorkerPool(run, workers=workers, rate=rate)
+        for start in range(0, len(templates), size):
+            pool.submit(('chunk', start))
+
+        try:
+            for task, result, error in pool.as_completed():
+                kind, start = task
+                end = min(start + size, len(templates))
+                if kind == 'record' or (error is not None and end - start == 1):
+                    yield start, result, error
+                elif error is not None:
+                    LOGGER.warning("Creating %d records failed, retrying them "
+                                   "one by one: %s", end - start, error)
+                    for index in range(start, end):
+                        pool.submit(('record', index))
+                else:
+                    for index, created in enumerate(result, start):
+                        yield index, created, None
+        finally:
+            pool.close()
+
+    def plan_zone_sync(self, zone_id, desired_records):
+        """Computes the changes which make a zone hold desired_records.
+
+        The current records are fetched with one call. Records are matched
+        on (host, type, data), ignoring the case of the host and of host
+        names in the data and a trailing dot of the latter. A matched record is only updated when its TTL
+        differs. Unmatched records with the same host and type are paired up
+        and updated in place instead of being deleted and created again. SOA
+        records are never touched.
+
+        :param integer zone_id: the zone's ID
+        :param list desired_records: dicts with the 'record', 'type', 'data'
+                                     and optionally 'ttl' of each record, as
+                                     returned by the zone file parser. A TTL
+                                     of None keeps the current TTL.
+        :returns: a ZoneSyncPlan
+        """
+        current = {}
+        for record in self.service.getResourceRecords(id=zone_id,
+                                                      mask=SYNC_RECORD_MASK):
+            if record['type'].upper() == 'SOA':
+                continue
+            key = _record_key(record['host'], record['type'], record['data'])
+            current.setdefault(key, []).append(record)
+
+        plan = ZoneSyncPlan(zone_id)
+        missing = []
+        for desired in desired_records:
+            key = _record_key(desired['record'], desired['type'],
+                              desired['data'])
+            if current.get(key):
+                record = current[key].pop(0)
+                if _ttl_changed(record, desired):
+                    plan.update.append({'id': record['id'],
+                                        'ttl': int(desired['ttl'])})
+            else:
+                missing.append(desired)
+
+        # Whatever is left over is either reused for a missing record with
+        # the same host and type or deleted
+        spare = {}
+        for key in sorted(current):
+            for record in current[key]:
+                spare.setdefault(key[:2], []).append(record)
+
+        for desired in missing:
+            key = _record_key(desired['record'], desired['type'],
+                              desired['data'])
+            if spare.get(key[:2]):
+                record = spare[key[:2]].pop(0)
+                change = {'id': record['id'], 'data': desired['data']}
+                if _ttl_changed(record, desired):
+                    change['ttl'] = int(desired['ttl'])
+                plan.update.append(change)
+            else:
+                plan.create.append(desired)
+
+        for records in spare.values():
+            plan.delete.extend(records)
+        plan.delete.sort(key=lambda record: record['id'])
+        return plan
+
+    def apply_zone_sync(self, plan, chunk_size=RECORD_CHUNK_SIZE,
+                        workers=bulk.DEFAULT_WORKERS, rate=None):
+        """Applies a ZoneSyncPlan with batched calls.
+
+        Updates and deletes are sent in chunks with one editObjects or
+        deleteObjects call each, and records are created with
+        create_records(). A failed chunk or record doesn't stop the rest.
+
+        :param ZoneSyncPlan plan: the changes to make
+        :param int chunk_size: maximum number of records per call
+        :param int workers: maximum number of concurrent API calls
+        :param rate: maximum number of API calls started per second
+        :returns: a SoftLayer.bulk.BulkReport keyed by (action, index) where
+                  action is 'create', 'update' or 'delete' and index is the
+                  position in that list of the plan
+        """
+        report = bulk.BulkReport()
+        size = chunk_size or len(plan) or 1
+        chunks = []
+        for action, records in (('update', plan.update),
+                                ('delete', plan.delete)):
+            for start in range(0, len(records), size):
+                chunks.append((action, start, records[start:start + size]))
+
+        def run(chunk):
+            """Edits or deletes a chunk of records."""
+            action, _, records = chunk
+            if action == 'update':
+                return self.record.editObjects(records)
+            return self.record.deleteObjects(records)
+
+        limiter = bulk.RateLimiter(rate)
+        for chunk, _, error in bulk.iter_concurrent(run, chunks,
+                                                    workers=workers,
+                                                    rate=limiter):
+            action, start, records = chunk
+            for index in range(start, start + len(records)):
+                if error is None:
+                    report.add_success((action, index), records[index - start])
+                else:
+                    report.add_failure((action, index), error)
+
+        for index, created, error in self.create_records(
+                plan.zone_id, plan.create, chunk_size=chunk_size,
+                workers=workers, rate=limiter):
+            if error is None:
+                report.add_success(('create', index), created)
+            else:
+                report.add_failure(('create', index), error)
+        return report
+
+    def sync_zone(self, zone_id, desired_records, **kwargs):
+        """Makes the records of a zone match desired_records.
+
+        This is plan_zone_sync() followed by apply_zone_sync(), so a zone
+        which is already in sync only costs one API call.
+
+        :param integer zone_id: the zone's ID
+        :param list desired_records: dicts with the 'record', 'type', 'data'
+                                     and optionally 'ttl' of each record
+        :param \\*\\*kwargs: chunk_size, workers and rate for
+                             apply_zone_sync()
+        :returns: tuple of (ZoneSyncPlan, SoftLayer.bulk.BulkReport)
+        """
+        plan = self.plan_zone_sync(zone_id, desired_records)
+        return plan, self.apply_zone_sync(plan, **kwargs)
+
+    def plan_host_sync(self, guests=(), hardware=(), record_types=('A', 'PTR'),
+                       ttl=7200, workers=bulk.DEFAULT_WORKERS):
+        """Computes the A, AAAA and PTR changes for many servers at once.
+
+        Forward zones are resolved with one call and reverse zones with one
+        getReverseDomainRecords call per /24 (and per server the zones found
+        that way don't cover). Every forward and reverse zone is then fetched
+        once, concurrently, and the records are compared in memory. A host
+        gets a record created when it has none, or its one record updated
+        when the address or TTL differ. Hosts with more than one record of a
+        type are reported as errors and left alone, like `slcli vs dns-sync`
+        does. So are the hosts of a zone which can't be fetched; the other
+        zones are still planned.
+
+        :param list guests: virtual servers, fetched with HOST_SYNC_MASK
+        :param list hardware: hardware servers, fetched with HOST_SYNC_MASK
+        :param list record_types: any of 'A', 'AAAA' and 'PTR'
+        :param int ttl: the TTL of the records
+        :param int workers: maximum number of concurrent API calls
+        :returns: tuple of (list of ZoneSyncPlan with changes, dict of
+                  fullyQualifiedDomainName => error message)
+        """
+        record_types = set(record_type.upper() for record_type in record_types)
+        hosts = ([('Virtual_Guest', host) for host in guests] +
+                 [('Hardware_Server', host) for host in hardware])
+        errors = {}
+        wanted = []
+        for service, host in hosts:
+            addresses, missing = _host_addresses(host, record_types)
+            wanted.extend((service, host, record_type, address)
+                          for record_type, address in addresses)
+            for message in missing:
+                _add_error(errors, host['fullyQualifiedDomainName'], message)
+
+        # One call resolves every forward zone
+        domains = sorted(set(host['domain'] for _, host, record_type, _
+                             in wanted if record_type != 'PTR'))
+        zone_ids = self._get_zone_ids_from_names(domains) if domains else {}
+        reverse_zones = self._resolve_reverse_zones(
+            [(service, host, address)
+             for service, host, record_type, address in wanted
+             if record_type == 'PTR'], errors, workers)
+
+        tasks = [('a', ids[0], domain)
+                 for domain, ids in sorted(zone_ids.items()) if len(ids) == 1]
+        tasks.extend(sorted(set(('ptr', zone['id'], zone['name'])
+                                for zone in reverse_zones.values())))
+
+        def fetch(task):
+            """Fetches the records of a forward or reverse zone."""
+            record_filter = (utils.query_filter_in(['a', 'aaaa'])
+                             if task[0] == 'a' else utils.query_filter('ptr'))
+            return self.service.getResourceRecords(
+                id=task[1], mask=SYNC_RECORD_MASK,
+                filter={'resourceRecords': {'type': record_filter}})
+
+        zones = {}
+        failed = {}
+        for task, result, error in bulk.iter_concurrent(fetch, tasks,
+                                                        workers=workers):
+            if error is None:
+                zones[task[1]] = _HostZone(task[1], task[2], result)
+            else:
+                failed[task[1]] = "Can't fetch zone %s: %s" % (task[2], error)
+
+        for _, host, record_type, address in wanted:
+            fqdn = host['fullyQualifiedDomainName']
+            if record_type == 'PTR':
+                if address not in reverse_zones:
+                    continue
+                zone_id = reverse_zones[address]['id']
+                record_host = _strip_zone(_reverse_name(address),
+                                          reverse_zones[address]['name'])
+                data = fqdn
+            else:
+                ids = zone_ids.get(host['domain'])
+                if len(ids) != 1:
+                    _add_error(errors, fqdn, "Found %d zones named %s" % (
+                        len(ids), host['domain']))
+                    continue
+                zone_id = ids[0]
+                record_host, data = host['hostname'], address
+
+            if zone_id in failed:
+                _add_error(errors, fqdn, failed[zone_id])
+                continue
+            error = zones[zone_id].plan(record_host, record_type, data, ttl)
+            if error:
+                _add_error(errors, fqdn, error)
+
+        plans = [zones[zone_id].sync_plan for zone_id in sorted(zones)
+                 if len(zones[zone_id].sync_plan)]
+        return plans, errors
+
+    def _resolve_reverse_zones(self, ptr_hosts, errors, workers):
+        """Finds the reverse zone of the address of each host.
+
+        The zone of one host per /24 is looked up first. A zone can be
+        larger than a /24, so hosts are matched to the zones found by name
+        and only the hosts no zone covers are looked up one by one.
+
+        :param list ptr_hosts: (service, host, address) tuples
+        :param dict errors: fullyQualifiedDomainName => error message, which
+                            hosts without a reverse zone are added to
+        :param int workers: maximum number of concurrent API calls
+        :returns: dict of address => {'id': zone id, 'name': zone name}
+        """
+        def resolve(task):
+            """Fetches the reverse zones of a server."""
+            service, host_id = task
+            return self.client[service].getReverseDomainRecords(
+                id=host_id, mask=REVERSE_ZONE_MASK)
+
+        # The host each /24 is looked up by
+        networks = {}
+        for service, host, address in ptr_hosts:
+            networks.setdefault(address.rsplit('.', 1)[0], (service, host['id']))
+
+        zones = {}
+        failed = {}
+        asked = set()
+        tasks = sorted(set(networks.values()))
+        while tasks:
+            for task, result, error in bulk.iter_concurrent(resolve, tasks,
+                                                            workers=workers):
+                asked.add(task)
+                if error is None:
+                    zones.update((zone['id'], zone) for zone in result or [])
+                else:
+                    failed[task] = error
+            tasks = sorted(set(
+                (service, host['id']) for service, host, address in ptr_hosts
+                if (service, host['id']) not in asked
+                and networks[address.rsplit('.', 1)[0]] not in failed
+                and _covering_zone(_reverse_name(address), zones.values()) is None))
+
+        resolved = {}
+        for service, host, address in ptr_hosts:
+            zone = _covering_zone(_reverse_name(address), zones.values())
+            # A host whose /24 lookup failed isn't looked up on its own
+            error = failed.get((service, host['id'])) or failed.get(
+                networks[address.rsplit('.', 1)[0]])
+            if zone is not None:
+                resolved[address] = zone
+            elif error is not None:
+                _add_error(errors, host['fullyQualifiedDomainName'],
+                           "Can't find the reverse zone of %s: %s"
+                           % (address, error))
+            else:
+                _add_error(errors, host['fullyQualifiedDomainName'],
+                           "No reverse zone for %s" % address)
+        return resolved
+
     def delete_record(self, record_id):
         """Delete a resource record by its ID.
 
@@ -171,3 +588,104 @@ class DNSManager(utils.IdentifierMixin, object):
 
         """
         return self.service.getZoneFileContents(id=zone_id)
+
+
+def _ttl_changed(record, desired):
+    """True when a desired record asks for another TTL than the current."""
+    ttl = desired.get('ttl')
+    return ttl is not None and int(ttl) != int(record.get('ttl') or 0)
+
+
+class _HostZone(object):
+    """The records of one zone, indexed by host and type for host syncs."""
+
+    def __init__(self, zone_id, name, records):
+        self.name = name
+        self.sync_plan = ZoneSyncPlan(zone_id, name)
+        self.records = {}
+        self.claimed = set()
+        for record in records:
+            key = (record['host'].lower(), record['type'].upper())
+            self.records.setdefault(key, []).append(record)
+
+    def plan(self, host, record_type, data, ttl):
+        """Adds the change making host's record hold data to the plan.
+
+        :returns: an error message, or None
+        """
+        key = (host.lower(), record_type)
+        if key in self.claimed:
+            return "Another server also wants the %s record of %s" % (
+                record_type, host)
+        self.claimed.add(key)
+
+        records = self.records.get(key, [])
+        if len(records) > 1:
+            return "Found %d %s records for %s" % (len(records), record_type,
+                                                   host)
+        if not records:
+            self.sync_plan.create.append({'record': host, 'type': record_type,
+                                          'data': data, 'ttl': ttl})
+            return None
+
+        record = records[0]
+        if (_record_data(record_type, record['data']) !=
+                _record_data(record_type, data) or
+                int(record.get('ttl') or 0) != int(ttl)):
+            self.sync_plan.update.append({'id': record['id'],
+                                          'host': record['host'],
+                                          'type': record['type'],
+                                          'data': data, 'ttl': ttl})
+        return None
+
+
+def _host_addresses(host, record_types):
+    """Returns the addresses a server should have records for.
+
+    :returns: tuple of (list of (record type, address) pairs, list of error
+              messages for the record types the server has no address for)
+    """
+    addresses = []
+    missing = []
+    for record_type in ('A', 'AAAA', 'PTR'):
+        if record_type not in record_types:
+            continue
+        if record_type == 'AAAA':
+            address = utils.lookup(host, 'primaryNetworkComponent',
+                                   'primaryVersion6IpAddressRecord',
+                                   'ipAddress')
+            message = "No ipv6 address"
+        else:
+            address = host.get('primaryIpAddress')
+            message = "No primary IP address"
+        if address:
+            addresses.append((record_type, address))
+        elif message not in missing:
+            missing.append(message)
+    return addresses, missing
+
+
+def _add_error(errors, fqdn, message):
+    """Adds an error message of a host to the ones it already has."""
+    if fqdn in errors:
+        message = '%s; %s' % (errors[fqdn], message)
+    errors[fqdn] = message
+
+
+def _reverse_name(address):
+    """Returns the in-addr.arpa name of an IPv4 address."""
+    return '.'.join(reversed(address.split('.'))) + '.in-addr.arpa'
+
+
+def _covering_zone(name, zones):
+    """Returns the most specific zone name is in, or None."""
+    covering = [zone for zone in zones
+                if name == zone['name'] or name.endswith('.' + zone['name'])]
+    return max(covering, key=lambda zone: len(zone['name'])) if covering else None
+
+
+def _strip_zone(name, zone):
+    """Returns a domain name relative to a zone."""
+    if zone and name.endswith('.' + zone):
+        return name[:-len(zone) - 1]
+    return name
@@ -5,6 +5,9 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import binascii
+import socket
+
 from SoftLayer import exceptions
 from SoftLayer import utils
 
@@ -12,6 +15,14 @@ RULE_MASK = ('mask[orderValue,action,destinationIpAddress,'
              'destinationIpSubnetMask,protocol,destinationPortRangeStart,'
              'destinationPortRangeEnd,sourceIpAddress,sourceIpSubnetMask,'
              'version,notes]')
+RULE_FIELDS = ['action', 'protocol', 'sourceIpAddress', 'sourceIpSubnetMask',
+               'destinationIpAddress', 'destinationIpSubnetMask',
+               'destinationPortRangeStart', 'destinationPortRangeEnd',
+               'version']
+ACTIONS = ('permit', 'deny')
+PORT_PROTOCOLS = ('tcp', 'udp')
+ANY_ON_SERVER = 'any on server'
+_FAMILIES = {4: (socket.AF_INET, 32), 6: (socket.AF_INET6, 128)}
 
 
 def has_firewall(vlan):
@@ -29,6 +40,347 @@ def has_firewall(vlan):
     )
 
 
+class _Network(object):
+    """The source or destination of a rule, as an integer and prefix length.
+
+    'any on server' is kept apart, since it can only be compared with
+    itself and with 'any'.
+    """
+
+    __slots__ = ('version', 'network', 'prefix', 'on_server')
+
+    def __init__(self, version, network=0, prefix=0, on_server=False):
+        self.version = version
+        self.network = network
+        self.prefix = prefix
+        self.on_server = on_server
+
+    @classmethod
+    def parse(cls, address, mask, version):
+        """Parses an address with a subnet mask, prefix length or CIDR suffix.
+
+        Host bits are cleared, so 10.0.0.7/24 becomes 10.0.0.0/24.
+        """
+        address = str(address or 'any').strip().lower()
+        if address == ANY_ON_SERVER:
+            return cls(version, on_server=True)
+        if address == 'any':
+            return cls(version)
+
+        if '/' in address:
+            address, mask = address.split('/', 1)
+        family_version = 6 if ':' in address else 4
+        if version is not None and version != family_version:
+            raise ValueError("%s is not an IPv%d address" % (address, version))
+        family, bits = _FAMILIES[family_version]
+        try:
+            network = _address_to_int(family, address)
+        except (socket.error, ValueError):
+            raise ValueError("Invalid IP address: %s" % address)
+
+        prefix = _mask_to_prefix(family, bits, mask)
+        network &= ((1 << bits) - 1) ^ ((1 << (bits - prefix)) - 1)
+        return cls(family_version, network, prefix)
+
+    @property
+    def level(self):
+        """The prefix length, or 'server' for 'any on server'."""
+        return 'server' if self.on_server else self.prefix
+
+    def truncate(self, level):
+        """The network bits above a level, for indexing covering rules."""
+        if level == 'server':
+            return 'server'
+        return self.network >> (_FAMILIES[self.version][1] - level)
+
+    def covers(self, other):
+        """Returns True if every address of other is in this network."""
+        if not self.on_server and not self.prefix:
+            return True
+        if self.on_server or other.on_server:
+            return self.on_server and other.on_server
+        return (other.prefix >= self.prefix and
+                other.truncate(self.prefix) == self.truncate(self.prefix))
+
+    def key(self):
+        """A tuple which is equal for equal networks."""
+        return (self.on_server, self.network, self.prefix)
+
+    def fields(self):
+        """Returns the (address, subnet mask) the API uses."""
+        family, bits = _FAMILIES[self.version]
+        host_mask = '255.255.255.255' if self.version == 4 else str(bits)
+        if self.on_server:
+            return ANY_ON_SERVER, host_mask
+        if not self.prefix:
+            return 'any', host_mask
+        address = _int_to_address(family, bits, self.network)
+        if self.version == 4:
+            mask = ((1 << bits) - 1) ^ ((1 << (bits - self.prefix)) - 1)
+            return address, _int_to_address(family, bits, mask)
+        return address, str(self.prefix)
+
+
+def _address_to_int(family, address):
+    return int(binascii.hexlify(socket.inet_pton(family, address)), 16)
+
+
+def _int_to_address(family, bits, value):
+    return socket.inet_ntop(family,
+                            binascii.unhexlify('%0*x' % (bits // 4, value)))
+
+
+def _mask_to_prefix(family, bits, mask):
+    """Turns a dotted subnet mask or a prefix length into a prefix length."""
+    if mask is None or str(mask).strip() == '':
+        return bits
+    mask = str(mask).strip()
+    if mask.isdigit():
+        prefix = int(mask)
+    else:
+        try:
+            value = _address_to_int(family, mask)
+        except (socket.error, ValueError):
+            raise ValueError("Invalid subnet mask: %s" % mask)
+        prefix = bin(value).count('1')
+        if value != ((1 << bits) - 1) ^ ((1 << (bits - prefix)) - 1):
+            raise ValueError("Subnet mask %s is not contiguous" % mask)
+    if not 0 <= prefix <= bits:
+        raise ValueError("Invalid prefix length: %s" % mask)
+    return prefix
+
+
+class FirewallRule(object):
+    """A firewall rule, normalised so that rules matching the same traffic
+    compare equal.
+
+    Addresses can be given with a subnet mask, a prefix length or in CIDR
+    notation. Port ranges only count for TCP and UDP rules.
+
+    :param dict rule: a SoftLayer_Network_Firewall_Update_Request_Rule, as
+                      returned by getRules or edit's parse_rules()
+    """
+
+    __slots__ = ('action', 'protocol', 'version', 'source', 'destination',
+                 'ports', 'notes')
+
+    def __init__(self, rule):
+        self.action = str(rule.get('action', 'permit')).strip().lower()
+        if self.action not in ACTIONS:
+            raise ValueError("Invalid action: %s" % rule.get('action'))
+        self.protocol = str(rule.get('protocol', 'tcp')).strip().lower()
+        if not self.protocol:
+            raise ValueError("A protocol is required")
+
+        version = rule.get('version')
+        version = int(version) if version not in (None, '') else None
+        if version not in (None, 4, 6):
+            raise ValueError("Invalid IP version: %s" % version)
+        # Without a version, the first address tells, and 'any' is IPv4
+        self.source = _Network.parse(rule.get('sourceIpAddress'),
+                                     rule.get('sourceIpSubnetMask'), version)
+        self.destination = _Network.parse(rule.get('destinationIpAddress'),
+                                          rule.get('destinationIpSubnetMask'),
+                                          version or self.source.version)
+        self.version = (version or self.source.version or
+                        self.destination.version or 4)
+        self.source.version = self.destination.version = self.version
+
+        self.ports = None
+        if self.protocol in PORT_PROTOCOLS:
+            start = rule.get('destinationPortRangeStart')
+            end = rule.get('destinationPortRangeEnd')
+            if start in (None, '') and end in (None, ''):
+                start, end = 1, 65535
+            start = 1 if start in (None, '') else int(start)
+            end = start if end in (None, '') else int(end)
+            if not 1 <= start <= end <= 65535:
+                raise ValueError("Invalid port range: %s-%s" % (start, end))
+            self.ports = (start, end)
+        self.notes = rule.get('notes')
+
+    def key(self):
+        """A tuple which is equal for equal rules. Notes are left out."""
+        return (self.action, self.protocol, self.version, self.source.key(),
+                self.destination.key(), self.ports)
+
+    def covers(self, other):
+        """Returns True if this rule matches all the traffic other matches.
+
+        A rule covered by an earlier one can never match, whatever its
+        action.
+        """
+        return (self.protocol == other.protocol and
+                self.version == other.version and
+                self.source.covers(other.source) and
+                self.destination.covers(other.destination) and
+                (self.ports is None or
+                 (other.ports is not None and
+                  self.ports[0] <= other.ports[0] and
+                  other.ports[1] <= self.ports[1])))
+
+    def to_dict(self):
+        """Returns the rule in the form the API takes."""
+        rule = {'action': self.action, 'protocol': self.protocol,
+                'version': self.version}
+        (rule['sourceIpAddress'],
+         rule['sourceIpSubnetMask']) = self.source.fields()
+        (rule['destinationIpAddress'],
+         rule['destinationIpSubnetMask']) = self.destination.fields()
+        if self.ports is not None:
+            (rule['destinationPortRangeStart'],
+             rule['destinationPortRangeEnd']) = self.ports
+        if self.notes:
+            rule['notes'] = self.notes
+        return rule
+
+
+class FirewallRulePlan(object):
+    """The rules to send in a firewall update request, and what was left out.
+
+    Update requests replace every rule of a firewall, so rules holds the
+    whole rule set. Rules which are already on the firewall are sent back
+    as getRules returned them.
+
+    :ivar list rules: the rule dicts to send, numbered by orderValue
+    :ivar list duplicates: (index, index of the first copy) of the given
+                           rules which were left out as repeats
+    :ivar list shadowed: (index, index of the covering rule) of the given
+                         rules which were left out since they can't match
+    :ivar list added: the rules which are not on the firewall yet
+    :ivar list removed: the current rules which are not in rules
+    :ivar bool changed: False if sending rules would change nothing
+    """
+
+    def __init__(self):
+        self.rules = []
+        self.duplicates = []
+        self.shadowed = []
+        self.added = []
+        self.removed = []
+        self.changed = False
+
+    def __repr__(self):
+        return ("<FirewallRulePlan: %d rules, %d duplicate, %d shadowed, "
+                "%d added, %d removed>"
+                % (len(self.rules), len(self.duplicates), len(self.shadowed),
+                   len(self.added), len(self.removed)))
+
+
+def _parse_rules(rules):
+    parsed = []
+    for index, rule in enumerate(rules):
+        try:
+            parsed.append(FirewallRule(rule))
+        except (TypeError, ValueError) as ex:
+            raise ValueError("Rule %d: %s" % (index + 1, ex))
+    return parsed
+
+
+def compile_rules(rules, current=()):
+    """Compiles a rule set into the smallest update request.
+
+    Repeated rules and rules which an earlier rule fully covers are left
+    out, and the result is compared with the current rules of the firewall.
+    Covering rules are found through an index of the kept rules by source
+    and destination network, so thousands of rules compile in about linear
+    time.
+
+    :param list rules: the rules wanted, in order
+    :param list current: the rules on the firewall, as returned by getRules
+    :returns: a FirewallRulePlan
+    """
+    plan = FirewallRulePlan()
+    current = sorted(current, key=lambda rule: rule.get('orderValue') or 0)
+    wanted = _parse_rules(rules)
+
+    seen = {}
+    # (protocol, version) => set of (source level, destination level), and
+    # (protocol, version, levels, truncated networks) => kept (index, rule)
+    levels = {}
+    index = {}
+    kept = []
+    for position, rule in enumerate(wanted):
+        key = rule.key()
+        if key in seen:
+            plan.duplicates.append((position, seen[key]))
+            continue
+        covering = _find_covering(rule, levels, index)
+        if covering is not None:
+            plan.shadowed.append((position, covering))
+            continue
+
+        seen[key] = position
+        kept.append(rule)
+        group = (rule.protocol, rule.version)
+        level = (rule.source.level, rule.destination.level)
+        levels.setdefault(group, set()).add(level)
+        index.setdefault(group + level + (
+            rule.source.truncate(level[0]),
+            rule.destination.truncate(level[1])), []).append((position, rule))
+
+    on_firewall = {}
+    current_rules = _parse_rules(current)
+    for rule, original in zip(current_rules, current):
+        on_firewall.setdefault(rule.key(), []).append(original)
+
+    for rule in kept:
+        originals = on_firewall.get(rule.key())
+        if originals:
+            original = originals.pop(0)
+            compiled = dict((field, original[field])
+                            for field in RULE_FIELDS if field in original)
+            notes = original.get('notes')
+            if rule.notes is not None and rule.notes != notes:
+                notes = rule.notes
+                plan.changed = True
+            if notes:
+                compiled['notes'] = notes
+        else:
+            compiled = rule.to_dict()
+            plan.added.append(compiled)
+        compiled['orderValue'] = len(plan.rules) + 1
+        plan.rules.append(compiled)
+
+    leftovers = set(id(original) for originals in on_firewall.values()
+                    for original in originals)
+    plan.removed = [original for original in current
+                    if id(original) in leftovers]
+    plan.changed = plan.changed or (
+        [rule.key() for rule in kept] !=
+        [rule.key() for rule in current_rules])
+    return plan
+
+
+def _find_covering(rule, levels, index):
+    """Returns the position of the first kept rule covering rule, or None."""
+    group = (rule.protocol, rule.version)
+    found = None
+    for source_level, destination_level in levels.get(group, ()):
+        if not (_level_covers(source_level, rule.source) and
+                _level_covers(destination_level, rule.destination)):
+            continue
+        key = group + (source_level, destination_level,
+                       rule.source.truncate(source_level),
+                       rule.destination.truncate(destination_level))
+        for position, candidate in index.get(key, ()):
+            if found is not None and position > found:
+                break
+            if candidate.covers(rule):
+                found = position
+                break
+    return found
+
+
+def _level_covers(level, network):
+    """Whether rules indexed at level can cover network at all."""
+    if level == 0:
+        return True
+    if level == 'server' or network.on_server:
+        return level == 'server' and network.on_server
+    return level <= network.prefix
+
+
 class FirewallManager(utils.IdentifierMixin, object):
     """Manages SoftLayer firewalls
 
@@ -289,3 +641,49 @@ class FirewallManager(utils.IdentifierMixin, object):
         template = {'networkComponentFirewallId': firewall_id, 'rules': rules}
 
         return rule_svc.createObject(template)
+
+    def edit_fwl_rules(self, firewall_id, rules, dedicated=False):
+        """Edit the rules for a dedicated or standard firewall.
+
+        :param integer firewall_id: the instance ID of the firewall
+        :param list rules: the rules to be pushed on the firewall
+        :param bool dedicated: whether the firewall is dedicated or standard
+        """
+
+        if dedicated:
+            return self.edit_dedicated_fwl_rules(firewall_id, rules)
+        return self.edit_standard_fwl_rules(firewall_id, rules)
+
+    def plan_fwl_rules(self, firewall_id, rules, dedicated=False):
+        """Compiles rules against the current rules of a firewall.
+
+        :param integer firewall_id: the instance ID of the firewall
+        :param list rules: the rules wanted, in order
+        :param bool dedicated: whether the firewall is dedicated or standard
+        :returns: a FirewallRulePlan
+        """
+
+        if dedicated:
+            current = self.get_dedicated_fwl_rules(firewall_id)
+        else:
+            current = self.get_standard_fwl_rules(firewall_id)
+        return compile_rules(rules, current or [])
+
+    def update_fwl_rules(self, firewall_id, rules, dedicated=False):
+        """Replaces the rules of a firewall, unless nothing would change.
+
+        Duplicate and shadowed rules are left out of the update request.
+
+        :param integer firewall_id: the instance ID of the firewall
+        :param list rules: the rules wanted, in order
+        :param bool dedicated: whether the firewall is dedicated or standard
+        :returns: (FirewallRulePlan, the update request). The update request
+                  is None when the firewall already has the rules, in which
+                  case no request is made.
+        """
+
+        plan = self.plan_fwl_rules(firewall_id, rules, dedicated=dedicated)
+        if not plan.changed:
+            return plan, None
+        return plan, self.edit_fwl_rules(firewall_id, plan.rules,
+                                         dedicated=dedicated)
@@ -8,21 +8,57 @@
 import logging
 import socket
 import time
+import weakref
 
 import SoftLayer
+from SoftLayer import bulk
 from SoftLayer.decoration import retry
+from SoftLayer.managers import datacenters
 from SoftLayer.managers import ordering
 from SoftLayer import utils
 
 LOGGER = logging.getLogger(__name__)
 
 # Invalid names are ignored due to long method names and short argument names
-# pylint: disable=invalid-name, no-self-use
+# pylint: disable=invalid-name, no-self-use, too-many-lines
 
 EXTRA_CATEGORIES = ['pri_ipv6_addresses',
                     'static_ipv6_addresses',
                     'sec_ip_addresses']
 
+PACKAGE_KEYNAME = 'BARE_METAL_SERVER'
+
+#: Seconds the sections of the package are reused for
+PACKAGE_TTL = 300
+
+PACKAGE_ITEM_MASK = '''
+    keyName,
+    capacity,
+    description,
+    attributes[id,attributeTypeKeyName],
+    itemCategory[id,categoryCode],
+    softwareDescription[id,referenceCode,longDescription],
+    prices
+    '''
+
+PACKAGE_SECTION_MASKS = {
+    'items': 'items[%s]' % PACKAGE_ITEM_MASK,
+    'activePresets': 'activePresets',
+    'regions': 'regions[location[location[priceGroups]]]',
+}
+
+#: Option => (package section, item categories) get_create_options() needs
+CREATE_OPTION_SECTIONS = {
+    'locations': ('regions', None),
+    'sizes': ('activePresets', None),
+    'operating_systems': ('items', ('os',)),
+    'port_speeds': ('items', ('port_speed',)),
+    'extras': ('items', tuple(EXTRA_CATEGORIES)),
+}
+
+# client => {(section, item categories) => (expiry time, package section)}
+_PACKAGE_CACHE = weakref.WeakKeyDictionary()
+
 
 class HardwareManager(utils.IdentifierMixin, object):
     """Manage SoftLayer hardware servers.
@@ -51,6 +87,8 @@ class HardwareManager(utils.IdentifierMixin, object):
         self.hardware = self.client['Hardware_Server']
         self.account = self.client['Account']
         self.resolvers = [self._get_ids_from_ip, self._get_ids_from_hostname]
+        self.batch_resolvers = [self._get_ids_from_ips,
+                                self._get_ids_from_hostnames]
         if ordering_manager is None:
             self.ordering_manager = ordering.OrderingManager(client)
         else:
@@ -254,6 +292,118 @@ class HardwareManager(utils.IdentifierMixin, object):
         return self.hardware.reloadOperatingSystem('FORCE', config,
                                                    id=hardware_id)
 
+    def cancel_servers(self, hardware_ids, reason='unneeded', comment='',
+                       immediate=False, **kwargs):
+        """Cancels many dedicated servers.
+
+        See :func:`cancel_hardware` for the cancellation options.
+
+        Example::
+
+            report = mgr.cancel_servers([1234, 1235], immediate=True)
+            for hardware_id, error in report.failed.items():
+                print(hardware_id, error)
+
+        :param list hardware_ids: The IDs of the hardware to be cancelled.
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        def cancel_one(hardware_id):
+            """Cancels a single server."""
+            return self.cancel_hardware(hardware_id, reason=reason,
+                                        comment=comment, immediate=immediate)
+
+        return bulk.run_bulk(cancel_one, hardware_ids, **kwargs)
+
+    def reload_servers(self, hardware_ids, post_uri=None, ssh_keys=None,
+                       **kwargs):
+        """Perform an OS reload of many servers.
+
+        See :func:`reload` for the reload options.
+
+        :param list hardware_ids: the server IDs to reload
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        def reload_one(hardware_id):
+            """Reloads a single server."""
+            return self.reload(hardware_id, post_uri=post_uri,
+                               ssh_keys=ssh_keys)
+
+        return bulk.run_bulk(reload_one, hardware_ids, **kwargs)
+
+    def edit_servers(self, hardware_ids, userdata=None, domain=None,
+                     notes=None, tags=None, **kwargs):
+        """Edit domain name, notes, tags and/or the user data of many servers.
+
+        See :func:`edit` for the options. Hostnames are unique to each server
+        so they can't be edited in bulk.
+
+        :param list hardware_ids: the server IDs to edit
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        def edit_one(hardware_id):
+            """Edits a single server."""
+            return self.edit(hardware_id, userdata=userdata, domain=domain,
+                             notes=notes, tags=tags)
+
+        return bulk.run_bulk(edit_one, hardware_ids, **kwargs)
+
+    def reboot_servers(self, hardware_ids, hard=None, **kwargs):
+        """Reboot many servers.
+
+        :param list hardware_ids: the server IDs to reboot
+        :param bool hard: True for a hard reboot, False for a soft reboot and
+                          None to let the API decide.
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        method = {True: 'rebootHard', False: 'rebootSoft'}.get(hard, 'rebootDefault')
+        return self._bulk_call(method, hardware_ids, **kwargs)
+
+    def power_cycle_servers(self, hardware_ids, **kwargs):
+        """Power cycle many servers.
+
+        :param list hardware_ids: the server IDs to power cycle
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        return self._bulk_call('powerCycle', hardware_ids, **kwargs)
+
+    def power_off_servers(self, hardware_ids, **kwargs):
+        """Power off many servers.
+
+        :param list hardware_ids: the server IDs to power off
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        return self._bulk_call('powerOff', hardware_ids, **kwargs)
+
+    def power_on_servers(self, hardware_ids, **kwargs):
+        """Power on many servers.
+
+        :param list hardware_ids: the server IDs to power on
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        return self._bulk_call('powerOn', hardware_ids, **kwargs)
+
+    def _bulk_call(self, method, hardware_ids, **kwargs):
+        """Calls a Hardware_Server method for many servers."""
+        def call(hardware_id):
+            """Calls the method for a single server."""
+            return self.client.call('Hardware_Server', method, id=hardware_id)
+
+        return bulk.run_bulk(call, hardware_ids, **kwargs)
+
     def rescue(self, hardware_id):
         """Reboot a server into the a recsue kernel.
 
@@ -344,87 +494,126 @@ class HardwareManager(utils.IdentifierMixin, object):
         }
 
     @retry(logger=LOGGER)
-    def get_create_options(self):
-        """Returns valid options for ordering hardware."""
+    def get_create_options(self, options=None):
+        """Returns valid options for ordering hardware.
 
-        package = self._get_package()
+        Only the package sections the requested options are built from are
+        fetched, with one concurrent call per section.
+
+        :param list options: the options to return, any of locations, sizes,
+                             operating_systems, port_speeds and extras.
+                             Defaults to all of them.
+        """
+        options = options or sorted(CREATE_OPTION_SECTIONS)
+        requests = []
+        for option in options:
+            if CREATE_OPTION_SECTIONS[option] not in requests:
+                requests.append(CREATE_OPTION_SECTIONS[option])
+        sections = dict(zip(requests, bulk.map_concurrent(
+            lambda request: self._get_package_section(*request), requests)))
+
+        def _items(option):
+            return sections[CREATE_OPTION_SECTIONS[option]]
+
+        result = {}
 
         # Locations
-        locations = []
-        for region in package['regions']:
-            locations.append({
-                'name': region['location']['location']['longName'],
-                'key': region['location']['location']['name'],
-            })
+        if 'locations' in options:
+            result['locations'] = []
+            for region in _items('locations'):
+                result['locations'].append({
+                    'name': region['location']['location']['longName'],
+                    'key': region['location']['location']['name'],
+                })
 
         # Sizes
-        sizes = []
-        for preset in package['activePresets']:
-            sizes.append({
-                'name': preset['description'],
-                'key': preset['keyName']
-            })
+        if 'sizes' in options:
+            result['sizes'] = []
+            for preset in _items('sizes'):
+                result['sizes'].append({
+                    'name': preset['description'],
+                    'key': preset['keyName']
+                })
 
         # Operating systems
-        operating_systems = []
-        for item in package['items']:
-            if item['itemCategory']['categoryCode'] == 'os':
-                operating_systems.append({
+        if 'operating_systems' in options:
+            result['operating_systems'] = []
+            for item in _items('operating_systems'):
+                result['operating_systems'].append({
                     'name': item['softwareDescription']['longDescription'],
                     'key': item['softwareDescription']['referenceCode'],
                 })
 
         # Port speeds
-        port_speeds = []
-        for item in package['items']:
-            if all([item['itemCategory']['categoryCode'] == 'port_speed',
-                    # Hide private options
-                    not _is_private_port_speed_item(item),
-                    # Hide unbonded options
-                    _is_bonded(item)]):
-                port_speeds.append({
-                    'name': item['description'],
-                    'key': item['capacity'],
-                })
+        if 'port_speeds' in options:
+            result['port_speeds'] = []
+            for item in _items('port_speeds'):
+                # Hide private and unbonded options
+                if not _is_private_port_speed_item(item) and _is_bonded(item):
+                    result['port_speeds'].append({
+                        'name': item['description'],
+                        'key': item['capacity'],
+                    })
 
         # Extras
-        extras = []
-        for item in package['items']:
-            if item['itemCategory']['categoryCode'] in EXTRA_CATEGORIES:
-                extras.append({
+        if 'extras' in options:
+            result['extras'] = []
+            for item in _items('extras'):
+                result['extras'].append({
                     'name': item['description'],
                     'key': item['keyName']
                 })
 
-        return {
-            'locations': locations,
-            'sizes': sizes,
-            'operating_systems': operating_systems,
-            'port_speeds': port_speeds,
-            'extras': extras,
-        }
+        return result
 
     @retry(logger=LOGGER)
     def _get_package(self):
-        """Get the package related to simple hardware ordering."""
-        mask = '''
-            items[
-                keyName,
-                capacity,
-                description,
-                attributes[id,attributeTypeKeyName],
-                itemCategory[id,categoryCode],
-                softwareDescription[id,referenceCode,longDescription],
-                prices
-            ],
-            activePresets,
-            regions[location[location[priceGroups]]]
-            '''
-
-        package_keyname = 'BARE_METAL_SERVER'
-        package = self.ordering_manager.get_package_by_key(package_keyname, mask=mask)
+        """Get the package related to simple hardware ordering.
+
+        The items, presets and regions are fetched with concurrent calls,
+        and every section is reused by this client for PACKAGE_TTL seconds.
+        """
+        sections = ['items', 'activePresets', 'regions']
+        package = dict(zip(sections, bulk.map_concurrent(
+            self._get_package_section, sections)))
+        package['id'] = self._get_package_section('id')
         return package
 
+    def _get_package_section(self, section, categories=None):
+        """Get one section of the package, from the cache when possible.
+
+        :param string section: 'id', 'items', 'activePresets' or 'regions'
+        :param tuple categories: only get the items of these category codes
+        """
+        cache = _PACKAGE_CACHE.setdefault(self.client, {})
+        now = time.time()
+        for key in [(section, categories), (section, None)]:
+            cached = cache.get(key)
+            if cached and cached[0] > now:
+                return _in_categories(cached[1], categories)
+
+        _filter = {'keyName': {'operation': PACKAGE_KEYNAME}}
+        mask = 'id'
+        if section != 'id':
+            mask = 'id,' + PACKAGE_SECTION_MASKS[section]
+        if categories:
+            _filter['items'] = {'itemCategory': {
+                'categoryCode': utils.query_filter_in(categories)}}
+
+        packages = self.client.call('Product_Package', 'getAllObjects',
+                                    mask=mask, filter=_filter)
+        if not packages:
+            raise SoftLayer.SoftLayerError(
+                "Package %s does not exist" % PACKAGE_KEYNAME)
+
+        cache[('id', None)] = (now + PACKAGE_TTL, packages[0]['id'])
+        if section == 'id':
+            return packages[0]['id']
+
+        value = _in_categories(packages[0][section], categories)
+        cache[(section, categories)] = (now + PACKAGE_TTL, value)
+        return value
+
     def _generate_create_dict(self,
                               size=None,
                               hostname=None,
@@ -513,6 +702,32 @@ class HardwareManager(utils.IdentifierMixin, object):
         if results:
             return [result['id'] for result in results]
 
+    def _get_ids_from_hostnames(self, hostnames):
+        """Maps each hostname to the matching hardware ids with one API call."""
+        _filter = {'hardware': {'hostname': utils.query_filter_in(hostnames)}}
+        results = self.list_hardware(mask="id,hostname", filter=_filter)
+        return utils.group_ids_by(results, 'hostname', hostnames,
+                                  normalize=lambda name: name.lower())
+
+    def _get_ids_from_ips(self, ips):
+        """Maps each ip address to the matching hardware ids.
+
+        Public addresses are looked up first, then whatever did not match is
+        looked up as a private address.
+        """
+        found = {}
+        pending = [ip for ip in ips if utils.is_ip_address(ip)]
+        for prop in ['primaryIpAddress', 'primaryBackendIpAddress']:
+            if not pending:
+                break
+            _filter = {'hardware': {prop: utils.query_filter_in(pending)}}
+            results = self.list_hardware(mask="id,%s" % prop, filter=_filter)
+            for ip, ids in utils.group_ids_by(results, prop, pending).items():
+                if ids:
+                    found[ip] = ids
+            pending = [ip for ip in pending if ip not in found]
+        return found
+
     def edit(self, hardware_id, userdata=None, hostname=None, domain=None,
              notes=None, tags=None):
         """Edit hostname, domain name, notes, user data of the hardware.
@@ -608,6 +823,41 @@ class HardwareManager(utils.IdentifierMixin, object):
         LOGGER.info("Waiting for %d expired.", instance_id)
         return False
 
+    def wait_for_ready_many(self, instance_ids, limit=14400, delay=10,
+                            pending=False, max_delay=None):
+        """Wait for many servers to become ready, polling them all at once.
+
+        Instead of polling each server, every poll fetches all of the
+        servers which are not ready yet with a single call. See
+        :func:`wait_for_ready` for what ready means.
+
+        :param list instance_ids: The instance IDs to wait for
+        :param int limit: The maximum amount of seconds to wait.
+        :param int delay: The number of seconds to sleep before the first
+                          re-poll. The interval grows while nothing becomes
+                          ready, up to max_delay.
+        :param bool pending: Wait for pending transactions too.
+        :param int max_delay: The longest poll interval. Defaults to 6 * delay.
+        :returns: generator of (instance_id, ready) tuples, yielded as soon as
+                  each server is ready. Servers that were not ready
+                  within limit are yielded last with ready set to False.
+
+        Example::
+
+            for instance_id, ready in mgr.wait_for_ready_many([1234, 1235]):
+                print(instance_id, ready)
+        """
+        mask = "mask[id, lastOperatingSystemReload[id], activeTransaction[id], provisionDate]"
+
+        def fetch(ids):
+            """Fetches the readiness data of the given servers."""
+            _filter = {'hardware': {'id': utils.query_filter_in(ids)}}
+            return self.list_hardware(mask=mask, filter=_filter)
+
+        return utils.wait_for_ready_many(fetch, instance_ids, limit,
+                                         delay=delay, pending=pending,
+                                         max_delay=max_delay)
+
 
 def _get_extra_price_id(items, key_name, hourly, location):
     """Returns a price id attached to item with the given key_name."""
@@ -763,11 +1013,19 @@ def _is_bonded(item):
     return True
 
 
+def _in_categories(items, categories):
+    """Return the items of the given categories, or all items."""
+    if not categories:
+        return items
+    return [item for item in items
+            if utils.lookup(item, 'itemCategory', 'categoryCode') in categories]
+
+
 def _get_location(package, location):
     """Get the longer key with a short location name."""
-    for region in package['regions']:
-        if region['location']['location']['name'] == location:
-            return region
+    region = datacenters.find_region(package['regions'], location)
+    if region is not None:
+        return region
 
     raise SoftLayer.SoftLayerError("Could not find valid location for: '%s'" % location)
 
@@ -26,6 +26,8 @@ class ImageManager(utils.IdentifierMixin, object):
         self.vgbdtg = self.client['Virtual_Guest_Block_Device_Template_Group']
         self.resolvers = [self._get_ids_from_name_public,
                           self._get_ids_from_name_private]
+        self.batch_resolvers = [self._get_ids_from_names_public,
+                                self._get_ids_from_names_private]
 
     def get_image(self, image_id, **kwargs):
         """Get details about an image.
@@ -100,6 +102,19 @@ class ImageManager(utils.IdentifierMixin, object):
         results = self.list_private_images(name=name)
         return [result['id'] for result in results]
 
+    def _get_ids_from_names_public(self, names):
+        """Get public images which match any of the given names."""
+        _filter = {'name': utils.query_filter_in(names)}
+        results = self.list_public_images(mask='id,name', filter=_filter)
+        return utils.group_ids_by(results, 'name', names)
+
+    def _get_ids_from_names_private(self, names):
+        """Get private images which match any of the given names."""
+        _filter = {'privateBlockDeviceTemplateGroups': {
+            'name': utils.query_filter_in(names)}}
+        results = self.list_private_images(mask='id,name', filter=_filter)
+        return utils.group_ids_by(results, 'name', names)
+
     def edit(self, image_id, name=None, note=None, tag=None):
         """Edit image related details.
 
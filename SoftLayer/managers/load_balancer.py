@@ -5,6 +5,7 @@
 
     :license: MIT, see LICENSE for more details.
 """
+from SoftLayer.managers import datacenters
 from SoftLayer import utils
 
 
@@ -79,11 +80,10 @@ class LoadBalancerManager(utils.IdentifierMixin, object):
         :returns: the location id of the given datacenter
         """
 
-        datacenters = self.client['Location'].getDataCenters()
-        for datacenter in datacenters:
-            if datacenter['name'] == datacenter_name:
-                return datacenter['id']
-        return 'FIRST_AVAILABLE'
+        location_id = datacenters.get_registry(self.client).get_id(datacenter_name)
+        if location_id is None:
+            return 'FIRST_AVAILABLE'
+        return location_id
 
     def cancel_lb(self, loadbal_id):
         """Cancels the specified load balancer.
@@ -7,6 +7,7 @@
 """
 import json
 
+import requests.adapters
 import requests.auth
 
 from SoftLayer import consts
@@ -21,6 +22,22 @@ ENDPOINTS = {
     }
 }
 
+#: Default number of keep-alive connections each MessagingConnection holds
+POOL_SIZE = 10
+
+
+def _make_session(pool_size=POOL_SIZE):
+    """Returns a requests session which keeps up to pool_size connections.
+
+    :param int pool_size: number of connections to keep alive per host
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                            pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 
 class QueueAuth(requests.auth.AuthBase):
     """SoftLayer Message Queue authentication for requests.
@@ -29,12 +46,15 @@ class QueueAuth(requests.auth.AuthBase):
     :param username: SoftLayer username
     :param api_key: SoftLayer API Key
     :param auth_token: (optional) Starting auth token
+    :param session: (optional) requests session to authenticate with
     """
-    def __init__(self, endpoint, username, api_key, auth_token=None):
+    def __init__(self, endpoint, username, api_key, auth_token=None,
+                 session=None):
         self.endpoint = endpoint
         self.username = username
         self.api_key = api_key
         self.auth_token = auth_token
+        self.session = session or _make_session()
 
     def auth(self):
         """Authenticate."""
@@ -42,22 +62,29 @@ class QueueAuth(requests.auth.AuthBase):
             'X-Auth-User': self.username,
             'X-Auth-Key': self.api_key
         }
-        resp = requests.post(self.endpoint, headers=headers)
+        resp = self.session.post(self.endpoint, headers=headers)
         if resp.ok:
             self.auth_token = resp.headers['X-Auth-Token']
         else:
             raise exceptions.Unauthenticated("Error while authenticating: %s"
                                              % resp.status_code)
 
-    def handle_error(self, resp, **_):
-        """Handle errors."""
+    def handle_error(self, resp, **kwargs):
+        """Handle errors.
+
+        The request is sent once more on a 503 and, after authenticating
+        again, on a 401. The retry goes through the adapter (and so the
+        connection pool) of the original response and replaces it.
+        """
         resp.request.deregister_hook('response', self.handle_error)
-        if resp.status_code == 503:
-            resp.connection.send(resp.request)
-        elif resp.status_code == 401:
+        if resp.status_code not in (401, 503):
+            return None
+        # Read the error body so its connection goes back to the pool
+        resp.content  # pylint: disable=pointless-statement
+        if resp.status_code == 401:
             self.auth()
             resp.request.headers['X-Auth-Token'] = self.auth_token
-            resp.connection.send(resp.request)
+        return resp.connection.send(resp.request, **kwargs)
 
     def __call__(self, resp):
         """Attach auth token to the request.
@@ -119,12 +146,14 @@ class MessagingManager(object):
         """Get all known message queue endpoints."""
         return ENDPOINTS
 
-    def get_connection(self, account_id, datacenter=None, network=None):
+    def get_connection(self, account_id, datacenter=None, network=None,
+                       pool_size=POOL_SIZE):
         """Get connection to Message Queue Service.
 
         :param account_id: Message Queue Account id
         :param datacenter: Datacenter code
         :param network: network ('public' or 'private')
+        :param int pool_size: number of keep-alive connections to the endpoint
         """
         if any([not self.client.auth,
                 not getattr(self.client.auth, 'username', None),
@@ -133,7 +162,8 @@ class MessagingManager(object):
                 'Client instance auth must be BasicAuthentication.')
 
         client = MessagingConnection(
-            account_id, endpoint=self.get_endpoint(datacenter, network))
+            account_id, endpoint=self.get_endpoint(datacenter, network),
+            pool_size=pool_size)
         client.authenticate(self.client.auth.username,
                             self.client.auth.api_key)
         return client
@@ -151,11 +181,17 @@ class MessagingConnection(object):
 
     :param account_id: Message Queue Account id
     :param endpoint: Endpoint URL
+    :param int pool_size: number of keep-alive connections to the endpoint
     """
-    def __init__(self, account_id, endpoint=None):
+    def __init__(self, account_id, endpoint=None, pool_size=POOL_SIZE):
         self.account_id = account_id
         self.endpoint = endpoint
         self.auth = None
+        self.session = _make_session(pool_size)
+
+    def close(self):
+        """Close the connections kept alive by this connection."""
+        self.session.close()
 
     def _make_request(self, method, path, **kwargs):
         """Make request. Generally not called directly.
@@ -173,7 +209,7 @@ class MessagingConnection(object):
         kwargs['auth'] = self.auth
 
         url = '/'.join((self.endpoint, 'v1', self.account_id, path))
-        resp = requests.request(method, url, **kwargs)
+        resp = self.session.request(method, url, **kwargs)
         try:
             resp.raise_for_status()
         except requests.HTTPError as ex:
@@ -192,7 +228,7 @@ class MessagingConnection(object):
         auth_endpoint = '/'.join((self.endpoint, 'v1',
                                   self.account_id, 'auth'))
         auth = QueueAuth(auth_endpoint, username, api_key,
-                         auth_token=auth_token)
+                         auth_token=auth_token, session=self.session)
         auth.auth()
         self.auth = auth
 
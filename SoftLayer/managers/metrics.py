@@ -0,0 +1,298 @@
+"""
+    SoftLayer.metrics
+    ~~~~~~~~~~~~~~~~~
+    Metric Tracking Object Manager/helpers
+
+    Keeps a local copy of metric series so that repeated reports only
+    download the intervals which were not fetched before.
+
+    :license: MIT, see LICENSE for more details.
+"""
+import array
+import bisect
+import json
+import math
+import operator
+import os
+import re
+
+from SoftLayer import utils
+
+
+class TimeSeries(object):
+    """A series of (timestamp, value) points, in timestamp order.
+
+    Timestamps and values are kept in two typed arrays, so range lookups are
+    a binary search and sums run over contiguous memory. Points are mostly
+    appended; older ones can be inserted or replaced with put().
+
+    :param timestamps: initial, ascending UNIX timestamps
+    :param values: initial values, one per timestamp
+    """
+
+    def __init__(self, timestamps=(), values=()):
+        self.timestamps = array.array('d', timestamps)
+        self.values = array.array('d', values)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def last(self):
+        """The newest timestamp in the series, or None when it is empty."""
+        return self.timestamps[-1] if self.timestamps else None
+
+    def append(self, timestamp, value):
+        """Appends a point, unless it isn't newer than the last one.
+
+        :returns: True if the point was appended
+        """
+        if self.timestamps and timestamp <= self.timestamps[-1]:
+            return False
+        self.timestamps.append(timestamp)
+        self.values.append(value)
+        return True
+
+    def put(self, timestamp, value):
+        """Adds a point anywhere in the series, replacing one at timestamp.
+
+        :returns: True if the series changed
+        """
+        if self.append(timestamp, value):
+            return True
+        index = bisect.bisect_left(self.timestamps, timestamp)
+        if self.timestamps[index] == timestamp:
+            if self.values[index] == value:
+                return False
+            self.values[index] = value
+            return True
+        self.timestamps.insert(index, timestamp)
+        self.values.insert(index, value)
+        return True
+
+    @classmethod
+    def from_points(cls, points):
+        """Builds a series from flat [timestamp, value, ...] points.
+
+        Points may be out of order; of points with the same timestamp the
+        later one is kept.
+        """
+        timestamps, values = points[0::2], points[1::2]
+        if all(map(operator.lt, timestamps, timestamps[1:])):
+            return cls(timestamps, values)
+        latest = dict(zip(timestamps, values))
+        ordered = sorted(latest)
+        return cls(ordered, [latest[timestamp] for timestamp in ordered])
+
+    def _bounds(self, start=None, end=None):
+        lower = 0 if start is None else bisect.bisect_left(
+            self.timestamps, utils.to_timestamp(start))
+        upper = len(self) if end is None else bisect.bisect_left(
+            self.timestamps, utils.to_timestamp(end))
+        return lower, upper
+
+    def slice(self, start=None, end=None):
+        """Returns the points within [start, end) as a new TimeSeries."""
+        lower, upper = self._bounds(start, end)
+        return TimeSeries(self.timestamps[lower:upper],
+                          self.values[lower:upper])
+
+    def sum(self, start=None, end=None):
+        """Sums the values of the points within [start, end).
+
+        :param start: datetime, dateTime string or timestamp. None means
+                      from the first point.
+        :param end: datetime, dateTime string or timestamp (exclusive). None
+                    means up to the last point.
+        """
+        lower, upper = self._bounds(start, end)
+        return math.fsum(self.values[lower:upper])
+
+
+class TimeSeriesStore(object):
+    """Stores TimeSeries per tracking object and metric key.
+
+    With a path, every series is persisted to its own append-only file of
+    native-endian (timestamp, value) doubles, where a later point replaces an
+    earlier one with the same timestamp, and the fetched ranges of every
+    query are kept in an index file, so the store can be reopened by a later
+    run. Without a path the store only lives in memory.
+
+    :param string path: directory to keep the series in
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path) if path else None
+        self._series = {}
+        self._fetched = {}
+        if self.path:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            index = os.path.join(self.path, 'index.json')
+            if os.path.exists(index):
+                with open(index) as index_fp:
+                    self._fetched = json.load(index_fp)
+
+    def _filename(self, tracking_id, key):
+        safe_key = re.sub(r'[^A-Za-z0-9_.-]', '_', str(key))
+        return os.path.join(self.path, '%s-%s.ts' % (tracking_id, safe_key))
+
+    def get(self, tracking_id, key):
+        """Returns the series of a metric key, loading it when needed."""
+        series = self._series.get((tracking_id, key))
+        if series is not None:
+            return series
+
+        series = TimeSeries()
+        if self.path and os.path.exists(self._filename(tracking_id, key)):
+            points = array.array('d')
+            filename = self._filename(tracking_id, key)
+            count = os.path.getsize(filename) // points.itemsize
+            with open(filename, 'rb') as series_fp:
+                # A run killed while writing can leave half a point behind
+                points.fromfile(series_fp, count - count % 2)
+            series = TimeSeries.from_points(points)
+        self._series[(tracking_id, key)] = series
+        return series
+
+    def add(self, tracking_id, key, points):
+        """Adds (timestamp, value) points to a series.
+
+        A point replaces the one the series has at the same timestamp, such
+        as an interval which was still filling up when it was last fetched.
+
+        :returns: the number of points added or changed
+        """
+        series = self.get(tracking_id, key)
+        added = array.array('d')
+        for timestamp, value in points:
+            if series.put(timestamp, value):
+                added.extend((timestamp, value))
+
+        if self.path and added:
+            with open(self._filename(tracking_id, key), 'ab') as series_fp:
+                added.tofile(series_fp)
+        return len(added) // 2
+
+    def fetched_ranges(self, tracking_id, query):
+        """Returns the sorted, disjoint [start, end] ranges a query fetched."""
+        return self._fetched.get('%s:%s' % (tracking_id, query), [])
+
+    def mark_fetched(self, tracking_id, query, start, end):
+        """Records that a query fetched everything from start to end."""
+        merged = []
+        for lower, upper in sorted(self.fetched_ranges(tracking_id, query)
+                                   + [[start, end]]):
+            if merged and lower <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], upper)
+            else:
+                merged.append([lower, upper])
+        self._fetched['%s:%s' % (tracking_id, query)] = merged
+        if self.path:
+            index = os.path.join(self.path, 'index.json')
+            with open(index + '.tmp', 'w') as index_fp:
+                json.dump(self._fetched, index_fp)
+            os.rename(index + '.tmp', index)
+
+
+class MetricsManager(object):
+    """Fetches Metric Tracking Object data into a local TimeSeriesStore.
+
+    ::
+
+        mgr = MetricsManager(client, store=TimeSeriesStore('~/.softlayer-metrics'))
+        mgr.sync_summary_data(1234, types, 3600, start, end)
+        total = mgr.sum(1234, 'publicIn_net_octet', start, end)
+
+    :param SoftLayer.API.BaseClient client: the client instance
+    :param TimeSeriesStore store: where to keep the series. Defaults to an
+                                  in-memory store.
+    """
+
+    def __init__(self, client, store=None):
+        self.client = client
+        self.metric = client['Metric_Tracking_Object']
+        self.store = store if store is not None else TimeSeriesStore()
+
+    def sync_summary_data(self, tracking_id, types, rollup, start, end):
+        """Fetches getSummaryData for the part of a window not fetched yet.
+
+        :param int tracking_id: the metric tracking object id
+        :param list types: SoftLayer_Container_Metric_Data_Type dicts
+        :param int rollup: the number of seconds per data point
+        :param start: datetime, dateTime string or timestamp
+        :param end: datetime, dateTime string or timestamp
+        :returns: the number of points added to the store
+        """
+        query = 'summary:%s:%s' % (
+            rollup, ','.join(sorted(t['keyName'] for t in types)))
+        return self._sync(tracking_id, query, start, end,
+                          lambda since, until: self.metric.getSummaryData(
+                              since, until, types, rollup, id=tracking_id))
+
+    def sync_bandwidth_data(self, tracking_id, data_type, rollup, start, end):
+        """Fetches getBandwidthData for the part of a window not fetched yet.
+
+        :param int tracking_id: the metric tracking object id
+        :param string data_type: 'public' or 'private'
+        :param int rollup: the number of seconds per data point
+        :param start: datetime, dateTime string or timestamp
+        :param end: datetime, dateTime string or timestamp
+        :returns: the number of points added to the store
+        """
+        query = 'bandwidth:%s:%s' % (data_type, rollup)
+        return self._sync(tracking_id, query, start, end,
+                          lambda since, until: self.metric.getBandwidthData(
+                              since, until, data_type, rollup, id=tracking_id))
+
+    def _sync(self, tracking_id, query, start, end, fetch):
+        """Fetches the parts of [start, end) not fetched yet and stores them."""
+        start, end = utils.to_timestamp(start), utils.to_timestamp(end)
+        # (since, until, whether data after until was fetched already)
+        gaps = []
+        for lower, upper in self.store.fetched_ranges(tracking_id, query):
+            if lower >= end:
+                break
+            if upper <= start:
+                continue
+            if lower > start:
+                gaps.append((start, lower, True))
+            start = upper
+        if start < end:
+            gaps.append((start, end, False))
+
+        added = 0
+        for since, until, complete in gaps:
+            points = {}
+            for data in fetch(utils.format_timestamp(since),
+                              utils.format_timestamp(until)) or []:
+                points.setdefault(data['type'], []).append(
+                    (utils.to_timestamp(data['dateTime']), float(data['counter'])))
+
+            for key, series in points.items():
+                series.sort()
+                added += self.store.add(tracking_id, key, series)
+
+            # The newest interval may still be filling up, so unless later
+            # data was fetched before, the next sync fetches the last point
+            # again and replaces it
+            if complete:
+                self.store.mark_fetched(tracking_id, query, since, until)
+            elif points:
+                self.store.mark_fetched(tracking_id, query, since, max(
+                    series[-1][0] for series in points.values()))
+        return added
+
+    def sum(self, tracking_id, key, start=None, end=None):
+        """Sums a stored series over [start, end)."""
+        return self.store.get(tracking_id, key).sum(start, end)
+
+    def summarize(self, tracking_ids, keys, start=None, end=None):
+        """Sums many stored series over [start, end).
+
+        :returns: dict of tracking id => dict of key => sum
+        """
+        return dict((tracking_id,
+                     dict((key, self.sum(tracking_id, key, start, end))
+                          for key in keys))
+                    for tracking_id in tracking_ids)
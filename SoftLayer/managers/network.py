@@ -6,16 +6,25 @@
     :license: MIT, see LICENSE for more details.
 """
 import collections
-import itertools
+import copy
 import json
 import logging
 import random
 import time
+import weakref
 
+from SoftLayer import bulk
 from SoftLayer import exceptions
 from SoftLayer import utils
 
 LOGGER = logging.getLogger(__name__)
+# pylint: disable=too-many-public-methods,too-many-lines
+
+#: Seconds summary_by_datacenter() reuses a summary for
+SUMMARY_TTL = 60
+
+# client => {datacenter => (expiry time, summary)}
+_SUMMARY_CACHE = weakref.WeakKeyDictionary()
 
 DEFAULT_SUBNET_MASK = ','.join(['hardware',
                                 'datacenter',
@@ -41,6 +50,101 @@ DEFAULT_GET_VLAN_MASK = ','.join([
     'virtualGuests',
 ])
 
+#: Most rules sent in one addRules, editRules or removeRules call
+SG_RULE_CHUNK_SIZE = 50
+
+SG_RULE_MASK = ('id,direction,ethertype,protocol,portRangeMin,portRangeMax,'
+                'remoteIp,remoteGroupId')
+
+# Audit log events which end a Security Group request
+SG_SUCCESS_EVENT = 'Network Component(s) Updated With Security Group'
+SG_FAILURE_EVENT = 'Security Group Update on Network Components Failed'
+SG_EVENT_MASK = 'mask[objectId,eventName,eventCreateDate,metaData]'
+#: Seconds before the newest event seen that the next poll starts at
+SG_EVENT_OVERLAP = 60
+#: Lowest UTC offset of a time zone. Event log date filters are in the API's
+#: local time, so until an event shows the API's offset the first poll
+#: starts as if it were this far behind UTC
+SG_EVENT_MIN_UTC_OFFSET = -12 * 3600
+
+
+def _sg_rule_fields(rule):
+    """Normalises the fields of a security group rule.
+
+    Values which the API treats alike compare equal: ethertype defaults to
+    IPv4, casing is ignored, single address CIDRs lose their prefix and
+    ports are dropped from rules without a protocol.
+    """
+    direction = str(rule.get('direction') or '').strip().lower()
+    if direction not in ('ingress', 'egress'):
+        raise ValueError("Invalid direction: %r" % rule.get('direction'))
+    ethertype = str(rule.get('ethertype') or 'IPv4').strip().lower()
+    if ethertype not in ('ipv4', 'ipv6'):
+        raise ValueError("Invalid ethertype: %r" % rule.get('ethertype'))
+
+    protocol = str(rule.get('protocol') or '').strip().lower() or None
+    ports = [rule.get(field) for field in ('portRangeMin', 'portRangeMax')]
+    ports = [None if port in (None, '', -1) else int(port) for port in ports]
+    if protocol is None:
+        ports = [None, None]
+
+    remote_ip = str(rule.get('remoteIp') or '').strip().lower()
+    if remote_ip.endswith('/128' if ':' in remote_ip else '/32'):
+        remote_ip = remote_ip.rsplit('/', 1)[0]
+    remote_group = rule.get('remoteGroupId')
+    remote_group = int(remote_group) if remote_group not in (None, '') else None
+
+    return {'direction': direction,
+            'ethertype': 'IPv4' if ethertype == 'ipv4' else 'IPv6',
+            'protocol': protocol,
+            'portRangeMin': ports[0],
+            'portRangeMax': ports[1],
+            'remoteIp': remote_ip or None,
+            'remoteGroupId': remote_group}
+
+
+def _sg_rule_key(fields, ports=True):
+    key = (fields['direction'], fields['ethertype'], fields['protocol'],
+           fields['remoteIp'], fields['remoteGroupId'])
+    if ports:
+        key += (fields['portRangeMin'], fields['portRangeMax'])
+    return key
+
+
+def _or_unset(port):
+    """-1 unsets a port, like in NetworkManager.edit_securitygroup_rule."""
+    return -1 if port is None else port
+
+
+def _sg_request_id(result):
+    """The requestId of a rule call's result, if it has one."""
+    if isinstance(result, dict):
+        return result.get('requestId')
+    return None
+
+
+class SecurityGroupSyncPlan(object):
+    """The rule changes which make a security group match a desired list.
+
+    :param int group_id: the security group's ID
+    """
+
+    def __init__(self, group_id):
+        self.group_id = group_id
+        #: rules to add, as passed to addRules
+        self.add = []
+        #: changed fields of current rules, with their id, for editRules
+        self.edit = []
+        #: current rules to remove
+        self.remove = []
+
+    def __len__(self):
+        return len(self.add) + len(self.edit) + len(self.remove)
+
+    def __repr__(self):
+        return "<SecurityGroupSyncPlan: %d add, %d edit, %d remove>" % (
+            len(self.add), len(self.edit), len(self.remove))
+
 
 class NetworkManager(object):
     """Manage SoftLayer network objects: VLANs, subnets, IPs and rwhois
@@ -554,6 +658,125 @@ class NetworkManager(object):
         """
         return self.security_group.removeRules(rules, id=group_id)
 
+    def plan_securitygroup_sync(self, group_id, desired_rules):
+        """Works out the rule changes which make a security group match a list.
+
+        The current rules are fetched once and indexed by their normalised
+        fields. Rules which are already there are left alone, rules which
+        only differ from a leftover current rule in their ports are edited
+        in place and everything else is added or removed. Repeated desired
+        rules are only added once.
+
+        :param int group_id: The ID of the security group
+        :param list desired_rules: rule dicts, with the fields addRules takes
+        :returns: a SecurityGroupSyncPlan
+        """
+        plan = SecurityGroupSyncPlan(group_id)
+        current = [(rule, _sg_rule_fields(rule)) for rule in
+                   self.security_group.getRules(id=group_id,
+                                                mask=SG_RULE_MASK) or []]
+        unmatched = {}
+        for rule, fields in current:
+            unmatched.setdefault(_sg_rule_key(fields), []).append(rule)
+
+        missing = []
+        seen = set()
+        for index, rule in enumerate(desired_rules):
+            try:
+                fields = _sg_rule_fields(rule)
+            except (TypeError, ValueError) as ex:
+                raise ValueError("Rule %d: %s" % (index + 1, ex))
+            key = _sg_rule_key(fields)
+            if key in seen:
+                continue
+            seen.add(key)
+            if unmatched.get(key):
+                unmatched[key].pop(0)
+            else:
+                missing.append(fields)
+
+        # Leftover current rules, by everything but their ports
+        leftover_ids = set(rule['id'] for rules in unmatched.values()
+                           for rule in rules)
+        leftovers = {}
+        for rule, fields in current:
+            if rule['id'] in leftover_ids:
+                leftovers.setdefault(_sg_rule_key(fields, ports=False),
+                                     []).append(rule)
+
+        edited = set()
+        for fields in missing:
+            candidates = leftovers.get(_sg_rule_key(fields, ports=False))
+            if candidates:
+                rule = candidates.pop(0)
+                edited.add(rule['id'])
+                plan.edit.append({
+                    'id': rule['id'],
+                    'portRangeMin': _or_unset(fields['portRangeMin']),
+                    'portRangeMax': _or_unset(fields['portRangeMax'])})
+            else:
+                plan.add.append(dict((field, value)
+                                     for field, value in fields.items()
+                                     if value is not None))
+
+        plan.remove = [rule for rule, _ in current
+                       if rule['id'] in leftover_ids - edited]
+        return plan
+
+    def apply_securitygroup_sync(self, plan, chunk_size=SG_RULE_CHUNK_SIZE,
+                                 wait=True, limit=600, delay=5):
+        """Makes the changes of a SecurityGroupSyncPlan.
+
+        Rules are added first and removed last, so traffic allowed both
+        before and after the sync is never blocked in between. Each kind of
+        change is sent in calls of at most chunk_size rules.
+
+        :param SecurityGroupSyncPlan plan: the changes to make
+        :param int chunk_size: the most rules to send in one call
+        :param bool wait: wait for the firewall updates of every call to
+                          complete, see wait_for_sg_requests()
+        :param int limit: the most seconds to wait
+        :param int delay: the seconds between checks while waiting
+        :returns: the requestIds of the calls made
+        """
+        request_ids = []
+        started = time.time()
+        for method, items in [('addRules', plan.add),
+                              ('editRules', plan.edit),
+                              ('removeRules', [rule['id']
+                                               for rule in plan.remove])]:
+            for start in range(0, len(items), chunk_size):
+                result = self.client.call('Network_SecurityGroup', method,
+                                          items[start:start + chunk_size],
+                                          id=plan.group_id)
+                request_id = _sg_request_id(result)
+                if request_id is not None:
+                    request_ids.append(request_id)
+
+        if wait and request_ids:
+            self.wait_for_sg_requests(plan.group_id, request_ids,
+                                      limit=limit, delay=delay, since=started)
+        return request_ids
+
+    def sync_securitygroup_rules(self, group_id, desired_rules, **kwargs):
+        """Makes the rules of a security group match a list.
+
+        ::
+
+            mgr.sync_securitygroup_rules(384727, [
+                {'direction': 'ingress', 'protocol': 'tcp',
+                 'portRangeMin': 22, 'portRangeMax': 22},
+                {'direction': 'egress'},
+            ])
+
+        :param int group_id: The ID of the security group
+        :param list desired_rules: rule dicts, with the fields addRules takes
+        :param kwargs: passed to apply_securitygroup_sync()
+        :returns: (SecurityGroupSyncPlan, the requestIds of the calls made)
+        """
+        plan = self.plan_securitygroup_sync(group_id, desired_rules)
+        return plan, self.apply_securitygroup_sync(plan, **kwargs)
+
     def resolve_global_ip_ids(self, identifier):
         """Resolve global ip ids."""
         return utils.resolve_ids(identifier,
@@ -568,18 +791,53 @@ class NetworkManager(object):
         """Resolve VLAN ids."""
         return utils.resolve_ids(identifier, [self._list_vlans_by_name])
 
-    def summary_by_datacenter(self):
+    def resolve_many_global_ip_ids(self, identifiers):
+        """Resolve many global ip ids at once.
+
+        :returns dict: identifier => list of matching ids
+        """
+        return utils.resolve_many(identifiers,
+                                  [self._list_global_ips_by_identifiers])
+
+    def resolve_many_subnet_ids(self, identifiers):
+        """Resolve many subnet ids at once.
+
+        :returns dict: identifier => list of matching ids
+        """
+        return utils.resolve_many(identifiers,
+                                  [self._list_subnets_by_identifiers])
+
+    def resolve_many_vlan_ids(self, identifiers):
+        """Resolve many VLAN ids at once.
+
+        :returns dict: identifier => list of matching ids
+        """
+        return utils.resolve_many(identifiers, [self._list_vlans_by_names])
+
+    def summary_by_datacenter(self, datacenter=None, ttl=SUMMARY_TTL):
         """Summary of the networks on the account, grouped by data center.
 
         The resultant dictionary is primarily useful for statistical purposes.
         It contains count information rather than raw data. If you want raw
         information, see the :func:`list_vlans` method instead.
 
+        VLANs, hardware and virtual servers are fetched with three concurrent
+        calls that only ask for the datacenter and counts. Results are cached
+        per client for ttl seconds.
+
+        :param string datacenter: only summarize this data center
+        :param int ttl: seconds to reuse a previous summary for, 0 to
+                        always fetch a new one
         :returns: A dictionary keyed by data center with the data containing a
                   set of counts for subnets, hardware, virtual servers, and
                   other objects residing within that data center.
 
         """
+        cache = _SUMMARY_CACHE.setdefault(self.client, {})
+        cached = cache.get(datacenter)
+        if ttl and cached and cached[0] > time.time():
+            return copy.deepcopy(cached[1])
+
         datacenters = collections.defaultdict(lambda: {
             'hardware_count': 0,
             'public_ip_count': 0,
@@ -588,22 +846,59 @@ class NetworkManager(object):
             'vlan_count': 0,
         })
 
-        for vlan in self.list_vlans():
+        vlans, hardware, guests = bulk.map_concurrent(
+            lambda fetch: fetch(datacenter),
+            [self._summary_vlans, self._summary_hardware,
+             self._summary_guests])
+
+        for vlan in vlans:
             name = utils.lookup(vlan, 'primaryRouter', 'datacenter', 'name')
 
             datacenters[name]['vlan_count'] += 1
             datacenters[name]['public_ip_count'] += (
-                vlan['totalPrimaryIpAddressCount'])
-            datacenters[name]['subnet_count'] += vlan['subnetCount']
+                vlan.get('totalPrimaryIpAddressCount', 0))
+            datacenters[name]['subnet_count'] += vlan.get('subnetCount', 0)
 
-            # NOTE(kmcdonald): Only count hardware/guests once
-            if vlan.get('networkSpace') == 'PRIVATE':
-                datacenters[name]['hardware_count'] += (
-                    vlan['hardwareCount'])
-                datacenters[name]['virtual_guest_count'] += (
-                    vlan['virtualGuestCount'])
+        for server in hardware:
+            name = utils.lookup(server, 'datacenter', 'name')
+            datacenters[name]['hardware_count'] += 1
 
-        return dict(datacenters)
+        for guest in guests:
+            name = utils.lookup(guest, 'datacenter', 'name')
+            datacenters[name]['virtual_guest_count'] += 1
+
+        result = dict(datacenters)
+        cache[datacenter] = (time.time() + ttl, result)
+        return copy.deepcopy(result)
+
+    def _summary_vlans(self, datacenter=None):
+        """Lists VLANs with only what summary_by_datacenter() counts."""
+        _filter = utils.NestedDict()
+        if datacenter:
+            _filter['networkVlans']['primaryRouter']['datacenter']['name'] = (
+                utils.query_filter(datacenter))
+        return self.account.getNetworkVlans(
+            mask='id,subnetCount,totalPrimaryIpAddressCount,'
+                 'primaryRouter[id,datacenter[name]]',
+            filter=_filter.to_dict())
+
+    def _summary_hardware(self, datacenter=None):
+        """Lists hardware with only its datacenter."""
+        _filter = utils.NestedDict()
+        if datacenter:
+            _filter['hardware']['datacenter']['name'] = (
+                utils.query_filter(datacenter))
+        return self.account.getHardware(mask='id,datacenter[name]',
+                                        filter=_filter.to_dict())
+
+    def _summary_guests(self, datacenter=None):
+        """Lists virtual servers with only their datacenter."""
+        _filter = utils.NestedDict()
+        if datacenter:
+            _filter['virtualGuests']['datacenter']['name'] = (
+                utils.query_filter(datacenter))
+        return self.account.getVirtualGuests(mask='id,datacenter[name]',
+                                             filter=_filter.to_dict())
 
     def unassign_global_ip(self, global_ip_id):
         """Unassigns a global IP address from a target.
@@ -642,6 +937,50 @@ class NetworkManager(object):
         results = self.list_vlans(name=name, mask='id')
         return [result['id'] for result in results]
 
+    def _list_global_ips_by_identifiers(self, identifiers):
+        """Maps each global IP identifier to the matching global IP IDs.
+
+        :param list identifiers: The identifiers to look up
+        :returns: dict of identifier => list of matching IDs
+        """
+        _filter = {'globalIpRecords': {'ipAddress': {'subnet': {
+            'networkIdentifier': utils.query_filter_in(identifiers)}}}}
+        results = self.account.getGlobalIpRecords(
+            mask='id,ipAddress[subnet[networkIdentifier]]', filter=_filter)
+        return utils.group_ids_by(
+            results,
+            lambda result: utils.lookup(result, 'ipAddress', 'subnet',
+                                        'networkIdentifier'),
+            identifiers)
+
+    def _list_subnets_by_identifiers(self, identifiers):
+        """Maps each subnet identifier to the matching subnet IDs.
+
+        :param list identifiers: The identifiers to look up, with or without
+                                 the CIDR suffix
+        :returns: dict of identifier => list of matching IDs
+        """
+        networks = dict((identifier, identifier.split('/', 1)[0])
+                        for identifier in identifiers)
+        _filter = {'subnets': {'networkIdentifier': utils.query_filter_in(
+            sorted(set(networks.values())))}}
+        results = self.list_subnets(mask='id,networkIdentifier',
+                                    filter=_filter)
+        by_network = utils.group_ids_by(results, 'networkIdentifier',
+                                        networks.values())
+        return dict((identifier, by_network[network])
+                    for identifier, network in networks.items())
+
+    def _list_vlans_by_names(self, names):
+        """Maps each VLAN name to the matching VLAN IDs.
+
+        :param list names: VLAN names
+        :returns: dict of name => list of matching IDs
+        """
+        _filter = {'networkVlans': {'name': utils.query_filter_in(names)}}
+        results = self.list_vlans(mask='id,name', filter=_filter)
+        return utils.group_ids_by(results, 'name', names)
+
     def get_nas_credentials(self, identifier, **kwargs):
         """Returns a list of IDs of VLANs which match the given VLAN name.
 
@@ -652,7 +991,8 @@ class NetworkManager(object):
         result = self.network_storage.getObject(id=identifier, **kwargs)
         return result
 
-    def wait_for_sg_request(self, group_id, request_id, limit=60, delay=5):
+    def wait_for_sg_request(self, group_id, request_id, limit=60, delay=5,
+                            since=None):
         """Wait for a Security Group API request to complete.
 
         Security Group API requests may trigger firewall updates that complete
@@ -666,6 +1006,7 @@ class NetworkManager(object):
         requestId field of their return value.
         :param int limit: The maximum amount of time to wait for completion.
         :param int delay: The number of seconds to sleep before polling checks. Defaults to 5.
+        :param since: UNIX timestamp of when the request was made. Defaults to now.
 
         Example::
 
@@ -674,87 +1015,131 @@ class NetworkManager(object):
             net_mgr.wait_for_sg_request(123456, 'abc123')
         """
 
-        # Audit log event name for successfully API completion
-        success_event_name = 'Network Component(s) Updated With Security Group'
+        return self.wait_for_sg_requests(group_id, [request_id],
+                                         limit=limit, delay=delay, since=since)
 
-        # Audit log event name for unsuccessful API completion
-        failure_event_name = 'Security Group Update on Network Components Failed'
+    def wait_for_sg_requests(self, group_id, request_ids, limit=60, delay=5,
+                             since=None):
+        """Wait for many Security Group API requests to complete.
 
-        LOGGER.info('wait %s seconds for request %s completion on Security Group %s',
-                     limit, request_id, group_id)
-        wait_until = time.time() + limit
+        Like wait_for_sg_request(), but each poll of the audit log checks
+        every pending request, so waiting on a batch of requests costs as
+        many calls as waiting on one.
 
-        for sg_id in itertools.repeat(group_id):
-            LOGGER.info('check event logs for completion')
-            try:
-                # get all event logs for the specified security group
-                logs = self.client.call("Event_Log",
-                                        'getAllObjects',
-                                        filter={'objectId': {'operation': sg_id}})
-
-                #
-                # look for a log for the indicated request, there will be
-                # only 1 SG log per request_id.
-                #
-                completion_log = None
-                for one_log in logs:
-                    if 'metaData' not in one_log:
-                        LOGGER.info('no metaData')
-                        continue
-                    metadata = json.loads(one_log['metaData'])
-                    if 'requestId' not in metadata:
-                        LOGGER.info('no requestId')
-                        continue
-                    if metadata['requestId'] == request_id:
-                        LOGGER.info('req Id match')
-                        event_name = one_log['eventName']
-                        if event_name == success_event_name or event_name == failure_event_name:
-                            completion_log = one_log
-                            break
-                    else:
-#                         LOGGER.info('req Id doesnt match')
-                        pass
-
-
-                #
-                # check if it's a successful or failure completion log
-                #
-                if completion_log is not None:
-                    if completion_log['eventName'] == success_event_name:
-                        # return True if firewall updates for the Security Group request
-                        # completed successfully.
-                        LOGGER.info('request %s complete successfully', request_id)
-                        return True
-                    elif completion_log['eventName'] == failure_event_name:
-                        LOGGER.info('request %s complete with failure', request_id)
-                        raise exceptions.SoftLayerError("Security Group %s request %s did not "
-                                                        "complete within the specified timeout"
-                                                        " (%s seconds)"
-                                                        % (sg_id, request_id, limit))
-                    else:
-                        LOGGER.warning('unexpected log event: %s', completion_log['eventName'])
-                        raise exceptions.SoftLayerError("Security Group internal error, rcvd %s "
-                                                        % completion_log['eventName'])
-
-                #
-                # no completion log yet, delay and try again
-                #
-                LOGGER.info("%s not complete.", str(request_id))
+        :param int group_id: The security group ID with the pending API requests
+        :param list request_ids: The request IDs of the API requests, from the
+                                 requestId field of their return values
+        :param int limit: The maximum amount of time to wait for completion.
+        :param int delay: The number of seconds to sleep before polling checks. Defaults to 5.
+        :param since: UNIX timestamp of when the requests were made. Defaults to now.
+        :returns: True once every request completed successfully
+        :raises SoftLayerError: if any request failed, or they did not all
+                                complete within limit seconds
+        """
+
+        return self.wait_for_many_sg_requests({group_id: request_ids},
+                                              limit=limit, delay=delay,
+                                              since=since)
+
+    def wait_for_many_sg_requests(self, requests, limit=60, delay=5,
+                                  since=None):
+        """Wait for Security Group API requests of many groups to complete.
 
+        All the groups are checked by one poll loop. Each poll only asks for
+        the completion events of the groups which were logged since the
+        requests were made or, once events were seen, since the newest one
+        (less SG_EVENT_OVERLAP seconds, for events logged late). So polls
+        stay cheap however long the groups' audit logs are. Every event is
+        parsed only once.
+
+        :param dict requests: security group ID => list of request IDs
+        :param int limit: The maximum amount of time to wait for completion.
+        :param int delay: The number of seconds to sleep before polling checks. Defaults to 5.
+        :param since: UNIX timestamp of when the requests were made. Defaults to now.
+        :returns: True once every request completed successfully
+        :raises SoftLayerError: if any request failed, or they did not all
+                                complete within limit seconds
+        """
+
+        pending = dict((request_id, group_id)
+                       for group_id, request_ids in requests.items()
+                       for request_id in request_ids)
+        failed = []
+        seen = set()
+        # The API's UTC offset, as shown by the events
+        offset = None
+        _filter = {
+            'objectId': utils.query_filter_in(sorted(set(
+                int(group_id) for group_id in requests))),
+            'eventName': utils.query_filter_in([SG_SUCCESS_EVENT,
+                                                SG_FAILURE_EVENT]),
+        }
+        LOGGER.info('wait %s seconds for %d requests on Security Groups %s',
+                    limit, len(pending), ', '.join(str(group_id)
+                                                   for group_id in requests))
+        now = time.time()
+        wait_until = now + limit
+        cursor = (now if since is None else since) - SG_EVENT_OVERLAP
+
+        while pending:
+            _filter['eventCreateDate'] = {
+                'operation': 'greaterThanDate',
+                'options': [{'name': 'date', 'value': [utils.format_filter_date(
+                    cursor, SG_EVENT_MIN_UTC_OFFSET if offset is None else offset)]}]}
+            try:
+                logs = self.client.call('Event_Log', 'getAllObjects',
+                                        filter=_filter, mask=SG_EVENT_MASK)
             except exceptions.SoftLayerAPIError:
                 # if the call is excepting unexpectedly, scale back how
                 # frequently we call it.
+                LOGGER.exception('checking Security Group event logs failed')
                 delay = (delay * 2) + random.randint(0, 9)
-                LOGGER.exception()
-
+                logs = []
+
+            # there is only 1 completion log per request
+            for one_log in logs or []:
+                key = (one_log.get('objectId'), one_log.get('eventCreateDate'),
+                       one_log.get('metaData'))
+                if key in seen:
+                    continue
+                seen.add(key)
+                if one_log.get('eventCreateDate'):
+                    offset = utils.utc_offset(one_log['eventCreateDate']) or 0
+                    cursor = max(cursor, utils.to_timestamp(
+                        one_log['eventCreateDate']) - SG_EVENT_OVERLAP)
+
+                request_id = json.loads(one_log.get('metaData') or '{}').get('requestId')
+                if request_id not in pending:
+                    continue
+                group_id = pending.pop(request_id)
+                if one_log.get('eventName') == SG_FAILURE_EVENT:
+                    LOGGER.info('request %s complete with failure', request_id)
+                    failed.append((group_id, request_id))
+                else:
+                    LOGGER.info('request %s complete successfully', request_id)
+
+            if not pending:
+                break
             now = time.time()
             if now > wait_until:
-                LOGGER.info("Security Group %s request %s did not complete"
-                                                " within the specified timeout %s",
-                                                sg_id, request_id, limit)
-                raise exceptions.SoftLayerError("Security Group %s request %s did not complete"
-                                                " within the specified timeout %s"
-                                                % (sg_id, request_id, limit))
-
-            LOGGER.info('Auto retry in %s seconds', str(min(delay, wait_until - now)))
+                raise exceptions.SoftLayerError(
+                    "Security Group requests %s did not complete within "
+                    "the specified timeout (%s seconds)"
+                    % (_describe_sg_requests(pending.items()), limit))
+
+            LOGGER.info('%d requests not complete, retry in %s seconds',
+                        len(pending), min(delay, wait_until - now))
             time.sleep(min(delay, wait_until - now))
+
+        if failed:
+            raise exceptions.SoftLayerError(
+                "Security Group requests %s failed"
+                % _describe_sg_requests((request_id, group_id)
+                                        for group_id, request_id in failed))
+        return True
+
+
+def _describe_sg_requests(requests):
+    """Lists (request ID, group ID) pairs for error messages."""
+    return ', '.join('%s (group %s)' % (request_id, group_id)
+                     for request_id, group_id in sorted(requests, key=str))
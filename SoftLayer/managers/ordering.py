@@ -6,8 +6,12 @@
     :license: MIT, see LICENSE for more details.
 """
 # pylint: disable=no-self-use
+import time
 
+from SoftLayer import bulk
 from SoftLayer import exceptions
+from SoftLayer.managers import datacenters
+from SoftLayer import utils
 
 CATEGORY_MASK = '''id,
                    isRequired,
@@ -20,6 +24,79 @@ PACKAGE_MASK = '''id, name, keyName, isActive, type'''
 
 PRESET_MASK = '''id, name, keyName, description'''
 
+CATALOG_ITEM_MASK = '''id, keyName, itemCategory[categoryCode],
+                        prices[id, locationGroupId, recurringFee, hourlyRecurringFee,
+                               categories[categoryCode]]'''
+
+PRESET_CATEGORY_MASK = '''id, keyName, categories[categoryCode]'''
+
+#: Seconds package and catalog lookups are reused for
+CATALOG_TTL = 300
+
+
+class PackageCatalog(object):
+    """Index of the items and prices of a package.
+
+    Built once from the items of a package, so looking up any number of item
+    keynames is a dictionary lookup instead of a scan of every item.
+
+    :param str package_keyname: The keyname of the package
+    :param list items: The package's items, with prices and itemCategory
+    """
+
+    def __init__(self, package_keyname, items):
+        self.package_keyname = package_keyname
+        #: keyName => item
+        self.items = {}
+        #: keyName => {locationGroupId => [prices]}. Location-agnostic prices
+        #: are under None.
+        self.prices = {}
+        #: categoryCode => [items]
+        self.categories = {}
+        #: price id => (item, price)
+        self.price_ids = {}
+
+        for item in items:
+            self.items[item['keyName']] = item
+
+            prices = self.prices.setdefault(item['keyName'], {})
+            for price in item.get('prices') or []:
+                group = price.get('locationGroupId') or None
+                prices.setdefault(group, []).append(price)
+                self.price_ids[price['id']] = (item, price)
+
+            category = (item.get('itemCategory') or {}).get('categoryCode')
+            if category:
+                self.categories.setdefault(category, []).append(item)
+
+    def get_item(self, item_keyname):
+        """Returns the item with the given keyname."""
+        try:
+            return self.items[item_keyname]
+        except KeyError:
+            raise exceptions.SoftLayerError(
+                "Item {} does not exist for package {}".format(item_keyname,
+                                                               self.package_keyname))
+
+    def get_price_id(self, item_keyname, location_group_id=None):
+        """Returns the price ID of an item.
+
+        :param str item_keyname: The keyname of the item
+        :param location_group_id: The location group to get the price of.
+                                  None gets the location-agnostic price.
+        """
+        self.get_item(item_keyname)
+        prices = self.prices[item_keyname].get(location_group_id)
+        if not prices:
+            raise exceptions.SoftLayerError(
+                "Item {} has no price for location group {} in package {}".format(
+                    item_keyname, location_group_id, self.package_keyname))
+        return prices[0]['id']
+
+    def get_items_in_category(self, category_code):
+        """Returns the items in the category with the given code."""
+        return self.categories.get(category_code, [])
+
 
 class OrderingManager(object):
     """Manager to help ordering via the SoftLayer API.
@@ -32,6 +109,163 @@ class OrderingManager(object):
         self.package_svc = client['Product_Package']
         self.order_svc = client['Product_Order']
         self.billing_svc = client['Billing_Order']
+        self.cache_ttl = CATALOG_TTL
+        self._cache = {}
+
+    def _cached(self, key, fetch):
+        """Returns fetch(), reusing the previous result for cache_ttl seconds."""
+        now = time.time()
+        entry = self._cache.get(key)
+        if entry is None or entry[0] <= now:
+            entry = self._cache[key] = (now + self.cache_ttl, fetch())
+        return entry[1]
+
+    def clear_cache(self):
+        """Forgets the cached packages, presets and catalogs."""
+        self._cache.clear()
+
+    def get_catalog(self, package_keyname):
+        """Returns the PackageCatalog of a package.
+
+        The catalog is cached on the manager for cache_ttl seconds.
+
+        :param str package_keyname: The keyname of the package
+        """
+        return self._cached(
+            ('catalog', package_keyname),
+            lambda: PackageCatalog(package_keyname,
+                                   self.list_items(package_keyname,
+                                                   mask=CATALOG_ITEM_MASK)))
+
+    def get_required_categories(self, package_keyname):
+        """Returns the codes of the categories every order of a package needs.
+
+        The result is cached on the manager for cache_ttl seconds.
+
+        :param str package_keyname: The keyname of the package
+        """
+        return self._cached(
+            ('required', package_keyname),
+            lambda: set(utils.lookup(category, 'itemCategory', 'categoryCode')
+                        for category in self.list_categories(package_keyname)
+                        if category.get('isRequired')))
+
+    def get_preset_categories(self, package_keyname):
+        """Returns the category codes each preset of a package fills.
+
+        The result is cached on the manager for cache_ttl seconds.
+
+        :param str package_keyname: The keyname of the package
+        :returns: dict of preset id => set of category codes
+        """
+        return self._cached(
+            ('preset_categories', package_keyname),
+            lambda: dict((preset['id'],
+                          set(category['categoryCode']
+                              for category in preset.get('categories') or []))
+                         for preset in self.list_presets(
+                             package_keyname, mask=PRESET_CATEGORY_MASK)))
+
+    def validate_order(self, package_keyname, order):
+        """Checks an order against the cached catalog of its package.
+
+        This catches the mistakes verifyOrder() would reject without a call
+        per order, so a large number of candidate orders can be screened and
+        only the plausible ones verified. Checked are:
+
+        - every price exists in the package, is available in the location's
+          price groups and has a fee for the order's billing type
+        - every required category is ordered, by a price or by the preset
+        - no category is ordered twice or both by a price and the preset.
+          A price fills one of its categories, so an item with several
+          slots (disk0, disk1, ...) can be ordered once per slot
+        - the quantity is positive and matches the hardware or virtualGuests
+
+        Passing doesn't guarantee verifyOrder() will accept the order.
+
+        :param str package_keyname: The keyname of the ordered package
+        :param dict order: The order, as made by generate_order()
+        :returns: A list of problems; empty if the order looks valid
+        """
+        problems = []
+        catalog = self.get_catalog(package_keyname)
+        package = self._cached(
+            ('package', package_keyname),
+            lambda: self.get_package_by_key(package_keyname, mask='id'))
+        if order.get('packageId') != package['id']:
+            problems.append("Order is not for package {} ({})".format(
+                package_keyname, package['id']))
+
+        quantity = order.get('quantity', 1)
+        if not isinstance(quantity, int) or quantity < 1:
+            problems.append("Quantity must be a positive integer, not {!r}".format(quantity))
+        else:
+            for key in ['hardware', 'virtualGuests']:
+                if key in order and len(order[key]) != quantity:
+                    problems.append("{} {} given for a quantity of {}".format(
+                        len(order[key]), key, quantity))
+
+        price_groups = None
+        if order.get('location') is not None:
+            registry = datacenters.get_registry(self.client)
+            if registry.get_datacenter(order['location']) is None:
+                problems.append("Location {} does not exist".format(order['location']))
+            else:
+                price_groups = set(str(group_id) for group_id in
+                                   registry.get_price_group_ids(order['location']))
+
+        preset_categories = set()
+        if order.get('presetId'):
+            presets = self.get_preset_categories(package_keyname)
+            if order['presetId'] in presets:
+                preset_categories = presets[order['presetId']]
+            else:
+                problems.append("Preset {} does not exist in package {}".format(
+                    order['presetId'], package_keyname))
+
+        fee = 'hourlyRecurringFee' if order.get('useHourlyPricing') else 'recurringFee'
+        slotted = []
+        for price_id in [utils.lookup(price, 'id') for price in order.get('prices', [])]:
+            if price_id not in catalog.price_ids:
+                problems.append("Price {} does not exist in package {}".format(
+                    price_id, package_keyname))
+                continue
+
+            item, price = catalog.price_ids[price_id]
+            group = price.get('locationGroupId')
+            if group and price_groups is not None and str(group) not in price_groups:
+                problems.append("Price {} of {} is not available in {}".format(
+                    price_id, item['keyName'], order['location']))
+            if price.get(fee) in (None, ''):
+                problems.append("Price {} of {} has no {}".format(
+                    price_id, item['keyName'], fee))
+
+            categories = [category['categoryCode']
+                          for category in price.get('categories') or []]
+            slotted.append((item, categories or [
+                utils.lookup(item, 'itemCategory', 'categoryCode')]))
+
+        # Prices with the fewest slots pick first, so a price which fits
+        # anywhere doesn't take the only slot of another one
+        ordered = set()
+        for item, categories in sorted(slotted, key=lambda slot: len(slot[1])):
+            free = [category for category in categories
+                    if category not in ordered and category not in preset_categories]
+            if free:
+                ordered.add(free[0])
+            elif categories[0] in preset_categories:
+                problems.append("Category {} of {} is already filled by the preset".format(
+                    categories[0], item['keyName']))
+            else:
+                problems.append("Category {} of {} is ordered more than once".format(
+                    categories[0], item['keyName']))
+
+        missing = (self.get_required_categories(package_keyname)
+                   - ordered - preset_categories)
+        for category in sorted(missing):
+            problems.append("Required category {} is missing".format(category))
+
+        return problems
 
     def get_packages_of_type(self, package_types, mask=None):
         """Get packages that match a certain type.
@@ -321,30 +555,14 @@ class OrderingManager(object):
                   keynames in the given package
 
         """
-        mask = 'id, keyName, prices'
-        items = self.list_items(package_keyname, mask=mask)
+        catalog = self.get_catalog(package_keyname)
 
-        prices = []
-        for item_keyname in item_keynames:
-            try:
-                # Need to find the item in the package that has a matching
-                # keyName with the current item we are searching for
-                matching_item = [i for i in items
-                                 if i['keyName'] == item_keyname][0]
-            except IndexError:
-                raise exceptions.SoftLayerError(
-                    "Item {} does not exist for package {}".format(item_keyname,
-                                                                   package_keyname))
-
-            # we want to get the price ID that has no location attached to it,
-            # because that is the most generic price. verifyOrder/placeOrder
-            # can take that ID and create the proper price for us in the location
-            # in which the order is made
-            price_id = [p['id'] for p in matching_item['prices']
-                        if p['locationGroupId'] == ''][0]
-            prices.append(price_id)
-
-        return prices
+        # we want to get the price ID that has no location attached to it,
+        # because that is the most generic price. verifyOrder/placeOrder
+        # can take that ID and create the proper price for us in the location
+        # in which the order is made
+        return [catalog.get_price_id(item_keyname)
+                for item_keyname in item_keynames]
 
     def verify_order(self, package_keyname, location, item_keynames, complex_type=None,
                      hourly=True, preset_keyname=None, extras=None, quantity=1):
@@ -435,7 +653,9 @@ class OrderingManager(object):
         order = {}
         extras = extras or {}
 
-        package = self.get_package_by_key(package_keyname, mask='id')
+        package = self._cached(
+            ('package', package_keyname),
+            lambda: self.get_package_by_key(package_keyname, mask='id'))
 
         # if there was extra data given for the order, add it to the order
         # example: VSIs require hostname and domain set on the order, so
@@ -448,7 +668,9 @@ class OrderingManager(object):
         order['useHourlyPricing'] = hourly
 
         if preset_keyname:
-            preset_id = self.get_preset_by_key(package_keyname, preset_keyname)['id']
+            preset_id = self._cached(
+                ('preset', package_keyname, preset_keyname),
+                lambda: self.get_preset_by_key(package_keyname, preset_keyname))['id']
             order['presetId'] = preset_id
 
         if not complex_type:
@@ -459,6 +681,97 @@ class OrderingManager(object):
         order['prices'] = [{'id': price_id} for price_id in price_ids]
         return order
 
+    def generate_orders(self, orders, workers=bulk.DEFAULT_WORKERS):
+        """Generates many orders in one pass.
+
+        The catalogs of all packages involved are fetched concurrently first,
+        then every order is generated from the cached catalogs.
+
+        :param list orders: dictionaries of generate_order() arguments
+        :param int workers: maximum number of catalogs fetched at the same time
+        :returns: list of orders, in the same order as the given ones
+
+        Example::
+
+            orders = mgr.generate_orders([
+                {'package_keyname': 'CLOUD_SERVER', 'location': 'DALLAS13',
+                 'item_keynames': [...], 'complex_type': '...'},
+                ...
+            ])
+        """
+        keynames = sorted(set(order['package_keyname'] for order in orders))
+        bulk.map_concurrent(self.get_catalog, keynames, workers=workers)
+        return [self.generate_order(**order) for order in orders]
+
+    def verify_orders(self, orders, workers=bulk.DEFAULT_WORKERS, rate=None,
+                      validate=True):
+        """Verifies many orders concurrently.
+
+        See :func:`_run_orders` for how the orders are generated and sent.
+
+        :param list orders: dictionaries of generate_order() arguments
+        :param int workers: maximum number of orders verified at the same time
+        :param float rate: maximum number of calls started per second
+        :param bool validate: skip orders failing validate_order()
+        :returns: generator of (index, verified order, exception) tuples, in
+                  the order the verifications finish
+
+        Example::
+
+            for index, result, error in mgr.verify_orders(orders):
+                print(index, error or 'OK')
+        """
+        return self._run_orders(self.order_svc.verifyOrder, orders,
+                                workers, rate, validate)
+
+    def place_orders(self, orders, workers=bulk.DEFAULT_WORKERS, rate=None,
+                     validate=True):
+        """Places many orders concurrently.
+
+        See :func:`_run_orders` for how the orders are generated and sent.
+
+        :param list orders: dictionaries of generate_order() arguments
+        :param int workers: maximum number of orders placed at the same time
+        :param float rate: maximum number of calls started per second
+        :param bool validate: skip orders failing validate_order()
+        :returns: generator of (index, order receipt, exception) tuples, in
+                  the order the calls finish
+        """
+        return self._run_orders(self.order_svc.placeOrder, orders,
+                                workers, rate, validate)
+
+    def _run_orders(self, func, orders, workers, rate, validate):
+        """Generates orders and calls func with each one concurrently.
+
+        The catalogs of all packages are fetched once, concurrently, and
+        every order's prices are resolved from them. Orders which can't be
+        generated or fail validate_order() are reported without calling func.
+        """
+        keynames = sorted(set(order['package_keyname'] for order in orders))
+        for _ in bulk.iter_concurrent(self.get_catalog, keynames, workers=workers):
+            # Failures show up again, per order, when generating the orders
+            pass
+
+        generated = []
+        for index, args in enumerate(orders):
+            try:
+                order = self.generate_order(**args)
+                problems = []
+                if validate:
+                    problems = self.validate_order(args['package_keyname'], order)
+            except exceptions.SoftLayerError as ex:
+                yield index, None, ex
+                continue
+
+            if problems:
+                yield index, None, exceptions.SoftLayerError('; '.join(problems))
+            else:
+                generated.append((index, order))
+
+        for (index, _), result, ex in bulk.iter_concurrent(
+                lambda pair: func(pair[1]), generated, workers=workers, rate=rate):
+            yield index, result, ex
+
     def package_locations(self, package_keyname):
         """List datacenter locations for a package keyname
 
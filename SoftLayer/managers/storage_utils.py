@@ -6,6 +6,7 @@
     :license: MIT, see LICENSE for more details.
 """
 from SoftLayer import exceptions
+from SoftLayer.managers import datacenters
 from SoftLayer import utils
 
 # pylint: disable=too-many-lines
@@ -85,7 +86,7 @@ def get_package(manager, category_code):
         raise ValueError('More than one package was found for %s'
                          % category_code)
 
-    return packages[0]
+    return StoragePackage(packages[0])
 
 
 def get_location_id(manager, location):
@@ -95,13 +96,102 @@ def get_location_id(manager, location):
     :param location: Datacenter short name
     :return: Returns location id
     """
-    loc_svc = manager.client['Location_Datacenter']
-    datacenters = loc_svc.getDatacenters(mask='mask[longName,id,name]')
-    for datacenter in datacenters:
-        if datacenter['name'] == location:
-            location = datacenter['id']
-            return location
-    raise ValueError('Invalid datacenter name specified.')
+    location_id = datacenters.get_registry(manager.client).get_id(location)
+    if location_id is None:
+        raise ValueError('Invalid datacenter name specified.')
+    return location_id
+
+
+class PriceIndex(object):
+    """The prices of a storage package, indexed for the find_*_price helpers.
+
+    Every price is filed under its category code and location group, and
+    again under each of its item's capacity, keyName, attribute values and
+    item category, so a lookup only walks the few prices sharing those keys
+    instead of every price in the package. Within a key, prices keep the
+    package's order, so lookups return what a scan of the package would.
+
+    :param package: The AsAService, Enterprise, or Performance product package
+    """
+
+    def __init__(self, package):
+        self._prices = {}
+        for item in package.get('items', []):
+            fields = _item_fields(item)
+            for price in item.get('prices', []):
+                entry = (fields, item, price)
+                codes = set(category.get('categoryCode')
+                            for category in price.get('categories', []))
+                for code in codes:
+                    key = (code, price.get('locationGroupId'))
+                    self._prices.setdefault(key, []).append(entry)
+                    for field, values in fields.items():
+                        for value in values:
+                            self._prices.setdefault(
+                                key + (field, value), []).append(entry)
+
+    def find(self, category_code, restriction=None, item_filter=None,
+             location_group_id='', **fields):
+        """Find the first price in a category matching the given conditions
+
+        :param category_code: The price category code to search for
+        :param restriction: An optional (capacityRestrictionType, value)
+                            tuple; the value has to be within the price's
+                            capacity restriction range
+        :param item_filter: An optional function, called with the item of a
+                            price, which returns False to skip the price
+        :param location_group_id: The location group of the price; '' for
+                                  prices valid in every location
+        :param fields: Item values to match, any of capacity, keyName,
+                       attribute or itemCategory
+        :return: Returns the price, or None if not found
+        """
+        key = (category_code, location_group_id)
+        if fields:
+            field = sorted(fields)[0]
+            key += (field, fields[field])
+
+        for item_fields, item, price in self._prices.get(key, ()):
+            if any(value not in item_fields.get(field, ())
+                   for field, value in fields.items()):
+                continue
+            if restriction is not None\
+                    and not _in_restriction(price, *restriction):
+                continue
+            if item_filter is not None and not item_filter(item):
+                continue
+            return price
+        return None
+
+
+class StoragePackage(dict):
+    """A product package returned by get_package()
+
+    Behaves like the package dict, and builds its PriceIndex on first use so
+    all the prices of one or more orders are resolved against one index.
+    """
+
+    _price_index = None
+
+    @property
+    def price_index(self):
+        """The PriceIndex of this package."""
+        if self._price_index is None:
+            self._price_index = PriceIndex(self)
+        return self._price_index
+
+
+def get_price_index(package):
+    """Returns the PriceIndex of a storage package
+
+    The index of a package fetched with get_package() is built once and kept
+    with the package; any other package is indexed on every call.
+
+    :param package: The AsAService, Enterprise, or Performance product package
+    """
+    if isinstance(package, StoragePackage):
+        return package.price_index
+    return PriceIndex(package)
 
 
 def find_price_by_category(package, price_category):
@@ -111,18 +201,12 @@ def find_price_by_category(package, price_category):
     :param price_category: The price category code to search for
     :return: Returns the price for the given category, or an error if not found
     """
-    for item in package['items']:
-        for price in item['prices']:
-            if price['locationGroupId'] != '':
-                continue
+    price = get_price_index(package).find(price_category)
+    if price is None:
+        raise ValueError("Could not find price with the category, %s"
+                         % price_category)
 
-            if not _has_category(price['categories'], price_category):
-                continue
-
-            return {'id': price['id']}
-
-    raise ValueError("Could not find price with the category, %s"
-                     % price_category)
+    return {'id': price['id']}
 
 
 def find_ent_space_price(package, category, size, tier_level):
@@ -141,27 +225,15 @@ def find_ent_space_price(package, category, size, tier_level):
     else:  # category == 'endurance'
         category_code = 'performance_storage_space'
 
-    for item in package['items']:
-        if int(item['capacity']) != size:
-            continue
-
-        for price in item['prices']:
-            # Only collect prices from valid location groups.
-            if price['locationGroupId'] != '':
-                continue
-
-            level = ENDURANCE_TIERS.get(tier_level)
-            if price['capacityRestrictionType'] != 'STORAGE_TIER_LEVEL'\
-                    or level < int(price['capacityRestrictionMinimum'])\
-                    or level > int(price['capacityRestrictionMaximum']):
-                continue
-
-            if not _has_category(price['categories'], category_code):
-                continue
+    level = ENDURANCE_TIERS.get(tier_level)
+    price = get_price_index(package).find(
+        category_code, capacity=size,
+        restriction=('STORAGE_TIER_LEVEL', level))
+    if price is None:
+        raise ValueError("Could not find price for %s storage space"
+                         % category)
 
-            return {'id': price['id']}
-
-    raise ValueError("Could not find price for %s storage space" % category)
+    return {'id': price['id']}
 
 
 def find_ent_endurance_tier_price(package, tier_level):
@@ -171,24 +243,12 @@ def find_ent_endurance_tier_price(package, tier_level):
     :param tier_level: The endurance tier for which a price is desired
     :return: Returns the price for the given tier, or an error if not found
     """
-    for item in package['items']:
-        for attribute in item.get('attributes', []):
-            if int(attribute['value']) == ENDURANCE_TIERS.get(tier_level):
-                break
-        else:
-            continue
+    price = get_price_index(package).find(
+        'storage_tier_level', attribute=ENDURANCE_TIERS.get(tier_level))
+    if price is None:
+        raise ValueError("Could not find price for endurance tier level")
 
-        for price in item['prices']:
-            # Only collect prices from valid location groups.
-            if price['locationGroupId'] != '':
-                continue
-
-            if not _has_category(price['categories'], 'storage_tier_level'):
-                continue
-
-            return {'id': price['id']}
-
-    raise ValueError("Could not find price for endurance tier level")
+    return {'id': price['id']}
 
 
 def find_endurance_tier_iops_per_gb(volume):
@@ -221,22 +281,13 @@ def find_perf_space_price(package, size):
     :param size: The storage space size for which a price is desired
     :return: Returns the price for the given size, or an error if not found
     """
-    for item in package['items']:
-        if int(item['capacity']) != size:
-            continue
+    price = get_price_index(package).find('performance_storage_space',
+                                          capacity=size)
+    if price is None:
+        raise ValueError(
+            "Could not find performance space price for this volume")
 
-        for price in item['prices']:
-            # Only collect prices from valid location groups.
-            if price['locationGroupId'] != '':
-                continue
-
-            if not _has_category(price['categories'],
-                                 'performance_storage_space'):
-                continue
-
-            return {'id': price['id']}
-
-    raise ValueError("Could not find performance space price for this volume")
+    return {'id': price['id']}
 
 
 def find_perf_iops_price(package, size, iops):
@@ -247,27 +298,13 @@ def find_perf_iops_price(package, size, iops):
     :param iops: The number of IOPS for which a price is desired
     :return: Returns the price for the size and IOPS, or an error if not found
     """
-    for item in package['items']:
-        if int(item['capacity']) != int(iops):
-            continue
-
-        for price in item['prices']:
-            # Only collect prices from valid location groups.
-            if price['locationGroupId'] != '':
-                continue
+    price = get_price_index(package).find(
+        'performance_storage_iops', capacity=int(iops),
+        restriction=('STORAGE_SPACE', size))
+    if price is None:
+        raise ValueError("Could not find price for iops for the given volume")
 
-            if not _has_category(price['categories'],
-                                 'performance_storage_iops'):
-                continue
-
-            if price['capacityRestrictionType'] != 'STORAGE_SPACE'\
-                    or size < int(price['capacityRestrictionMinimum'])\
-                    or size > int(price['capacityRestrictionMaximum']):
-                continue
-
-            return {'id': price['id']}
-
-    raise ValueError("Could not find price for iops for the given volume")
+    return {'id': price['id']}
 
 
 def find_saas_endurance_space_price(package, size, tier_level):
@@ -282,30 +319,13 @@ def find_saas_endurance_space_price(package, size, tier_level):
         tier_level = int(tier_level)
     key_name = 'STORAGE_SPACE_FOR_{0}_IOPS_PER_GB'.format(tier_level)
     key_name = key_name.replace(".", "_")
-    for item in package['items']:
-        if item['keyName'] != key_name:
-            continue
-
-        if 'capacityMinimum' not in item or 'capacityMaximum' not in item:
-            continue
-
-        capacity_minimum = int(item['capacityMinimum'])
-        capacity_maximum = int(item['capacityMaximum'])
-        if size < capacity_minimum or size > capacity_maximum:
-            continue
-
-        for price in item['prices']:
-            # Only collect prices from valid location groups.
-            if price['locationGroupId'] != '':
-                continue
-
-            if not _has_category(price['categories'],
-                                 'performance_storage_space'):
-                continue
-
-            return {'id': price['id']}
+    price = get_price_index(package).find(
+        'performance_storage_space', keyName=key_name,
+        item_filter=lambda item: _in_capacity_range(item, size))
+    if price is None:
+        raise ValueError("Could not find price for endurance storage space")
 
-    raise ValueError("Could not find price for endurance storage space")
+    return {'id': price['id']}
 
 
 def find_saas_endurance_tier_price(package, tier_level):
@@ -315,28 +335,13 @@ def find_saas_endurance_tier_price(package, tier_level):
     :param tier_level: The endurance tier for which a price is desired
     :return: Returns the price for the given tier, or an error if not found
     """
-    target_capacity = ENDURANCE_TIERS.get(tier_level)
-    for item in package['items']:
-        if 'itemCategory' not in item\
-                or 'categoryCode' not in item['itemCategory']\
-                or item['itemCategory']['categoryCode']\
-                != 'storage_tier_level':
-            continue
-
-        if int(item['capacity']) != target_capacity:
-            continue
-
-        for price in item['prices']:
-            # Only collect prices from valid location groups.
-            if price['locationGroupId'] != '':
-                continue
-
-            if not _has_category(price['categories'], 'storage_tier_level'):
-                continue
+    price = get_price_index(package).find(
+        'storage_tier_level', itemCategory='storage_tier_level',
+        capacity=ENDURANCE_TIERS.get(tier_level))
+    if price is None:
+        raise ValueError("Could not find price for endurance tier level")
 
-            return {'id': price['id']}
-
-    raise ValueError("Could not find price for endurance tier level")
+    return {'id': price['id']}
 
 
 def find_saas_perform_space_price(package, size):
@@ -346,37 +351,20 @@ def find_saas_perform_space_price(package, size):
     :param size: The volume size for which a price is desired
     :return: Returns the price for the size and tier, or an error if not found
     """
-    for item in package['items']:
-        if 'itemCategory' not in item\
-                or 'categoryCode' not in item['itemCategory']\
-                or item['itemCategory']['categoryCode']\
-                != 'performance_storage_space':
-            continue
-
-        if 'capacityMinimum' not in item or 'capacityMaximum' not in item:
-            continue
-
-        capacity_minimum = int(item['capacityMinimum'])
-        capacity_maximum = int(item['capacityMaximum'])
-        if size < capacity_minimum or size > capacity_maximum:
-            continue
-
-        key_name = '{0}_{1}_GBS'.format(capacity_minimum, capacity_maximum)
-        if item['keyName'] != key_name:
-            continue
-
-        for price in item['prices']:
-            # Only collect prices from valid location groups.
-            if price['locationGroupId'] != '':
-                continue
+    def _matches(item):
+        if not _in_capacity_range(item, size):
+            return False
+        key_name = '{0}_{1}_GBS'.format(int(item['capacityMinimum']),
+                                        int(item['capacityMaximum']))
+        return item['keyName'] == key_name
 
-            if not _has_category(price['categories'],
-                                 'performance_storage_space'):
-                continue
+    price = get_price_index(package).find(
+        'performance_storage_space', itemCategory='performance_storage_space',
+        item_filter=_matches)
+    if price is None:
+        raise ValueError("Could not find price for performance storage space")
 
-            return {'id': price['id']}
-
-    raise ValueError("Could not find price for performance storage space")
+    return {'id': price['id']}
 
 
 def find_saas_perform_iops_price(package, size, iops):
@@ -387,38 +375,14 @@ def find_saas_perform_iops_price(package, size, iops):
     :param iops: The number of IOPS for which a price is desired
     :return: Returns the price for the size and IOPS, or an error if not found
     """
-    for item in package['items']:
-        if 'itemCategory' not in item\
-                or 'categoryCode' not in item['itemCategory']\
-                or item['itemCategory']['categoryCode']\
-                != 'performance_storage_iops':
-            continue
-
-        if 'capacityMinimum' not in item or 'capacityMaximum' not in item:
-            continue
-
-        capacity_minimum = int(item['capacityMinimum'])
-        capacity_maximum = int(item['capacityMaximum'])
-        if iops < capacity_minimum or iops > capacity_maximum:
-            continue
-
-        for price in item['prices']:
-            # Only collect prices from valid location groups.
-            if price['locationGroupId'] != '':
-                continue
-
-            if not _has_category(price['categories'],
-                                 'performance_storage_iops'):
-                continue
-
-            if price['capacityRestrictionType'] != 'STORAGE_SPACE'\
-                    or size < int(price['capacityRestrictionMinimum'])\
-                    or size > int(price['capacityRestrictionMaximum']):
-                continue
-
-            return {'id': price['id']}
+    price = get_price_index(package).find(
+        'performance_storage_iops', itemCategory='performance_storage_iops',
+        restriction=('STORAGE_SPACE', size),
+        item_filter=lambda item: _in_capacity_range(item, iops))
+    if price is None:
+        raise ValueError("Could not find price for iops for the given volume")
 
-    raise ValueError("Could not find price for iops for the given volume")
+    return {'id': price['id']}
 
 
 def find_saas_snapshot_space_price(package, size, tier=None, iops=None):
@@ -431,33 +395,16 @@ def find_saas_snapshot_space_price(package, size, tier=None, iops=None):
     :return: Returns the price for the given size, or an error if not found
     """
     if tier is not None:
-        target_value = ENDURANCE_TIERS.get(tier)
-        target_restriction_type = 'STORAGE_TIER_LEVEL'
+        restriction = ('STORAGE_TIER_LEVEL', ENDURANCE_TIERS.get(tier))
     else:
-        target_value = iops
-        target_restriction_type = 'IOPS'
-
-    for item in package['items']:
-        if int(item['capacity']) != size:
-            continue
-
-        for price in item['prices']:
-            # Only collect prices from valid location groups.
-            if price['locationGroupId'] != '':
-                continue
-
-            if target_restriction_type != price['capacityRestrictionType']\
-                    or target_value < int(price['capacityRestrictionMinimum'])\
-                    or target_value > int(price['capacityRestrictionMaximum']):
-                continue
-
-            if not _has_category(price['categories'],
-                                 'storage_snapshot_space'):
-                continue
+        restriction = ('IOPS', iops)
 
-            return {'id': price['id']}
+    price = get_price_index(package).find(
+        'storage_snapshot_space', capacity=size, restriction=restriction)
+    if price is None:
+        raise ValueError("Could not find price for snapshot space")
 
-    raise ValueError("Could not find price for snapshot space")
+    return {'id': price['id']}
 
 
 def find_saas_replication_price(package, tier=None, iops=None):
@@ -469,35 +416,19 @@ def find_saas_replication_price(package, tier=None, iops=None):
     :return: Returns the replication price, or an error if not found
     """
     if tier is not None:
-        target_value = ENDURANCE_TIERS.get(tier)
         target_item_keyname = 'REPLICATION_FOR_TIERBASED_PERFORMANCE'
-        target_restriction_type = 'STORAGE_TIER_LEVEL'
+        restriction = ('STORAGE_TIER_LEVEL', ENDURANCE_TIERS.get(tier))
     else:
-        target_value = iops
         target_item_keyname = 'REPLICATION_FOR_IOPSBASED_PERFORMANCE'
-        target_restriction_type = 'IOPS'
+        restriction = ('IOPS', iops)
 
-    for item in package['items']:
-        if item['keyName'] != target_item_keyname:
-            continue
+    price = get_price_index(package).find(
+        'performance_storage_replication', keyName=target_item_keyname,
+        restriction=restriction)
+    if price is None:
+        raise ValueError("Could not find price for replicant volume")
 
-        for price in item['prices']:
-            # Only collect prices from valid location groups.
-            if price['locationGroupId'] != '':
-                continue
-
-            if target_restriction_type != price['capacityRestrictionType']\
-                    or target_value < int(price['capacityRestrictionMinimum'])\
-                    or target_value > int(price['capacityRestrictionMaximum']):
-                continue
-
-            if not _has_category(price['categories'],
-                                 'performance_storage_replication'):
-                continue
-
-            return {'id': price['id']}
-
-    raise ValueError("Could not find price for replicant volume")
+    return {'id': price['id']}
 
 
 def find_snapshot_schedule_id(volume, snapshot_schedule_keyname):
@@ -1079,13 +1010,39 @@ def prepare_modify_order_object(manager, volume, new_iops, new_tier, new_size):
     return modify_order
 
 
-def _has_category(categories, category_code):
-    return any(
-        True
-        for category
-        in categories
-        if category['categoryCode'] == category_code
-    )
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _item_fields(item):
+    """Returns the values a PriceIndex files the prices of an item under."""
+    fields = {
+        'capacity': [_to_int(item.get('capacity'))],
+        'keyName': [item.get('keyName')],
+        'attribute': [_to_int(attribute.get('value'))
+                      for attribute in item.get('attributes', [])],
+        'itemCategory': [utils.lookup(item, 'itemCategory', 'categoryCode')],
+    }
+    return dict((field, frozenset(value for value in values
+                                  if value is not None))
+                for field, values in fields.items())
+
+
+def _in_restriction(price, restriction_type, value):
+    if value is None or price.get('capacityRestrictionType') != restriction_type:
+        return False
+    return int(price['capacityRestrictionMinimum']) <= value\
+        <= int(price['capacityRestrictionMaximum'])
+
+
+def _in_capacity_range(item, value):
+    if 'capacityMinimum' not in item or 'capacityMaximum' not in item:
+        return False
+    return int(item['capacityMinimum']) <= value\
+        <= int(item['capacityMaximum'])
 
 
 def _staas_version_is_v2_or_above(volume):
@@ -5,9 +5,14 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import os
 
+from SoftLayer import transports
 from SoftLayer import utils
 
+#: Default size of the attachments upload_attachment_parts() splits files into
+ATTACHMENT_PART_SIZE = 100 * 1024 * 1024
+
 
 class TicketManager(utils.IdentifierMixin, object):
     """Manages SoftLayer support tickets.
@@ -83,9 +88,11 @@ class TicketManager(utils.IdentifierMixin, object):
         return self.ticket.addUpdate({'entry': body}, id=ticket_id)
 
     def upload_attachment(self, ticket_id=None, file_path=None,
-                          file_name=None):
+                          file_name=None, progress=None):
         """Upload an attachment to a ticket.
 
+        The file is streamed to the API, so it is never held in memory.
+
         :param integer ticket_id: the id of the ticket to
                                   upload the attachment to
         :param string file_path:
@@ -93,20 +100,54 @@ class TicketManager(utils.IdentifierMixin, object):
         :param string file_name:
                                   The name of the attachment shown
                                   in the ticket
+        :param progress: called with (bytes sent, file size) as the file is
+                         sent
 
         :returns: dict -- The uploaded attachment
         """
-        file_content = None
-        with open(file_path, 'rb') as attached_file:
-            file_content = attached_file.read()
-
         file_object = {
             "filename": file_name,
-            "data": file_content
+            "data": transports.StreamedFile(file_path, progress=progress)
         }
 
         return self.ticket.addAttachedFile(file_object, id=ticket_id)
 
+    def upload_attachment_parts(self, ticket_id=None, file_path=None,
+                                file_name=None, part_size=ATTACHMENT_PART_SIZE,
+                                progress=None):
+        """Upload a file to a ticket as several attachments.
+
+        A file larger than part_size is split into attachments named
+        file_name.001, file_name.002 and so on, which can be joined again
+        with `cat file_name.* > file_name`. Smaller files are uploaded as
+        they are.
+
+        :param integer ticket_id: the id of the ticket to
+                                  upload the attachments to
+        :param string file_path: The path of the file to be uploaded
+        :param string file_name: The name of the attachment shown
+                                 in the ticket
+        :param int part_size: maximum number of bytes per attachment
+        :param progress: called with (bytes sent, file size) as the file is
+                         sent
+
+        :returns: list -- The uploaded attachments
+        """
+        size = os.path.getsize(file_path)
+        if size <= part_size:
+            return [self.upload_attachment(ticket_id, file_path, file_name,
+                                           progress=progress)]
+
+        attachments = []
+        for number, offset in enumerate(range(0, size, part_size), 1):
+            attachments.append(self.ticket.addAttachedFile({
+                "filename": "%s.%03d" % (file_name, number),
+                "data": transports.StreamedFile(
+                    file_path, offset, part_size,
+                    progress=_part_progress(progress, offset, size)),
+            }, id=ticket_id))
+        return attachments
+
     def attach_hardware(self, ticket_id=None, hardware_id=None):
         """Attach hardware to a ticket.
 
@@ -146,3 +187,10 @@ class TicketManager(utils.IdentifierMixin, object):
         :returns: bool -- Whether the detachment was successful
         """
         return self.ticket.removeAttachedVirtualGuest(virtual_id, id=ticket_id)
+
+
+def _part_progress(progress, offset, size):
+    """Reports the progress of a part of a file as progress of the file."""
+    if progress is None:
+        return None
+    return lambda sent, _: progress(offset + sent, size)
@@ -11,6 +11,7 @@ import socket
 import time
 import warnings
 
+from SoftLayer import bulk
 from SoftLayer.decoration import retry
 from SoftLayer import exceptions
 from SoftLayer.managers import ordering
@@ -18,7 +19,7 @@ from SoftLayer import utils
 
 
 LOGGER = logging.getLogger(__name__)
-# pylint: disable=no-self-use
+# pylint: disable=no-self-use,too-many-lines
 
 
 class VSManager(utils.IdentifierMixin, object):
@@ -51,6 +52,8 @@ class VSManager(utils.IdentifierMixin, object):
         self.account = client['Account']
         self.guest = client['Virtual_Guest']
         self.resolvers = [self._get_ids_from_ip, self._get_ids_from_hostname]
+        self.batch_resolvers = [self._get_ids_from_ips,
+                                self._get_ids_from_hostnames]
         if ordering_manager is None:
             self.ordering_manager = ordering.OrderingManager(client)
         else:
@@ -300,6 +303,105 @@ class VSManager(utils.IdentifierMixin, object):
         return self.client.call('Virtual_Guest', 'reloadOperatingSystem',
                                 'FORCE', config, id=instance_id)
 
+    def cancel_instances(self, instance_ids, **kwargs):
+        """Cancel many instances immediately, deleting all their data.
+
+        :param list instance_ids: the instance IDs to cancel
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+
+        Example::
+
+            report = mgr.cancel_instances([12345, 12346], workers=4, rate=2)
+            for instance_id, error in report.failed.items():
+                print(instance_id, error)
+
+            # Try again, only for the instances that failed
+            mgr.cancel_instances([12345, 12346], report=report)
+        """
+        return bulk.run_bulk(self.cancel_instance, instance_ids, **kwargs)
+
+    def reload_instances(self, instance_ids, post_uri=None, ssh_keys=None,
+                         image_id=None, **kwargs):
+        """Perform an OS reload of many instances.
+
+        See :func:`reload_instance` for the reload options.
+
+        :param list instance_ids: the instance IDs to reload
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        def reload_one(instance_id):
+            """Reloads a single instance."""
+            return self.reload_instance(instance_id, post_uri=post_uri,
+                                        ssh_keys=ssh_keys, image_id=image_id)
+
+        return bulk.run_bulk(reload_one, instance_ids, **kwargs)
+
+    def edit_instances(self, instance_ids, userdata=None, domain=None,
+                       notes=None, tags=None, **kwargs):
+        """Edit domain name, notes, tags and/or the user data of many instances.
+
+        See :func:`edit` for the options. Hostnames are unique to each instance
+        so they can't be edited in bulk.
+
+        :param list instance_ids: the instance IDs to edit
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        def edit_one(instance_id):
+            """Edits a single instance."""
+            return self.edit(instance_id, userdata=userdata, domain=domain,
+                             notes=notes, tags=tags)
+
+        return bulk.run_bulk(edit_one, instance_ids, **kwargs)
+
+    def reboot_instances(self, instance_ids, hard=None, **kwargs):
+        """Reboot many instances.
+
+        :param list instance_ids: the instance IDs to reboot
+        :param bool hard: True for a hard reboot, False for a soft reboot and
+                          None to let the API decide.
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        method = {True: 'rebootHard', False: 'rebootSoft'}.get(hard, 'rebootDefault')
+        return self._bulk_call(method, instance_ids, **kwargs)
+
+    def power_off_instances(self, instance_ids, hard=False, **kwargs):
+        """Power off many instances.
+
+        :param list instance_ids: the instance IDs to power off
+        :param bool hard: perform a hard shutdown
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        method = 'powerOff' if hard else 'powerOffSoft'
+        return self._bulk_call(method, instance_ids, **kwargs)
+
+    def power_on_instances(self, instance_ids, **kwargs):
+        """Power on many instances.
+
+        :param list instance_ids: the instance IDs to power on
+        :param dict \\*\\*kwargs: bulk options (workers, rate, report). See
+                                  :func:`SoftLayer.bulk.run_bulk`
+        :returns: a :class:`SoftLayer.bulk.BulkReport`
+        """
+        return self._bulk_call('powerOn', instance_ids, **kwargs)
+
+    def _bulk_call(self, method, instance_ids, **kwargs):
+        """Calls a Virtual_Guest method for many instances."""
+        def call(instance_id):
+            """Calls the method for a single instance."""
+            return self.client.call('Virtual_Guest', method, id=instance_id)
+
+        return bulk.run_bulk(call, instance_ids, **kwargs)
+
     def _generate_create_dict(
             self, cpus=None, memory=None, hourly=True,
             hostname=None, domain=None, local_disk=True,
@@ -467,6 +569,41 @@ class VSManager(utils.IdentifierMixin, object):
         LOGGER.info("Waiting for %d expired.", instance_id)
         return False
 
+    def wait_for_ready_many(self, instance_ids, limit=3600, delay=10,
+                            pending=False, max_delay=None):
+        """Wait for many instances to become ready, polling them all at once.
+
+        Instead of polling each VS, every poll fetches all of the
+        instances which are not ready yet with a single call. See
+        :func:`wait_for_ready` for what ready means.
+
+        :param list instance_ids: The instance IDs to wait for
+        :param int limit: The maximum amount of seconds to wait.
+        :param int delay: The number of seconds to sleep before the first
+                          re-poll. The interval grows while nothing becomes
+                          ready, up to max_delay.
+        :param bool pending: Wait for pending transactions too.
+        :param int max_delay: The longest poll interval. Defaults to 6 * delay.
+        :returns: generator of (instance_id, ready) tuples, yielded as soon as
+                  each VS is ready. Instances that were not ready
+                  within limit are yielded last with ready set to False.
+
+        Example::
+
+            for instance_id, ready in mgr.wait_for_ready_many([1234, 1235]):
+                print(instance_id, ready)
+        """
+        mask = "mask[id, lastOperatingSystemReload[id], activeTransaction[id], provisionDate]"
+
+        def fetch(ids):
+            """Fetches the readiness data of the given instances."""
+            _filter = {'virtualGuests': {'id': utils.query_filter_in(ids)}}
+            return self.list_instances(mask=mask, filter=_filter)
+
+        return utils.wait_for_ready_many(fetch, instance_ids, limit,
+                                         delay=delay, pending=pending,
+                                         max_delay=max_delay)
+
     def verify_create_instance(self, **kwargs):
         """Verifies an instance creation command.
 
@@ -610,16 +747,100 @@ class VSManager(utils.IdentifierMixin, object):
             #vsi will be a dictionary of all the new virtual servers
             print vsi
         """
-        tags = [conf.pop('tags', None) for conf in config_list]
+        report = self.provision_instances(config_list, chunk_size=None)
+        if report.errors:
+            raise report.errors[0]
+        return report.created
+
+    def provision_instances(self, config_list, chunk_size=50,
+                            workers=bulk.DEFAULT_WORKERS, rate=None,
+                            wait=False, limit=3600, delay=10):
+        """Creates many virtual server instances, tags them and optionally
+        waits for them to be ready.
+
+        The configs are split into chunks which are ordered concurrently with
+        one createObjects call each. The instances of a chunk are queued for
+        tagging as soon as the chunk is created, while other chunks are still
+        being ordered. Ordering and tagging share one pool of workers, so no
+        more than `workers` API calls run at the same time. A failed chunk or
+        tag doesn't stop the rest.
+
+        The readiness wait starts once every chunk was ordered and tagged.
+        Ordering only takes seconds while provisioning takes minutes, so this
+        barely delays the instances of the first chunks.
+
+        .. warning::
+
+            This will add charges to your account
+
+        :param list config_list: dictionaries using the same arguments as
+                                 create_instance()
+        :param int chunk_size: maximum number of instances per createObjects
+                               call. None orders everything with one call.
+        :param int workers: maximum number of concurrent API calls
+        :param rate: maximum number of API calls started per second
+        :param bool wait: wait for the created instances to be ready
+        :param int limit: The maximum amount of seconds to wait.
+        :param int delay: The number of seconds to sleep before re-polling.
+        :returns: a SoftLayer.bulk.ProvisionReport
+
+        Example::
+
+            report = mgr.provision_instances(instances, wait=True)
+            for guest in report.created:
+                print(guest['id'], report.ready.get(guest['id']))
+        """
+        configs = [dict(conf) for conf in config_list]
+        tags = [conf.pop('tags', None) for conf in configs]
+        size = chunk_size or len(configs) or 1
+
+        def run(task):
+            """Orders a chunk or tags a single instance."""
+            if task[0] == 'create':
+                return self.guest.createObjects(
+                    [self._generate_create_dict(**kwargs)
+                     for kwargs in task[2]])
+            return self.set_tags(task[2], guest_id=task[1])
+
+        pool = bulk.WorkerPool(run, workers=workers, rate=rate)
+        for start in range(0, len(configs), size):
+            pool.submit(('create', start, configs[start:start + size],
+                         tags[start:start + size]))
+
+        report = bulk.ProvisionReport()
+        created = {}
+        try:
+            for task, result, error in pool.as_completed():
+                if task[0] == 'create':
+                    _, start, chunk_configs, chunk_tags = task
+                    if error is not None:
+                        LOGGER.warning("Creating %d instances failed: %s",
+                                       len(chunk_configs), error)
+                        report.create_errors[start // size] = (chunk_configs,
+                                                               error)
+                        continue
+                    created[start] = result
+                    for instance, tag in zip(result, chunk_tags):
+                        if tag is not None:
+                            pool.submit(('tag', instance['id'], tag))
+                elif error is not None:
+                    LOGGER.warning("Tagging %s failed: %s", task[1], error)
+                    report.tag_errors[task[1]] = error
+                else:
+                    report.tagged[task[1]] = task[2]
+        finally:
+            pool.close()
 
-        resp = self.guest.createObjects([self._generate_create_dict(**kwargs)
-                                         for kwargs in config_list])
+        for start in sorted(created):
+            report.created.extend(created[start])
 
-        for instance, tag in zip(resp, tags):
-            if tag is not None:
-                self.set_tags(tag, guest_id=instance['id'])
+        if wait and report.created:
+            for guest_id, ready in self.wait_for_ready_many(
+                    [guest['id'] for guest in report.created],
+                    limit=limit, delay=delay):
+                report.ready[guest_id] = ready
 
-        return resp
+        return report
 
     def change_port_speed(self, instance_id, public, speed):
         """Allows you to change the port speed of a virtual server's NICs.
@@ -671,6 +892,32 @@ class VSManager(utils.IdentifierMixin, object):
         if results:
             return [result['id'] for result in results]
 
+    def _get_ids_from_hostnames(self, hostnames):
+        """Maps each hostname to the matching VS ids with one API call."""
+        _filter = {'virtualGuests': {'hostname': utils.query_filter_in(hostnames)}}
+        results = self.list_instances(mask="id,hostname", filter=_filter)
+        return utils.group_ids_by(results, 'hostname', hostnames,
+                                  normalize=lambda name: name.lower())
+
+    def _get_ids_from_ips(self, ips):
+        """Maps each ip address to the matching VS ids.
+
+        Public addresses are looked up first, then whatever did not match is
+        looked up as a private address.
+        """
+        found = {}
+        pending = [ip for ip in ips if utils.is_ip_address(ip)]
+        for prop in ['primaryIpAddress', 'primaryBackendIpAddress']:
+            if not pending:
+                break
+            _filter = {'virtualGuests': {prop: utils.query_filter_in(pending)}}
+            results = self.list_instances(mask="id,%s" % prop, filter=_filter)
+            for ip, ids in utils.group_ids_by(results, prop, pending).items():
+                if ids:
+                    found[ip] = ids
+            pending = [ip for ip in pending if ip not in found]
+        return found
+
     def edit(self, instance_id, userdata=None, hostname=None, domain=None,
              notes=None, tags=None):
         """Edit hostname, domain name, notes, and/or the user data of a VS.
@@ -0,0 +1,268 @@
+"""
+    SoftLayer.masks
+    ~~~~~~~~~~~~~~~
+    Local object mask projection.
+
+    Applies an object mask to data that did not come straight from the API
+    (fixtures, cached responses, inventory mirrors) so that it has the same
+    shape the API would have returned.
+
+    :license: MIT, see LICENSE for more details.
+"""
+import re
+
+from SoftLayer import exceptions
+
+_TOKEN_RE = re.compile(r'\s*(?:([A-Za-z0-9_]+)|(.))', re.S)
+
+# Compiled masks are cached by their string form. Masks are almost always
+# module level constants so this stays small, but it is capped anyway.
+_CACHE = {}
+_CACHE_SIZE = 256
+
+
+def _identity(value):
+    """Projection used for properties that are requested as a whole."""
+    return value
+
+
+class ObjectMask(object):
+    """A parsed object mask which can be applied to API-shaped data.
+
+    ::
+
+        >>> mask = ObjectMask('mask[id,datacenter[name]]')
+        >>> mask.apply({'id': 1, 'hostname': 'a', 'datacenter': {'id': 2, 'name': 'dal05'}})
+        {'id': 1, 'datacenter': {'name': 'dal05'}}
+
+    :param mask: a string- or dict-based object mask
+    """
+
+    def __init__(self, mask):
+        if isinstance(mask, dict):
+            self.tree = _tree_from_dict(mask)
+        else:
+            self.tree = _Parser(mask).parse()
+        self._project = _compile(self.tree)
+
+    def apply(self, data):
+        """Returns a copy of data which only contains the masked properties.
+
+        Lists are projected item by item. Properties which are masked without
+        any children are returned as-is (they are not copied).
+
+        :param data: a dict, a list of dicts or a scalar value
+        """
+        return self._project(data)
+
+    __call__ = apply
+
+    def __repr__(self):
+        return "<ObjectMask: %s>" % (_format_tree(self.tree),)
+
+
+def compile_mask(mask):
+    """Returns an ObjectMask for the given mask, reusing a compiled one.
+
+    :param mask: a string- or dict-based object mask (or an ObjectMask)
+    """
+    if isinstance(mask, ObjectMask):
+        return mask
+    if isinstance(mask, dict):
+        return ObjectMask(mask)
+
+    compiled = _CACHE.get(mask)
+    if compiled is None:
+        if len(_CACHE) >= _CACHE_SIZE:
+            _CACHE.clear()
+        compiled = _CACHE[mask] = ObjectMask(mask)
+    return compiled
+
+
+def apply_mask(data, mask):
+    """Applies an object mask to data.
+
+    :param data: a dict, a list of dicts or a scalar value
+    :param mask: a string- or dict-based object mask. None returns data
+                 untouched.
+    """
+    if not mask:
+        return data
+    return compile_mask(mask).apply(data)
+
+
+def _compile(tree):
+    """Turns a mask tree into a projection function.
+
+    Each level of the tree is resolved to a list of (property, projection)
+    pairs once, so applying the mask is a plain loop over those pairs.
+    """
+    if not tree:
+        return _identity
+
+    properties = [(key, _compile(child)) for key, child in sorted(tree.items())]
+
+    def project(value):
+        """Projects a single value through this level of the mask."""
+        if isinstance(value, dict):
+            result = {}
+            for key, child in properties:
+                if key in value:
+                    result[key] = child(value[key])
+            return result
+        if isinstance(value, list):
+            return [project(item) for item in value]
+        return value
+
+    return project
+
+
+def _merge(tree, key, child):
+    """Merges a property into a mask tree.
+
+    A property masked as a whole wins over a property masked with children.
+    """
+    if key not in tree:
+        tree[key] = child
+    elif tree[key] is None or child is None:
+        tree[key] = None
+    else:
+        for sub_key, sub_child in child.items():
+            _merge(tree[key], sub_key, sub_child)
+
+
+def _tree_from_dict(mask):
+    """Builds a mask tree from an old-style dict mask."""
+    tree = {}
+    for key, child in mask.items():
+        if isinstance(child, dict) and child:
+            _merge(tree, key, _tree_from_dict(child))
+        else:
+            _merge(tree, key, None)
+    return tree
+
+
+def _format_tree(tree):
+    """Formats a mask tree back into a string mask."""
+    parts = []
+    for key, child in sorted(tree.items()):
+        if child:
+            parts.append('%s[%s]' % (key, _format_tree(child)))
+        else:
+            parts.append(key)
+    return ','.join(parts)
+
+
+class _Parser(object):
+    """Recursive descent parser for string object masks.
+
+    Supports nested brackets, dotted paths, type casts such as
+    ``mask(SoftLayer_Hardware_Server)[...]`` and compound masks such as
+    ``[mask[...], mask(SoftLayer_Hardware_Server)[...]]``.
+    """
+
+    def __init__(self, mask):
+        self.mask = mask
+        self.tokens = []
+        for match in _TOKEN_RE.finditer(mask):
+            name, char = match.groups()
+            if name:
+                self.tokens.append(('name', name))
+            elif char and not char.isspace():
+                self.tokens.append(('char', char))
+        self.pos = 0
+
+    def parse(self):
+        """Parses the whole mask into a tree."""
+        tree = {}
+        self._parse_list(tree)
+        if self.pos < len(self.tokens):
+            self._error('unexpected %r' % self.tokens[self.pos][1])
+        return tree
+
+    def _error(self, message):
+        raise exceptions.SoftLayerError(
+            'Invalid object mask %r: %s' % (self.mask, message))
+
+    def _peek(self, value=None):
+        if self.pos >= len(self.tokens):
+            return None
+        token = self.tokens[self.pos]
+        if value is not None and token[1] != value:
+            return None
+        return token
+
+    def _expect(self, value):
+        if self._peek(value) is None:
+            self._error('expected %r' % value)
+        self.pos += 1
+
+    def _name(self):
+        token = self._peek()
+        if token is None or token[0] != 'name':
+            self._error('expected a property name')
+        self.pos += 1
+        return token[1]
+
+    def _parse_list(self, tree):
+        """Parses comma separated items into tree."""
+        while self._peek() is not None and self._peek(']') is None:
+            if self._peek(','):
+                self.pos += 1
+                continue
+            self._parse_item(tree)
+
+    def _parse_item(self, tree):
+        """Parses a single item, which may be a nested mask or a property."""
+        if self._peek('['):
+            self._parse_group(tree)
+            return
+
+        token = self._peek()
+        is_root = token == ('name', 'mask') and (
+            self._lookahead('[') or self._lookahead('(') or self._lookahead('.'))
+        if is_root:
+            self.pos += 1
+            self._skip_cast()
+            if self._peek('.'):
+                self.pos += 1
+                self._parse_path(tree)
+            else:
+                self._parse_group(tree)
+            return
+
+        self._parse_path(tree)
+
+    def _lookahead(self, value):
+        pos = self.pos + 1
+        return pos < len(self.tokens) and self.tokens[pos][1] == value
+
+    def _skip_cast(self):
+        """Skips a type cast like (SoftLayer_Hardware_Server)."""
+        if self._peek('('):
+            self.pos += 1
+            self._name()
+            self._expect(')')
+
+    def _parse_group(self, tree):
+        self._expect('[')
+        self._parse_list(tree)
+        self._expect(']')
+
+    def _parse_path(self, tree):
+        """Parses a dotted property path with optional children."""
+        path = [self._name()]
+        while self._peek('.'):
+            self.pos += 1
+            path.append(self._name())
+        self._skip_cast()
+
+        child = None
+        if self._peek('['):
+            child = {}
+            self._parse_group(child)
+            child = child or None
+
+        for key in reversed(path[1:]):
+            child = {key: child}
+        _merge(tree, path[0], child)
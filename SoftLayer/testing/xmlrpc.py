@@ -31,8 +31,7 @@ class TestHandler(six.moves.BaseHTTPServer.BaseHTTPRequestHandler):
     def do_POST(self):
         """Handle XML-RPC POSTs."""
         try:
-            length = int(self.headers['Content-Length'])
-            data = self.rfile.read(length).decode('utf-8')
+            data = self._read_body().decode('utf-8')
             args, method = utils.xmlrpc_client.loads(data)
             headers = args[0].get('headers', {})
 
@@ -78,6 +77,22 @@ class TestHandler(six.moves.BaseHTTPServer.BaseHTTPRequestHandler):
             self.send_response(500)
             logging.exception("Error while handling request")
 
+    def _read_body(self):
+        """Reads the request body, which may use chunked transfer encoding."""
+        if self.headers.get('Transfer-Encoding', '').lower() != 'chunked':
+            return self.rfile.read(int(self.headers['Content-Length']))
+
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b';')[0], 16)
+            if size == 0:
+                # Skip trailers, up to the empty line ending the body
+                while self.rfile.readline().strip():
+                    pass
+                return b''.join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
     def log_message(self, fmt, *args):
         """Override log_message."""
         pass
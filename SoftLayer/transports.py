@@ -5,17 +5,22 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import base64
 import importlib
+import itertools
 import json
 import logging
+import os
 import time
 
 import requests
 from requests.adapters import HTTPAdapter
+import six
 from urllib3.util.retry import Retry
 
 from SoftLayer import consts
 from SoftLayer import exceptions
+from SoftLayer import masks
 from SoftLayer import utils
 
 LOGGER = logging.getLogger(__name__)
@@ -29,6 +34,7 @@ __all__ = [
     'TimingTransport',
     'FixtureTransport',
     'SoftLayerListResult',
+    'StreamedFile',
 ]
 
 REST_SPECIAL_METHODS = {
@@ -40,6 +46,15 @@ REST_SPECIAL_METHODS = {
 }
 
 
+#: Bytes of a StreamedFile read at a time, and of an XML-RPC payload
+#: serialized before it is handed over. This is a multiple of 3, so every
+#: chunk of a file base64-encodes on its own, without padding.
+STREAM_CHUNK_SIZE = 3 * 64 * 1024
+
+#: XML-RPC payloads of at least this many bytes are streamed
+STREAM_THRESHOLD = 1024 * 1024
+
+
 def get_session(user_agent):
     """Sets up urllib sessions"""
 
@@ -101,6 +116,214 @@ class Request(object):
         self.offset = None
 
 
+class StreamedFile(object):
+    """An API argument holding (part of) a file as base64 data.
+
+    The XML-RPC transport encodes and sends the file a chunk at a time while
+    the request body is being written, so the file is never held in memory.
+    Use it wherever a method takes base64 data::
+
+        client['Ticket'].addAttachedFile({
+            'filename': 'logs.tar.gz',
+            'data': StreamedFile('logs.tar.gz'),
+        }, id=ticket_id)
+
+    :param string path: the file to send
+    :param int offset: where in the file to start
+    :param int length: how many bytes to send. Defaults to the rest of the
+                       file.
+    :param progress: called with (bytes sent, bytes to send) after every chunk
+    """
+
+    def __init__(self, path, offset=0, length=None, progress=None):
+        self.path = path
+        self.offset = offset
+        remaining = max(os.path.getsize(path) - offset, 0)
+        self.length = remaining if length is None else min(length, remaining)
+        self.progress = progress
+
+    @property
+    def encoded_length(self):
+        """The length of the file's base64 encoding."""
+        return (self.length + 2) // 3 * 4
+
+    def iter_encoded(self, chunk_size=STREAM_CHUNK_SIZE):
+        """Yields the base64 encoding of the file, a chunk at a time."""
+        chunk_size -= chunk_size % 3
+        sent = 0
+        with open(self.path, 'rb') as file_obj:
+            file_obj.seek(self.offset)
+            while sent < self.length:
+                chunk = file_obj.read(min(chunk_size, self.length - sent))
+                if not chunk:
+                    raise IOError("%s was truncated while being sent"
+                                  % self.path)
+                sent += len(chunk)
+                yield base64.b64encode(chunk)
+                if self.progress is not None:
+                    self.progress(sent, self.length)
+
+    def read(self):
+        """Reads all of the file's data, for transports that can't stream."""
+        with open(self.path, 'rb') as file_obj:
+            file_obj.seek(self.offset)
+            return file_obj.read(self.length)
+
+    def __repr__(self):
+        return "<StreamedFile: %s [%d:%d]>" % (self.path, self.offset,
+                                               self.offset + self.length)
+
+
+class _XmlRpcWriter(object):
+    """Writes an XML-RPC methodCall, yielding it a chunk at a time.
+
+    Containers are walked here and StreamedFiles are read a chunk at a
+    time. Everything else is written by the standard library's Marshaller,
+    so the output is the same as xmlrpc_client.dumps().
+    """
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.marshaller = utils.xmlrpc_client.Marshaller(allow_none=True)
+        self.escape = utils.xmlrpc_client.escape
+        self.memo = set()
+        self.out = []
+        self.size = 0
+
+    def write(self, text):
+        """Buffers a piece of the payload."""
+        self.out.append(text)
+        self.size += len(text)
+
+    def flush(self):
+        """Returns the buffered payload as bytes and empties the buffer."""
+        data = ''.join(self.out).encode('utf-8')
+        self.out, self.size = [], 0
+        return data
+
+    def method_call(self, params, methodname):
+        """Yields the chunks of a whole methodCall."""
+        self.write("<?xml version='1.0'?>\n<methodCall>\n"
+                   "<methodName>%s</methodName>\n<params>\n" % methodname)
+        for param in params:
+            self.write("<param>\n")
+            for chunk in self.dump(param):
+                yield chunk
+            self.write("</param>\n")
+        self.write("</params>\n</methodCall>\n")
+        yield self.flush()
+
+    def dump(self, value):
+        """Writes a value, yielding a chunk whenever the buffer is full."""
+        dumper = _SCALAR_DUMPERS.get(type(value))
+        if dumper is not None:
+            dumper(self.marshaller, value, self.write)
+        elif isinstance(value, StreamedFile):
+            self.write("<value><base64>")
+            yield self.flush()
+            for chunk in value.iter_encoded(self.chunk_size):
+                yield chunk
+            self.write("</base64></value>\n")
+        elif isinstance(value, (list, tuple)):
+            for chunk in self._dump_array(value):
+                yield chunk
+        elif isinstance(value, dict):
+            for chunk in self._dump_struct(value):
+                yield chunk
+        elif hasattr(value, '__dict__'):
+            for chunk in self._dump_struct(value.__dict__):
+                yield chunk
+        else:
+            raise TypeError("cannot marshal %s objects" % type(value))
+
+        if self.size >= self.chunk_size:
+            yield self.flush()
+
+    def _enter(self, value, kind):
+        if id(value) in self.memo:
+            raise TypeError("cannot marshal recursive %s" % kind)
+        self.memo.add(id(value))
+
+    def _dump_array(self, value):
+        self._enter(value, 'sequences')
+        self.write("<value><array><data>\n")
+        for item in value:
+            dumper = _SCALAR_DUMPERS.get(type(item))
+            if dumper is not None:
+                dumper(self.marshaller, item, self.write)
+            elif not self._write_flat_struct(item):
+                for chunk in self.dump(item):
+                    yield chunk
+            if self.size >= self.chunk_size:
+                yield self.flush()
+        self.write("</data></array></value>\n")
+        self.memo.discard(id(value))
+
+    def _write_flat_struct(self, value):
+        """Writes a dict of scalars, like most API objects, without nesting
+        generators. Returns False, having written nothing, for anything else.
+        """
+        if type(value) is not dict:  # pylint: disable=unidiomatic-typecheck
+            return False
+        dumpers = [_SCALAR_DUMPERS.get(type(item)) for item in value.values()]
+        if None in dumpers:
+            return False
+
+        start = len(self.out)
+        write, marshaller, escape = self.out.append, self.marshaller, self.escape
+        write("<value><struct>\n")
+        for (key, item), dumper in zip(value.items(), dumpers):
+            if not isinstance(key, six.string_types):
+                raise TypeError("dictionary key must be string")
+            write("<member>\n<name>%s</name>\n" % escape(key))
+            dumper(marshaller, item, write)
+            write("</member>\n")
+        write("</struct></value>\n")
+        self.size += sum(map(len, self.out[start:]))
+        return True
+
+    def _dump_struct(self, value):
+        self._enter(value, 'dictionaries')
+        self.write("<value><struct>\n")
+        for key, item in value.items():
+            if not isinstance(key, six.string_types):
+                raise TypeError("dictionary key must be string")
+            self.write("<member>\n<name>%s</name>\n" % self.escape(key))
+            dumper = _SCALAR_DUMPERS.get(type(item))
+            if dumper is not None:
+                dumper(self.marshaller, item, self.write)
+            else:
+                for chunk in self.dump(item):
+                    yield chunk
+            self.write("</member>\n")
+            if self.size >= self.chunk_size:
+                yield self.flush()
+        self.write("</struct></value>\n")
+        self.memo.discard(id(value))
+
+
+# The Marshaller's own functions for every type that isn't a container
+_SCALAR_DUMPERS = dict(
+    (type_, dumper)
+    for type_, dumper in utils.xmlrpc_client.Marshaller.dispatch.items()
+    if isinstance(type_, type) and type_ not in (list, tuple, dict))
+
+
+def iter_dumps(params, methodname, chunk_size=STREAM_CHUNK_SIZE):
+    """Serializes an XML-RPC methodCall a chunk at a time.
+
+    The output is xmlrpc_client.dumps(params, methodname, allow_none=True)
+    encoded as UTF-8, but only about chunk_size bytes of it are held at a
+    time. StreamedFile values are read from their file as they are reached.
+
+    :param tuple params: the method's parameters
+    :param string methodname: the method's name
+    :param int chunk_size: how many bytes to buffer before yielding them
+    :returns: generator of bytes
+    """
+    return _XmlRpcWriter(chunk_size).method_call(params, methodname)
+
+
 class SoftLayerListResult(list):
     """A SoftLayer API list result."""
 
@@ -164,9 +387,7 @@ class XmlRpcTransport(object):
         request.transport_headers.setdefault('User-Agent', self.user_agent)
 
         url = '/'.join([self.endpoint_url, request.service])
-        payload = utils.xmlrpc_client.dumps(tuple(largs),
-                                            methodname=request.method,
-                                            allow_none=True)
+        data = _xmlrpc_body(iter_dumps(tuple(largs), request.method))
 
         # Prefer the request setting, if it's not None
         verify = request.verify
@@ -176,11 +397,12 @@ class XmlRpcTransport(object):
         LOGGER.debug("=== REQUEST ===")
         LOGGER.debug('POST %s', url)
         LOGGER.debug(request.transport_headers)
-        LOGGER.debug(payload)
+        LOGGER.debug(data if isinstance(data, six.string_types)
+                     else '(streamed payload)')
 
         try:
             resp = self.client.request('POST', url,
-                                       data=payload,
+                                       data=data,
                                        headers=request.transport_headers,
                                        timeout=self.timeout,
                                        verify=verify,
@@ -285,7 +507,7 @@ class RestTransport(object):
 
         raw_body = None
         if body:
-            raw_body = json.dumps(body)
+            raw_body = json.dumps(body, default=_json_default)
 
         url_parts = [self.endpoint_url, request.service]
         if request.identifier is not None:
@@ -363,7 +585,14 @@ class TimingTransport(object):
 
 
 class FixtureTransport(object):
-    """Implements a transport which returns fixtures."""
+    """Implements a transport which returns fixtures.
+
+    :param bool apply_mask: project fixtures through the requested object mask
+                            so responses have the shape the API would return.
+    """
+    def __init__(self, apply_mask=False):
+        self.apply_mask = apply_mask
+
     def __call__(self, call):
         """Load fixture from the default fixture path."""
         try:
@@ -372,10 +601,38 @@ class FixtureTransport(object):
         except ImportError:
             raise NotImplementedError('%s fixture is not implemented' % call.service)
         try:
-            return getattr(module, call.method)
+            result = getattr(module, call.method)
         except AttributeError:
             raise NotImplementedError('%s::%s fixture is not implemented' % (call.service, call.method))
 
+        if self.apply_mask and call.mask:
+            result = masks.apply_mask(result, call.mask)
+        return result
+
+
+def _xmlrpc_body(chunks):
+    """Returns the body of an XML-RPC request.
+
+    Payloads smaller than STREAM_THRESHOLD are returned as a string. Bigger
+    ones are returned as an iterator, which requests sends with chunked
+    transfer encoding while the rest of the payload is being serialized.
+    """
+    head = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_THRESHOLD:
+            return itertools.chain(head, chunks)
+    return b''.join(head).decode('utf-8')
+
+
+def _json_default(value):
+    """Encodes StreamedFiles for json.dumps(), which can't stream them."""
+    if isinstance(value, StreamedFile):
+        return base64.b64encode(value.read()).decode('ascii')
+    raise TypeError("%r is not JSON serializable" % value)
+
 
 def _proxies_dict(proxy):
     """Makes a proxy dict appropriate to pass to requests."""
@@ -5,15 +5,24 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import calendar
 import datetime
+import logging
 import re
+import socket
+import time
 
 import six
 
 # pylint: disable=no-member, invalid-name
 
+LOGGER = logging.getLogger(__name__)
 UUID_RE = re.compile(r'^[0-9a-f\-]{36}$', re.I)
 KNOWN_OPERATIONS = ['<=', '>=', '<', '>', '~', '!~', '*=', '^=', '$=', '_=']
+DATETIME_RE = re.compile(
+    r'^(\d{4}-\d{2}-\d{2})(?:[T ](\d{2}:\d{2}:\d{2})(?:\.\d+)?)?'
+    r'\s*(?:(Z)|([+-])(\d{2}):?(\d{2}))?')
+EPOCH = datetime.datetime(1970, 1, 1)
 
 configparser = six.moves.configparser
 string_types = six.string_types
@@ -108,6 +117,17 @@ def query_filter(query):
     return {'operation': query}
 
 
+def query_filter_in(values):
+    """Translate a list of values to an 'in' filter.
+
+    :param list values: values to match exactly
+    """
+    return {
+        'operation': 'in',
+        'options': [{'name': 'data', 'value': list(values)}],
+    }
+
+
 def query_filter_date(start, end):
     """Query filters given start and end date.
 
@@ -127,6 +147,69 @@ def query_filter_date(start, end):
     }
 
 
+def to_timestamp(value):
+    """Converts a datetime or an API dateTime string to a UNIX timestamp.
+
+    Naive datetimes and strings without an offset are taken to be UTC.
+
+    :param value: a datetime, a string like '2017-05-04T00:00:00-06:00' or
+                  '2017-05-04', or a number, which is returned as a float
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    if isinstance(value, datetime.datetime):
+        offset = value.utcoffset() or datetime.timedelta(0)
+        naive = value.replace(tzinfo=None) - offset
+        return calendar.timegm(naive.timetuple()) + naive.microsecond / 1e6
+
+    match = DATETIME_RE.match(value)
+    if not match:
+        raise ValueError("Invalid dateTime: %r" % value)
+    date, time_ = match.group(1), match.group(2)
+    naive = datetime.datetime.strptime('%s %s' % (date, time_ or '00:00:00'),
+                                       '%Y-%m-%d %H:%M:%S')
+    return float(calendar.timegm(naive.timetuple()) - (utc_offset(value) or 0))
+
+
+def utc_offset(value):
+    """Returns the UTC offset of an API dateTime string in seconds.
+
+    :param string value: a string like '2017-05-04T00:00:00-06:00'
+    :returns: the offset, or None if the string doesn't have one
+    """
+    match = DATETIME_RE.match(value)
+    if not match:
+        raise ValueError("Invalid dateTime: %r" % value)
+    _, _, zulu, sign, hours, minutes = match.groups()
+    if zulu:
+        return 0
+    if not sign:
+        return None
+    offset = int(hours) * 3600 + int(minutes) * 60
+    return -offset if sign == '-' else offset
+
+
+def format_timestamp(timestamp):
+    """Formats a UNIX timestamp as an API dateTime string in UTC."""
+    moment = EPOCH + datetime.timedelta(seconds=timestamp)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+def format_filter_date(timestamp, offset=0):
+    """Formats a UNIX timestamp as a date of an object filter.
+
+    Date filters, like those of query_filter_date(), take 'M/D/YYYY H:M:S'
+    in the local time of the API.
+
+    :param timestamp: UNIX timestamp
+    :param int offset: the UTC offset of the API in seconds, see utc_offset()
+    """
+    moment = EPOCH + datetime.timedelta(seconds=int(timestamp) + offset)
+    return '%d/%d/%d %d:%d:%d' % (moment.month, moment.day, moment.year,
+                                  moment.hour, moment.minute, moment.second)
+
+
 class IdentifierMixin(object):
     """Mixin used to resolve ids from other names of objects.
 
@@ -135,6 +218,7 @@ class IdentifierMixin(object):
 
     """
     resolvers = []
+    batch_resolvers = []
 
     def resolve_ids(self, identifier):
         """Takes a string and tries to resolve to a list of matching ids.
@@ -147,6 +231,21 @@ class IdentifierMixin(object):
 
         return resolve_ids(identifier, self.resolvers)
 
+    def resolve_many(self, identifiers):
+        """Resolves many identifiers with as few API calls as possible.
+
+        Identifiers are handed to each of the batch_resolvers as a group
+        instead of one at a time. Managers without batch resolvers fall back
+        to resolving each identifier with the regular resolvers.
+
+        :param list identifiers: identifying strings
+        :returns dict: identifier => list of matching ids. An empty list means
+                       the identifier was not found, more than one id means it
+                       is ambiguous.
+        """
+
+        return resolve_many(identifiers, self.batch_resolvers, self.resolvers)
+
 
 def resolve_ids(identifier, resolvers):
     """Resolves IDs given a list of functions.
@@ -174,6 +273,92 @@ def resolve_ids(identifier, resolvers):
     return []
 
 
+def is_ip_address(identifier):
+    """Returns True if the identifier looks like an IPv4 address."""
+    try:
+        socket.inet_aton(identifier)
+    except (socket.error, TypeError):
+        return False
+    return True
+
+
+def resolve_many(identifiers, batch_resolvers, resolvers=None):
+    """Resolves many identifiers given a list of batch resolver functions.
+
+    Integers and globalIdentifiers (UUIDs) are resolved locally. The rest are
+    passed, as a list, to each batch resolver in turn. A batch resolver
+    returns a dict of identifier => list of ids for the identifiers it
+    matched; anything it did not match is passed on to the next one.
+
+    :param list identifiers: identifier strings
+    :param list batch_resolvers: a list of functions which take a list of
+                                 identifiers
+    :param list resolvers: single identifier resolvers, used when there are
+                           no batch resolvers
+    :returns dict: identifier => list of ids
+    """
+    results = {}
+    pending = []
+    seen = set()
+    for identifier in identifiers:
+        if identifier in seen:
+            continue
+        seen.add(identifier)
+        try:
+            results[identifier] = [int(identifier)]
+            continue
+        except ValueError:
+            pass
+
+        if len(identifier) == 36 and UUID_RE.match(identifier):
+            results[identifier] = [identifier]
+            continue
+
+        pending.append(identifier)
+
+    if not batch_resolvers:
+        for identifier in pending:
+            results[identifier] = resolve_ids(identifier, resolvers or [])
+        return results
+
+    for resolver in batch_resolvers:
+        if not pending:
+            break
+        found = resolver(pending)
+        for identifier, ids in found.items():
+            if ids:
+                results[identifier] = ids
+        pending = [identifier for identifier in pending
+                   if identifier not in results]
+
+    for identifier in pending:
+        results[identifier] = []
+    return results
+
+
+def group_ids_by(results, key, identifiers, normalize=None):
+    """Groups API results by a property to answer a batch resolver.
+
+    :param list results: API results containing 'id' and the key property
+    :param key: a property name or a function which returns the property
+    :param list identifiers: the identifiers which were asked for
+    :param normalize: optional function applied to both sides before matching
+    :returns dict: identifier => list of ids
+    """
+    normalize = normalize or (lambda value: value)
+    getter = key if callable(key) else (lambda result: result.get(key))
+
+    grouped = {}
+    for result in results:
+        value = getter(result)
+        if value is None:
+            continue
+        grouped.setdefault(normalize(value), []).append(result['id'])
+
+    return dict((identifier, grouped.get(normalize(identifier), []))
+                for identifier in identifiers)
+
+
 class UTC(datetime.tzinfo):
     """UTC timezone."""
 
@@ -209,3 +394,55 @@ def is_ready(instance, pending=False):
     if instance.get('provisionDate') and not reloading and not outstanding:
         return True
     return False
+
+
+def wait_for_ready_many(fetch, instance_ids, limit, delay=10, pending=False,
+                        max_delay=None, backoff=1.5):
+    """Polls many Hardware or Virt instances until each one is ready.
+
+    All instances which are not ready yet are fetched together with one call
+    per poll. Instances are dropped from the poll as soon as they are ready.
+    The poll interval starts at delay and grows by backoff (up to max_delay)
+    while nothing becomes ready, then drops back to delay.
+
+    :param fetch: function which takes a list of ids and returns those
+                  instances, with the transaction data needed by is_ready()
+    :param list instance_ids: the instance IDs to wait for. String ids are
+                              converted to int, the type the API returns.
+    :param int limit: The maximum amount of seconds to wait.
+    :param int delay: The number of seconds to sleep before the first re-poll.
+    :param bool pending: Wait for ALL transactions to finish?
+    :param int max_delay: The longest poll interval. Defaults to 6 * delay.
+    :param float backoff: How much the interval grows while nothing is ready.
+    :returns: generator of (instance_id, ready) tuples, in the order instances
+              became ready. Instances which were not ready within limit are
+              yielded last, with ready set to False.
+    """
+    waiting = set(int(instance_id) for instance_id in instance_ids)
+    until = time.time() + limit
+    max_delay = max_delay or delay * 6
+    interval = delay
+
+    while waiting:
+        became_ready = False
+        for instance in fetch(sorted(waiting)):
+            if instance.get('id') in waiting and is_ready(instance, pending):
+                waiting.discard(instance['id'])
+                became_ready = True
+                yield instance['id'], True
+
+        now = time.time()
+        if not waiting or now >= until:
+            break
+
+        if became_ready:
+            interval = delay
+        snooze = min(interval, until - now)
+        LOGGER.info("%d instances not ready. Auto retry in %ds",
+                    len(waiting), snooze)
+        time.sleep(snooze)
+        interval = min(interval * backoff, max_delay)
+
+    for instance_id in sorted(waiting):
+        LOGGER.info("Waiting for %s expired.", instance_id)
+        yield instance_id, False
@@ -7,6 +7,7 @@
 """
 import json
 import os
+import shutil
 import sys
 import tempfile
 
@@ -266,6 +267,50 @@ class ResolveIdTests(testing.TestCase):
             exceptions.CLIAbort, helpers.resolve_id, resolver, 'test')
 
 
+class ReadDataFileTests(testing.TestCase):
+
+    def _write(self, content, name='data.json'):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        path = os.path.join(path, name)
+        with open(path, 'w') as data_fp:
+            data_fp.write(content)
+        return path
+
+    def test_json(self):
+        path = self._write('[{"a": 1}]')
+        self.assertEqual([{'a': 1}], helpers.read_data_file(path))
+
+    def test_json_lines(self):
+        path = self._write('{"a": 1}\n\n# comment\n{"b": 2}\n')
+        self.assertEqual([{'a': 1}, {'b': 2}],
+                         helpers.read_data_file(path, json_lines=True))
+
+        path = self._write('{"a": 1}\n{"b":\n')
+        ex = self.assertRaises(exceptions.CLIAbort, helpers.read_data_file,
+                               path, json_lines=True)
+        self.assertIn('line 2:', ex.message)
+
+    def test_yaml(self):
+        path = self._write('- a: 1\n', name='data.yaml')
+        self.assertEqual([{'a': 1}], helpers.read_data_file(path))
+
+    def test_bad_file(self):
+        for content, name in [('[{"a": 1}', 'data.json'),
+                              ('- a: [1\n', 'data.yml')]:
+            path = self._write(content, name=name)
+            ex = self.assertRaises(exceptions.CLIAbort,
+                                   helpers.read_data_file, path)
+            self.assertIn("Can't parse %s" % path, ex.message)
+
+    @mock.patch('SoftLayer.CLI.helpers.yaml', None)
+    def test_no_yaml(self):
+        path = self._write('- a: 1\n', name='data.yaml')
+        ex = self.assertRaises(exceptions.CLIAbort, helpers.read_data_file,
+                               path)
+        self.assertIn('PyYAML', ex.message)
+
+
 class TestTable(testing.TestCase):
 
     def test_table_with_duplicated_columns(self):
@@ -4,13 +4,17 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import itertools
 import json
 import os.path
+import shutil
+import tempfile
 
 import mock
 
 from SoftLayer.CLI.dns import zone_import
 from SoftLayer.CLI import exceptions
+from SoftLayer import SoftLayerAPIError
 from SoftLayer import testing
 
 
@@ -127,6 +131,10 @@ spf  IN TXT "v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"
                      'record': '@',
                      'type': 'NS',
                      'ttl': '86400'},
+                    {'data': 'test.realtest.com.',
+                     'record': '@',
+                     'type': 'MX',
+                     'ttl': '86400'},
                     {'data': '127.0.0.1',
                      'record': 'testing',
                      'type': 'A',
@@ -138,19 +146,23 @@ spf  IN TXT "v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"
                     {'data': '1.0.3.4',
                      'record': 'server2',
                      'type': 'A',
-                     'ttl': None},
+                     'ttl': '86400'},
                     {'data': 'server2',
                      'record': 'ftp',
                      'type': 'CNAME',
-                     'ttl': None},
+                     'ttl': '86400'},
                     {'data': '"This is just a test of the txt record"',
                      'record': 'dev.realtest.com',
                      'type': 'TXT',
-                     'ttl': None},
+                     'ttl': '86400'},
+                    {'data': '2001:db8:10::1',
+                     'record': 'dev.realtest.com',
+                     'type': 'AAAA',
+                     'ttl': '86400'},
                     {'data': '"v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"',
                      'record': 'spf',
                      'type': 'TXT',
-                     'ttl': None},
+                     'ttl': '86400'},
                     {'data': '127.0.0.2',
                      'record': '*.testing',
                      'type': 'A',
@@ -162,7 +174,83 @@ spf  IN TXT "v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"
         zone, records, bad_lines = zone_import.parse_zone_details(zone_file)
         self.assertEqual(zone, 'realtest.com')
         self.assertEqual(records, expected)
-        self.assertEqual(len(bad_lines), 13)
+        self.assertEqual(len(bad_lines), 1)
+        self.assertTrue(bad_lines[0].startswith('@ IN SOA ns1.softlayer.com.'))
+
+    def test_zone_parser_directives(self):
+        zone_file = """; leading comment
+$ORIGIN example.com.
+$TTL 1h
+www.example.com.  IN  A  10.0.0.1   ; absolute name
+mail  300  IN  MX  10  mx.example.com.
+txt   IN  TXT  "semi;colon (paren)" "second"
+      IN  TXT  "same owner"
+long  IN  TXT  ( "first line"
+                 "second line" ) ; comment
+$ORIGIN sub.example.com.
+api   2d IN  A  10.0.0.2
+@        IN  A  10.0.0.3
+other.org.  IN  CNAME  www.example.com.
+bad
+$BOGUS directive
+"""
+        parser = zone_import.ZoneParser()
+        records = list(parser.records(zone_file.splitlines()))
+
+        self.assertEqual('example.com', parser.zone)
+        self.assertEqual([
+            ('www', 'A', '10.0.0.1', '3600'),
+            ('mail', 'MX', 'mx.example.com.', '300'),
+            ('txt', 'TXT', '"semi;colon (paren)" "second"', '3600'),
+            ('txt', 'TXT', '"same owner"', '3600'),
+            ('long', 'TXT', '"first line" "second line"', '3600'),
+            ('api.sub', 'A', '10.0.0.2', '172800'),
+            ('sub', 'A', '10.0.0.3', '3600'),
+            ('other.org.', 'CNAME', 'www.example.com.', '3600'),
+        ], [(r['record'], r['type'], r['data'], r['ttl']) for r in records])
+        self.assertEqual(['bad', '$BOGUS directive'], parser.bad_lines)
+
+    def test_zone_parser_bad_ttl(self):
+        digits = '1' * 40
+        zone_file = ("$ORIGIN example.com.\n"
+                     "$TTL %sx\n"
+                     "web  %sx  IN  A  10.0.0.1\n"
+                     "api  1h30  IN  A  10.0.0.2\n" % (digits, digits))
+
+        parser = zone_import.ZoneParser(ttl='30')
+        records = list(parser.records(zone_file.splitlines()))
+
+        # Neither is a TTL: $TTL is ignored and the token is taken as the type
+        self.assertEqual([('web', digits + 'X', '30'), ('api', 'A', '3630')],
+                         [(r['record'], r['type'], r['ttl']) for r in records])
+
+    def test_zone_parser_include(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        with open(os.path.join(path, 'hosts.zone'), 'w') as include_f:
+            include_f.write("web  IN  A  10.0.0.5\n   IN  AAAA  ::1\n")
+        zone_path = os.path.join(path, 'example.com.zone')
+        with open(zone_path, 'w') as zone_f:
+            zone_f.write("$ORIGIN example.com.\n"
+                         "top  60  IN  A  10.0.0.4\n"
+                         "$INCLUDE hosts.zone lab.example.com.\n"
+                         "     IN  A  10.0.0.6\n"
+                         "$INCLUDE missing.zone\n")
+
+        parser = zone_import.ZoneParser(ttl='30')
+        with open(zone_path) as zone_f:
+            records = parser.records(zone_f, path=zone_path)
+            self.assertEqual({'record': 'top', 'type': 'A',
+                              'data': '10.0.0.4', 'ttl': '60'}, next(records))
+            self.assertEqual([('web.lab', 'A', '30'), ('web.lab', 'AAAA', '30'),
+                              ('top', 'A', '30')],
+                             [(r['record'], r['type'], r['ttl'])
+                              for r in itertools.islice(records, 3)])
+            # A missing file must not silently drop records
+            self.assertRaises(IOError, next, records)
+
+        result = self.run_command(['dns', 'import', zone_path, '--dry-run'])
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
 
     def test_import_zone_dry_run(self):
         path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
@@ -172,9 +260,12 @@ spf  IN TXT "v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"
         self.assertIn(
             "Parsed: type=NS, record=@, data=ns1.softlayer.com., ttl=86400",
             result.output)
-        self.assertIn("Unparsed: $TTL 86400", result.output)
+        self.assertIn("Unparsed: @ IN SOA", result.output)
 
     def test_import_zone(self):
+        create_mock = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                    'createObjects')
+        create_mock.side_effect = lambda call: call.args[0]
         path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
         result = self.run_command(['dns', 'import', path])
 
@@ -182,7 +273,7 @@ spf  IN TXT "v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"
                          [])
 
         calls = self.calls('SoftLayer_Dns_Domain_ResourceRecord',
-                           'createObject')
+                           'createObjects')
         expected_calls = [{'data': 'ns1.softlayer.com.',
                            'host': '@',
                            'domainId': 12345,
@@ -193,6 +284,11 @@ spf  IN TXT "v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"
                            'domainId': 12345,
                            'type': 'NS',
                            'ttl': '86400'},
+                          {'data': 'test.realtest.com.',
+                           'host': '@',
+                           'domainId': 12345,
+                           'type': 'MX',
+                           'ttl': '86400'},
                           {'data': '127.0.0.1',
                            'host': 'testing',
                            'domainId': 12345,
@@ -207,27 +303,180 @@ spf  IN TXT "v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"
                            'host': 'server2',
                            'domainId': 12345,
                            'type': 'A',
-                           'ttl': None},
+                           'ttl': '86400'},
                           {'data': 'server2',
                            'host': 'ftp',
                            'domainId': 12345,
                            'type': 'CNAME',
-                           'ttl': None},
+                           'ttl': '86400'},
                           {'data':
                            '"This is just a test of the txt record"',
                            'host': 'dev.realtest.com',
                            'domainId': 12345,
                            'type': 'TXT',
-                           'ttl': None},
+                           'ttl': '86400'},
+                          {'data': '2001:db8:10::1',
+                           'host': 'dev.realtest.com',
+                           'domainId': 12345,
+                           'type': 'AAAA',
+                           'ttl': '86400'},
                           {'data': '"v=spf1 ip4:192.0.2.0/24 '
                                    'ip4:198.51.100.123 a -all"',
                            'host': 'spf',
                            'domainId': 12345,
                            'type': 'TXT',
-                           'ttl': None}]
+                           'ttl': '86400'}]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0].args[0], expected_calls)
+
+        self.assertIn("Finished", result.output)
+
+    def test_import_zone_reports_failed_records(self):
+        def create_records(call):
+            if len(call.args[0]) > 1:
+                raise SoftLayerAPIError('SoftLayer_Exception', 'Bad record')
+            return call.args[0]
+
+        def create_record(call):
+            record = call.args[0]
+            if record['type'] == 'CNAME':
+                raise SoftLayerAPIError('SoftLayer_Exception', 'Bad CNAME')
+            return record
+
+        self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                      'createObjects').side_effect = create_records
+        self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                      'createObject').side_effect = create_record
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
 
-        self.assertEqual(len(calls), len(expected_calls))
-        for call, expected_call in zip(calls, expected_calls):
-            self.assertEqual(call.args[0], expected_call)
+        result = self.run_command(['dns', 'import', path])
 
+        self.assert_no_fail(result)
+        self.assertEqual(10, len(self.calls(
+            'SoftLayer_Dns_Domain_ResourceRecord', 'createObject')))
+        self.assertIn("Created: type=A, record=server2, data=1.0.3.4, "
+                      "ttl=86400", result.output)
+        self.assertIn("Failed: type=CNAME, record=ftp, data=server2, "
+                      "ttl=86400", result.output)
+        self.assertIn("Bad CNAME", result.output)
         self.assertIn("Finished", result.output)
+
+    def test_zone_sync_dry_run(self):
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
+        result = self.run_command(['dns', 'zone-sync', path, '--dry-run'])
+
+        self.assert_no_fail(result)
+        actions = json.loads(result.output)
+        self.assertEqual({'create': 10, 'update': 0, 'delete': 6},
+                         dict((action, len([row for row in actions
+                                            if row['action'] == action]))
+                              for action in ('create', 'update', 'delete')))
+        self.assertIn({'action': 'create', 'id': None, 'host': 'testing1',
+                       'type': 'A', 'data': '12.12.0.1', 'ttl': '86400'},
+                      actions)
+        self.assertEqual([], self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                                        'deleteObjects'))
+        self.assertEqual([], self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                                        'createObjects'))
+
+    def test_zone_sync(self):
+        records_mock = self.set_mock('SoftLayer_Dns_Domain',
+                                     'getResourceRecords')
+        records_mock.return_value = [
+            {'id': 1, 'host': '@', 'type': 'ns', 'data': 'ns1.softlayer.com.',
+             'ttl': 86400},
+            {'id': 2, 'host': 'gone', 'type': 'mx', 'data': 'mx.', 'ttl': 86400},
+        ]
+        create_mock = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                    'createObjects')
+        create_mock.side_effect = lambda call: call.args[0]
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
+
+        result = self.run_command(['--really', 'dns', 'zone-sync', path])
+
+        self.assert_no_fail(result)
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'deleteObjects', args=([records_mock.return_value[1]],))
+        self.assertEqual([], self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                                        'editObjects'))
+        created = self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                             'createObjects')[0].args[0]
+        self.assertEqual(9, len(created))
+        self.assertIn("Synced realtest.com: 9 created, 0 updated, 1 deleted",
+                      result.output)
+
+    @mock.patch('SoftLayer.CLI.formatting.confirm')
+    def test_zone_sync_abort(self, confirm_mock):
+        confirm_mock.return_value = False
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
+
+        result = self.run_command(['dns', 'zone-sync', path])
+
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+        self.assertEqual([], self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                                        'deleteObjects'))
+
+    def test_host_sync(self):
+        self.set_mock('SoftLayer_Account', 'getDomains').return_value = [
+            {'id': 1, 'name': 'test.sftlyr.ws'}]
+        self.set_mock('SoftLayer_Account', 'getHardware').return_value = []
+        records = {
+            1: [{'id': 10, 'host': 'vs-test1', 'type': 'a',
+                 'data': '172.16.240.2', 'ttl': 7200}],
+            2: [{'id': 20, 'host': '2', 'type': 'ptr',
+                 'data': 'old.test.sftlyr.ws', 'ttl': 7200}]}
+        self.set_mock('SoftLayer_Dns_Domain', 'getResourceRecords'
+                      ).side_effect = lambda call: records[call.identifier]
+        self.set_mock('SoftLayer_Virtual_Guest',
+                      'getReverseDomainRecords').return_value = [{
+                          'id': 2, 'name': '240.16.172.in-addr.arpa'}]
+        self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                      'createObjects').side_effect = lambda call: call.args[0]
+
+        result = self.run_command(['--really', 'dns', 'host-sync', '--tag', 'web'])
+
+        self.assert_no_fail(result)
+        self.assertEqual({'name': {'operation': 'in',
+                                   'options': [{'name': 'data', 'value': ['web']}]}},
+                         self.calls('SoftLayer_Account', 'getVirtualGuests')[0]
+                         .filter['virtualGuests']['tagReferences']['tag'])
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'editObjects',
+                                args=([{'id': 20, 'host': '2', 'type': 'ptr',
+                                        'data': 'vs-test1.test.sftlyr.ws',
+                                        'ttl': 7200}],))
+        created = [call.args[0] for call in self.calls(
+            'SoftLayer_Dns_Domain_ResourceRecord', 'createObjects')]
+        self.assertEqual(2, len(created))
+        self.assertIn([{'domainId': 1, 'host': 'vs-test2', 'type': 'A',
+                        'data': '172.16.240.7', 'ttl': 7200}], created)
+        self.assertIn([{'domainId': 2, 'host': '7', 'type': 'PTR',
+                        'data': 'vs-test2.test.sftlyr.ws', 'ttl': 7200}], created)
+
+    def test_host_sync_dry_run(self):
+        self.set_mock('SoftLayer_Account', 'getDomains').return_value = [
+            {'id': 1, 'name': 'test.sftlyr.ws'}]
+        self.set_mock('SoftLayer_Dns_Domain',
+                      'getResourceRecords').return_value = []
+
+        result = self.run_command(['dns', 'host-sync', '--all', '--no-hardware',
+                                   '--dry-run', '-a'])
+
+        self.assert_no_fail(result)
+        self.assertEqual([{'zone': 'test.sftlyr.ws', 'action': 'create',
+                           'host': 'vs-test1', 'type': 'A',
+                           'data': '172.16.240.2', 'ttl': 7200},
+                          {'zone': 'test.sftlyr.ws', 'action': 'create',
+                           'host': 'vs-test2', 'type': 'A',
+                           'data': '172.16.240.7', 'ttl': 7200}],
+                         json.loads(result.output))
+        self.assertEqual([], self.calls('SoftLayer_Account', 'getHardware'))
+        self.assertEqual([], self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                                        'createObjects'))
+
+    def test_host_sync_needs_servers(self):
+        result = self.run_command(['dns', 'host-sync'])
+
+        self.assertEqual(2, result.exit_code)
+        self.assertIsInstance(result.exception, exceptions.ArgumentError)
@@ -5,7 +5,15 @@
     :license: MIT, see LICENSE for more details.
 """
 import json
+import os
+import shutil
+import tempfile
 
+import mock
+
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI.firewall import edit
+from SoftLayer.fixtures import SoftLayer_Network_Vlan_Firewall
 from SoftLayer import testing
 
 
@@ -28,3 +36,95 @@ class FirewallTests(testing.TestCase):
                            'firewall id': 'server:1234',
                            'server/vlan id': 1,
                            'type': 'Server - standard'}])
+
+    def _write_rules(self, rules):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        path = os.path.join(path, 'rules.txt')
+        with open(path, 'w') as rules_fp:
+            for rule in rules:
+                rules_fp.write(edit.DELIMITER)
+                rules_fp.write(edit.get_formatted_rule(rule))
+            rules_fp.write(edit.DELIMITER)
+        return path
+
+    def test_sync(self):
+        path = self._write_rules([
+            {'sourceIpAddress': '10.0.0.0/24', 'destinationPortRangeStart': 22,
+             'destinationPortRangeEnd': 22},
+            {'sourceIpAddress': '10.0.0.5', 'destinationPortRangeStart': 22,
+             'destinationPortRangeEnd': 22},
+            {'sourceIpAddress': '10.0.0.0/24', 'destinationPortRangeStart': 22,
+             'destinationPortRangeEnd': 22},
+        ])
+
+        result = self.run_command(['--really', 'firewall', 'sync', 'vlan:1234', path])
+
+        self.assert_no_fail(result)
+        self.assertIn('1 rules: 1 added, 3 removed, 1 duplicate and 1 shadowed '
+                      'rules left out', result.output)
+        self.assertIn('Firewall updated!', result.output)
+        self.assertEqual([{'rule': 2, 'left out': 'shadowed by rule 1'},
+                          {'rule': 3, 'left out': 'duplicate of rule 1'}],
+                         json.loads(result.output.split('\n"1 rules')[0]))
+        self.assert_called_with('SoftLayer_Network_Firewall_Update_Request', 'createObject', args=({
+            'firewallContextAccessControlListId': 3142,
+            'rules': [{'orderValue': 1, 'action': 'permit', 'protocol': 'tcp',
+                       'version': 4, 'sourceIpAddress': '10.0.0.0',
+                       'sourceIpSubnetMask': '255.255.255.0',
+                       'destinationIpAddress': 'any',
+                       'destinationIpSubnetMask': '255.255.255.255',
+                       'destinationPortRangeStart': 22,
+                       'destinationPortRangeEnd': 22}]},))
+
+    def test_sync_dry_run(self):
+        path = self._write_rules([{'sourceIpAddress': '10.0.0.1'}])
+
+        result = self.run_command(['firewall', 'sync', 'vs:1234', path, '--dry-run'])
+
+        self.assert_no_fail(result)
+        self.assertIn('1 rules: 1 added, 3 removed', result.output)
+        self.assert_called_with('SoftLayer_Network_Component_Firewall', 'getRules', identifier=1234)
+        self.assertEqual([], self.calls('SoftLayer_Network_Firewall_Update_Request'))
+
+    def test_sync_unchanged(self):
+        path = self._write_rules(SoftLayer_Network_Vlan_Firewall.getRules)
+
+        result = self.run_command(['--really', 'firewall', 'sync', 'vlan:1234', path])
+
+        self.assert_no_fail(result)
+        self.assertIn('already has these rules, nothing was sent', result.output)
+        self.assertEqual([], self.calls('SoftLayer_Network_Firewall_Update_Request'))
+
+    def test_sync_invalid_rules(self):
+        path = self._write_rules([{'sourceIpAddress': '10.0.0.300'}])
+
+        result = self.run_command(['--really', 'firewall', 'sync', 'vlan:1234', path])
+
+        self.assertEqual(2, result.exit_code)
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+        self.assertIn('Rule 1: Invalid IP address: 10.0.0.300', result.exception.message)
+        self.assertEqual([], self.calls('SoftLayer_Network_Firewall_Update_Request'))
+
+    def test_parse_rules_ipv6(self):
+        rules = edit.parse_rules(edit.DELIMITER + edit.get_formatted_rule({
+            'sourceIpAddress': '2001:db8::1', 'sourceIpSubnetMask': '64',
+            'version': 6, 'notes': 'v6'}) + 'notes: v6\n')
+
+        self.assertEqual('2001:db8::1', rules[0]['sourceIpAddress'])
+        self.assertEqual('v6', rules[0]['notes'])
+        self.assertEqual(6, rules[0]['version'])
+
+    @mock.patch('SoftLayer.CLI.formatting.confirm')
+    @mock.patch('SoftLayer.CLI.firewall.edit.open_editor')
+    def test_edit_unchanged(self, open_editor, confirm):
+        open_editor.return_value = ''.join(
+            edit.DELIMITER + edit.get_formatted_rule(rule)
+            for rule in SoftLayer_Network_Vlan_Firewall.getRules)
+        confirm.return_value = True
+
+        result = self.run_command(['firewall', 'edit', 'vlan:1234'])
+
+        self.assert_no_fail(result)
+        self.assertIn('already has these rules, nothing was sent', result.output)
+        self.assertEqual([], self.calls('SoftLayer_Network_Firewall_Update_Request'))
@@ -4,7 +4,11 @@
     :license: MIT, see LICENSE for more details.
 """
 import json
+import os
+import shutil
+import tempfile
 
+from SoftLayer.CLI import exceptions
 from SoftLayer import testing
 
 
@@ -223,3 +227,98 @@ class OrderTests(testing.TestCase):
         price2 = {'item': item2, 'hourlyRecurringFee': '0.05',
                   'recurringFee': '150'}
         return {'prices': [price1, price2]}
+
+    def _write_orders(self, name, content):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        path = os.path.join(path, name)
+        with open(path, 'w') as orders_fp:
+            orders_fp.write(content)
+        return path
+
+    def _set_batch_mocks(self):
+        items_mock = self.set_mock('SoftLayer_Product_Package', 'getItems')
+        items_mock.return_value = [
+            {'id': 1, 'keyName': 'RAM_1', 'itemCategory': {'categoryCode': 'ram'},
+             'prices': [{'id': 10, 'locationGroupId': '', 'hourlyRecurringFee': '.1'}]},
+            {'id': 3, 'keyName': 'OS', 'itemCategory': {'categoryCode': 'os'},
+             'prices': [{'id': 30, 'locationGroupId': '', 'hourlyRecurringFee': '0'}]},
+        ]
+        config_mock = self.set_mock('SoftLayer_Product_Package', 'getConfiguration')
+        config_mock.return_value = [
+            {'isRequired': 1, 'itemCategory': {'categoryCode': 'ram'}},
+            {'isRequired': 1, 'itemCategory': {'categoryCode': 'os'}}]
+
+    def test_place_batch(self):
+        self._set_batch_mocks()
+        path = self._write_orders('orders.jsonl', """
+# two orders
+{"package_keyname": "PACKAGE", "location": "sjc01", "item_keynames": ["RAM_1", "OS"], "complex_type": "Type"}
+{"package_keyname": "PACKAGE", "location": "sjc01", "item_keynames": ["OS", "RAM_1"], "complex_type": "Type"}
+""")
+
+        result = self.run_command(['--really', 'order', 'place-batch', path])
+
+        self.assert_no_fail(result)
+        self.assertEqual(2, len(self.calls('SoftLayer_Product_Order', 'verifyOrder')))
+        self.assertEqual(2, len(self.calls('SoftLayer_Product_Order', 'placeOrder')))
+        self.assertEqual(1, len(self.calls('SoftLayer_Product_Package', 'getItems')))
+        self.assertIn('verify 1 (PACKAGE sjc01): OK', result.output)
+        self.assertIn('place 2 (PACKAGE sjc01): OK', result.output)
+        table = json.loads(result.output[result.output.index('['):])
+        self.assertEqual([{'#': 1, 'package': 'PACKAGE', 'location': 'sjc01',
+                           'verified': 'yes', 'placed': 'yes', 'order id': 1234,
+                           'error': None},
+                          {'#': 2, 'package': 'PACKAGE', 'location': 'sjc01',
+                           'verified': 'yes', 'placed': 'yes', 'order id': 1234,
+                           'error': None}], table)
+
+    def test_place_batch_verify_failure_places_nothing(self):
+        self._set_batch_mocks()
+        path = self._write_orders('orders.yaml', """
+- package_keyname: PACKAGE
+  location: sjc01
+  item_keynames: [RAM_1, OS]
+  complex_type: Type
+- package_keyname: PACKAGE
+  location: sjc01
+  item_keynames: [RAM_1]
+  complex_type: Type
+""")
+
+        result = self.run_command(['--really', 'order', 'place-batch', path])
+
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+        self.assertEqual("1 of 2 orders failed to verify; none were placed",
+                         result.exception.message)
+        self.assertEqual(1, len(self.calls('SoftLayer_Product_Order', 'verifyOrder')))
+        self.assertEqual([], self.calls('SoftLayer_Product_Order', 'placeOrder'))
+        self.assertIn('verify 2 (PACKAGE sjc01): FAILED: Required category os is missing',
+                      result.output)
+
+    def test_place_batch_verify_only(self):
+        self._set_batch_mocks()
+        path = self._write_orders('orders.jsonl', (
+            '{"package_keyname": "PACKAGE", "location": "sjc01", '
+            '"item_keynames": ["RAM_1"], "complex_type": "Type"}\n'))
+
+        result = self.run_command(['order', 'place-batch', '--verify',
+                                   '--no-validate', path])
+
+        self.assert_no_fail(result)
+        self.assertEqual(1, len(self.calls('SoftLayer_Product_Order', 'verifyOrder')))
+        self.assertEqual([], self.calls('SoftLayer_Product_Order', 'placeOrder'))
+
+    def test_place_batch_bad_file(self):
+        path = self._write_orders('orders.jsonl', '{"package_keyname": "PACKAGE"}\n')
+
+        result = self.run_command(['order', 'place-batch', path])
+
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+        self.assertEqual("Order 1 is missing: location, item_keynames, complex_type",
+                         result.exception.message)
+
+        path = self._write_orders('orders.jsonl', '{"package": "PACKAGE"\n')
+        result = self.run_command(['order', 'place-batch', path])
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+        self.assertIn("line 1:", result.exception.message)
@@ -7,6 +7,10 @@
 from SoftLayer import testing
 
 import json
+import os
+import tempfile
+
+import mock
 
 
 class ReportTests(testing.TestCase):
@@ -194,3 +198,152 @@ class ReportTests(testing.TestCase):
             300,
         )
         self.assertEqual(expected_args, call.args)
+
+    def _set_bandwidth_mocks(self):
+        racks = self.set_mock('SoftLayer_Account', 'getVirtualDedicatedRacks')
+        racks.return_value = [{'id': 1, 'name': 'pool1',
+                               'metricTrackingObjectId': 1}]
+        self.set_mock('SoftLayer_Account', 'getHardware').return_value = []
+        guests = self.set_mock('SoftLayer_Account', 'getVirtualGuests')
+        guests.return_value = [
+            {'id': 200 + i, 'metricTrackingObjectId': 200 + i,
+             'hostname': 'host%d' % i} for i in range(1, 4)]
+        summary_data = self.set_mock('SoftLayer_Metric_Tracking_Object',
+                                     'getSummaryData')
+        summary_data.return_value = [
+            {'type': 'publicIn_net_octet', 'counter': 10},
+        ]
+        return summary_data
+
+    def test_bandwidth_report_workers_order(self):
+        self._set_bandwidth_mocks()
+
+        result = self.run_command(['report', 'bandwidth', '--workers=3',
+                                   '--start=2016-02-04',
+                                   '--end=2016-03-04'])
+
+        self.assert_no_fail(result)
+        rows = json.loads('[' + result.output.split('[', 1)[1])
+        self.assertEqual(['pool1', 'host1', 'host2', 'host3'],
+                         [row['name'] for row in rows])
+
+    def test_bandwidth_report_checkpoint(self):
+        summary_data = self._set_bandwidth_mocks()
+        path = os.path.join(tempfile.mkdtemp(), 'bandwidth.checkpoint')
+        args = ['report', 'bandwidth', '--checkpoint', path,
+                '--start=2016-02-04', '--end=2016-03-04']
+
+        result = self.run_command(args)
+        self.assert_no_fail(result)
+        self.assertEqual(4, summary_data.call_count)
+        with open(path) as checkpoint:
+            self.assertEqual(4, len(checkpoint.readlines()))
+
+        # Everything is in the checkpoint, so nothing is fetched again.
+        result = self.run_command(args)
+        self.assert_no_fail(result)
+        self.assertEqual(4, summary_data.call_count)
+        rows = json.loads('[' + result.output.split('[', 1)[1])
+        self.assertEqual([10, 10, 10, 10],
+                         [row['public_in'] for row in rows])
+
+        # A different date range doesn't reuse the results
+        result = self.run_command(['report', 'bandwidth', '--checkpoint',
+                                   path, '--start=2016-01-04',
+                                   '--end=2016-03-04'])
+        self.assert_no_fail(result)
+        self.assertEqual(8, summary_data.call_count)
+
+    def test_bandwidth_report_interrupted(self):
+        summary_data = self._set_bandwidth_mocks()
+        path = os.path.join(tempfile.mkdtemp(), 'bandwidth.checkpoint')
+
+        with mock.patch('SoftLayer.CLI.report.bandwidth._get_summary_data',
+                        side_effect=[[{'type': 'publicIn_net_octet',
+                                       'counter': 10}],
+                                     KeyboardInterrupt()]):
+            result = self.run_command(['report', 'bandwidth', '--workers=1',
+                                       '--checkpoint', path,
+                                       '--start=2016-02-04',
+                                       '--end=2016-03-04'])
+
+        self.assert_no_fail(result)
+        self.assertIn('Printing collected results and then aborting.',
+                      result.output)
+        rows = json.loads('[' + result.output.split('[', 1)[1])
+        self.assertEqual(['pool1'], [row['name'] for row in rows])
+
+        result = self.run_command(['report', 'bandwidth',
+                                   '--checkpoint', path,
+                                   '--start=2016-02-04', '--end=2016-03-04'])
+
+        self.assert_no_fail(result)
+        self.assertEqual(3, summary_data.call_count)
+        self.assertIn('1 of 4 already fetched', result.output)
+
+    @mock.patch('SoftLayer.CLI.report.bandwidth._get_virtual_bandwidth')
+    def test_bandwidth_report_interrupted_listing(self, virtual):
+        summary_data = self._set_bandwidth_mocks()
+        virtual.side_effect = KeyboardInterrupt()
+
+        result = self.run_command(['report', 'bandwidth',
+                                   '--start=2016-02-04', '--end=2016-03-04'])
+
+        self.assert_no_fail(result)
+        self.assertIn('Printing collected results and then aborting.',
+                      result.output)
+        self.assertEqual(0, summary_data.call_count)
+
+    def test_bandwidth_report_top_and_rollups(self):
+        racks = self.set_mock('SoftLayer_Account', 'getVirtualDedicatedRacks')
+        racks.return_value = [{'id': 1, 'name': 'pool1',
+                               'metricTrackingObjectId': 1}]
+        self.set_mock('SoftLayer_Account', 'getHardware').return_value = [{
+            'id': 101,
+            'metricTrackingObject': {'id': 101},
+            'hostname': 'hw1',
+            'datacenter': {'name': 'dal05'},
+        }]
+        guests = self.set_mock('SoftLayer_Account', 'getVirtualGuests')
+        guests.return_value = [{
+            'id': 200 + i,
+            'metricTrackingObjectId': 200 + i,
+            'hostname': 'host%d' % i,
+            'datacenter': {'name': 'dal05' if i < 3 else 'wdc01'},
+            'virtualRack': {'id': 1, 'bandwidthAllotmentTypeId': 2},
+        } for i in range(1, 4)]
+
+        def summary_data(call):
+            """Every object moves id GB out on the public side."""
+            return [
+                {'type': 'publicOut_net_octet',
+                 'counter': call.identifier * 2.0 ** 30},
+                {'type': 'publicOut_net_octet', 'counter': 0},
+                {'type': 'privateIn_net_octet', 'counter': 2.0 ** 30},
+                {'type': 'somethingElse', 'counter': 5 * 2.0 ** 30},
+            ]
+        self.set_mock('SoftLayer_Metric_Tracking_Object',
+                      'getSummaryData').side_effect = summary_data
+
+        result = self.run_command(['--format=table', 'report', 'bandwidth',
+                                   '--top=2', '--rollup=pool',
+                                   '--rollup=datacenter',
+                                   '--start=2016-02-04', '--end=2016-03-04',
+                                   '--sortby=public_out'])
+
+        self.assert_no_fail(result)
+        output = result.output
+        # The two busiest objects are host3 (203) and host2 (202)
+        self.assertIn('host3', output)
+        self.assertIn('host2', output)
+        self.assertNotIn('host1', output)
+        self.assertNotIn('hw1', output)
+        # pool 1 sums all three guests, dal05 sums host1, host2 and hw1
+        self.assertRegex(
+            output, r': +1 +: +3 +: +0.00G +: +606.00G +: +3.00G +: +0.00G +:')
+        self.assertRegex(
+            output,
+            r': +dal05 +: +3 +: +0.00G +: +504.00G +: +3.00G +: +0.00G +:')
+        self.assertRegex(
+            output,
+            r': +wdc01 +: +1 +: +0.00G +: +203.00G +: +1.00G +: +0.00G +:')
@@ -4,7 +4,11 @@
     :license: MIT, see LICENSE for more details.
 """
 import json
+import os
+import shutil
+import tempfile
 
+from SoftLayer.CLI import exceptions
 from SoftLayer import testing
 
 
@@ -232,3 +236,86 @@ class SecurityGroupTests(testing.TestCase):
                                    '--network-component=500'])
 
         self.assertEqual(result.exit_code, 2)
+
+    def _write_rules(self, content, name='rules.json'):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        path = os.path.join(path, name)
+        with open(path, 'w') as rules_fp:
+            rules_fp.write(content)
+        return path
+
+    def test_securitygroup_rule_sync_dry_run(self):
+        path = self._write_rules(json.dumps([
+            {'direction': 'ingress', 'protocol': 'tcp',
+             'portRangeMin': 22, 'portRangeMax': 22}]))
+
+        result = self.run_command(['sg', 'rule-sync', '100', path, '--dry-run'])
+
+        self.assert_no_fail(result)
+        self.assertEqual([{'action': 'add', 'id': None, 'remoteIp': None,
+                           'remoteGroupId': None, 'direction': 'ingress',
+                           'ethertype': 'IPv4', 'portRangeMin': 22,
+                           'portRangeMax': 22, 'protocol': 'tcp'},
+                          {'action': 'remove', 'id': 100, 'remoteIp': None,
+                           'remoteGroupId': None, 'direction': 'egress',
+                           'ethertype': 'IPv4', 'portRangeMin': None,
+                           'portRangeMax': None, 'protocol': None}],
+                         json.loads(result.output))
+        self.assertEqual([], self.calls('SoftLayer_Network_SecurityGroup', 'addRules'))
+        self.assertEqual([], self.calls('SoftLayer_Network_SecurityGroup', 'removeRules'))
+
+    def test_securitygroup_rule_sync(self):
+        path = self._write_rules(json.dumps([
+            {'direction': 'ingress', 'remoteIp': '10.0.0.0/24'}]))
+
+        result = self.run_command(['--really', 'sg', 'rule-sync', '100', path])
+
+        self.assert_no_fail(result)
+        self.assertIn('Synced security group 100: 1 added, 0 edited, 1 removed',
+                      result.output)
+        self.assert_called_with('SoftLayer_Network_SecurityGroup', 'addRules',
+                                identifier='100',
+                                args=([{'direction': 'ingress',
+                                        'ethertype': 'IPv4',
+                                        'remoteIp': '10.0.0.0/24'}],))
+        self.assert_called_with('SoftLayer_Network_SecurityGroup', 'removeRules',
+                                identifier='100', args=([100],))
+
+    def test_securitygroup_rule_sync_no_wait(self):
+        add_mock = self.set_mock('SoftLayer_Network_SecurityGroup', 'addRules')
+        add_mock.return_value = {'requestId': 'abc'}
+        path = self._write_rules(json.dumps([
+            {'direction': 'egress'}, {'direction': 'ingress'}]))
+
+        result = self.run_command(['sg', 'rule-sync', '100', path, '--no-wait'])
+
+        self.assert_no_fail(result)
+        self.assertIn('Firewall updates pending for requests abc', result.output)
+        self.assertEqual([], self.calls('SoftLayer_Event_Log'))
+
+    def test_securitygroup_rule_sync_in_sync(self):
+        path = self._write_rules('- direction: EGRESS\n', name='rules.yaml')
+
+        result = self.run_command(['sg', 'rule-sync', '100', path])
+
+        self.assert_no_fail(result)
+        self.assertIn('Security group 100 is in sync', result.output)
+
+    def test_securitygroup_rule_sync_bad_file(self):
+        path = self._write_rules('{"direction": "egress"}')
+
+        result = self.run_command(['sg', 'rule-sync', '100', path])
+
+        self.assertEqual(2, result.exit_code)
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+        self.assertIn('should contain a list of rules', result.exception.message)
+
+    def test_securitygroup_rule_sync_bad_yaml(self):
+        path = self._write_rules('- direction: [egress\n', name='rules.yaml')
+
+        result = self.run_command(['sg', 'rule-sync', '100', path])
+
+        self.assertEqual(2, result.exit_code)
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+        self.assertIn("Can't parse", result.exception.message)
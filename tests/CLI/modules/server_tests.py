@@ -272,6 +272,19 @@ class ServerCLITests(testing.TestCase):
             [{'extras': '1 IPv6 Address', 'value': '1_IPV6_ADDRESS'}]]
         self.assertEqual(json.loads(result.output), expected)
 
+    def test_create_options_category(self):
+        result = self.run_command(['server', 'create-options',
+                                   '--category=os', '--category=datacenter'])
+
+        self.assert_no_fail(result)
+        expected = [
+            [{'datacenter': 'Washington 1', 'value': 'wdc01'}],
+            [{'operating_system': 'Ubuntu / 14.04-64',
+              'value': 'UBUNTU_14_64'}]]
+        self.assertEqual(json.loads(result.output), expected)
+        self.assertEqual(2, len(self.calls('SoftLayer_Product_Package',
+                                           'getAllObjects')))
+
     @mock.patch('SoftLayer.HardwareManager.place_order')
     def test_create_server(self, order_mock):
         order_mock.return_value = {
@@ -509,3 +522,31 @@ class ServerCLITests(testing.TestCase):
         result = self.run_command(['hw', 'ready', '100', '--wait=100'])
         self.assert_no_fail(result)
         self.assertEqual(result.output, '"READY"\n')
+
+    def test_bulk_power_cycle(self):
+        result = self.run_command(['--really', 'hw', 'bulk-power-cycle',
+                                   '1000', '1001', '--rate=100'])
+
+        self.assert_no_fail(result)
+        self.assertEqual(2, len(self.calls('SoftLayer_Hardware_Server',
+                                           'powerCycle')))
+
+    def test_bulk_reload(self):
+        result = self.run_command(['--really', 'hw', 'bulk-reload', '1000',
+                                   '1001', '--postinstall=https://x/y'])
+
+        self.assert_no_fail(result)
+        self.assert_called_with('SoftLayer_Hardware_Server',
+                                'reloadOperatingSystem',
+                                identifier=1001,
+                                args=('FORCE',
+                                      {'customProvisionScriptUri': 'https://x/y'}))
+
+    def test_bulk_cancel(self):
+        result = self.run_command(['--really', 'hw', 'bulk-cancel', '1000',
+                                   '--immediate', '--reason=cost'])
+
+        self.assert_no_fail(result)
+        self.assert_called_with('SoftLayer_Billing_Item', 'cancelItem',
+                                args=(True, False, 'Server / Upgrade Costs',
+                                      ''))
@@ -18,12 +18,50 @@ class SummaryTests(testing.TestCase):
             {
                 'datacenter': 'dal00',
                 'subnets': 0,
-                'hardware': 1,
+                'hardware': 0,
                 'public_ips': 6,
-                'virtual_servers': 1,
+                'virtual_servers': 0,
                 'vlans': 3
-            }
+            },
+            {
+                'datacenter': 'TEST00',
+                'subnets': 0,
+                'hardware': 3,
+                'public_ips': 0,
+                'virtual_servers': 2,
+                'vlans': 0
+            },
+            {
+                'datacenter': None,
+                'subnets': 0,
+                'hardware': 1,
+                'public_ips': 0,
+                'virtual_servers': 0,
+                'vlans': 0
+            },
         ]
 
         self.assert_no_fail(result)
         self.assertEqual(json.loads(result.output), expected)
+
+    def test_summary_datacenter(self):
+        vlans = self.set_mock('SoftLayer_Account', 'getNetworkVlans')
+        vlans.return_value = []
+        guests = self.set_mock('SoftLayer_Account', 'getVirtualGuests')
+        guests.return_value = []
+        hardware = self.set_mock('SoftLayer_Account', 'getHardware')
+        hardware.return_value = [{'id': 1, 'datacenter': {'name': 'dal05'}}]
+
+        result = self.run_command(['summary', '--datacenter=dal05'])
+
+        self.assert_no_fail(result)
+        self.assertEqual(json.loads(result.output), [{
+            'datacenter': 'dal05',
+            'subnets': 0,
+            'hardware': 1,
+            'public_ips': 0,
+            'virtual_servers': 0,
+            'vlans': 0
+        }])
+        self.assert_called_with('SoftLayer_Account', 'getHardware', filter={
+            'hardware': {'datacenter': {'name': {'operation': '_= dal05'}}}})
@@ -5,6 +5,10 @@
     :license: MIT, see LICENSE for more details.
 """
 import json
+import os
+import shutil
+import tempfile
+
 import mock
 
 from SoftLayer.CLI import exceptions
@@ -204,3 +208,19 @@ class TicketTests(testing.TestCase):
                                 args=({"filename": "a_file_name",
                                        "data": b"ticket attached data"},),
                                 identifier=1)
+
+    def test_ticket_upload_split(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        path = os.path.join(path, 'big.log')
+        with open(path, 'wb') as upload:
+            upload.write(b'x' * (2 * 1024 * 1024 + 10))
+
+        result = self.run_command(['ticket', 'upload', '1', '--path', path,
+                                   '--split-size', '1'])
+
+        self.assert_no_fail(result)
+        self.assertEqual(['big.log.001', 'big.log.002', 'big.log.003'],
+                         [call.args[0]['filename'] for call in self.calls(
+                             'SoftLayer_Ticket', 'addAttachedFile')])
+        self.assertEqual(3, result.output.count('File attached'))
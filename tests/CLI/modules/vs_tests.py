@@ -5,6 +5,7 @@
     :license: MIT, see LICENSE for more details.
 """
 import json
+import tempfile
 
 import mock
 
@@ -662,3 +663,73 @@ class VirtTests(testing.TestCase):
         result = self.run_command(['vs', 'ready', '100', '--wait=100'])
         self.assert_no_fail(result)
         self.assertEqual(result.output, '"READY"\n')
+
+    def test_bulk_cancel(self):
+        mock = self.set_mock('SoftLayer_Account', 'getVirtualGuests')
+        mock.return_value = []
+        result = self.run_command(['--really', 'vs', 'bulk-cancel',
+                                   '100', 'nope'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual("Error: Unable to find VS 'nope'",
+                         result.exception.message)
+        self.assertEqual([], self.calls('SoftLayer_Virtual_Guest',
+                                        'deleteObject'))
+
+        with tempfile.NamedTemporaryFile(mode='w') as id_file:
+            id_file.write('# guests\n101\n\n102\n')
+            id_file.flush()
+            result = self.run_command(['--really', 'vs', 'bulk-cancel', '100',
+                                       '--file=%s' % id_file.name,
+                                       '--workers=2'])
+
+        self.assert_no_fail(result)
+        self.assertEqual(json.loads(result.output),
+                         [{'id': 100, 'status': 'OK', 'error': None},
+                          {'id': 101, 'status': 'OK', 'error': None},
+                          {'id': 102, 'status': 'OK', 'error': None}])
+        self.assertEqual(3, len(self.calls('SoftLayer_Virtual_Guest',
+                                           'deleteObject')))
+
+    def test_bulk_cancel_no_identifiers(self):
+        result = self.run_command(['--really', 'vs', 'bulk-cancel'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIsInstance(result.exception, exceptions.ArgumentError)
+
+    @mock.patch('SoftLayer.CLI.formatting.confirm')
+    def test_bulk_reboot_abort(self, confirm_mock):
+        confirm_mock.return_value = False
+        result = self.run_command(['vs', 'bulk-reboot', '100', '101'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+        self.assertEqual([], self.calls('SoftLayer_Virtual_Guest',
+                                        'rebootDefault'))
+
+    def test_bulk_power_off_partial_failure(self):
+        mock = self.set_mock('SoftLayer_Virtual_Guest', 'powerOff')
+
+        def power_off(call):
+            if call.identifier == 101:
+                raise SoftLayerAPIError('SoftLayer_Exception', 'Busy')
+            return True
+
+        mock.side_effect = power_off
+        result = self.run_command(['--really', 'vs', 'bulk-power-off',
+                                   '--hard', '100', '101'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual("1 of 2 virtual servers failed. Retry with: 101",
+                         result.exception.message)
+
+    def test_bulk_edit(self):
+        result = self.run_command(['--really', 'vs', 'bulk-edit', '100', '101',
+                                   '--domain=example.com', '--tag=dev'])
+
+        self.assert_no_fail(result)
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'setTags',
+                                identifier=101, args=('dev',))
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'editObject',
+                                identifier=100,
+                                args=({'domain': 'example.com'},))
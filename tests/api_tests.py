@@ -52,6 +52,15 @@ class Inititialization(testing.TestCase):
         self.assertEqual(client.auth.get_headers(), auth.get_headers())
         self.assertEqual(client.transport.timeout, 10)
         self.assertEqual(client.transport.endpoint_url, 'http://endpoint_url')
+        self.assertEqual(client.location_cache, '~/.softlayer-locations')
+
+    @mock.patch('SoftLayer.config.get_client_settings')
+    def test_env_location_cache(self, get_client_settings):
+        get_client_settings.return_value = {
+            'location_cache': '/tmp/locations',
+        }
+        client = SoftLayer.create_client_from_env()
+        self.assertEqual(client.location_cache, '/tmp/locations')
 
 
 class ClientMethods(testing.TestCase):
@@ -6,6 +6,9 @@
     :license: MIT, see LICENSE for more details.
 """
 import datetime
+
+import mock
+
 import SoftLayer
 from SoftLayer import testing
 
@@ -71,6 +74,36 @@ class TestUtils(testing.TestCase):
         }
         self.assertEqual(expected, result)
 
+    def test_to_timestamp(self):
+        expected = 1493877600.0  # 2017-05-04 06:00:00 UTC
+        self.assertEqual(expected,
+                         SoftLayer.utils.to_timestamp('2017-05-04T00:00:00-06:00'))
+        self.assertEqual(expected,
+                         SoftLayer.utils.to_timestamp('2017-05-04T06:00:00Z'))
+        self.assertEqual(expected,
+                         SoftLayer.utils.to_timestamp('2017-05-04 06:00:00'))
+        self.assertEqual(expected, SoftLayer.utils.to_timestamp(
+            datetime.datetime(2017, 5, 4, 6)))
+        self.assertEqual(expected, SoftLayer.utils.to_timestamp(expected))
+        self.assertRaises(ValueError, SoftLayer.utils.to_timestamp, 'welp')
+
+    def test_utc_offset(self):
+        self.assertEqual(-6 * 3600,
+                         SoftLayer.utils.utc_offset('2017-05-04T00:00:00-06:00'))
+        self.assertEqual(5 * 3600 + 1800,
+                         SoftLayer.utils.utc_offset('2017-05-04T00:00:00+0530'))
+        self.assertEqual(0, SoftLayer.utils.utc_offset('2017-05-04T00:00:00Z'))
+        self.assertIsNone(SoftLayer.utils.utc_offset('2017-05-04'))
+
+    def test_format_timestamp(self):
+        self.assertEqual('2017-05-04T06:00:00+00:00',
+                         SoftLayer.utils.format_timestamp(1493877600))
+        self.assertEqual('5/4/2017 6:0:0',
+                         SoftLayer.utils.format_filter_date(1493877600))
+        self.assertEqual('5/3/2017 23:59:59',
+                         SoftLayer.utils.format_filter_date(1493877599.5,
+                                                            -6 * 3600))
+
     def test_timezone(self):
         utc = SoftLayer.utils.UTC()
         time = datetime.datetime(2018, 1, 1, tzinfo=utc)
@@ -179,3 +212,74 @@ class TestIdentifierMixin(testing.TestCase):
     def test_globalidentifier_upper(self):
         ids = self.fixture.resolve_ids('B534EF96-55C4-4891-B51A-63866411B58E')
         self.assertEqual(ids, ['B534EF96-55C4-4891-B51A-63866411B58E'])
+
+    def test_resolve_many_fallback(self):
+        ids = self.fixture.resolve_many([1234, 'a', 'b', 'a', 'nope'])
+        self.assertEqual(ids, {1234: [1234],
+                               'a': ['this', 'is', 'a'],
+                               'b': ['this', 'is', 'b'],
+                               'nope': []})
+
+    def test_resolve_many_batch(self):
+        calls = []
+
+        def batch(identifiers):
+            calls.append(list(identifiers))
+            return {'a': [1], 'b': [2, 3]}
+
+        self.fixture.batch_resolvers = [batch]
+        uuid = '9d888bc2-7c9a-4dba-bbd8-6bd688687bae'
+        ids = self.fixture.resolve_many(['1', uuid, 'a', 'b', 'c'])
+
+        self.assertEqual(calls, [['a', 'b', 'c']])
+        self.assertEqual(ids, {'1': [1], uuid: [uuid], 'a': [1],
+                               'b': [2, 3], 'c': []})
+
+
+class TestWaitForReadyMany(testing.TestCase):
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.time')
+    def test_ready_as_they_happen(self, _time, _sleep):
+        _time.return_value = 0
+        fetch = mock.Mock(side_effect=[
+            [{'id': 1, 'provisionDate': 'aaa'}, {'id': 2}, {'id': 3}],
+            [{'id': 2}, {'id': 3}],
+            [{'id': 2}, {'id': 3, 'provisionDate': 'aaa'}],
+            [{'id': 2, 'provisionDate': 'aaa'}],
+        ])
+
+        events = list(SoftLayer.utils.wait_for_ready_many(
+            fetch, [3, 2, 1], 100, delay=10, max_delay=20))
+
+        self.assertEqual([(1, True), (3, True), (2, True)], events)
+        fetch.assert_has_calls([mock.call([1, 2, 3]), mock.call([2, 3]),
+                                mock.call([2, 3]), mock.call([2])])
+        # Backs off while nothing is ready, resets once something is ready
+        _sleep.assert_has_calls([mock.call(10), mock.call(15),
+                                 mock.call(10)])
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.time')
+    def test_expired(self, _time, _sleep):
+        _time.side_effect = [0, 5, 12]
+        fetch = mock.Mock(return_value=[{'id': 1, 'provisionDate': 'aaa'},
+                                        {'id': 2}])
+
+        events = list(SoftLayer.utils.wait_for_ready_many(
+            fetch, [1, 2, 3], 10, delay=10))
+
+        self.assertEqual([(1, True), (2, False), (3, False)], events)
+        _sleep.assert_called_once_with(5)
+
+    @mock.patch('time.sleep')
+    def test_string_ids(self, _sleep):
+        fetch = mock.Mock(return_value=[{'id': 1, 'provisionDate': 'aaa'},
+                                        {'id': 2, 'provisionDate': 'aaa'}])
+
+        events = list(SoftLayer.utils.wait_for_ready_many(
+            fetch, ['2', '1'], 10))
+
+        self.assertEqual([(1, True), (2, True)], events)
+        fetch.assert_called_once_with([1, 2])
+        self.assertFalse(_sleep.called)
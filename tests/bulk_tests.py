@@ -0,0 +1,119 @@
+"""
+    SoftLayer.tests.bulk_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import threading
+import time
+
+import mock
+
+from SoftLayer import bulk
+from SoftLayer import exceptions
+from SoftLayer import testing
+
+
+def _double(item):
+    if item == 3:
+        raise exceptions.SoftLayerError('three')
+    return item * 2
+
+
+class BulkTests(testing.TestCase):
+
+    def test_iter_concurrent(self):
+        results = sorted(bulk.iter_concurrent(_double, [1, 2, 3, 4],
+                                              workers=3))
+
+        self.assertEqual([(1, 2, None), (2, 4, None), (4, 8, None)],
+                         [r for r in results if r[0] != 3])
+        self.assertIsInstance(results[2][2], exceptions.SoftLayerError)
+
+    def test_map_concurrent(self):
+        self.assertEqual([2, 4, 8, 10],
+                         bulk.map_concurrent(_double, [1, 2, 4, 5], workers=2))
+        self.assertRaises(exceptions.SoftLayerError,
+                          bulk.map_concurrent, _double, [1, 2, 3], workers=2)
+
+    def test_run_bulk(self):
+        report = bulk.run_bulk(_double, [1, 2, 3], workers=1)
+
+        self.assertEqual({1: 2, 2: 4}, dict(report.succeeded))
+        self.assertEqual([3], list(report.failed))
+        self.assertFalse(report.ok)
+        self.assertEqual(3, len(report))
+        self.assertEqual('<BulkReport: 2 succeeded, 1 failed>', repr(report))
+
+    def test_run_bulk_resume(self):
+        report = bulk.run_bulk(_double, [1, 2, 3])
+        func = mock.Mock(return_value=6)
+
+        report = bulk.run_bulk(func, [1, 2, 3], report=report)
+
+        func.assert_called_once_with(3)
+        self.assertTrue(report.ok)
+        self.assertEqual({1: 2, 2: 4, 3: 6}, dict(report.succeeded))
+
+    @mock.patch('SoftLayer.bulk.time')
+    def test_rate_limiter(self, time_mock):
+        time_mock.time.return_value = 100.0
+        limiter = bulk.RateLimiter(rate=2)
+
+        limiter.wait()
+        limiter.wait()
+        limiter.wait()
+
+        self.assertEqual([mock.call(0.5), mock.call(1.0)],
+                         time_mock.sleep.call_args_list)
+
+    @mock.patch('SoftLayer.bulk.time')
+    def test_no_rate_limit(self, time_mock):
+        bulk.RateLimiter().wait()
+        self.assertFalse(time_mock.time.called)
+
+    def test_worker_pool_submit_while_consuming(self):
+        lock = threading.Lock()
+        running = [0, 0]  # current, max
+
+        def work(item):
+            """Tracks how many calls run at the same time."""
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return item
+
+        pool = bulk.WorkerPool(work, workers=2)
+        for item in range(4):
+            pool.submit(item)
+
+        seen = []
+        try:
+            for item, result, error in pool.as_completed():
+                self.assertIsNone(error)
+                seen.append(result)
+                if item < 4:
+                    pool.submit(item + 10)
+        finally:
+            pool.close()
+
+        self.assertEqual([0, 1, 2, 3, 10, 11, 12, 13], sorted(seen))
+        self.assertEqual(0, len(pool))
+        self.assertLessEqual(running[1], 2)
+
+    def test_provision_report(self):
+        report = bulk.ProvisionReport()
+        self.assertTrue(report.ok)
+
+        error = ValueError('nope')
+        report.created.append({'id': 1})
+        report.ready[1] = False
+        report.tag_errors[1] = error
+
+        self.assertFalse(report.ok)
+        self.assertEqual([error], report.errors)
+        self.assertEqual('<ProvisionReport: 1 created, 0 tagged, 0 ready, '
+                         '1 errors>', repr(report))
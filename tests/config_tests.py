@@ -59,12 +59,14 @@ class TestGetClientSettingsEnv(testing.TestCase):
 
     @mock.patch.dict('os.environ', {'SL_USERNAME': 'username',
                                     'SL_API_KEY': 'api_key',
-                                    'https_proxy': 'https://localhost:3128'})
+                                    'https_proxy': 'https://localhost:3128',
+                                    'SL_LOCATION_CACHE': '/tmp/locations'})
     def test_username_api_key(self):
         result = config.get_client_settings_env()
 
         self.assertEqual(result['username'], 'username')
         self.assertEqual(result['api_key'], 'api_key')
+        self.assertEqual(result['location_cache'], '/tmp/locations')
 
 
 class TestGetClientSettingsConfigFile(testing.TestCase):
@@ -78,6 +80,7 @@ class TestGetClientSettingsConfigFile(testing.TestCase):
         self.assertEqual(result['proxy'], config_parser().get())
         self.assertEqual(result['username'], config_parser().get())
         self.assertEqual(result['api_key'], config_parser().get())
+        self.assertEqual(result['location_cache'], config_parser().get())
 
     @mock.patch('six.moves.configparser.RawConfigParser')
     def test_no_section(self, config_parser):
@@ -0,0 +1,104 @@
+"""
+    SoftLayer.tests.managers.datacenters_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import os
+import shutil
+import tempfile
+
+import mock
+
+from SoftLayer.managers import datacenters
+from SoftLayer import testing
+
+
+class LocationRegistryTests(testing.TestCase):
+
+    def set_up(self):
+        self.registry = datacenters.LocationRegistry(self.client)
+
+    def test_lookups(self):
+        for identifier in ['sjc01', 'SJC01', 'San Jose 1', 168642, '168642',
+                           'SANJOSE01']:
+            self.assertEqual(168642, self.registry.get_id(identifier))
+
+        self.assertEqual('SANJOSE01',
+                         self.registry.get_region_keyname('sjc01'))
+        self.assertEqual([503], self.registry.get_price_group_ids('sjc01'))
+        self.assertEqual(0, self.registry.get_id('dal05'))
+        self.assertEqual([], self.registry.get_price_group_ids('dal05'))
+        self.assertIsNone(self.registry.get_id('dal10'))
+        self.assertIsNone(self.registry.get_region_keyname('dal10'))
+        self.assertEqual(2, len(self.registry.get_datacenters()))
+
+        self.assert_called_with('SoftLayer_Location_Datacenter',
+                                'getDatacenters',
+                                mask='mask[%s]' % datacenters.DATACENTER_MASK)
+        self.assertEqual(1, len(self.calls('SoftLayer_Location_Datacenter',
+                                           'getDatacenters')))
+
+    @mock.patch('SoftLayer.managers.datacenters.time')
+    def test_ttl(self, time_mock):
+        time_mock.time.return_value = 1000
+        self.registry.get_id('sjc01')
+        time_mock.time.return_value = 1000 + datacenters.LOCATION_TTL - 1
+        self.registry.get_id('sjc01')
+        self.assertEqual(1, len(self.calls('SoftLayer_Location_Datacenter',
+                                           'getDatacenters')))
+
+        time_mock.time.return_value = 1000 + datacenters.LOCATION_TTL
+        self.registry.get_id('sjc01')
+        self.assertEqual(2, len(self.calls('SoftLayer_Location_Datacenter',
+                                           'getDatacenters')))
+
+        self.registry.clear()
+        self.registry.get_id('sjc01')
+        self.assertEqual(3, len(self.calls('SoftLayer_Location_Datacenter',
+                                           'getDatacenters')))
+
+    def test_persistent(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        filename = os.path.join(path, 'locations.json')
+
+        registry = datacenters.LocationRegistry(self.client, path=filename)
+        self.assertEqual(168642, registry.get_id('sjc01'))
+        self.assertTrue(os.path.exists(filename))
+
+        registry = datacenters.LocationRegistry(self.client, path=filename)
+        self.assertEqual(168642, registry.get_id('San Jose 1'))
+        self.assertEqual(1, len(self.calls('SoftLayer_Location_Datacenter',
+                                           'getDatacenters')))
+
+        registry.clear()
+        self.assertFalse(os.path.exists(filename))
+
+    def test_get_registry(self):
+        registry = datacenters.get_registry(self.client)
+
+        self.assertIs(registry, datacenters.get_registry(self.client))
+        self.assertIsNot(registry, self.registry)
+        self.assertIsNone(registry.path)
+
+    def test_get_registry_location_cache(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        self.client.location_cache = os.path.join(path, 'locations')
+
+        registry = datacenters.get_registry(self.client)
+        self.assertEqual(168642, registry.get_id('sjc01'))
+        self.assertTrue(os.path.exists(self.client.location_cache))
+
+    def test_find_region(self):
+        regions = [{
+            'keyname': 'DALLAS05',
+            'location': {'location': {'id': 138124, 'name': 'dal05',
+                                      'longName': 'Dallas 5'}}
+        }]
+
+        for identifier in ['dal05', 'Dallas 5', 138124, 'DALLAS05']:
+            self.assertIs(regions[0],
+                          datacenters.find_region(regions, identifier))
+        self.assertIsNone(datacenters.find_region(regions, 'dal10'))
@@ -55,6 +55,19 @@ class DNSTests(testing.TestCase):
         self.assert_called_with('SoftLayer_Account', 'getDomains',
                                 filter=_filter)
 
+    def test_resolve_many(self):
+        mock = self.set_mock('SoftLayer_Account', 'getDomains')
+        mock.return_value = [{'id': 12345, 'name': 'example.com'},
+                             {'id': 12346, 'name': 'example.org'}]
+
+        res = self.dns_client.resolve_many(['example.com', 'Example.org',
+                                            'example.net'])
+
+        self.assertEqual({'example.com': [12345],
+                          'Example.org': [12346],
+                          'example.net': []}, res)
+        self.assertEqual(1, len(self.calls('SoftLayer_Account', 'getDomains')))
+
     def test_create_zone(self):
         res = self.dns_client.create_zone('example.com', serial='2014110201')
 
@@ -91,6 +104,60 @@ class DNSTests(testing.TestCase):
                                 },))
         self.assertEqual(res, {'name': 'example.com'})
 
+    def test_create_records(self):
+        create_mock = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                    'createObjects')
+        create_mock.side_effect = lambda call: [
+            dict(record, id=record['host']) for record in call.args[0]]
+        records = [{'record': 'host%d' % i, 'type': 'A', 'data': '10.0.0.%d' % i}
+                   for i in range(5)]
+
+        results = sorted(self.dns_client.create_records(1, records,
+                                                        chunk_size=2))
+
+        self.assertEqual([(i, 'host%d' % i, None) for i in range(5)],
+                         [(i, created['id'], error)
+                          for i, created, error in results])
+        calls = self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                           'createObjects')
+        self.assertEqual([2, 2, 1], sorted((len(call.args[0]) for call in calls),
+                                           reverse=True))
+        self.assertIn([{'domainId': 1, 'ttl': 60, 'host': 'host4',
+                        'type': 'A', 'data': '10.0.0.4'}],
+                      [call.args[0] for call in calls])
+
+    def test_create_records_retries_failed_chunk(self):
+        def create_records(call):
+            if len(call.args[0]) > 1:
+                raise SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'bad')
+            return call.args[0]
+
+        def create_record(call):
+            record = call.args[0]
+            if record['host'] == 'bad':
+                raise SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'bad')
+            return dict(record, id=10)
+
+        self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                      'createObjects').side_effect = create_records
+        self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                      'createObject').side_effect = create_record
+        records = [{'record': 'good', 'type': 'A', 'data': '10.0.0.1', 'ttl': 10},
+                   {'record': 'bad', 'type': 'A', 'data': 'nope', 'ttl': 10},
+                   {'record': 'last', 'type': 'A', 'data': '10.0.0.2', 'ttl': 10}]
+
+        results = dict((index, (created, error)) for index, created, error
+                       in self.dns_client.create_records(1, records,
+                                                         chunk_size=2))
+
+        self.assertEqual(10, results[0][0]['id'])
+        self.assertIsNone(results[1][0])
+        self.assertIsInstance(results[1][1], SoftLayer.SoftLayerAPIError)
+        self.assertEqual('last', results[2][0]['host'])
+        # Only the failed chunk is retried record by record
+        self.assertEqual(2, len(self.calls(
+            'SoftLayer_Dns_Domain_ResourceRecord', 'createObject')))
+
     def test_delete_record(self):
         self.dns_client.delete_record(1)
 
@@ -136,3 +203,290 @@ class DNSTests(testing.TestCase):
         self.assert_called_with('SoftLayer_Dns_Domain', 'getResourceRecords',
                                 identifier=12345,
                                 filter=_filter)
+
+    def test_plan_zone_sync(self):
+        records_mock = self.set_mock('SoftLayer_Dns_Domain',
+                                     'getResourceRecords')
+        records_mock.return_value = [
+            {'id': 1, 'host': '@', 'type': 'soa', 'data': 'ns1.', 'ttl': 86400},
+            {'id': 2, 'host': 'www', 'type': 'a', 'data': '10.0.0.1', 'ttl': 900},
+            {'id': 3, 'host': 'mail', 'type': 'a', 'data': '10.0.0.2', 'ttl': 900},
+            {'id': 4, 'host': 'old', 'type': 'cname', 'data': 'www', 'ttl': 900},
+            {'id': 5, 'host': 'api', 'type': 'a', 'data': '10.0.0.3', 'ttl': 900},
+            {'id': 6, 'host': 'api', 'type': 'a', 'data': '10.0.0.3', 'ttl': 900},
+        ]
+        desired = [
+            {'record': 'WWW', 'type': 'A', 'data': '10.0.0.1', 'ttl': None},
+            {'record': 'mail', 'type': 'A', 'data': '10.0.0.9', 'ttl': '60'},
+            {'record': 'api', 'type': 'A', 'data': '10.0.0.3', 'ttl': '300'},
+            {'record': 'new', 'type': 'TXT', 'data': '"hi"', 'ttl': '60'},
+        ]
+
+        plan = self.dns_client.plan_zone_sync(12345, desired)
+
+        self.assert_called_with('SoftLayer_Dns_Domain', 'getResourceRecords',
+                                identifier=12345,
+                                mask='mask[id,host,type,data,ttl]')
+        self.assertEqual([{'id': 5, 'ttl': 300},
+                          {'id': 3, 'data': '10.0.0.9', 'ttl': 60}],
+                         plan.update)
+        self.assertEqual([desired[3]], plan.create)
+        self.assertEqual([4, 6], [record['id'] for record in plan.delete])
+        self.assertEqual(5, len(plan))
+
+    def test_plan_zone_sync_in_sync(self):
+        desired = [{'record': 'a', 'type': 'CNAME', 'data': 'd', 'ttl': 7200},
+                   {'record': 'b', 'type': 'A', 'data': '1', 'ttl': None},
+                   {'record': 'c', 'type': 'PTR', 'data': 'x', 'ttl': 900},
+                   {'record': 'd', 'type': 'TXT', 'data': 'b', 'ttl': 86400},
+                   {'record': 'e', 'type': 'TXT', 'data': 'b', 'ttl': 86400},
+                   {'record': 'f', 'type': 'TXT', 'data': 'b', 'ttl': 600}]
+
+        plan = self.dns_client.plan_zone_sync(12345, desired)
+
+        self.assertEqual(0, len(plan))
+
+    def test_plan_zone_sync_hostname_data(self):
+        self.set_mock('SoftLayer_Dns_Domain', 'getResourceRecords').return_value = [
+            {'id': 1, 'host': 'www', 'type': 'cname', 'data': 'Host.Example.com.', 'ttl': 60},
+            {'id': 2, 'host': '@', 'type': 'mx', 'data': 'mail.example.com', 'ttl': 60},
+            {'id': 3, 'host': 'txt', 'type': 'txt', 'data': 'Dot.', 'ttl': 60}]
+        desired = [
+            {'record': 'www', 'type': 'CNAME', 'data': 'host.example.com', 'ttl': 60},
+            {'record': '@', 'type': 'MX', 'data': 'MAIL.example.com.', 'ttl': 60},
+            {'record': 'txt', 'type': 'TXT', 'data': 'Dot.', 'ttl': 60},
+            {'record': 'txt', 'type': 'TXT', 'data': 'dot', 'ttl': 60}]
+
+        plan = self.dns_client.plan_zone_sync(12345, desired)
+
+        # Only TXT data is compared as written
+        self.assertEqual([desired[3]], plan.create)
+        self.assertEqual([], plan.update)
+        self.assertEqual([], plan.delete)
+
+    def test_sync_zone(self):
+        plan = SoftLayer.managers.dns.ZoneSyncPlan(12345)
+        plan.create = [{'record': 'new%d' % i, 'type': 'A', 'data': '10.0.0.%d' % i}
+                       for i in range(3)]
+        plan.update = [{'id': 1, 'ttl': 60}, {'id': 2, 'data': 'x'}]
+        plan.delete = [{'id': 3}, {'id': 4}, {'id': 5}]
+        create_mock = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                    'createObjects')
+        create_mock.side_effect = lambda call: call.args[0]
+        delete_mock = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                    'deleteObjects')
+        delete_mock.side_effect = [True, SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception', 'nope')]
+
+        report = self.dns_client.apply_zone_sync(plan, chunk_size=2, workers=1)
+
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'editObjects', args=(plan.update,))
+        self.assertEqual([[{'id': 3}, {'id': 4}], [{'id': 5}]],
+                         [call.args[0] for call in self.calls(
+                             'SoftLayer_Dns_Domain_ResourceRecord',
+                             'deleteObjects')])
+        self.assertEqual(2, len(self.calls(
+            'SoftLayer_Dns_Domain_ResourceRecord', 'createObjects')))
+        self.assertEqual([('delete', 2)], list(report.failed))
+        self.assertEqual(7, len(report.succeeded))
+        self.assertEqual('new2', report.succeeded[('create', 2)]['host'])
+
+    def _set_host_sync_mocks(self):
+        domains_mock = self.set_mock('SoftLayer_Account', 'getDomains')
+        domains_mock.return_value = [{'id': 1, 'name': 'example.com'}]
+        self.zone_records = {
+            1: [{'id': 10, 'host': 'web1', 'type': 'a', 'data': '10.0.0.1', 'ttl': 7200},
+                {'id': 11, 'host': 'web2', 'type': 'a', 'data': '10.0.0.9', 'ttl': 7200},
+                {'id': 12, 'host': 'dup', 'type': 'a', 'data': '10.0.0.4', 'ttl': 7200},
+                {'id': 13, 'host': 'dup', 'type': 'a', 'data': '10.0.0.5', 'ttl': 7200}],
+            2: [{'id': 20, 'host': '1', 'type': 'ptr',
+                 'data': 'web1.example.com.', 'ttl': 7200}],
+        }
+
+        def get_records(call):
+            if isinstance(self.zone_records[call.identifier], Exception):
+                raise self.zone_records[call.identifier]
+            return self.zone_records[call.identifier]
+
+        self.set_mock('SoftLayer_Dns_Domain',
+                      'getResourceRecords').side_effect = get_records
+        self.set_mock('SoftLayer_Virtual_Guest',
+                      'getReverseDomainRecords').return_value = [
+                          {'id': 2, 'name': '0.0.10.in-addr.arpa'}]
+        self.set_mock('SoftLayer_Hardware_Server',
+                      'getReverseDomainRecords').return_value = []
+
+    def test_plan_host_sync(self):
+        self._set_host_sync_mocks()
+        guests = [
+            {'id': 100, 'hostname': 'web1', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'web1.example.com',
+             'primaryIpAddress': '10.0.0.1'},
+            {'id': 101, 'hostname': 'web2', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'web2.example.com',
+             'primaryIpAddress': '10.0.0.2'},
+            {'id': 102, 'hostname': 'dup', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'dup.example.com',
+             'primaryIpAddress': '10.0.0.3'},
+            {'id': 103, 'hostname': 'nozone', 'domain': 'example.org',
+             'fullyQualifiedDomainName': 'nozone.example.org',
+             'primaryIpAddress': '10.0.0.4'},
+            {'id': 104, 'hostname': 'noip', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'noip.example.com'},
+        ]
+        hardware = [{'id': 200, 'hostname': 'db1', 'domain': 'example.com',
+                     'fullyQualifiedDomainName': 'db1.example.com',
+                     'primaryIpAddress': '10.1.0.1'}]
+
+        plans, errors = self.dns_client.plan_host_sync(guests, hardware)
+
+        self.assertEqual({
+            'dup.example.com': 'Found 2 A records for dup',
+            'nozone.example.org': 'Found 0 zones named example.org',
+            'noip.example.com': 'No primary IP address',
+            'db1.example.com': 'No reverse zone for 10.1.0.1',
+        }, errors)
+        self.assertEqual([1, 2], [plan.zone_id for plan in plans])
+        forward, reverse = plans
+        self.assertEqual('example.com', forward.name)
+        self.assertEqual([{'record': 'db1', 'type': 'A', 'data': '10.1.0.1',
+                           'ttl': 7200}], forward.create)
+        self.assertEqual([{'id': 11, 'host': 'web2', 'type': 'a',
+                           'data': '10.0.0.2', 'ttl': 7200}], forward.update)
+        self.assertEqual([{'record': '2', 'type': 'PTR',
+                           'data': 'web2.example.com', 'ttl': 7200},
+                          {'record': '3', 'type': 'PTR',
+                           'data': 'dup.example.com', 'ttl': 7200},
+                          {'record': '4', 'type': 'PTR',
+                           'data': 'nozone.example.org', 'ttl': 7200}],
+                         reverse.create)
+        self.assertEqual([], reverse.update)
+
+        # Every zone was resolved and loaded once
+        self.assert_called_with('SoftLayer_Account', 'getDomains',
+                                mask='mask[id,name]')
+        self.assertEqual(1, len(self.calls('SoftLayer_Account', 'getDomains')))
+        self.assertEqual([1, 2], sorted(call.identifier for call in self.calls(
+            'SoftLayer_Dns_Domain', 'getResourceRecords')))
+        self.assert_called_with('SoftLayer_Dns_Domain', 'getResourceRecords',
+                                identifier=2, mask='mask[id,host,type,data,ttl]',
+                                filter={'resourceRecords': {
+                                    'type': {'operation': '_= ptr'}}})
+        self.assertEqual(1, len(self.calls('SoftLayer_Virtual_Guest',
+                                           'getReverseDomainRecords')))
+        self.assertEqual(1, len(self.calls('SoftLayer_Hardware_Server',
+                                           'getReverseDomainRecords')))
+
+    def test_plan_host_sync_reverse_zone_size(self):
+        self._set_host_sync_mocks()
+        self.zone_records[3] = [{'id': 30, 'host': '2.0', 'type': 'ptr',
+                                 'data': 'web2.example.com.', 'ttl': 7200}]
+        self.set_mock('SoftLayer_Virtual_Guest',
+                      'getReverseDomainRecords').return_value = [
+                          {'id': 3, 'name': '0.10.in-addr.arpa'}]
+        guests = [
+            {'id': 100 + number, 'hostname': 'web%d' % number,
+             'domain': 'example.com',
+             'fullyQualifiedDomainName': 'web%d.example.com' % number,
+             'primaryIpAddress': address}
+            for number, address in [(1, '10.0.0.1'), (2, '10.0.0.2'),
+                                    (3, '10.0.1.5')]]
+
+        plans, errors = self.dns_client.plan_host_sync(guests,
+                                                       record_types=['ptr'])
+
+        self.assertEqual({}, errors)
+        # The /16 zone holds the PTR of web2, which another server found
+        self.assertEqual([3], [plan.zone_id for plan in plans])
+        self.assertEqual([{'record': '1.0', 'type': 'PTR',
+                           'data': 'web1.example.com', 'ttl': 7200},
+                          {'record': '5.1', 'type': 'PTR',
+                           'data': 'web3.example.com', 'ttl': 7200}],
+                         plans[0].create)
+        self.assertEqual([], plans[0].update)
+        self.assertEqual([101, 103], sorted(call.identifier for call in self.calls(
+            'SoftLayer_Virtual_Guest', 'getReverseDomainRecords')))
+        self.assertEqual(1, len(self.calls('SoftLayer_Dns_Domain',
+                                           'getResourceRecords')))
+
+    def test_plan_host_sync_reverse_zone_per_host(self):
+        self._set_host_sync_mocks()
+        self.set_mock('SoftLayer_Virtual_Guest', 'getReverseDomainRecords'
+                      ).side_effect = lambda call: (
+                          [] if call.identifier == 101
+                          else [{'id': 2, 'name': '0.0.10.in-addr.arpa'}])
+        guests = [{'id': 100 + number, 'hostname': 'web%d' % number,
+                   'domain': 'example.com',
+                   'fullyQualifiedDomainName': 'web%d.example.com' % number,
+                   'primaryIpAddress': '10.0.0.%d' % number}
+                  for number in (1, 2)]
+
+        plans, errors = self.dns_client.plan_host_sync(guests,
+                                                       record_types=['ptr'])
+
+        # The zone of web2 is looked up on its own since web1 had none
+        self.assertEqual({}, errors)
+        self.assertEqual(['2'], [record['record'] for record in plans[0].create])
+        self.assertEqual([101, 102], [call.identifier for call in self.calls(
+            'SoftLayer_Virtual_Guest', 'getReverseDomainRecords')])
+
+    def test_plan_host_sync_failures(self):
+        self._set_host_sync_mocks()
+        self.zone_records[1] = SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'down')
+        self.set_mock('SoftLayer_Hardware_Server', 'getReverseDomainRecords'
+                      ).side_effect = SoftLayer.SoftLayerAPIError(
+                          'SoftLayer_Exception', 'nope')
+        guests = [{'id': 101, 'hostname': 'web2', 'domain': 'example.com',
+                   'fullyQualifiedDomainName': 'web2.example.com',
+                   'primaryIpAddress': '10.0.0.2'}]
+        hardware = [{'id': 200 + number, 'hostname': 'db%d' % number,
+                     'domain': 'example.com',
+                     'fullyQualifiedDomainName': 'db%d.example.com' % number,
+                     'primaryIpAddress': '10.1.0.%d' % number}
+                    for number in (1, 2)]
+
+        plans, errors = self.dns_client.plan_host_sync(guests, hardware)
+
+        zone_error = ("Can't fetch zone example.com: "
+                      "SoftLayerAPIError(SoftLayer_Exception): down")
+        reverse_error = ("Can't find the reverse zone of 10.1.0.%d: "
+                         "SoftLayerAPIError(SoftLayer_Exception): nope")
+        self.assertEqual({
+            'web2.example.com': zone_error,
+            'db1.example.com': reverse_error % 1 + '; ' + zone_error,
+            'db2.example.com': reverse_error % 2 + '; ' + zone_error,
+        }, errors)
+        # The reverse zone is still synced
+        self.assertEqual([2], [plan.zone_id for plan in plans])
+        self.assertEqual(['2'], [record['record'] for record in plans[0].create])
+        # The hosts of a failed /24 aren't looked up one by one
+        self.assertEqual(1, len(self.calls('SoftLayer_Hardware_Server',
+                                           'getReverseDomainRecords')))
+
+    def test_plan_host_sync_aaaa(self):
+        self._set_host_sync_mocks()
+        guests = [
+            {'id': 100, 'hostname': 'web1', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'web1.example.com',
+             'primaryIpAddress': '10.0.0.1',
+             'primaryNetworkComponent': {
+                 'primaryVersion6IpAddressRecord': {'ipAddress': '2001:db8::1'}}},
+            {'id': 101, 'hostname': 'web2', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'web2.example.com',
+             'primaryIpAddress': '10.0.0.2'},
+        ]
+
+        plans, errors = self.dns_client.plan_host_sync(
+            guests, record_types=['a', 'aaaa'], ttl=60)
+
+        # web2 still gets its A record
+        self.assertEqual({'web2.example.com': 'No ipv6 address'}, errors)
+        self.assertEqual([{'record': 'web1', 'type': 'AAAA',
+                           'data': '2001:db8::1', 'ttl': 60}], plans[0].create)
+        self.assertEqual([{'id': 10, 'host': 'web1', 'type': 'a',
+                           'data': '10.0.0.1', 'ttl': 60},
+                          {'id': 11, 'host': 'web2', 'type': 'a',
+                           'data': '10.0.0.2', 'ttl': 60}], plans[0].update)
+        self.assertEqual([], self.calls('SoftLayer_Virtual_Guest',
+                                        'getReverseDomainRecords'))
@@ -8,6 +8,8 @@
 import SoftLayer
 from SoftLayer import exceptions
 from SoftLayer import fixtures
+from SoftLayer.fixtures import SoftLayer_Network_Vlan_Firewall
+from SoftLayer.managers import firewall
 from SoftLayer import testing
 
 
@@ -322,3 +324,173 @@ class FirewallTests(testing.TestCase):
         self.assert_called_with('SoftLayer_Network_Firewall_Update_Request',
                                 'createObject',
                                 args=args)
+
+    def test_compile_rules(self):
+        rules = [
+            {'action': 'permit', 'protocol': 'tcp',
+             'sourceIpAddress': '10.0.0.7/24',
+             'destinationIpAddress': 'any on server',
+             'destinationPortRangeStart': 80,
+             'destinationPortRangeEnd': 443},
+            {'action': 'PERMIT', 'protocol': 'TCP',
+             'sourceIpAddress': '10.0.0.0',
+             'sourceIpSubnetMask': '255.255.255.0',
+             'destinationIpAddress': 'any on server',
+             'destinationPortRangeStart': 80,
+             'destinationPortRangeEnd': 443},
+            {'action': 'deny', 'protocol': 'tcp',
+             'sourceIpAddress': '10.0.0.9',
+             'destinationIpAddress': 'any on server',
+             'destinationPortRangeStart': 443,
+             'destinationPortRangeEnd': 443},
+            {'action': 'permit', 'protocol': 'icmp',
+             'sourceIpAddress': '2001:db8::/32',
+             'destinationIpAddress': 'any',
+             'destinationPortRangeStart': 1,
+             'destinationPortRangeEnd': 1},
+        ]
+
+        plan = firewall.compile_rules(rules)
+
+        self.assertEqual([(1, 0)], plan.duplicates)
+        self.assertEqual([(2, 0)], plan.shadowed)
+        self.assertTrue(plan.changed)
+        self.assertEqual(plan.rules, plan.added)
+        self.assertEqual([], plan.removed)
+        self.assertEqual([
+            {'orderValue': 1, 'action': 'permit', 'protocol': 'tcp',
+             'version': 4, 'sourceIpAddress': '10.0.0.0',
+             'sourceIpSubnetMask': '255.255.255.0',
+             'destinationIpAddress': 'any on server',
+             'destinationIpSubnetMask': '255.255.255.255',
+             'destinationPortRangeStart': 80,
+             'destinationPortRangeEnd': 443},
+            {'orderValue': 2, 'action': 'permit', 'protocol': 'icmp',
+             'version': 6, 'sourceIpAddress': '2001:db8::',
+             'sourceIpSubnetMask': '32', 'destinationIpAddress': 'any',
+             'destinationIpSubnetMask': '128'},
+        ], plan.rules)
+
+    def test_compile_rules_diff(self):
+        current = SoftLayer_Network_Vlan_Firewall.getRules
+        new_rule = {'action': 'deny', 'protocol': 'udp',
+                    'sourceIpAddress': 'any',
+                    'destinationIpAddress': '10.1.0.0/16'}
+
+        plan = firewall.compile_rules(
+            [current[2], new_rule, current[1]], current)
+
+        self.assertTrue(plan.changed)
+        self.assertEqual([], plan.shadowed)
+        self.assertEqual([current[0]], plan.removed)
+        self.assertEqual([plan.rules[1]], plan.added)
+        self.assertEqual('10.1.0.0', plan.added[0]['destinationIpAddress'])
+        self.assertEqual((1, 65535), (plan.added[0]['destinationPortRangeStart'],
+                                      plan.added[0]['destinationPortRangeEnd']))
+        # Kept rules go back as getRules returned them, renumbered
+        self.assertEqual(dict(current[2], orderValue=1), plan.rules[0])
+        self.assertEqual(dict(current[1], orderValue=3), plan.rules[2])
+
+    def test_compile_rules_unchanged(self):
+        current = SoftLayer_Network_Vlan_Firewall.getRules
+        rules = [{'action': 'permit', 'protocol': 'tcp',
+                  'sourceIpAddress': 'any',
+                  'destinationIpAddress': 'any on server',
+                  'destinationPortRangeStart': 80,
+                  'destinationPortRangeEnd': 80}] + current[1:]
+
+        plan = firewall.compile_rules(rules, current)
+
+        self.assertFalse(plan.changed)
+        self.assertEqual([], plan.added)
+        self.assertEqual([], plan.removed)
+
+    def test_compile_rules_current_order(self):
+        current = SoftLayer_Network_Vlan_Firewall.getRules
+
+        plan = firewall.compile_rules(current, list(reversed(current)))
+
+        self.assertFalse(plan.changed)
+        self.assertEqual([], plan.added)
+        self.assertEqual([], plan.removed)
+        self.assertEqual(current, plan.rules)
+
+    def test_compile_rules_notes_changed(self):
+        current = SoftLayer_Network_Vlan_Firewall.getRules
+
+        plan = firewall.compile_rules(
+            [dict(current[0], notes='web')] + current[1:], current)
+
+        self.assertTrue(plan.changed)
+        self.assertEqual('web', plan.rules[0]['notes'])
+        self.assertEqual([], plan.added)
+
+    def test_compile_rules_invalid(self):
+        compile_rules = firewall.compile_rules
+        for rule, message in [
+                ({'action': 'allow'}, 'Rule 1: Invalid action: allow'),
+                ({'sourceIpAddress': '10.0.0.256'},
+                 'Rule 1: Invalid IP address: 10.0.0.256'),
+                ({'sourceIpAddress': '10.0.0.0',
+                  'sourceIpSubnetMask': '255.0.255.0'},
+                 'Rule 1: Subnet mask 255.0.255.0 is not contiguous'),
+                ({'destinationPortRangeStart': 90,
+                  'destinationPortRangeEnd': 80},
+                 'Rule 1: Invalid port range: 90-80'),
+                ({'sourceIpAddress': '10.0.0.1', 'version': 6},
+                 'Rule 1: 10.0.0.1 is not an IPv6 address')]:
+            ex = self.assertRaises(ValueError, compile_rules, [rule])
+            self.assertEqual(message, str(ex))
+
+    def test_compile_rules_many(self):
+        rules = [{'action': 'permit', 'protocol': 'tcp',
+                  'sourceIpAddress': '10.%d.%d.0/24' % (i // 256, i % 256),
+                  'destinationIpAddress': 'any on server',
+                  'destinationPortRangeStart': 22,
+                  'destinationPortRangeEnd': 22} for i in range(5000)]
+        rules.insert(2500, {'action': 'deny', 'protocol': 'tcp',
+                            'sourceIpAddress': '10.0.0.0/8',
+                            'destinationIpAddress': 'any on server'})
+
+        plan = firewall.compile_rules(rules)
+
+        self.assertEqual(2501, len(plan.rules))
+        self.assertEqual([(i, 2500) for i in range(2501, 5001)], plan.shadowed)
+
+    def test_update_fwl_rules(self):
+        rules = [{'action': 'permit', 'protocol': 'tcp',
+                  'sourceIpAddress': '10.0.0.1'}]
+
+        plan, _ = self.firewall.update_fwl_rules(1234, rules)
+
+        self.assertTrue(plan.changed)
+        self.assert_called_with('SoftLayer_Network_Component_Firewall',
+                                'getRules', identifier=1234)
+        self.assert_called_with('SoftLayer_Network_Firewall_Update_Request',
+                                'createObject',
+                                args=({'networkComponentFirewallId': 1234,
+                                       'rules': plan.rules},))
+
+    def test_edit_fwl_rules(self):
+        rules = [{'action': 'permit'}]
+
+        self.firewall.edit_fwl_rules(1234, rules, dedicated=True)
+        self.assert_called_with('SoftLayer_Network_Vlan_Firewall', 'getObject',
+                                identifier=1234)
+
+        self.firewall.edit_fwl_rules(1234, rules)
+        self.assert_called_with('SoftLayer_Network_Firewall_Update_Request',
+                                'createObject',
+                                args=({'networkComponentFirewallId': 1234,
+                                       'rules': rules},))
+
+    def test_update_fwl_rules_unchanged(self):
+        rules = SoftLayer_Network_Vlan_Firewall.getRules
+
+        plan, result = self.firewall.update_fwl_rules(1234, rules,
+                                                      dedicated=True)
+
+        self.assertFalse(plan.changed)
+        self.assertIsNone(result)
+        self.assert_called_with('SoftLayer_Network_Vlan_Firewall', 'getRules')
+        self.assertEqual([], self.calls('SoftLayer_Network_Firewall_Update_Request'))
@@ -95,6 +95,26 @@ class HardwareTests(testing.TestCase):
         _id = self.hardware._get_ids_from_hostname('hardware-test1')
         self.assertEqual(_id, [1000, 1001, 1002, 1003])
 
+    def test_resolve_many(self):
+        mock = self.set_mock('SoftLayer_Account', 'getHardware')
+        mock.side_effect = [
+            [{'id': 1000, 'primaryIpAddress': '172.16.1.100'}],
+            [],
+            [{'id': 1001, 'hostname': 'hardware-test1'}],
+        ]
+
+        result = self.hardware.resolve_many(['172.16.1.100', '10.0.1.87',
+                                             'hardware-test1'])
+
+        self.assertEqual({'172.16.1.100': [1000],
+                          '10.0.1.87': [],
+                          'hardware-test1': [1001]}, result)
+        _filter = {'hardware': {'primaryBackendIpAddress': {
+            'operation': 'in',
+            'options': [{'name': 'data', 'value': ['10.0.1.87']}]}}}
+        self.assert_called_with('SoftLayer_Account', 'getHardware',
+                                filter=_filter)
+
     def test_get_hardware(self):
         result = self.hardware.get_hardware(1000)
 
@@ -134,6 +154,49 @@ class HardwareTests(testing.TestCase):
 
         self.assertEqual(options, expected)
 
+    def test_get_create_options_only_fetches_requested_sections(self):
+        options = self.hardware.get_create_options(['operating_systems'])
+
+        self.assertEqual({'operating_systems': [{'key': 'UBUNTU_14_64',
+                                                 'name': 'Ubuntu / 14.04-64'}]},
+                         options)
+        calls = self.calls('SoftLayer_Product_Package', 'getAllObjects')
+        self.assertEqual(1, len(calls))
+        self.assertEqual(
+            {'keyName': {'operation': 'BARE_METAL_SERVER'},
+             'items': {'itemCategory': {'categoryCode': {
+                 'operation': 'in',
+                 'options': [{'name': 'data', 'value': ['os']}]}}}},
+            calls[0].filter)
+        self.assertIn('items[', calls[0].mask)
+        self.assertNotIn('regions', calls[0].mask)
+
+    def test_get_package_is_cached(self):
+        package = self.hardware._get_package()
+        self.assertEqual(3, len(self.calls('SoftLayer_Product_Package',
+                                           'getAllObjects')))
+        self.assertEqual(200, package['id'])
+        self.assertEqual(['WASHINGTON_DC'],
+                         [region['keyname'] for region in package['regions']])
+
+        other = SoftLayer.HardwareManager(self.client)
+        self.assertEqual(package, other._get_package())
+        options = other.get_create_options(['extras', 'locations'])
+        self.assertEqual(['1_IPV6_ADDRESS'],
+                         [extra['key'] for extra in options['extras']])
+        self.assertEqual(3, len(self.calls('SoftLayer_Product_Package',
+                                           'getAllObjects')))
+
+    @mock.patch('SoftLayer.managers.hardware.time')
+    def test_get_package_cache_expires(self, time_mock):
+        time_mock.time.return_value = 1000
+        self.hardware._get_package()
+        time_mock.time.return_value = 1000 + managers.hardware.PACKAGE_TTL
+        self.hardware._get_package()
+
+        self.assertEqual(6, len(self.calls('SoftLayer_Product_Package',
+                                           'getAllObjects')))
+
     def test_get_create_options_package_missing(self):
         packages = self.set_mock('SoftLayer_Product_Package', 'getAllObjects')
         packages.return_value = []
@@ -276,6 +339,72 @@ class HardwareTests(testing.TestCase):
                                 identifier=6327,
                                 args=(False, False, 'No longer needed', ''))
 
+    def test_cancel_servers(self):
+        report = self.hardware.cancel_servers([6327, 6328], reason='cost',
+                                              immediate=True)
+
+        self.assertEqual({6327: True, 6328: True}, dict(report.succeeded))
+        self.assert_called_with('SoftLayer_Billing_Item',
+                                'cancelItem',
+                                identifier=6327,
+                                args=(True, False, 'Server / Upgrade Costs', ''))
+
+    def test_cancel_servers_partial_failure(self):
+        mock = self.set_mock('SoftLayer_Hardware_Server', 'getObject')
+        mock.return_value = {'id': 987}
+
+        report = self.hardware.cancel_servers([6327])
+
+        self.assertFalse(report.ok)
+        self.assertEqual("No billing item found for hardware",
+                         str(report.failed[6327]))
+
+    def test_reload_servers(self):
+        report = self.hardware.reload_servers([1, 2], ssh_keys=[1701])
+
+        self.assertTrue(report.ok)
+        self.assert_called_with('SoftLayer_Hardware_Server',
+                                'reloadOperatingSystem',
+                                identifier=1,
+                                args=('FORCE', {'sshKeyIds': [1701]}))
+
+    def test_edit_servers(self):
+        report = self.hardware.edit_servers([1, 2], notes='bulk')
+
+        self.assertEqual({1: True, 2: True}, dict(report.succeeded))
+        self.assert_called_with('SoftLayer_Hardware_Server', 'editObject',
+                                identifier=2, args=({'notes': 'bulk'},))
+
+    def test_power_servers(self):
+        self.hardware.power_cycle_servers([1, 2])
+        self.assertEqual(2, len(self.calls('SoftLayer_Hardware_Server',
+                                           'powerCycle')))
+        self.hardware.reboot_servers([1], hard=False)
+        self.assert_called_with('SoftLayer_Hardware_Server', 'rebootSoft',
+                                identifier=1)
+        self.hardware.power_off_servers([1])
+        self.assert_called_with('SoftLayer_Hardware_Server', 'powerOff',
+                                identifier=1)
+        self.hardware.power_on_servers([1])
+        self.assert_called_with('SoftLayer_Hardware_Server', 'powerOn',
+                                identifier=1)
+
+    def test_wait_for_ready_many(self):
+        mock = self.set_mock('SoftLayer_Account', 'getHardware')
+        mock.return_value = [{'id': 1000, 'provisionDate': 'aaa'},
+                             {'id': 1001, 'provisionDate': 'aaa'}]
+
+        events = list(self.hardware.wait_for_ready_many([1000, 1001], 10))
+
+        self.assertEqual([(1000, True), (1001, True)], events)
+        _filter = {'hardware': {'id': {
+            'operation': 'in',
+            'options': [{'name': 'data', 'value': [1000, 1001]}]}}}
+        self.assert_called_with('SoftLayer_Account', 'getHardware',
+                                filter=_filter)
+        self.assertEqual(1, len(self.calls('SoftLayer_Account',
+                                           'getHardware')))
+
     def test_cancel_hardware_no_billing_item(self):
         mock = self.set_mock('SoftLayer_Hardware_Server', 'getObject')
         mock.return_value = {'id': 987}
@@ -109,6 +109,28 @@ class ImageTests(testing.TestCase):
         result = self.image.resolve_ids('unknown_name')
         self.assertEqual([], result)
 
+    def test_resolve_many(self):
+        public_mock = self.set_mock(IMAGE_SERVICE, 'getPublicImages')
+        public_mock.return_value = [{'id': 100, 'name': 'image_name'}]
+        private_mock = self.set_mock('SoftLayer_Account',
+                                     'getPrivateBlockDeviceTemplateGroups')
+        private_mock.return_value = [{'id': 200, 'name': 'private_name'},
+                                     {'id': 201, 'name': 'private_name'}]
+
+        result = self.image.resolve_many(['image_name', 'private_name',
+                                          'unknown_name'])
+
+        self.assertEqual({'image_name': [100],
+                          'private_name': [200, 201],
+                          'unknown_name': []}, result)
+        _filter = {'privateBlockDeviceTemplateGroups': {'name': {
+            'operation': 'in',
+            'options': [{'name': 'data',
+                         'value': ['private_name', 'unknown_name']}]}}}
+        self.assert_called_with('SoftLayer_Account',
+                                'getPrivateBlockDeviceTemplateGroups',
+                                filter=_filter)
+
     def test_edit_tags(self):
         # Test updating tags
         self.image.edit(1, tag="tag1,tag2")
@@ -51,8 +51,10 @@ class LoadBalancerTests(testing.TestCase):
         id1 = self.lb_mgr._get_location('sjc01')
         self.assertEqual(id1, 168642)
 
-        id2 = self.lb_mgr._get_location('dal05')
+        id2 = self.lb_mgr._get_location('dal10')
         self.assertEqual(id2, 'FIRST_AVAILABLE')
+        self.assertEqual(
+            1, len(self.calls('SoftLayer_Location_Datacenter', 'getDatacenters')))
 
     def test_get_routing_types(self):
         result = self.lb_mgr.get_routing_types()
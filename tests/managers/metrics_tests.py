@@ -0,0 +1,191 @@
+"""
+    SoftLayer.tests.managers.metrics_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import os
+import tempfile
+
+import SoftLayer
+from SoftLayer.managers import metrics
+from SoftLayer import testing
+from SoftLayer import utils
+
+TYPES = [{'keyName': 'PUBLICIN_NET_OCTET',
+          'name': 'publicIn_net_octet',
+          'summaryType': 'sum'}]
+
+
+def _data(hour, counter, type_='publicIn_net_octet'):
+    return {'dateTime': '2017-05-04T%02d:00:00-06:00' % hour,
+            'counter': counter,
+            'type': type_}
+
+
+class TimeSeriesTests(testing.TestCase):
+
+    def test_append_and_sum(self):
+        series = metrics.TimeSeries()
+        self.assertIsNone(series.last)
+
+        for timestamp in range(0, 100, 10):
+            self.assertTrue(series.append(timestamp, timestamp / 10))
+        self.assertFalse(series.append(50, 100))
+
+        self.assertEqual(10, len(series))
+        self.assertEqual(90, series.last)
+        self.assertEqual(45, series.sum())
+        self.assertEqual(2 + 3 + 4, series.sum(20, 50))
+        self.assertEqual(0, series.sum(1000))
+        self.assertEqual([20, 30], list(series.slice(20, 40).timestamps))
+
+    def test_put(self):
+        series = metrics.TimeSeries([10, 20], [1, 2])
+
+        self.assertTrue(series.put(20, 5))
+        self.assertFalse(series.put(20, 5))
+        self.assertTrue(series.put(15, 3))
+        self.assertTrue(series.put(30, 4))
+
+        self.assertEqual([10, 15, 20, 30], list(series.timestamps))
+        self.assertEqual([1, 3, 5, 4], list(series.values))
+
+    def test_store_persists(self):
+        path = tempfile.mkdtemp()
+        store = metrics.TimeSeriesStore(path)
+
+        self.assertEqual(2, store.add(1, 'cpu0', [(10, 1.5), (20, 2.5)]))
+        self.assertEqual(2, store.add(1, 'cpu0', [(20, 9), (30, 3)]))
+        self.assertEqual(1, store.add(1, 'cpu0', [(5, 1), (30, 3)]))
+        store.mark_fetched(1, 'summary', 10, 30)
+        store.mark_fetched(1, 'summary', 50, 60)
+        store.mark_fetched(1, 'summary', 0, 10)
+
+        reopened = metrics.TimeSeriesStore(path)
+        self.assertEqual([5, 10, 20, 30], list(reopened.get(1, 'cpu0').timestamps))
+        self.assertEqual([1, 1.5, 9, 3], list(reopened.get(1, 'cpu0').values))
+        self.assertEqual([[0, 30], [50, 60]],
+                         reopened.fetched_ranges(1, 'summary'))
+        self.assertEqual(0, len(reopened.get(2, 'cpu0')))
+
+    def test_store_partial_point(self):
+        path = tempfile.mkdtemp()
+        metrics.TimeSeriesStore(path).add(1, 'cpu0', [(10, 1), (20, 2)])
+        with open(os.path.join(path, '1-cpu0.ts'), 'ab') as series_fp:
+            series_fp.write(b'\0' * 8)
+
+        series = metrics.TimeSeriesStore(path).get(1, 'cpu0')
+
+        self.assertEqual([1, 2], list(series.values))
+
+
+class MetricsTests(testing.TestCase):
+
+    def set_up(self):
+        self.metrics = SoftLayer.MetricsManager(self.client)
+
+    def test_sync_summary_data_incremental(self):
+        summary = self.set_mock('SoftLayer_Metric_Tracking_Object',
+                                'getSummaryData')
+        summary.return_value = [_data(0, 10), _data(1, 20), _data(2, 30),
+                                _data(0, 1, 'privateIn_net_octet')]
+
+        added = self.metrics.sync_summary_data(
+            1234, TYPES, 3600, '2017-05-04T00:00:00-06:00',
+            '2017-05-05T00:00:00-06:00')
+
+        self.assertEqual(4, added)
+        self.assert_called_with('SoftLayer_Metric_Tracking_Object',
+                                'getSummaryData', identifier=1234,
+                                args=('2017-05-04T06:00:00+00:00',
+                                      '2017-05-05T06:00:00+00:00',
+                                      TYPES, 3600))
+        self.assertEqual(60, self.metrics.sum(1234, 'publicIn_net_octet'))
+
+        # Only the part after the last fetched point is requested again, and
+        # the last point, which may have been partial, is replaced
+        summary.return_value = [_data(2, 35), _data(3, 40)]
+        added = self.metrics.sync_summary_data(
+            1234, TYPES, 3600, '2017-05-04T00:00:00-06:00',
+            '2017-05-05T00:00:00-06:00')
+
+        self.assertEqual(2, added)
+        self.assert_called_with('SoftLayer_Metric_Tracking_Object',
+                                'getSummaryData', identifier=1234,
+                                args=('2017-05-04T08:00:00+00:00',
+                                      '2017-05-05T06:00:00+00:00',
+                                      TYPES, 3600))
+        self.assertEqual(105, self.metrics.sum(1234, 'publicIn_net_octet'))
+        self.assertEqual(55, self.metrics.sum(
+            1234, 'publicIn_net_octet', '2017-05-04T01:00:00-06:00',
+            '2017-05-04T03:00:00-06:00'))
+
+    def test_sync_earlier_window(self):
+        summary = self.set_mock('SoftLayer_Metric_Tracking_Object',
+                                'getSummaryData')
+        summary.return_value = [_data(12, 10), _data(13, 20)]
+        self.metrics.sync_summary_data(1234, TYPES, 3600,
+                                       '2017-05-04T12:00:00-06:00',
+                                       '2017-05-04T14:00:00-06:00')
+
+        # The hours before the first sync are fetched up to where it started
+        summary.return_value = [_data(10, 1), _data(11, 2)]
+        added = self.metrics.sync_summary_data(1234, TYPES, 3600,
+                                               '2017-05-04T10:00:00-06:00',
+                                               '2017-05-04T13:00:00-06:00')
+
+        self.assertEqual(2, added)
+        self.assert_called_with('SoftLayer_Metric_Tracking_Object',
+                                'getSummaryData', identifier=1234,
+                                args=('2017-05-04T16:00:00+00:00',
+                                      '2017-05-04T18:00:00+00:00',
+                                      TYPES, 3600))
+        self.assertEqual(3, self.metrics.sum(
+            1234, 'publicIn_net_octet', '2017-05-04T10:00:00-06:00',
+            '2017-05-04T12:00:00-06:00'))
+        self.assertEqual([[utils.to_timestamp('2017-05-04T10:00:00-06:00'),
+                           utils.to_timestamp('2017-05-04T13:00:00-06:00')]],
+                         self.metrics.store.fetched_ranges(
+                             1234, 'summary:3600:PUBLICIN_NET_OCTET'))
+
+        # Now only the hour after the last point is missing
+        summary.return_value = []
+        self.metrics.sync_summary_data(1234, TYPES, 3600,
+                                       '2017-05-04T10:00:00-06:00',
+                                       '2017-05-04T14:00:00-06:00')
+        self.assert_called_with('SoftLayer_Metric_Tracking_Object',
+                                'getSummaryData', identifier=1234,
+                                args=('2017-05-04T19:00:00+00:00',
+                                      '2017-05-04T20:00:00+00:00',
+                                      TYPES, 3600))
+
+    def test_sync_up_to_date(self):
+        self.metrics.store.mark_fetched(1234, 'bandwidth:public:300',
+                                        utils.to_timestamp('2017-05-03'),
+                                        utils.to_timestamp('2017-05-05'))
+
+        added = self.metrics.sync_bandwidth_data(1234, 'public', 300,
+                                                 '2017-05-04', '2017-05-05')
+
+        self.assertEqual(0, added)
+        self.assertEqual([], self.calls('SoftLayer_Metric_Tracking_Object',
+                                        'getBandwidthData'))
+
+    def test_sync_bandwidth_data(self):
+        bandwidth = self.set_mock('SoftLayer_Metric_Tracking_Object',
+                                  'getBandwidthData')
+        bandwidth.return_value = [_data(0, 5, 'publicIn'),
+                                  _data(0, 7, 'publicOut')]
+
+        self.metrics.sync_bandwidth_data(1234, 'public', 300,
+                                         '2017-05-04', '2017-05-05')
+
+        self.assert_called_with('SoftLayer_Metric_Tracking_Object',
+                                'getBandwidthData', identifier=1234,
+                                args=('2017-05-04T00:00:00+00:00',
+                                      '2017-05-05T00:00:00+00:00',
+                                      'public', 300))
+        self.assertEqual({1234: {'publicIn': 5, 'publicOut': 7}},
+                         self.metrics.summarize([1234],
+                                                ['publicIn', 'publicOut']))
@@ -4,10 +4,16 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import json
+
+import mock
+
 import SoftLayer
+from SoftLayer import exceptions
 from SoftLayer import fixtures
 from SoftLayer.managers import network
 from SoftLayer import testing
+from SoftLayer import utils
 
 
 class NetworkTests(testing.TestCase):
@@ -413,12 +419,57 @@ class NetworkTests(testing.TestCase):
     def test_summary_by_datacenter(self):
         result = self.network.summary_by_datacenter()
 
-        expected = {'dal00': {'hardware_count': 1,
-                              'virtual_guest_count': 1,
+        expected = {'dal00': {'hardware_count': 0,
+                              'virtual_guest_count': 0,
                               'subnet_count': 0,
                               'public_ip_count': 6,
-                              'vlan_count': 3}}
+                              'vlan_count': 3},
+                    'TEST00': {'hardware_count': 3,
+                               'virtual_guest_count': 2,
+                               'subnet_count': 0,
+                               'public_ip_count': 0,
+                               'vlan_count': 0},
+                    None: {'hardware_count': 1,
+                           'virtual_guest_count': 0,
+                           'subnet_count': 0,
+                           'public_ip_count': 0,
+                           'vlan_count': 0}}
         self.assertEqual(expected, result)
+        self.assert_called_with('SoftLayer_Account', 'getHardware',
+                                mask='mask[id,datacenter[name]]')
+        self.assert_called_with('SoftLayer_Account', 'getVirtualGuests',
+                                mask='mask[id,datacenter[name]]')
+        self.assert_called_with(
+            'SoftLayer_Account', 'getNetworkVlans',
+            mask='mask[id,subnetCount,totalPrimaryIpAddressCount,'
+                 'primaryRouter[id,datacenter[name]]]')
+
+    def test_summary_by_datacenter_cached(self):
+        first = self.network.summary_by_datacenter()
+        first['dal00']['vlan_count'] = 100
+
+        self.assertEqual(3, self.network.summary_by_datacenter()[
+            'dal00']['vlan_count'])
+        self.assertEqual(1, len(self.calls('SoftLayer_Account',
+                                           'getNetworkVlans')))
+
+        self.network.summary_by_datacenter(ttl=0)
+        self.assertEqual(2, len(self.calls('SoftLayer_Account',
+                                           'getNetworkVlans')))
+
+    def test_summary_by_datacenter_filter(self):
+        self.network.summary_by_datacenter(datacenter='dal00')
+
+        self.assert_called_with('SoftLayer_Account', 'getHardware', filter={
+            'hardware': {'datacenter': {'name': {'operation': '_= dal00'}}}})
+        self.assert_called_with(
+            'SoftLayer_Account', 'getVirtualGuests', filter={
+                'virtualGuests': {
+                    'datacenter': {'name': {'operation': '_= dal00'}}}})
+        self.assert_called_with(
+            'SoftLayer_Account', 'getNetworkVlans', filter={
+                'networkVlans': {'primaryRouter': {
+                    'datacenter': {'name': {'operation': '_= dal00'}}}}})
 
     def test_resolve_global_ip_ids(self):
         _id = self.network.resolve_global_ip_ids('10.0.0.1')
@@ -459,6 +510,35 @@ class NetworkTests(testing.TestCase):
 
         self.assertEqual(_id, [])
 
+    def test_resolve_many_global_ip_ids(self):
+        mock = self.set_mock('SoftLayer_Account', 'getGlobalIpRecords')
+        mock.return_value = [
+            {'id': 200,
+             'ipAddress': {'subnet': {'networkIdentifier': '10.0.0.1'}}}]
+
+        _ids = self.network.resolve_many_global_ip_ids(['10.0.0.1', 'nope'])
+
+        self.assertEqual(_ids, {'10.0.0.1': [200], 'nope': []})
+
+    def test_resolve_many_subnet_ids(self):
+        mock = self.set_mock('SoftLayer_Account', 'getSubnets')
+        mock.return_value = [{'id': 100, 'networkIdentifier': '10.0.0.1'}]
+
+        _ids = self.network.resolve_many_subnet_ids(['10.0.0.1/29', '10.0.0.1',
+                                                     '10.0.0.9'])
+
+        self.assertEqual(_ids, {'10.0.0.1/29': [100], '10.0.0.1': [100],
+                                '10.0.0.9': []})
+        self.assertEqual(1, len(self.calls('SoftLayer_Account', 'getSubnets')))
+
+    def test_resolve_many_vlan_ids(self):
+        mock = self.set_mock('SoftLayer_Account', 'getNetworkVlans')
+        mock.return_value = [{'id': 100, 'name': 'vlan_name'}]
+
+        _ids = self.network.resolve_many_vlan_ids(['vlan_name', '1', 'nope'])
+
+        self.assertEqual(_ids, {'vlan_name': [100], '1': [1], 'nope': []})
+
     def test_unassign_global_ip(self):
         result = self.network.unassign_global_ip(9876)
 
@@ -466,3 +546,188 @@ class NetworkTests(testing.TestCase):
         self.assert_called_with('SoftLayer_Network_Subnet_IpAddress_Global',
                                 'unroute',
                                 identifier=9876)
+
+    def _set_sg_rules(self):
+        rules_mock = self.set_mock('SoftLayer_Network_SecurityGroup', 'getRules')
+        rules_mock.return_value = [
+            {'id': 1, 'direction': 'ingress', 'ethertype': 'IPv4',
+             'protocol': 'tcp', 'portRangeMin': 22, 'portRangeMax': 22,
+             'remoteIp': '10.0.0.1/32'},
+            {'id': 2, 'direction': 'ingress', 'ethertype': 'IPv4',
+             'protocol': 'tcp', 'portRangeMin': 80, 'portRangeMax': 80},
+            {'id': 3, 'direction': 'egress', 'ethertype': 'IPv4'},
+            {'id': 4, 'direction': 'ingress', 'ethertype': 'IPv6',
+             'protocol': 'udp', 'portRangeMin': 53, 'portRangeMax': 53},
+        ]
+
+    def test_plan_securitygroup_sync(self):
+        self._set_sg_rules()
+
+        plan = self.network.plan_securitygroup_sync(100, [
+            {'direction': 'INGRESS', 'protocol': 'TCP', 'portRangeMin': 22,
+             'portRangeMax': 22, 'remoteIp': '10.0.0.1'},
+            {'direction': 'ingress', 'protocol': 'tcp', 'portRangeMin': 80,
+             'portRangeMax': 443},
+            {'direction': 'egress', 'ethertype': 'ipv4', 'portRangeMin': 1},
+            {'direction': 'ingress', 'protocol': 'icmp', 'portRangeMin': 8,
+             'portRangeMax': 0, 'remoteGroupId': '101'},
+            {'direction': 'ingress', 'protocol': 'icmp', 'portRangeMin': 8,
+             'portRangeMax': 0, 'remoteGroupId': 101},
+        ])
+
+        self.assertEqual([{'direction': 'ingress', 'ethertype': 'IPv4',
+                           'protocol': 'icmp', 'portRangeMin': 8,
+                           'portRangeMax': 0, 'remoteGroupId': 101}],
+                         plan.add)
+        self.assertEqual([{'id': 2, 'portRangeMin': 80, 'portRangeMax': 443}],
+                         plan.edit)
+        self.assertEqual([4], [rule['id'] for rule in plan.remove])
+        self.assertEqual(3, len(plan))
+        self.assert_called_with('SoftLayer_Network_SecurityGroup', 'getRules',
+                                identifier=100, mask='mask[%s]' % network.SG_RULE_MASK)
+
+    def test_plan_securitygroup_sync_invalid(self):
+        self._set_sg_rules()
+
+        ex = self.assertRaises(ValueError, self.network.plan_securitygroup_sync,
+                               100, [{'direction': 'egress'}, {'direction': 'in'}])
+
+        self.assertEqual("Rule 2: Invalid direction: 'in'", str(ex))
+
+    def test_apply_securitygroup_sync(self):
+        plan = network.SecurityGroupSyncPlan(100)
+        plan.add = [{'direction': 'egress', 'remoteGroupId': i}
+                    for i in range(5)]
+        plan.edit = [{'id': 2, 'portRangeMin': -1, 'portRangeMax': -1}]
+        plan.remove = [{'id': 3}, {'id': 4}]
+        for method in ['addRules', 'editRules', 'removeRules']:
+            call_mock = self.set_mock('SoftLayer_Network_SecurityGroup', method)
+            call_mock.side_effect = lambda call: {'requestId': '%s-%s' % (
+                call.method, len(call.args[0]))}
+
+        with mock.patch.object(self.network, 'wait_for_sg_requests') as wait, \
+                mock.patch('SoftLayer.managers.network.time') as time_mock:
+            time_mock.time.return_value = 1234
+            request_ids = self.network.apply_securitygroup_sync(plan, chunk_size=2)
+
+        self.assertEqual(['addRules-2', 'addRules-2', 'addRules-1',
+                          'editRules-1', 'removeRules-2'], request_ids)
+        wait.assert_called_once_with(100, request_ids, limit=600, delay=5,
+                                     since=1234)
+        calls = self.calls('SoftLayer_Network_SecurityGroup')
+        self.assertEqual([plan.add[:2], plan.add[2:4], plan.add[4:],
+                          plan.edit, [3, 4]],
+                         [call.args[0] for call in calls])
+
+    def test_sync_securitygroup_rules_in_sync(self):
+        self._set_sg_rules()
+        rules = self.client['Network_SecurityGroup'].getRules(id=100)
+
+        plan, request_ids = self.network.sync_securitygroup_rules(100, rules)
+
+        self.assertEqual(0, len(plan))
+        self.assertEqual([], request_ids)
+        self.assertEqual(['getRules', 'getRules'],
+                         [call.method for call in self.calls('SoftLayer_Network_SecurityGroup')])
+
+    def _event_log(self, request_id, event_name, group_id=100,
+                   created='2018-05-15T14:37:13.378291-06:00'):
+        return {'objectId': group_id, 'eventName': event_name,
+                'eventCreateDate': created,
+                'metaData': json.dumps({'requestId': request_id})}
+
+    @mock.patch('SoftLayer.managers.network.time')
+    def test_wait_for_sg_requests(self, time_mock):
+        time_mock.time.return_value = 0
+        logs_mock = self.set_mock('SoftLayer_Event_Log', 'getAllObjects')
+        logs_mock.side_effect = [
+            [self._event_log('a', network.SG_SUCCESS_EVENT)],
+            [self._event_log('a', network.SG_SUCCESS_EVENT),
+             self._event_log('b', network.SG_SUCCESS_EVENT,
+                             created='2018-05-15T14:38:00-06:00'),
+             self._event_log('other', network.SG_FAILURE_EVENT)],
+        ]
+
+        with mock.patch.object(network.json, 'loads', wraps=json.loads) as loads:
+            self.assertTrue(self.network.wait_for_sg_requests(100, ['a', 'b']))
+
+        # The repeated event of request a is only parsed once
+        self.assertEqual(3, loads.call_count)
+        self.assertEqual(1, time_mock.sleep.call_count)
+        first, second = self.calls('SoftLayer_Event_Log', 'getAllObjects')
+        # The first poll starts a minute before the requests were made, in
+        # the earliest time zone as long as the API's is unknown
+        self.assertEqual({
+            'objectId': {'operation': 'in',
+                         'options': [{'name': 'data', 'value': [100]}]},
+            'eventName': {'operation': 'in', 'options': [{
+                'name': 'data',
+                'value': [network.SG_SUCCESS_EVENT, network.SG_FAILURE_EVENT]}]},
+            'eventCreateDate': {'operation': 'greaterThanDate',
+                                'options': [{'name': 'date',
+                                             'value': ['12/31/1969 11:59:0']}]},
+        }, first.filter)
+        self.assertEqual(network.SG_EVENT_MASK, first.mask)
+        # The next poll starts a minute before the newest event seen, in the
+        # API's time zone
+        self.assertEqual({'operation': 'greaterThanDate',
+                          'options': [{'name': 'date',
+                                       'value': ['5/15/2018 14:36:13']}]},
+                         second.filter['eventCreateDate'])
+
+    def test_wait_for_sg_requests_failure(self):
+        logs_mock = self.set_mock('SoftLayer_Event_Log', 'getAllObjects')
+        logs_mock.return_value = [
+            self._event_log('a', network.SG_SUCCESS_EVENT),
+            self._event_log('b', network.SG_FAILURE_EVENT)]
+
+        ex = self.assertRaises(exceptions.SoftLayerError,
+                               self.network.wait_for_sg_requests, 100, ['a', 'b'])
+
+        self.assertEqual('Security Group requests b (group 100) failed', str(ex))
+
+    @mock.patch('SoftLayer.managers.network.time')
+    def test_wait_for_many_sg_requests(self, time_mock):
+        time_mock.time.return_value = 0
+        logs_mock = self.set_mock('SoftLayer_Event_Log', 'getAllObjects')
+        logs_mock.side_effect = [
+            [self._event_log('a', network.SG_SUCCESS_EVENT)],
+            [],
+            [self._event_log('b', network.SG_SUCCESS_EVENT, group_id=200),
+             self._event_log('c', network.SG_SUCCESS_EVENT, group_id=200)],
+        ]
+
+        self.assertTrue(self.network.wait_for_many_sg_requests(
+            {100: ['a'], '200': ['b', 'c']}))
+
+        calls = self.calls('SoftLayer_Event_Log', 'getAllObjects')
+        self.assertEqual(3, len(calls))
+        self.assertEqual([100, 200],
+                         calls[0].filter['objectId']['options'][0]['value'])
+        self.assertEqual(2, time_mock.sleep.call_count)
+
+    @mock.patch('SoftLayer.managers.network.time')
+    def test_wait_for_sg_request_timeout(self, time_mock):
+        time_mock.time.side_effect = [0, 30, 61]
+        logs_mock = self.set_mock('SoftLayer_Event_Log', 'getAllObjects')
+        logs_mock.return_value = []
+
+        ex = self.assertRaises(exceptions.SoftLayerError,
+                               self.network.wait_for_sg_request, 100, 'a')
+
+        self.assertEqual('Security Group requests a (group 100) did not complete '
+                         'within the specified timeout (60 seconds)', str(ex))
+        time_mock.sleep.assert_called_once_with(5)
+        self.assertEqual(['12/31/1969 11:59:0'], self.calls('SoftLayer_Event_Log')[-1]
+                         .filter['eventCreateDate']['options'][0]['value'])
+
+    def test_wait_for_sg_requests_since(self):
+        self.set_mock('SoftLayer_Event_Log', 'getAllObjects').return_value = [
+            self._event_log('a', network.SG_SUCCESS_EVENT,
+                            created='2018-05-15T20:30:00+05:30')]
+
+        self.network.wait_for_sg_requests(100, ['a'],
+                                          since=utils.to_timestamp('2018-05-15T12:00:00Z'))
+
+        self.assertEqual(['5/14/2018 23:59:0'], self.calls('SoftLayer_Event_Log')[0]
+                         .filter['eventCreateDate']['options'][0]['value'])
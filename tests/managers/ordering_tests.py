@@ -9,6 +9,7 @@ import mock
 import SoftLayer
 from SoftLayer import exceptions
 from SoftLayer import fixtures
+from SoftLayer.managers import ordering
 from SoftLayer import testing
 
 
@@ -235,7 +236,7 @@ class OrderingTests(testing.TestCase):
 
             prices = self.ordering.get_price_id_list('PACKAGE_KEYNAME', ['ITEM1', 'ITEM2'])
 
-        list_mock.assert_called_once_with('PACKAGE_KEYNAME', mask='id, keyName, prices')
+        list_mock.assert_called_once_with('PACKAGE_KEYNAME', mask=ordering.CATALOG_ITEM_MASK)
         self.assertEqual([price1['id'], price2['id']], prices)
 
     def test_get_price_id_list_item_not_found(self):
@@ -248,9 +249,215 @@ class OrderingTests(testing.TestCase):
             exc = self.assertRaises(exceptions.SoftLayerError,
                                     self.ordering.get_price_id_list,
                                     'PACKAGE_KEYNAME', ['ITEM2'])
-        list_mock.assert_called_once_with('PACKAGE_KEYNAME', mask='id, keyName, prices')
+        list_mock.assert_called_once_with('PACKAGE_KEYNAME', mask=ordering.CATALOG_ITEM_MASK)
         self.assertEqual("Item ITEM2 does not exist for package PACKAGE_KEYNAME", str(exc))
 
+    @mock.patch('SoftLayer.managers.ordering.time')
+    def test_get_price_id_list_cached(self, time_mock):
+        time_mock.time.return_value = 1000
+        price1 = {'id': 1234, 'locationGroupId': ''}
+        item1 = {'id': 1111, 'keyName': 'ITEM1', 'prices': [price1]}
+
+        with mock.patch.object(self.ordering, 'list_items') as list_mock:
+            list_mock.return_value = [item1]
+
+            self.ordering.get_price_id_list('PACKAGE_KEYNAME', ['ITEM1'])
+            self.ordering.get_price_id_list('PACKAGE_KEYNAME', ['ITEM1'])
+            self.assertEqual(1, list_mock.call_count)
+
+            time_mock.time.return_value = 1000 + ordering.CATALOG_TTL
+            self.ordering.get_price_id_list('PACKAGE_KEYNAME', ['ITEM1'])
+            self.assertEqual(2, list_mock.call_count)
+
+    def test_package_catalog(self):
+        items = [
+            {'id': 1, 'keyName': 'RAM_1', 'itemCategory': {'categoryCode': 'ram'},
+             'prices': [{'id': 10, 'locationGroupId': 5},
+                        {'id': 11, 'locationGroupId': ''}]},
+            {'id': 2, 'keyName': 'RAM_2', 'itemCategory': {'categoryCode': 'ram'},
+             'prices': [{'id': 20, 'locationGroupId': 5}]},
+            {'id': 3, 'keyName': 'OS', 'prices': []},
+        ]
+
+        catalog = ordering.PackageCatalog('PACKAGE_KEYNAME', items)
+
+        self.assertEqual(11, catalog.get_price_id('RAM_1'))
+        self.assertEqual(10, catalog.get_price_id('RAM_1', location_group_id=5))
+        self.assertEqual([items[0], items[1]], catalog.get_items_in_category('ram'))
+        self.assertEqual([], catalog.get_items_in_category('os'))
+        self.assertEqual(items[2], catalog.get_item('OS'))
+        exc = self.assertRaises(exceptions.SoftLayerError,
+                                catalog.get_price_id, 'RAM_2')
+        self.assertEqual("Item RAM_2 has no price for location group None in "
+                         "package PACKAGE_KEYNAME", str(exc))
+        exc = self.assertRaises(exceptions.SoftLayerError,
+                                catalog.get_item, 'NOPE')
+        self.assertEqual("Item NOPE does not exist for package PACKAGE_KEYNAME", str(exc))
+
+    def _patch_for_validate(self):
+        items = [
+            {'id': 1, 'keyName': 'RAM_1', 'itemCategory': {'categoryCode': 'ram'},
+             'prices': [{'id': 10, 'locationGroupId': '',
+                         'hourlyRecurringFee': '.1', 'recurringFee': '50'},
+                        {'id': 11, 'locationGroupId': 999,
+                         'hourlyRecurringFee': '.2', 'recurringFee': '60'}]},
+            {'id': 2, 'keyName': 'RAM_2', 'itemCategory': {'categoryCode': 'ram'},
+             'prices': [{'id': 20, 'locationGroupId': 503, 'recurringFee': '70'}]},
+            {'id': 3, 'keyName': 'OS', 'itemCategory': {'categoryCode': 'os'},
+             'prices': [{'id': 30, 'locationGroupId': '',
+                         'hourlyRecurringFee': '0', 'recurringFee': '0'}]},
+        ]
+        patches = [
+            mock.patch.object(self.ordering, 'list_items', return_value=items),
+            mock.patch.object(self.ordering, 'get_package_by_key',
+                              return_value={'id': 1234}),
+            mock.patch.object(self.ordering, 'list_categories', return_value=[
+                {'isRequired': 1, 'itemCategory': {'categoryCode': 'ram'}},
+                {'isRequired': 1, 'itemCategory': {'categoryCode': 'os'}},
+                {'isRequired': 0, 'itemCategory': {'categoryCode': 'disk'}}]),
+            mock.patch.object(self.ordering, 'list_presets', return_value=[
+                {'id': 64, 'keyName': 'SMALL',
+                 'categories': [{'categoryCode': 'ram'}]}]),
+        ]
+        mocks = []
+        for patch in patches:
+            mocks.append(patch.start())
+            self.addCleanup(patch.stop)
+        return mocks
+
+    def test_validate_order(self):
+        mocks = self._patch_for_validate()
+        order = {'packageId': 1234, 'location': 'SANJOSE01', 'quantity': 1,
+                 'useHourlyPricing': True, 'prices': [{'id': 10}, {'id': 30}],
+                 'virtualGuests': [{'hostname': 'test', 'domain': 'example.com'}]}
+
+        for _ in range(3):
+            self.assertEqual([], self.ordering.validate_order('PACKAGE_KEYNAME', order))
+            self.assertEqual([], self.ordering.validate_order('PACKAGE_KEYNAME', dict(
+                order, presetId=64, prices=[{'id': 30}])))
+
+        for patched in mocks:
+            self.assertEqual(1, patched.call_count)
+        self.assertEqual(1, len(self.calls('SoftLayer_Location_Datacenter',
+                                           'getDatacenters')))
+
+    def test_validate_order_problems(self):
+        self._patch_for_validate()
+        order = {'packageId': 1, 'location': 'SANJOSE01', 'quantity': 2,
+                 'useHourlyPricing': True, 'presetId': 64,
+                 'prices': [{'id': 11}, {'id': 20}, {'id': 404}],
+                 'hardware': [{'hostname': 'test', 'domain': 'example.com'}]}
+
+        problems = self.ordering.validate_order('PACKAGE_KEYNAME', order)
+
+        self.assertEqual([
+            "Order is not for package PACKAGE_KEYNAME (1234)",
+            "1 hardware given for a quantity of 2",
+            "Price 11 of RAM_1 is not available in SANJOSE01",
+            "Price 20 of RAM_2 has no hourlyRecurringFee",
+            "Price 404 does not exist in package PACKAGE_KEYNAME",
+            "Category ram of RAM_1 is already filled by the preset",
+            "Category ram of RAM_2 is already filled by the preset",
+            "Required category os is missing",
+        ], problems)
+
+    def test_validate_order_location_and_preset(self):
+        self._patch_for_validate()
+        order = {'packageId': 1234, 'location': 'NOWHERE', 'quantity': 0,
+                 'presetId': 1, 'prices': [{'id': 10}, {'id': 10}, {'id': 30}]}
+
+        problems = self.ordering.validate_order('PACKAGE_KEYNAME', order)
+
+        self.assertEqual([
+            "Quantity must be a positive integer, not 0",
+            "Location NOWHERE does not exist",
+            "Preset 1 does not exist in package PACKAGE_KEYNAME",
+            "Category ram of RAM_1 is ordered more than once",
+        ], problems)
+
+    def test_validate_order_two_disks(self):
+        mocks = self._patch_for_validate()
+        disk = {'hourlyRecurringFee': '0', 'recurringFee': '0', 'locationGroupId': ''}
+        mocks[0].return_value += [
+            {'id': 4, 'keyName': 'DISK_100', 'itemCategory': {'categoryCode': 'disk0'},
+             'prices': [dict(disk, id=40, categories=[{'categoryCode': 'disk0'}]),
+                        dict(disk, id=41, categories=[{'categoryCode': 'disk1'},
+                                                      {'categoryCode': 'disk2'}])]},
+            {'id': 5, 'keyName': 'DISK_25', 'itemCategory': {'categoryCode': 'disk0'},
+             'prices': [dict(disk, id=50, categories=[{'categoryCode': 'disk0'},
+                                                      {'categoryCode': 'disk1'}])]},
+        ]
+        mocks[2].return_value.append(
+            {'isRequired': 1, 'itemCategory': {'categoryCode': 'disk1'}})
+        order = {'packageId': 1234, 'useHourlyPricing': True,
+                 'prices': [{'id': 10}, {'id': 30}, {'id': 50}, {'id': 40}]}
+
+        self.assertEqual([], self.ordering.validate_order('PACKAGE_KEYNAME', order))
+
+        order['prices'] += [{'id': 41}, {'id': 41}]
+        self.assertEqual(["Category disk1 of DISK_100 is ordered more than once"],
+                         self.ordering.validate_order('PACKAGE_KEYNAME', order))
+
+    def test_generate_orders(self):
+        items = [{'id': 1, 'keyName': 'ITEM1',
+                  'prices': [{'id': 1111, 'locationGroupId': ''}]}]
+        with mock.patch.object(self.ordering, 'list_items') as list_mock:
+            list_mock.return_value = items
+
+            orders = self.ordering.generate_orders([
+                {'package_keyname': 'PACKAGE_KEYNAME', 'location': location,
+                 'item_keynames': ['ITEM1'], 'complex_type': 'My_Type'}
+                for location in ('DALLAS13', 'DALLAS10', 'WASHINGTON07')])
+
+        list_mock.assert_called_once_with('PACKAGE_KEYNAME',
+                                          mask=ordering.CATALOG_ITEM_MASK)
+        self.assertEqual(['DALLAS13', 'DALLAS10', 'WASHINGTON07'],
+                         [order['location'] for order in orders])
+        self.assertEqual([[{'id': 1111}]] * 3,
+                         [order['prices'] for order in orders])
+        self.assertEqual(1, len(self.calls('SoftLayer_Product_Package',
+                                           'getAllObjects')))
+
+    def test_verify_orders(self):
+        self._patch_for_validate()
+        orders = [
+            {'package_keyname': 'PACKAGE_KEYNAME', 'location': 'SANJOSE01',
+             'item_keynames': ['RAM_1', 'OS'], 'complex_type': 'My_Type'},
+            {'package_keyname': 'PACKAGE_KEYNAME', 'location': 'SANJOSE01',
+             'item_keynames': ['RAM_1', 'NOPE'], 'complex_type': 'My_Type'},
+            {'package_keyname': 'PACKAGE_KEYNAME', 'location': 'SANJOSE01',
+             'item_keynames': ['RAM_1'], 'complex_type': 'My_Type'},
+            {'package_keyname': 'PACKAGE_KEYNAME', 'location': 'SANJOSE01',
+             'item_keynames': ['OS', 'RAM_1'], 'complex_type': 'My_Type',
+             'hourly': False},
+        ]
+
+        results = dict((index, (result, error)) for index, result, error
+                       in self.ordering.verify_orders(orders, workers=2))
+
+        self.assertEqual([0, 1, 2, 3], sorted(results))
+        self.assertIsNone(results[0][1])
+        self.assertEqual(fixtures.SoftLayer_Product_Order.verifyOrder, results[0][0])
+        self.assertEqual("Item NOPE does not exist for package PACKAGE_KEYNAME",
+                         str(results[1][1]))
+        self.assertEqual("Required category os is missing", str(results[2][1]))
+        self.assertIsNone(results[3][1])
+        calls = self.calls('SoftLayer_Product_Order', 'verifyOrder')
+        self.assertEqual([[10, 30], [30, 10]],
+                         sorted([price['id'] for price in call.args[0]['prices']]
+                                for call in calls))
+
+    def test_place_orders_without_validation(self):
+        self._patch_for_validate()
+        orders = [{'package_keyname': 'PACKAGE_KEYNAME', 'location': 'DALLAS13',
+                   'item_keynames': ['RAM_1'], 'complex_type': 'My_Type'}]
+
+        results = list(self.ordering.place_orders(orders, validate=False))
+
+        self.assertEqual([(0, fixtures.SoftLayer_Product_Order.placeOrder, None)],
+                         results)
+        self.assert_called_with('SoftLayer_Product_Order', 'placeOrder')
+
     def test_generate_no_complex_type(self):
         pkg = 'PACKAGE_KEYNAME'
         items = ['ITEM1', 'ITEM2']
@@ -4,7 +4,11 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import json
+import threading
+
 import mock
+import six
 
 import SoftLayer
 from SoftLayer import consts
@@ -52,6 +56,50 @@ def mocked_auth_call(self):
     self.auth_token = 'NEW_AUTH_TOKEN'
 
 
+class QueueServer(six.moves.socketserver.ThreadingMixIn,
+                  six.moves.BaseHTTPServer.HTTPServer):
+    """Keep-alive message queue endpoint whose tokens can be expired."""
+    daemon_threads = True
+
+    def __init__(self):
+        six.moves.BaseHTTPServer.HTTPServer.__init__(
+            self, ('localhost', 0), QueueHandler)
+        self.token = 'TOKEN_1'
+        self.clients = set()
+        self.requests = []
+
+
+class QueueHandler(six.moves.BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serves auth and stats, answering 401 to stale tokens."""
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.server.clients.add(self.client_address)
+        self.server.requests.append(('POST', self.path))
+        self._respond(200, {}, {'X-Auth-Token': self.server.token})
+
+    def do_GET(self):
+        self.server.clients.add(self.client_address)
+        token = self.headers.get('X-Auth-Token')
+        self.server.requests.append(('GET', self.path, token))
+        if token != self.server.token:
+            self._respond(401, {'message': 'Unauthorized'})
+        else:
+            self._respond(200, {'requests': len(self.server.requests)})
+
+    def log_message(self, *args):
+        pass
+
+
 class QueueAuthTests(testing.TestCase):
     def set_up(self):
         self.auth = messaging.QueueAuth(
@@ -65,13 +113,22 @@ class QueueAuthTests(testing.TestCase):
         self.assertEqual(auth.api_key, 'api_key')
         self.assertEqual(auth.auth_token, 'auth_token')
 
-    @mock.patch('SoftLayer.managers.messaging.requests.post')
-    def test_auth(self, post):
+    def test_init_session(self):
+        session = mock.MagicMock()
+        auth = messaging.QueueAuth('endpoint', 'username', 'api_key',
+                                   session=session)
+        self.assertIs(auth.session, session)
+
+    def test_auth(self):
+        post = self.auth.session.post = mock.MagicMock()
         post().headers = {'X-Auth-Token': 'NEW_AUTH_TOKEN'}
         post().ok = True
         self.auth.auth()
         self.auth.auth_token = 'NEW_AUTH_TOKEN'
 
+        post.assert_called_with('endpoint', headers={
+            'X-Auth-User': 'username', 'X-Auth-Key': 'api_key'})
+
         post().ok = False
         self.assertRaises(SoftLayer.Unauthenticated, self.auth.auth)
 
@@ -81,10 +138,11 @@ class QueueAuthTests(testing.TestCase):
         # No op on no error
         request = mock.MagicMock()
         request.status_code = 200
-        self.auth.handle_error(request)
+        result = self.auth.handle_error(request)
 
+        self.assertIsNone(result)
         self.assertEqual(self.auth.auth_token, 'auth_token')
-        self.assertFalse(request.request.send.called)
+        self.assertFalse(request.connection.send.called)
 
     @mock.patch('SoftLayer.managers.messaging.QueueAuth.auth',
                 mocked_auth_call)
@@ -92,10 +150,12 @@ class QueueAuthTests(testing.TestCase):
         # Retry once more on 503 error
         request = mock.MagicMock()
         request.status_code = 503
-        self.auth.handle_error(request)
+        result = self.auth.handle_error(request, timeout=10)
 
         self.assertEqual(self.auth.auth_token, 'auth_token')
-        request.connection.send.assert_called_with(request.request)
+        request.connection.send.assert_called_with(request.request,
+                                                   timeout=10)
+        self.assertEqual(result, request.connection.send())
 
     @mock.patch('SoftLayer.managers.messaging.QueueAuth.auth',
                 mocked_auth_call)
@@ -104,10 +164,13 @@ class QueueAuthTests(testing.TestCase):
         request = mock.MagicMock()
         request.status_code = 401
         request.request.headers = {'X-Auth-Token': 'OLD_AUTH_TOKEN'}
-        self.auth.handle_error(request)
+        result = self.auth.handle_error(request)
 
         self.assertEqual(self.auth.auth_token, 'NEW_AUTH_TOKEN')
+        self.assertEqual(request.request.headers,
+                         {'X-Auth-Token': 'NEW_AUTH_TOKEN'})
         request.connection.send.assert_called_with(request.request)
+        self.assertEqual(result, request.connection.send())
 
     @mock.patch('SoftLayer.managers.messaging.QueueAuth.auth',
                 mocked_auth_call)
@@ -175,7 +238,8 @@ class MessagingManagerTests(testing.TestCase):
     def test_get_connection(self, conn):
         queue_conn = self.manager.get_connection('QUEUE_ACCOUNT_ID')
         conn.assert_called_with(
-            'QUEUE_ACCOUNT_ID', endpoint='https://dal05.mq.softlayer.net')
+            'QUEUE_ACCOUNT_ID', endpoint='https://dal05.mq.softlayer.net',
+            pool_size=messaging.POOL_SIZE)
         conn().authenticate.assert_called_with(
             self.client.auth.username, self.client.auth.api_key)
         self.assertEqual(queue_conn, conn())
@@ -217,8 +281,22 @@ class MessagingConnectionTests(testing.TestCase):
         self.assertEqual(self.conn.endpoint, 'endpoint')
         self.assertEqual(self.conn.auth, self.auth)
 
-    @mock.patch('SoftLayer.managers.messaging.requests.request')
-    def test_make_request(self, request):
+    def test_init_pool_size(self):
+        conn = messaging.MessagingConnection('acount_id', pool_size=3)
+
+        adapter = conn.session.get_adapter('https://endpoint')
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertIs(conn.session.get_adapter('http://endpoint'), adapter)
+
+    def test_close(self):
+        self.conn.session = mock.MagicMock()
+        self.conn.close()
+
+        self.conn.session.close.assert_called_with()
+
+    def test_make_request(self):
+        request = self.conn.session.request = mock.MagicMock()
         resp = self.conn._make_request('GET', 'path')
         request.assert_called_with(
             'GET', 'endpoint/v1/acount_id/path',
@@ -235,7 +313,7 @@ class MessagingConnectionTests(testing.TestCase):
 
         auth.assert_called_with(
             'endpoint/v1/acount_id/auth', 'username', 'api_key',
-            auth_token='auth_token')
+            auth_token='auth_token', session=self.conn.session)
         auth().auth.assert_called_with()
         self.assertEqual(self.conn.auth, auth())
 
@@ -465,3 +543,43 @@ class MessagingConnectionTests(testing.TestCase):
             'delete',
             'topics/example_topic/subscriptions/%s' % SUBSCRIPTION_1['id'])
         self.assertTrue(result)
+
+
+class MessagingConnectionPoolTests(testing.TestCase):
+
+    def set_up(self):
+        self.server = QueueServer()
+        thread = threading.Thread(target=self.server.serve_forever,
+                                  kwargs={'poll_interval': 0.01})
+        thread.daemon = True
+        thread.start()
+        self.conn = messaging.MessagingConnection(
+            'account', endpoint='http://localhost:%d' % self.server.server_port)
+        self.conn.authenticate('username', 'api_key')
+
+    def tear_down(self):
+        self.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_keep_alive(self):
+        for _ in range(5):
+            self.conn.stats()
+
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertEqual(len(self.server.clients), 1)
+
+    def test_reauth_on_pooled_session(self):
+        self.conn.stats()
+        self.server.token = 'TOKEN_2'
+
+        self.assertEqual(self.conn.stats(), {'requests': 5})
+        self.assertEqual(self.conn.auth.auth_token, 'TOKEN_2')
+        self.assertEqual(self.server.requests, [
+            ('POST', '/v1/account/auth'),
+            ('GET', '/v1/account/stats/hour', 'TOKEN_1'),
+            ('GET', '/v1/account/stats/hour', 'TOKEN_1'),
+            ('POST', '/v1/account/auth'),
+            ('GET', '/v1/account/stats/hour', 'TOKEN_2'),
+        ])
+        self.assertEqual(len(self.server.clients), 1)
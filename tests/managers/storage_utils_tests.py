@@ -123,6 +123,86 @@ class StorageUtilsTests(testing.TestCase):
             mask='mask[id,name,items[prices[categories],attributes]]'
         )
 
+    def test_get_package_builds_price_index_once(self):
+        mock = self.set_mock('SoftLayer_Product_Package', 'getAllObjects')
+        mock.return_value = [fixtures.SoftLayer_Product_Package.SAAS_PACKAGE]
+
+        package = storage_utils.get_package(self.block, 'storage_as_a_service')
+
+        self.assertIsInstance(package.price_index, storage_utils.PriceIndex)
+        self.assertIs(package.price_index,
+                      storage_utils.get_price_index(package))
+
+    # ---------------------------------------------------------------------
+    # Tests for PriceIndex
+    # ---------------------------------------------------------------------
+    def test_price_index_keeps_package_order(self):
+        package = {
+            'items': [
+                {'capacity': '10',
+                 'prices': [
+                     {'id': 1,
+                      'categories': [{'categoryCode': 'storage_snapshot_space'}],
+                      'locationGroupId': ''},
+                     {'id': 2,
+                      'categories': [{'categoryCode': 'storage_snapshot_space'}],
+                      'locationGroupId': ''}
+                 ]},
+                {'capacity': '20',
+                 'prices': [
+                     {'id': 3,
+                      'categories': [{'categoryCode': 'storage_snapshot_space'}],
+                      'locationGroupId': ''}
+                 ]}
+            ]}
+
+        index = storage_utils.PriceIndex(package)
+
+        self.assertEqual(1, index.find('storage_snapshot_space')['id'])
+        self.assertEqual(3, index.find('storage_snapshot_space',
+                                       capacity=20)['id'])
+        self.assertIsNone(index.find('storage_snapshot_space', capacity=30))
+
+    def test_price_index_by_location_group_and_restriction(self):
+        package = {
+            'items': [
+                {'capacity': '1000',
+                 'keyName': '1000_IOPS',
+                 'prices': [
+                     {'id': 1,
+                      'capacityRestrictionType': 'STORAGE_SPACE',
+                      'capacityRestrictionMinimum': '20',
+                      'capacityRestrictionMaximum': '80',
+                      'categories': [{'categoryCode': 'performance_storage_iops'}],
+                      'locationGroupId': ''},
+                     {'id': 2,
+                      'capacityRestrictionType': 'STORAGE_SPACE',
+                      'capacityRestrictionMinimum': '100',
+                      'capacityRestrictionMaximum': '500',
+                      'categories': [{'categoryCode': 'performance_storage_iops'}],
+                      'locationGroupId': ''},
+                     {'id': 3,
+                      'capacityRestrictionType': 'STORAGE_SPACE',
+                      'capacityRestrictionMinimum': '100',
+                      'capacityRestrictionMaximum': '500',
+                      'categories': [{'categoryCode': 'performance_storage_iops'}],
+                      'locationGroupId': '509'}
+                 ]}
+            ]}
+
+        index = storage_utils.PriceIndex(package)
+
+        self.assertEqual(2, index.find('performance_storage_iops',
+                                       capacity=1000, keyName='1000_IOPS',
+                                       restriction=('STORAGE_SPACE', 250))['id'])
+        self.assertEqual(3, index.find('performance_storage_iops',
+                                       restriction=('STORAGE_SPACE', 250),
+                                       location_group_id='509')['id'])
+        self.assertIsNone(index.find('performance_storage_iops',
+                                     restriction=('STORAGE_TIER_LEVEL', 250)))
+        self.assertIsNone(index.find('performance_storage_iops',
+                                     restriction=('STORAGE_SPACE', 90)))
+
     # ---------------------------------------------------------------------
     # Tests for get_location_id()
     # ---------------------------------------------------------------------
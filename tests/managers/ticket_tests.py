@@ -4,6 +4,12 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import os
+import shutil
+import tempfile
+
+import mock
+
 import SoftLayer
 from SoftLayer import fixtures
 from SoftLayer import testing
@@ -102,3 +108,55 @@ class TicketTests(testing.TestCase):
                                 'removeAttachedVirtualGuest',
                                 args=(123,),
                                 identifier=100)
+
+    def _write_file(self, data):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        path = os.path.join(path, 'logs.tgz')
+        with open(path, 'wb') as upload:
+            upload.write(data)
+        return path
+
+    def test_upload_attachment(self):
+        path = self._write_file(b'x' * 1000)
+        progress = mock.Mock()
+
+        result = self.ticket.upload_attachment(100, path, 'logs.tgz',
+                                               progress=progress)
+
+        self.assertEqual(fixtures.SoftLayer_Ticket.addAttachedFile, result)
+        self.assert_called_with('SoftLayer_Ticket', 'addAttachedFile',
+                                args=({'filename': 'logs.tgz',
+                                       'data': b'x' * 1000},),
+                                identifier=100)
+        progress.assert_called_with(1000, 1000)
+
+    def test_upload_attachment_parts(self):
+        path = self._write_file(b'0123456789' * 25)
+        progress = mock.Mock()
+
+        result = self.ticket.upload_attachment_parts(100, path, 'logs.tgz',
+                                                     part_size=100,
+                                                     progress=progress)
+
+        self.assertEqual(3, len(result))
+        calls = self.calls('SoftLayer_Ticket', 'addAttachedFile')
+        self.assertEqual([('logs.tgz.001', b'0123456789' * 10),
+                          ('logs.tgz.002', b'0123456789' * 10),
+                          ('logs.tgz.003', b'0123456789' * 5)],
+                         [(call.args[0]['filename'], call.args[0]['data'])
+                          for call in calls])
+        self.assertEqual([mock.call(100, 250), mock.call(200, 250),
+                          mock.call(250, 250)], progress.call_args_list)
+
+    def test_upload_attachment_parts_small_file(self):
+        path = self._write_file(b'small')
+
+        result = self.ticket.upload_attachment_parts(100, path, 'logs.tgz',
+                                                     part_size=100)
+
+        self.assertEqual([fixtures.SoftLayer_Ticket.addAttachedFile], result)
+        self.assert_called_with('SoftLayer_Ticket', 'addAttachedFile',
+                                args=({'filename': 'logs.tgz',
+                                       'data': b'small'},),
+                                identifier=100)
@@ -107,6 +107,92 @@ class VSTests(testing.TestCase):
         _id = self.vs._get_ids_from_hostname('vs-test1')
         self.assertEqual(_id, [100, 104])
 
+    def test_cancel_instances(self):
+        def delete_object(call):
+            if call.identifier == 2:
+                raise SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'no')
+            return True
+
+        mock = self.set_mock('SoftLayer_Virtual_Guest', 'deleteObject')
+        mock.side_effect = delete_object
+
+        report = self.vs.cancel_instances([1, 2, 3], workers=2)
+
+        self.assertEqual({1: True, 3: True}, dict(report.succeeded))
+        self.assertEqual([2], list(report.failed))
+        self.assertFalse(report.ok)
+
+        # Resuming only retries the failed instance
+        mock.side_effect = None
+        mock.return_value = True
+        report = self.vs.cancel_instances([1, 2, 3], report=report)
+
+        self.assertTrue(report.ok)
+        calls = self.calls('SoftLayer_Virtual_Guest', 'deleteObject')
+        self.assertEqual([1, 2, 2, 3],
+                         sorted(call.identifier for call in calls))
+
+    def test_reload_instances(self):
+        report = self.vs.reload_instances([1, 2], post_uri='https://x/y',
+                                          workers=1)
+
+        self.assertTrue(report.ok)
+        self.assert_called_with('SoftLayer_Virtual_Guest',
+                                'reloadOperatingSystem',
+                                identifier=2,
+                                args=('FORCE',
+                                      {'customProvisionScriptUri': 'https://x/y'}))
+
+    def test_edit_instances(self):
+        report = self.vs.edit_instances([1, 2], domain='example.com')
+
+        self.assertEqual({1: True, 2: True}, dict(report.succeeded))
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'editObject',
+                                identifier=1,
+                                args=({'domain': 'example.com'},))
+
+    def test_power_instances(self):
+        self.vs.reboot_instances([1], hard=True)
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'rebootHard',
+                                identifier=1)
+        self.vs.reboot_instances([1])
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'rebootDefault',
+                                identifier=1)
+        self.vs.power_off_instances([1])
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'powerOffSoft',
+                                identifier=1)
+        self.vs.power_on_instances([1])
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'powerOn',
+                                identifier=1)
+
+    def test_resolve_many(self):
+        mock = self.set_mock('SoftLayer_Account', 'getVirtualGuests')
+        mock.side_effect = [
+            [{'id': 100, 'primaryIpAddress': '172.16.240.2'}],
+            [{'id': 99, 'primaryBackendIpAddress': '10.0.1.87'}],
+            [{'id': 101, 'hostname': 'vs-test1'},
+             {'id': 102, 'hostname': 'VS-TEST2'},
+             {'id': 103, 'hostname': 'vs-test2'}],
+        ]
+
+        result = self.vs.resolve_many(['172.16.240.2', '10.0.1.87', '1234',
+                                       'vs-test1', 'vs-test2', 'missing'])
+
+        self.assertEqual({'172.16.240.2': [100],
+                          '10.0.1.87': [99],
+                          '1234': [1234],
+                          'vs-test1': [101],
+                          'vs-test2': [102, 103],
+                          'missing': []}, result)
+        self.assertEqual(3, len(self.calls('SoftLayer_Account',
+                                           'getVirtualGuests')))
+        _filter = {'virtualGuests': {'hostname': {
+            'operation': 'in',
+            'options': [{'name': 'data',
+                         'value': ['vs-test1', 'vs-test2', 'missing']}]}}}
+        self.assert_called_with('SoftLayer_Account', 'getVirtualGuests',
+                                filter=_filter, mask='mask[id,hostname]')
+
     def test_get_instance(self):
         result = self.vs.get_instance(100)
 
@@ -200,6 +286,100 @@ class VSTests(testing.TestCase):
                                 args=('dev,green',),
                                 identifier=100)
 
+    def test_create_instances_does_not_modify_configs(self):
+        configs = [{'cpus': 1, 'memory': 1024, 'hostname': 'server',
+                    'domain': 'example.com', 'tags': 'dev'}]
+
+        self.vs.create_instances(configs)
+
+        self.assertEqual('dev', configs[0]['tags'])
+
+    def test_create_instances_error(self):
+        mock = self.set_mock('SoftLayer_Virtual_Guest', 'createObjects')
+        mock.side_effect = SoftLayer.SoftLayerAPIError('SoftLayer_Exception',
+                                                       'no capacity')
+
+        self.assertRaises(SoftLayer.SoftLayerAPIError,
+                          self.vs.create_instances,
+                          [{'cpus': 1, 'memory': 1024, 'hostname': 'server',
+                            'domain': 'example.com'}])
+
+    def test_provision_instances_chunks(self):
+        mock = self.set_mock('SoftLayer_Virtual_Guest', 'createObjects')
+        mock.side_effect = lambda call: [{'id': int(c['hostname'][1:])}
+                                         for c in call.args[0]]
+        configs = [{'cpus': 1, 'memory': 1024, 'hostname': 's%d' % i,
+                    'domain': 'example.com', 'tags': 'tag%d' % i}
+                   for i in range(5)]
+
+        report = self.vs.provision_instances(configs, chunk_size=2,
+                                             workers=3)
+
+        self.assertTrue(report.ok)
+        self.assertEqual([0, 1, 2, 3, 4],
+                         [guest['id'] for guest in report.created])
+        self.assertEqual(3, len(self.calls('SoftLayer_Virtual_Guest',
+                                           'createObjects')))
+        self.assertEqual({0: 'tag0', 1: 'tag1', 2: 'tag2', 3: 'tag3',
+                          4: 'tag4'}, dict(report.tagged))
+        self.assertEqual(5, len(self.calls('SoftLayer_Virtual_Guest',
+                                           'setTags')))
+        self.assertEqual({}, dict(report.ready))
+
+    @mock.patch('SoftLayer.bulk.WorkerPool')
+    def test_provision_instances_one_pool(self, pool_class):
+        pool = pool_class.return_value
+        pool.as_completed.return_value = iter([])
+
+        self.vs.provision_instances([{'cpus': 1, 'memory': 1024,
+                                      'hostname': 's', 'domain': 'a.com'}],
+                                    workers=4, rate=2)
+
+        pool_class.assert_called_once_with(mock.ANY, workers=4, rate=2)
+        self.assertTrue(pool.close.called)
+
+    @mock.patch('SoftLayer.decoration.sleep')
+    def test_provision_instances_failures(self, _sleep):
+        create_mock = self.set_mock('SoftLayer_Virtual_Guest', 'createObjects')
+
+        def create(call):
+            """Fails the chunk which contains s2."""
+            configs = call.args[0]
+            if configs[0]['hostname'] == 's2':
+                raise SoftLayer.SoftLayerAPIError('SoftLayer_Exception',
+                                                  'no capacity')
+            return [{'id': int(c['hostname'][1:])} for c in configs]
+        create_mock.side_effect = create
+
+        tag_mock = self.set_mock('SoftLayer_Virtual_Guest', 'setTags')
+        tag_mock.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception_Public', 'bad tag')
+        configs = [{'cpus': 1, 'memory': 1024, 'hostname': 's%d' % i,
+                    'domain': 'example.com'} for i in range(4)]
+        configs[0]['tags'] = 'bad'
+
+        report = self.vs.provision_instances(configs, chunk_size=2)
+
+        self.assertFalse(report.ok)
+        self.assertEqual([0, 1], [guest['id'] for guest in report.created])
+        self.assertEqual([1], list(report.create_errors))
+        self.assertEqual(['s2', 's3'],
+                         [c['hostname'] for c in report.create_errors[1][0]])
+        self.assertEqual([0], list(report.tag_errors))
+        self.assertEqual(2, len(report.errors))
+
+    @mock.patch('SoftLayer.managers.vs.VSManager.wait_for_ready_many')
+    def test_provision_instances_wait(self, wait_many):
+        wait_many.return_value = iter([(100, True)])
+
+        report = self.vs.provision_instances(
+            [{'cpus': 1, 'memory': 1024, 'hostname': 'server',
+              'domain': 'example.com'}], wait=True, limit=60, delay=1)
+
+        self.assertTrue(report.ok)
+        self.assertEqual({100: True}, dict(report.ready))
+        wait_many.assert_called_once_with([100], limit=60, delay=1)
+
     def test_generate_os_and_image(self):
         self.assertRaises(
             ValueError,
@@ -912,6 +1092,24 @@ class VSWaitReadyGoTests(testing.TestCase):
 
         _sleep.assert_has_calls([mock.call(10)])
 
+    @mock.patch('time.sleep')
+    def test_wait_for_ready_many(self, _sleep):
+        guests = self.client['Account'].getVirtualGuests
+        guests.side_effect = [
+            [{'id': 1}, {'id': 2, 'provisionDate': 'aaa'}],
+            [{'id': 1, 'provisionDate': 'aaa'}],
+        ]
+
+        events = list(self.vs.wait_for_ready_many([1, 2], 10, delay=1))
+
+        self.assertEqual([(2, True), (1, True)], events)
+        _sleep.assert_called_once_with(1)
+        guests.assert_called_with(
+            mask=mock.ANY,
+            filter={'virtualGuests': {'id': {
+                'operation': 'in',
+                'options': [{'name': 'data', 'value': [1]}]}}})
+
     @mock.patch('SoftLayer.decoration.sleep')
     @mock.patch('SoftLayer.transports.FixtureTransport.__call__')
     @mock.patch('time.time')
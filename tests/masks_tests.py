@@ -0,0 +1,90 @@
+"""
+    SoftLayer.tests.masks_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+from SoftLayer import exceptions
+from SoftLayer import masks
+from SoftLayer import testing
+
+GUEST = {
+    'id': 100,
+    'hostname': 'vs-test1',
+    'domain': 'test.sftlyr.ws',
+    'datacenter': {'id': 50, 'name': 'dal05', 'longName': 'Dallas 5'},
+    'activeTransaction': {
+        'id': 1,
+        'transactionStatus': {'name': 'RECLAIM', 'friendlyName': 'Reclaim'},
+    },
+    'tagReferences': [{'id': 1, 'tag': {'id': 2, 'name': 'a'}},
+                      {'id': 3, 'tag': {'id': 4, 'name': 'b'}}],
+}
+
+
+class ObjectMaskTests(testing.TestCase):
+
+    def test_simple(self):
+        result = masks.apply_mask(GUEST, 'id,hostname')
+        self.assertEqual({'id': 100, 'hostname': 'vs-test1'}, result)
+
+    def test_mask_prefix(self):
+        result = masks.apply_mask(GUEST, 'mask[id, datacenter[name]]')
+        self.assertEqual({'id': 100, 'datacenter': {'name': 'dal05'}}, result)
+
+    def test_nested_lists(self):
+        result = masks.apply_mask(GUEST, 'mask[tagReferences[tag[name]]]')
+        self.assertEqual({'tagReferences': [{'tag': {'name': 'a'}},
+                                            {'tag': {'name': 'b'}}]},
+                         result)
+
+    def test_dotted_path(self):
+        result = masks.apply_mask(
+            GUEST, 'id,activeTransaction.transactionStatus.name')
+        self.assertEqual({'id': 100,
+                          'activeTransaction': {
+                              'transactionStatus': {'name': 'RECLAIM'}}},
+                         result)
+
+    def test_whole_property_is_not_copied(self):
+        result = masks.apply_mask(GUEST, 'datacenter')
+        self.assertIs(GUEST['datacenter'], result['datacenter'])
+
+    def test_whole_property_wins_merge(self):
+        result = masks.apply_mask(GUEST, 'datacenter.name,datacenter')
+        self.assertEqual(GUEST['datacenter'], result['datacenter'])
+
+    def test_compound_with_type_cast(self):
+        mask = ('[mask[id,hostname],'
+                ' mask(SoftLayer_Hardware_Server)[activeTransaction[id]]]')
+        result = masks.apply_mask([GUEST, GUEST], mask)
+        expected = {'id': 100, 'hostname': 'vs-test1',
+                    'activeTransaction': {'id': 1}}
+        self.assertEqual([expected, expected], result)
+
+    def test_dict_mask(self):
+        result = masks.apply_mask(GUEST, {'datacenter': {'name': {}},
+                                          'id': ''})
+        self.assertEqual({'id': 100, 'datacenter': {'name': 'dal05'}}, result)
+
+    def test_missing_properties(self):
+        result = masks.apply_mask(GUEST, 'id,primaryIpAddress[ipAddress]')
+        self.assertEqual({'id': 100}, result)
+
+    def test_scalars(self):
+        self.assertEqual(True, masks.apply_mask(True, 'id'))
+        self.assertEqual(GUEST, masks.apply_mask(GUEST, None))
+
+    def test_compiled_once(self):
+        mask = masks.compile_mask('mask[id,hostname]')
+        self.assertIs(mask, masks.compile_mask('mask[id,hostname]'))
+        self.assertIs(mask, masks.compile_mask(mask))
+        self.assertEqual('<ObjectMask: hostname,id>', repr(mask))
+
+    def test_invalid(self):
+        self.assertRaises(exceptions.SoftLayerError,
+                          masks.ObjectMask, 'mask[id,datacenter[name]')
+        self.assertRaises(exceptions.SoftLayerError,
+                          masks.ObjectMask, 'id]')
+        self.assertRaises(exceptions.SoftLayerError,
+                          masks.ObjectMask, 'mask(SoftLayer_Thing[id]')
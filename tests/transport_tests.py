@@ -4,7 +4,11 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import datetime
 import io
+import os
+import shutil
+import tempfile
 import warnings
 
 import mock
@@ -241,6 +245,97 @@ class TestXmlRpcAPICall(testing.TestCase):
         self.assertIn("<value><string>mask.something.nested</string></value>",
                       kwargs['data'])
 
+    @mock.patch('SoftLayer.transports.requests.Session.request')
+    def test_streamed_file(self, request):
+        request.return_value = self.response
+        path = self._write_file(b'0123456789' * 100000)
+        progress = mock.Mock()
+
+        req = transports.Request()
+        req.service = 'SoftLayer_Ticket'
+        req.method = 'addAttachedFile'
+        req.args = ({'filename': 'a.txt',
+                     'data': transports.StreamedFile(path, 5, 900000,
+                                                     progress=progress)},
+                    [transports.StreamedFile(path, length=4)])
+        self.transport(req)
+
+        body = request.call_args[1]['data']
+        self.assertNotIsInstance(body, (bytes, str))
+        args, method = six.moves.xmlrpc_client.loads(b''.join(body))
+        self.assertEqual('addAttachedFile', method)
+        self.assertEqual('a.txt', args[1]['filename'])
+        self.assertEqual(b'5678901234' * 90000, args[1]['data'].data)
+        self.assertEqual(b'0123', args[2][0].data)
+        self.assertEqual(mock.call(900000, 900000), progress.call_args)
+        self.assertEqual(5, progress.call_count)
+
+    @mock.patch('SoftLayer.transports.requests.Session.request')
+    def test_large_payload_is_streamed(self, request):
+        request.return_value = self.response
+        records = [{'host': 'host%d' % i, 'type': 'A', 'ttl': 900,
+                    'data': '10.0.%d.%d' % (i // 256 % 256, i % 256)}
+                   for i in range(30000)]
+
+        req = transports.Request()
+        req.service = 'SoftLayer_Dns_Domain_ResourceRecord'
+        req.method = 'createObjects'
+        req.args = (records,)
+        self.transport(req)
+
+        body = request.call_args[1]['data']
+        self.assertNotIsInstance(body, (bytes, str))
+        expected = six.moves.xmlrpc_client.dumps(({'headers': {}}, records),
+                                                 methodname='createObjects',
+                                                 allow_none=True)
+        self.assertEqual(expected.encode('utf-8'), b''.join(body))
+
+    def test_streamed_request_to_server(self):
+        # Goes through the test server, which has to decode the chunked body
+        records = [{'host': 'host%d' % i, 'type': 'a', 'data': '10.0.0.1'}
+                   for i in range(30000)]
+
+        result = self.client['Dns_Domain_ResourceRecord'].createObjects(records)
+
+        self.assertEqual([{'id': 1}], result)
+        call = self.calls('SoftLayer_Dns_Domain_ResourceRecord', 'createObjects')[0]
+        self.assertEqual(records, call.args[0])
+
+    def test_iter_dumps(self):
+        values = ({'headers': {'a': None}},
+                  [{'name': u'<caf\xe9 & co>', 'id': 1, 'price': 1.5,
+                    'active': True, 'tags': ('a', 'b'),
+                    'date': datetime.datetime(2018, 1, 2, 3, 4, 5),
+                    'raw': six.moves.xmlrpc_client.Binary(b'raw')}] * 50,
+                  'last')
+        expected = six.moves.xmlrpc_client.dumps(values, methodname='editObjects',
+                                                 allow_none=True)
+
+        chunks = list(transports.iter_dumps(values, 'editObjects',
+                                            chunk_size=1000))
+
+        self.assertEqual(expected.encode('utf-8'), b''.join(chunks))
+        self.assertGreater(len(chunks), 10)
+        self.assertTrue(all(len(chunk) < 2000 for chunk in chunks))
+
+    def test_iter_dumps_errors(self):
+        recursive = []
+        recursive.append(recursive)
+        self.assertRaises(TypeError, list,
+                          transports.iter_dumps((recursive,), 'getObject'))
+        self.assertRaises(TypeError, list,
+                          transports.iter_dumps(({1: 'a'},), 'getObject'))
+        self.assertRaises(TypeError, list,
+                          transports.iter_dumps((object(),), 'getObject'))
+
+    def _write_file(self, data):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        path = os.path.join(path, 'upload')
+        with open(path, 'wb') as upload:
+            upload.write(data)
+        return path
+
     @mock.patch('SoftLayer.transports.requests.Session.request')
     def test_request_exception(self, request):
         # Test Text Error
@@ -439,6 +534,24 @@ class TestRestAPICall(testing.TestCase):
             proxies=None,
             timeout=None)
 
+    @mock.patch('SoftLayer.transports.requests.Session.request')
+    def test_with_streamed_file(self, request):
+        request().text = '{}'
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        path = os.path.join(path, 'upload')
+        with open(path, 'wb') as upload:
+            upload.write(b'data')
+
+        req = transports.Request()
+        req.service = 'SoftLayer_Ticket'
+        req.method = 'addAttachedFile'
+        req.args = ({'data': transports.StreamedFile(path)},)
+        self.transport(req)
+
+        self.assertEqual('{"parameters": [{"data": "ZGF0YQ=="}]}',
+                         request.call_args[1]['data'])
+
     @mock.patch('SoftLayer.transports.requests.Session.request')
     def test_with_filter(self, request):
         request().text = '{}'
@@ -602,3 +715,12 @@ class TestFixtureTransport(testing.TestCase):
         req.service = 'SoftLayer_Account'
         req.method = 'getObjectzzzz'
         self.assertRaises(NotImplementedError, self.transport, req)
+
+    def test_apply_mask(self):
+        transport = transports.FixtureTransport(apply_mask=True)
+        req = transports.Request()
+        req.service = 'SoftLayer_Account'
+        req.method = 'getObject'
+        req.mask = 'mask[accountId]'
+        resp = transport(req)
+        self.assertEqual({'accountId': 1234}, resp)
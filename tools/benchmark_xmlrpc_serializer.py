@@ -0,0 +1,87 @@
+"""Benchmarks the streaming XML-RPC serializer used by XmlRpcTransport.
+
+Serializes a createObjects payload with the given number of DNS records,
+once with xmlrpc_client.dumps() and once with SoftLayer.transports.iter_dumps(),
+and reports the time to the first byte, the total time and the peak memory
+allocated by each.
+
+    python tools/benchmark_xmlrpc_serializer.py [--records 200000]
+
+dumps() holds the whole document (several times over, while joining it)
+before anything can be sent; iter_dumps() only ever holds one chunk.
+
+:license: MIT, see LICENSE for more details.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+
+from six.moves import xmlrpc_client  # noqa: E402 pylint: disable=wrong-import-position
+
+from SoftLayer import transports  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def make_records(count):
+    """Returns count DNS records, like a large `dns import` would send."""
+    return [{'domainId': 1234, 'host': 'host%d' % number, 'type': 'a',
+             'ttl': 900, 'data': '10.%d.%d.%d' % (number >> 16 & 255,
+                                                  number >> 8 & 255,
+                                                  number & 255)}
+            for number in range(count)]
+
+
+def measure(serialize):
+    """Runs serialize(), returns (first byte, total seconds, bytes, peak MB).
+
+    Memory is traced in a second run, since tracing slows allocations down.
+    """
+    start = time.time()
+    first = None
+    size = 0
+    for chunk in serialize():
+        if first is None:
+            first = time.time() - start
+        size += len(chunk)
+    elapsed = time.time() - start
+
+    tracemalloc.start()
+    for chunk in serialize():
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first, elapsed, size, peak / 1e6
+
+
+def main():
+    """Runs the benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    arg_parser.add_argument('--records', type=int, default=200000)
+    args = arg_parser.parse_args()
+
+    params = ({'headers': {}}, make_records(args.records))
+
+    def dumps():
+        """The whole document at once, like XmlRpcTransport used to send."""
+        return [xmlrpc_client.dumps(params, methodname='createObjects',
+                                    allow_none=True).encode('utf-8')]
+
+    def iter_dumps():
+        """The document in transports.STREAM_CHUNK_SIZE chunks."""
+        return transports.iter_dumps(params, 'createObjects')
+
+    for name, serialize in [('dumps', dumps), ('iter_dumps', iter_dumps)]:
+        first, elapsed, size, peak = measure(serialize)
+        print('%-10s %d records (%.1f MB): first byte after %.3fs, '
+              'done in %.2fs, peak %.1f MB allocated'
+              % (name, args.records, size / 1e6, first, elapsed, peak))
+
+
+if __name__ == '__main__':
+    main()
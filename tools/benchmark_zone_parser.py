@@ -0,0 +1,84 @@
+"""Benchmarks the BIND zone file parser used by `slcli dns import`.
+
+Writes a synthetic zone with the given number of records (a mix of A, AAAA,
+CNAME, MX, TXT and multi-line records, comments and $ORIGIN/$TTL changes) to
+a temporary file and parses it, streaming from the file.
+
+    python tools/benchmark_zone_parser.py [--records 1000000]
+
+Peak memory stays flat as --records grows, since records are never kept.
+
+:license: MIT, see LICENSE for more details.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+
+from SoftLayer.CLI.dns import zone_import  # noqa: E402 pylint: disable=wrong-import-position
+
+TEMPLATES = [
+    'host{0}  300  IN  A  10.{1}.{2}.{3}\n',
+    '         IN  AAAA  2001:db8::{0:x}\n',
+    'alias{0}  IN  CNAME  host{0}.example.com.\n',
+    'mx{0}  IN  MX  10  host{0}\n',
+    'txt{0}  IN  TXT  "v=spf1 ip4:10.{1}.{2}.{3} -all" ; comment\n',
+    'long{0}  IN  TXT  ( "part one of {0}"\n             "part two" )\n',
+]
+
+
+def write_zone(path, count):
+    """Writes a zone file with count records."""
+    with open(path, 'w') as zone_f:
+        zone_f.write('$ORIGIN example.com.\n$TTL 1h\n')
+        for number in range(count):
+            if number and number % 100000 == 0:
+                zone_f.write('$ORIGIN sub%d.example.com.\n' % number)
+            zone_f.write(TEMPLATES[number % len(TEMPLATES)].format(
+                number, number >> 16 & 255, number >> 8 & 255, number & 255))
+
+
+def main():
+    """Runs the benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    arg_parser.add_argument('--records', type=int, default=1000000)
+    args = arg_parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    try:
+        zone_path = os.path.join(path, 'example.com.zone')
+        write_zone(zone_path, args.records)
+        size = os.path.getsize(zone_path)
+
+        parser = zone_import.ZoneParser()
+        start = time.time()
+        parsed = 0
+        with open(zone_path) as zone_f:
+            for _ in parser.records(zone_f, path=zone_path):
+                parsed += 1
+        elapsed = time.time() - start
+    finally:
+        shutil.rmtree(path)
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        max_rss //= 1024
+
+    print('%d records (%.1f MB) parsed in %.2fs: %d records/s, %.1f MB/s'
+          % (parsed, size / 1e6, elapsed, parsed / elapsed,
+             size / 1e6 / elapsed))
+    print('%d unparsed lines, peak RSS %.1f MB'
+          % (len(parser.bad_lines), max_rss / 1024.0))
+
+
+if __name__ == '__main__':
+    main()